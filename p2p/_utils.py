@@ -7,7 +7,7 @@ import rlp
 def sxor(s1: bytes, s2: bytes) -> bytes:
     if len(s1) != len(s2):
         raise ValueError("Cannot sxor strings of different length")
-    return bytes(x ^ y for x, y in zip(s1, s2))
+    return (int.from_bytes(s1, 'big') ^ int.from_bytes(s2, 'big')).to_bytes(len(s1), 'big')
 
 
 def roundup_16(x: int) -> int:
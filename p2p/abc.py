@@ -8,6 +8,7 @@ from typing import (
     Callable,
     ClassVar,
     ContextManager,
+    Dict,
     Generic,
     Hashable,
     List,
@@ -178,12 +179,15 @@ class CommandAPI(ABC, Generic[TCommandPayload]):
     serialization_codec: SerializationCodecAPI[TCommandPayload]
     compression_codec: CompressionCodecAPI
 
-    payload: TCommandPayload
-
     @abstractmethod
     def __init__(self, payload: TCommandPayload) -> None:
         ...
 
+    @property
+    @abstractmethod
+    def payload(self) -> TCommandPayload:
+        ...
+
     @abstractmethod
     def encode(self, negotiated_command_id: int, snappy_support: bool) -> MessageAPI:
         ...
@@ -203,6 +207,11 @@ class TransportAPI(ABC):
     read_state: TransportState
     logger: ExtendedDebugLogger
 
+    # Total bytes written to the remote
+    egress_bytes: int
+    # How many sent messages are waiting to be written to the remote
+    egress_queue_depth: int
+
     @property
     @abstractmethod
     def is_closing(self) -> bool:
@@ -292,6 +301,17 @@ class MultiplexerAPI(ABC):
     def get_total_msg_count(self) -> int:
         ...
 
+    #
+    # Backpressure
+    #
+    @abstractmethod
+    def get_queue_depths(self) -> Dict[str, int]:
+        ...
+
+    @abstractmethod
+    def get_total_stall_time(self) -> float:
+        ...
+
     #
     # Proxy Transport properties and methods
     #
@@ -2,7 +2,9 @@ from typing import (
     Any,
     Callable,
     ClassVar,
+    Dict,
     Type,
+    TypeVar,
 )
 
 import snappy
@@ -14,7 +16,6 @@ from p2p.abc import (
     CompressionCodecAPI,
     MessageAPI,
     SerializationCodecAPI,
-    TCommand,
 )
 from p2p.constants import RLPX_HEADER_DATA
 from p2p.message import Message
@@ -83,22 +84,63 @@ class NoCompressionCodec(CompressionCodecAPI):
         return data
 
 
+TBaseCommand = TypeVar('TBaseCommand', bound='BaseCommand[Any]')
+
+
 class BaseCommand(CommandAPI[TCommandPayload]):
     protocol_command_id: ClassVar[int]
 
     serialization_codec: SerializationCodecAPI[TCommandPayload]
     compression_codec: CompressionCodecAPI = SnappyCodec()
 
-    payload: TCommandPayload
+    _payload: TCommandPayload
+    _encoded_payload: bytes = None
 
     def __init__(self, payload: TCommandPayload) -> None:
-        self.payload = payload
+        self._payload = payload
+
+    @classmethod
+    def from_encoded_payload(cls: Type[TBaseCommand], encoded_payload: bytes) -> TBaseCommand:
+        """
+        Build a command around a payload that was already serialized with the
+        command's ``serialization_codec``. The encoded payload is sent as-is, and
+        only deserialized if :attr:`payload` is accessed.
+        """
+        command = cls.__new__(cls)
+        command._encoded_payload = encoded_payload
+        return command
+
+    @property
+    def payload(self) -> TCommandPayload:
+        try:
+            return self._payload
+        except AttributeError:
+            try:
+                self._payload = self.serialization_codec.decode(self._encoded_payload)
+            except (rlp.exceptions.DecodingError, rlp.exceptions.DeserializationError) as err:
+                raise MalformedMessage(f"Malformed payload for {type(self)}: {err}") from err
+            return self._payload
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Commands that have their raw payload cross process boundaries with only that,
+        #   which is smaller than the decoded payload, and is decoded again on first access.
+        state = self.__dict__.copy()
+        if self._encoded_payload is not None:
+            state.pop('_payload', None)
+        return state
 
     def __repr__(self) -> str:
-        return f"{self.__class__}(payload={self.payload})"
+        try:
+            payload = self.payload
+        except MalformedMessage:
+            return f"{self.__class__}(malformed payload)"
+        return f"{self.__class__}(payload={payload})"
 
     def encode(self, cmd_id: int, snappy_support: bool) -> MessageAPI:
-        raw_payload_data = self.serialization_codec.encode(self.payload)
+        if self._encoded_payload is None:
+            raw_payload_data = self.serialization_codec.encode(self.payload)
+        else:
+            raw_payload_data = self._encoded_payload
 
         if snappy_support:
             payload_data = self.compression_codec.compress(raw_payload_data)
@@ -118,17 +160,14 @@ class BaseCommand(CommandAPI[TCommandPayload]):
         return Message(header, body)
 
     @classmethod
-    def decode(cls: Type[TCommand], message: MessageAPI, snappy_support: bool) -> TCommand:
+    def decode(cls: Type[TBaseCommand],
+               message: MessageAPI,
+               snappy_support: bool) -> TBaseCommand:
         if snappy_support:
             payload_data = cls.compression_codec.decompress(message.encoded_payload)
         else:
             payload_data = message.encoded_payload
 
-        try:
-            payload = cls.serialization_codec.decode(payload_data)
-        except rlp.exceptions.DeserializationError as err:
-            raise rlp.exceptions.DeserializationError(
-                f"DeserializationError for {cls}",
-                err.serial,
-            ) from err
-        return cls(payload)
+        # The payload is only deserialized when it's first accessed, so that the commands
+        # that are only relayed, counted or dropped never pay for it.
+        return cls.from_encoded_payload(payload_data)
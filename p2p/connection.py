@@ -152,7 +152,7 @@ class Connection(ConnectionAPI, BaseService):
                     protocol,
                     type(cmd),
                 )
-                self.run_task(proto_handler_fn(self, cmd))
+                self.run_task(self._run_handler(proto_handler_fn, cmd))
             command_handlers = set(self._command_handlers[type(cmd)])
             for cmd_handler_fn in command_handlers:
                 self.logger.debug2(
@@ -161,7 +161,20 @@ class Connection(ConnectionAPI, BaseService):
                     protocol,
                     type(cmd),
                 )
-                self.run_task(cmd_handler_fn(self, cmd))
+                self.run_task(self._run_handler(cmd_handler_fn, cmd))
+
+    async def _run_handler(self, handler_fn: HandlerFn, cmd: CommandAPI[Any]) -> None:
+        try:
+            await handler_fn(self, cmd)
+        except MalformedMessage as err:
+            # The payloads are decoded when the handlers first read them
+            self.logger.debug(
+                "Disconnecting peer %s for sending MalformedMessage: %s",
+                self.remote,
+                err,
+            )
+            self.get_base_protocol().send(Disconnect(DisconnectReason.BAD_PROTOCOL))
+            self.cancel_nowait()
 
     def add_protocol_handler(self,
                              protocol_class: Type[ProtocolAPI],
@@ -32,6 +32,16 @@ HEADER_LEN = 16
 # Length of an RLPx header's/frame's MAC
 MAC_LEN = 16
 
+# Each transport decrypts incoming frames into a buffer that it reuses for the next frames,
+# as long as they fit in this many bytes. Bigger frames get a buffer of their own, so that
+# a peer that sends a single huge frame doesn't pin that much memory for the connection.
+MAX_REUSED_DECRYPTION_BUFFER_SIZE = 64 * 1024
+
+# Each transport encrypts outgoing frames into a buffer, and writes all the frames that were
+# sent in the same iteration of the event loop at once. The buffer is reused for the next
+# frames, unless a burst of big frames made it grow past this many bytes.
+MAX_REUSED_EGRESS_BUFFER_SIZE = 256 * 1024
+
 # The amount of seconds a connection can be idle.
 CONN_IDLE_TIMEOUT = 30
 
@@ -9,7 +9,10 @@ from eth_utils import (
 
 from p2p.abc import ConnectionAPI
 
-from p2p.exceptions import PeerConnectionLost
+from p2p.exceptions import (
+    MalformedMessage,
+    PeerConnectionLost,
+)
 
 from .abc import (
     ExchangeManagerAPI,
@@ -63,7 +66,9 @@ class ExchangeManager(ExchangeManagerAPI[TRequestCommand, TResponseCommand, TRes
                     result = normalizer.normalize_result(payload)
 
                 validate_result(result)
-            except ValidationError as err:
+            except (ValidationError, MalformedMessage) as err:
+                # MalformedMessage is raised when the response payload, which is only
+                # decoded on first access, turns out to be invalid
                 self.service.logger.debug(
                     "Response validation failed for pending %s request from connection %s: %s",
                     stream.response_cmd_name,
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import collections
+import time
 from typing import (
     Any,
     AsyncIterator,
@@ -94,6 +95,19 @@ async def stream_transport_messages(transport: TransportAPI,
 
 
 class Multiplexer(CancellableMixin, MultiplexerAPI):
+    """
+    Read the messages from the transport, and feed them into a queue for each protocol.
+
+    The queues are bounded: when the consumer of a protocol lags behind, the multiplexer
+    stops reading from the transport, so that the remote has to wait for it instead of the
+    messages getting dropped. The protocols are ranked by ``protocol_priority``, from the
+    highest priority to the lowest, and by default the base protocol comes first, then the
+    sub-protocols in the order they were given. A message that finds the queue of its
+    protocol full is queued anyway, and only the next message for that protocol, or for
+    one of a lower priority, waits for the consumer to catch up. So messages of a higher
+    priority, like a Ping or a Disconnect, still get through while a lower priority
+    consumer lags.
+    """
     logger = get_extended_debug_logger('p2p.multiplexer.Multiplexer')
 
     _multiplex_token: CancelToken
@@ -103,13 +117,15 @@ class Multiplexer(CancellableMixin, MultiplexerAPI):
 
     _protocol_locks: ResourceLock
     _protocol_queues: Dict[Type[ProtocolAPI], 'asyncio.Queue[CommandAPI[Any]]']
+    _protocol_ranks: Dict[Type[ProtocolAPI], int]
 
     def __init__(self,
                  transport: TransportAPI,
                  base_protocol: BaseP2PProtocol,
                  protocols: Sequence[ProtocolAPI],
                  token: CancelToken = None,
-                 max_queue_size: int = 4096) -> None:
+                 max_queue_size: int = 4096,
+                 protocol_priority: Sequence[Type[ProtocolAPI]] = None) -> None:
         if token is None:
             loop = None
         else:
@@ -137,15 +153,38 @@ class Multiplexer(CancellableMixin, MultiplexerAPI):
         self._protocol_locks = ResourceLock()
 
         # Each protocol gets a queue where messages for the individual protocol
-        # are placed when streamed from the transport
+        # are placed when streamed from the transport. The queues themselves are
+        # unbounded: `_do_multiplexing` enforces the bound, by waiting for the
+        # consumers to catch up before reading more messages.
+        self._max_queue_size = max_queue_size
         self._protocol_queues = {
-            type(protocol): asyncio.Queue(max_queue_size)
+            type(protocol): asyncio.Queue()
             for protocol
             in self.get_protocols()
         }
+        # Set each time a message is taken out of one of the queues
+        self._queue_consumed = asyncio.Event()
+
+        # The rank of each protocol, where a lower rank is a higher priority
+        self._protocol_ranks = {}
+        if protocol_priority is None:
+            protocol_priority = ()
+        for protocol in self.get_protocols():
+            for rank, priority_class in enumerate(protocol_priority):
+                if isinstance(protocol, priority_class):
+                    self._protocol_ranks[type(protocol)] = rank
+                    break
+            else:
+                # protocols without an explicit priority come after the ones with one
+                self._protocol_ranks[type(protocol)] = (
+                    len(protocol_priority) + len(self._protocol_ranks)
+                )
 
         self._msg_counts = collections.defaultdict(int)
 
+        # Total time spent not reading from the transport, waiting for lagging consumers
+        self._stall_time = 0.0
+
     def __str__(self) -> str:
         protocol_infos = ','.join(tuple(
             f"{proto.name}:{proto.version}"
@@ -169,6 +208,19 @@ class Multiplexer(CancellableMixin, MultiplexerAPI):
     def get_total_msg_count(self) -> int:
         return sum(self._msg_counts.values())
 
+    #
+    # Backpressure
+    #
+    def get_queue_depths(self) -> Dict[str, int]:
+        return {
+            protocol_class.name: queue.qsize()
+            for protocol_class, queue
+            in self._protocol_queues.items()
+        }
+
+    def get_total_stall_time(self) -> float:
+        return self._stall_time
+
     #
     # Proxy Transport methods
     #
@@ -301,9 +353,12 @@ class Multiplexer(CancellableMixin, MultiplexerAPI):
                     # the event loop.  Since this is an async generator it will
                     # yield to the loop each time it returns a value so we
                     # don't have to worry about this blocking other processes.
-                    yield msg_queue.get_nowait()
+                    cmd = msg_queue.get_nowait()
                 except asyncio.QueueEmpty:
-                    yield await self.wait(msg_queue.get(), token=token)
+                    cmd = await self.wait(msg_queue.get(), token=token)
+                # the multiplexing may be waiting for this queue to make room
+                self._queue_consumed.set()
+                yield cmd
 
     #
     # Message reading and streaming API
@@ -397,21 +452,41 @@ class Multiplexer(CancellableMixin, MultiplexerAPI):
             # track total number of messages received for each command type.
             self._msg_counts[type(cmd)] += 1
 
-            queue = self._protocol_queues[type(protocol)]
-            try:
-                # We must use `put_nowait` here to ensure that in the event
-                # that a single protocol queue is full that we don't block
-                # other protocol messages getting through.
-                queue.put_nowait(cmd)
-            except asyncio.QueueFull:
-                self.logger.error(
-                    (
-                        "Multiplexing queue for protocol '%s' full. "
-                        "discarding message: %s"
-                    ),
-                    protocol,
-                    cmd,
+            protocol_class = type(protocol)
+            queue = self._protocol_queues[protocol_class]
+            if self._must_wait_for_consumers(protocol_class):
+                self.logger.debug2(
+                    "Multiplexing for %s stalled, queue depths: %s",
+                    self.remote,
+                    self.get_queue_depths(),
                 )
+                stall_start = time.monotonic()
+                try:
+                    # Stop reading from the transport until the consumers catch up, so
+                    # that the remote waits for us.
+                    while self._must_wait_for_consumers(protocol_class):
+                        self._queue_consumed.clear()
+                        await self.wait(self._queue_consumed.wait(), token=token)
+                finally:
+                    # the message was read from the transport already, so it is queued
+                    # even if the multiplexing stops meanwhile
+                    queue.put_nowait(cmd)
+                    self._stall_time += time.monotonic() - stall_start
+            else:
+                queue.put_nowait(cmd)
 
             if stop.is_set():
                 break
+
+    def _must_wait_for_consumers(self, protocol_class: Type[ProtocolAPI]) -> bool:
+        """
+        Whether a message of the given protocol has to wait before it is queued: that is
+        while the queue of that protocol, or of any protocol with a higher priority, is
+        over its bound.
+        """
+        rank = self._protocol_ranks[protocol_class]
+        return any(
+            queue.qsize() > self._max_queue_size
+            for other_class, queue in self._protocol_queues.items()
+            if self._protocol_ranks[other_class] <= rank
+        )
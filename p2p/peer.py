@@ -211,6 +211,22 @@ class BasePeer(BaseService):
     def received_msgs_count(self) -> int:
         return self.connection.get_multiplexer().get_total_msg_count()
 
+    @property
+    def msg_queue_depths(self) -> Dict[str, int]:
+        return self.connection.get_multiplexer().get_queue_depths()
+
+    @property
+    def multiplexer_stall_time(self) -> float:
+        return self.connection.get_multiplexer().get_total_stall_time()
+
+    @property
+    def egress_bytes(self) -> int:
+        return self.connection.get_multiplexer().get_transport().egress_bytes
+
+    @property
+    def egress_queue_depth(self) -> int:
+        return self.connection.get_multiplexer().get_transport().egress_queue_depth
+
     def add_subscriber(self, subscriber: 'PeerSubscriber') -> None:
         self._subscribers.append(subscriber)
 
@@ -511,10 +511,17 @@ class BasePeerPool(BaseService, AsyncIterable[BasePeer]):
                         "%s is no longer alive but had not been removed from pool", peer)
                     continue
                 self.logger.debug(
-                    "%s: uptime=%s, received_msgs=%d",
+                    "%s: uptime=%s, received_msgs=%d, egress_bytes=%d, egress_queue=%d",
                     peer,
                     humanize_seconds(peer.uptime),
                     peer.received_msgs_count,
+                    peer.egress_bytes,
+                    peer.egress_queue_depth,
+                )
+                self.logger.debug(
+                    "msg_queue_depths=%s, stalled=%.3fs",
+                    peer.msg_queue_depths,
+                    peer.multiplexer_stall_time,
                 )
                 self.logger.debug(
                     "client_version_string='%s'",
@@ -1,4 +1,4 @@
-from typing import Callable, Tuple, Type
+from typing import Callable, Sequence, Tuple, Type
 
 from cancel_token import CancelToken
 
@@ -30,6 +30,8 @@ def MultiplexerPairFactory(*,
                            bob_private_key: keys.PrivateKey = None,
                            bob_p2p_version: int = DEVP2P_V5,
                            cancel_token: CancelToken = None,
+                           max_queue_size: int = 4096,
+                           protocol_priority: Sequence[Type[ProtocolAPI]] = None,
                            ) -> Tuple[MultiplexerAPI, MultiplexerAPI]:
     if cancel_token is None:
         cancel_token = CancelTokenFactory(name='multiplexer-factory')
@@ -67,6 +69,8 @@ def MultiplexerPairFactory(*,
         base_protocol=alice_p2p_protocol,
         protocols=alice_protocols,
         token=cancel_token,
+        max_queue_size=max_queue_size,
+        protocol_priority=protocol_priority,
     )
 
     bob_p2p_protocol = p2p_protocol_class(bob_transport, 0, snappy_support)
@@ -75,5 +79,7 @@ def MultiplexerPairFactory(*,
         base_protocol=bob_p2p_protocol,
         protocols=bob_protocols,
         token=cancel_token,
+        max_queue_size=max_queue_size,
+        protocol_priority=protocol_priority,
     )
     return alice_multiplexer, bob_multiplexer
@@ -38,6 +38,9 @@ class MemoryTransport(TransportAPI):
         self._private_key = private_key
         self._reader = reader
         self._writer = writer
+        self.egress_bytes = 0
+        # messages are written right away
+        self.egress_queue_depth = 0
 
     @classmethod
     def connected_pair(cls,
@@ -74,6 +77,7 @@ class MemoryTransport(TransportAPI):
 
     def write(self, data: bytes) -> None:
         self._writer.write(data)
+        self.egress_bytes += len(data)
 
     async def recv(self, token: CancelToken) -> MessageAPI:
         self.read_state = TransportState.HEADER
@@ -3,7 +3,7 @@ import functools
 import hmac
 import secrets
 import struct
-from typing import ByteString, Tuple
+from typing import Optional
 
 import sha3
 
@@ -39,6 +39,8 @@ from p2p.constants import (
     HASH_LEN,
     HEADER_LEN,
     MAC_LEN,
+    MAX_REUSED_DECRYPTION_BUFFER_SIZE,
+    MAX_REUSED_EGRESS_BUFFER_SIZE,
     REPLY_TIMEOUT,
 )
 from p2p.exceptions import (
@@ -57,10 +59,25 @@ from p2p.transport_state import TransportState
 HEADER_DATA_SEDES = rlp.sedes.List((rlp.sedes.big_endian_int, rlp.sedes.big_endian_int))
 
 
+# The AES block size, which is also how much bigger than the input the output buffer of
+# a cipher's update_into() must be
+AES_BLOCK_SIZE = 16
+
+# Frame bodies are padded with zeros to a multiple of the AES block size
+FRAME_PADDING = b'\x00' * AES_BLOCK_SIZE
+
+
 @functools.lru_cache(256)
-def _decode_header_data(data: ByteString) -> Tuple[int, int]:
+def _strip_header_data_padding(data: bytes) -> bytes:
+    # Decode the header data and re-encode to recover the unpadded header size. Almost all
+    # frames have the same header data, so this is nearly always a cache hit.
     header_data = rlp.decode(data, sedes=HEADER_DATA_SEDES, strict=False)
-    return header_data
+    return rlp.encode(header_data, sedes=HEADER_DATA_SEDES)
+
+
+def _set_idle_timeout(idle_timeout: 'asyncio.Future[None]') -> None:
+    if not idle_timeout.done():
+        idle_timeout.set_result(None)
 
 
 class Transport(TransportAPI):
@@ -102,6 +119,20 @@ class Transport(TransportAPI):
         self._aes_enc = aes_cipher.encryptor()
         self._aes_dec = aes_cipher.decryptor()
 
+        # incoming frames are decrypted into this buffer, which is reused for every frame
+        self._decryption_buffer = bytearray()
+        # ends the current read when the peer stays idle for too long
+        self._idle_timer: asyncio.TimerHandle = None
+
+        # Outgoing frames are encrypted into this buffer, until they are written together.
+        # It's only filled up to _egress_size, the rest is preallocated for the next frames.
+        self._egress_buffer = bytearray()
+        self._egress_size = 0
+        self._egress_flush: Optional['asyncio.Future[None]'] = None
+        self._is_egress_draining = False
+        self.egress_bytes = 0
+        self.egress_queue_depth = 0
+
         mac_cipher = Cipher(algorithms.AES(mac_secret), modes.ECB(), default_backend())
         self._mac_enc = mac_cipher.encryptor().update
 
@@ -259,7 +290,10 @@ class Transport(TransportAPI):
             raise PeerConnectionLost(f"Lost connection to {self.remote}") from err
 
     def write(self, data: bytes) -> None:
+        # keep the order with the frames that are waiting to be written
+        self._write_egress_buffer()
         self._writer.write(data)
+        self.egress_bytes += len(data)
 
     async def recv(self, token: CancelToken) -> MessageAPI:
         # Check that Transport read state is IDLE.
@@ -274,11 +308,40 @@ class Transport(TransportAPI):
             )
             raise Exception(f"Corrupted transport: {self} - state={self.read_state.name}")
 
+        # Wait on the whole frame at once: every cancellable wait on the token
+        # costs a few tasks, which add up when receiving a lot of small messages.
+        # The idle timeout still applies to the header and the body reads separately,
+        # so that a big frame that arrives after a long idle wait doesn't time out.
+        idle_timeout: 'asyncio.Future[None]' = asyncio.Future()
+        try:
+            message = await token.cancellable_wait(self._recv_frame(idle_timeout), idle_timeout)
+        except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError) as err:
+            raise PeerConnectionLost(f"Lost connection to {self.remote}") from err
+        finally:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+
+        if message is None:
+            raise asyncio.TimeoutError(f"{self.remote} was idle for {CONN_IDLE_TIMEOUT}s")
+        else:
+            return message
+
+    def _restart_idle_timer(self, idle_timeout: 'asyncio.Future[None]') -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+        self._idle_timer = asyncio.get_event_loop().call_later(
+            CONN_IDLE_TIMEOUT,
+            _set_idle_timeout,
+            idle_timeout,
+        )
+
+    async def _recv_frame(self, idle_timeout: 'asyncio.Future[None]') -> MessageAPI:
         # Set status to indicate we are waiting to read the message header
         self.read_state = TransportState.HEADER
+        self._restart_idle_timer(idle_timeout)
 
         try:
-            header_bytes = await self.read(HEADER_LEN + MAC_LEN, token)
+            header_bytes = await self._reader.readexactly(HEADER_LEN + MAC_LEN)
         except asyncio.CancelledError:
             self.logger.debug('Transport cancelled during header read. resetting to IDLE state')
             self.read_state = TransportState.IDLE
@@ -299,7 +362,8 @@ class Transport(TransportAPI):
         # The frame_size specified in the header does not include the padding to 16-byte boundary,
         # so need to do this here to ensure we read all the frame's data.
         read_size = roundup_16(frame_size)
-        frame_data = await self.read(read_size + MAC_LEN, token)
+        self._restart_idle_timer(idle_timeout)
+        frame_data = await self._reader.readexactly(read_size + MAC_LEN)
         try:
             body = self._decrypt_body(frame_data, frame_size)
         except DecryptionError as err:
@@ -312,26 +376,62 @@ class Transport(TransportAPI):
         # Reset status back to IDLE
         self.read_state = TransportState.IDLE
 
-        # Decode the header data and re-encode to recover the unpadded header size.
         try:
-            header_data = _decode_header_data(padded_header[3:])
+            header_data = _strip_header_data_padding(padded_header[3:])
         except rlp.exceptions.DeserializationError as err:
             raise MalformedMessage from err
 
-        header = padded_header[:3] + rlp.encode(header_data)
+        header = padded_header[:3] + header_data
 
         return Message(header, body)
 
     def send(self, message: MessageAPI) -> None:
-        header = message.header.ljust(roundup_16(len(message.header)), b'\x00')
-        body = message.body.ljust(roundup_16(len(message.body)), b'\x00')
         if self.is_closing:
             raise PeerConnectionLost(
                 f"Attempted to send msg with cmd id {message.command_id} to "
                 f"disconnected peer {self.remote}"
             )
 
-        self.write(self._encrypt(header, body))
+        self._encrypt_into_egress_buffer(message.header, message.body)
+        self.egress_queue_depth += 1
+
+        if self._egress_size >= MAX_REUSED_EGRESS_BUFFER_SIZE and not self._is_egress_draining:
+            # Batching more of a big burst doesn't save much, so write it right away, to keep
+            # reusing the buffer. Unless the socket can't take more data: then it waits.
+            self._write_egress_buffer()
+        elif self._egress_flush is None or self._egress_flush.done():
+            # The flush only starts on the next iteration of the event loop, so all the
+            # messages that are sent until then go out in a single write.
+            self._egress_flush = asyncio.ensure_future(self._flush_egress())
+
+    async def _flush_egress(self) -> None:
+        while self._egress_size:
+            self._write_egress_buffer()
+            # Wait for the socket to take the data, if the remote is slow to read it. The
+            # messages that are sent meanwhile pile up in the buffer, for the next write.
+            self._is_egress_draining = True
+            try:
+                await self._writer.drain()
+            except OSError as err:
+                # the receive path will notice that the connection is lost, and report it
+                self.logger.debug2("Lost connection to %s while writing: %r", self.remote, err)
+                return
+            finally:
+                self._is_egress_draining = False
+
+    def _write_egress_buffer(self) -> None:
+        if not self._egress_size:
+            return
+
+        # Hand a copy to the writer, because some event loops hold on to the data until
+        # the socket accepts it, while the buffer gets reused right away.
+        self._writer.write(bytes(memoryview(self._egress_buffer)[:self._egress_size]))
+
+        self.egress_bytes += self._egress_size
+        self.egress_queue_depth = 0
+        self._egress_size = 0
+        if len(self._egress_buffer) > MAX_REUSED_EGRESS_BUFFER_SIZE:
+            self._egress_buffer = bytearray()
 
     def close(self) -> None:
         """Close this peer's reader/writer streams.
@@ -340,6 +440,9 @@ class Transport(TransportAPI):
 
         If the streams have already been closed, do nothing.
         """
+        if not self.is_closing:
+            # a message like Disconnect is often sent right before closing
+            self._write_egress_buffer()
         if not self._reader.at_eof():
             self._reader.feed_eof()
         self._writer.close()
@@ -348,24 +451,50 @@ class Transport(TransportAPI):
     def is_closing(self) -> bool:
         return self._writer.transport.is_closing()
 
-    def _encrypt(self, header: bytes, frame: bytes) -> bytes:
-        if len(header) != HEADER_LEN:
+    def _encrypt_into_egress_buffer(self, header: bytes, body: bytes) -> None:
+        if roundup_16(len(header)) != HEADER_LEN:
             raise ValueError(f"Unexpected header length: {len(header)}")
 
-        header_ciphertext = self._aes_enc.update(header)
+        body_size = len(body)
+        padded_body_size = roundup_16(body_size)
+        header_start = self._egress_size
+        body_start = header_start + HEADER_LEN + MAC_LEN
+        body_end = body_start + body_size
+        frame_end = body_start + padded_body_size
+        buffer = self._get_egress_buffer(frame_end + MAC_LEN)
+        # The output of update_into() must have room for an extra block, which the MAC
+        # after the header and the body provides, until it's written.
+        buffer_view = memoryview(buffer)
+
+        self._aes_enc.update_into(header.ljust(HEADER_LEN, b'\x00'), buffer_view[header_start:])
+        header_ciphertext = bytes(buffer_view[header_start:header_start + HEADER_LEN])
         mac_secret = self._egress_mac.digest()[:HEADER_LEN]
         self._egress_mac.update(sxor(self._mac_enc(mac_secret), header_ciphertext))
-        header_mac = self._egress_mac.digest()[:HEADER_LEN]
-
-        frame_ciphertext = self._aes_enc.update(frame)
-        self._egress_mac.update(frame_ciphertext)
-        fmac_seed = self._egress_mac.digest()[:HEADER_LEN]
+        buffer_view[body_start - MAC_LEN:body_start] = self._egress_mac.digest()[:MAC_LEN]
+
+        # AES-CTR is a stream cipher, so encrypting the body and its padding one after the
+        # other is the same as encrypting the padded body
+        if body_size:
+            self._aes_enc.update_into(body, buffer_view[body_start:])
+        if padded_body_size > body_size:
+            self._aes_enc.update_into(
+                FRAME_PADDING[:padded_body_size - body_size],
+                buffer_view[body_end:],
+            )
+        self._egress_mac.update(buffer_view[body_start:frame_end])
+        fmac_seed = self._egress_mac.digest()[:MAC_LEN]
+        self._egress_mac.update(sxor(self._mac_enc(fmac_seed), fmac_seed))
+        buffer_view[frame_end:frame_end + MAC_LEN] = self._egress_mac.digest()[:MAC_LEN]
 
-        mac_secret = self._egress_mac.digest()[:HEADER_LEN]
-        self._egress_mac.update(sxor(self._mac_enc(mac_secret), fmac_seed))
-        frame_mac = self._egress_mac.digest()[:HEADER_LEN]
+        self._egress_size = frame_end + MAC_LEN
 
-        return header_ciphertext + header_mac + frame_ciphertext + frame_mac
+    def _get_egress_buffer(self, size: int) -> bytearray:
+        if len(self._egress_buffer) < size:
+            # grow geometrically, a burst of messages is usually followed by more of them
+            new_buffer = bytearray(max(size, 2 * len(self._egress_buffer)))
+            new_buffer[:self._egress_size] = memoryview(self._egress_buffer)[:self._egress_size]
+            self._egress_buffer = new_buffer
+        return self._egress_buffer
 
     def _decrypt_header(self, data: bytes) -> bytes:
         if len(data) != HEADER_LEN + MAC_LEN:
@@ -392,8 +521,10 @@ class Transport(TransportAPI):
                 f'Insufficient body length; Got {len(data)}, wanted {read_size} + {MAC_LEN}'
             )
 
-        frame_ciphertext = data[:read_size]
-        frame_mac = data[read_size:read_size + MAC_LEN]
+        # Slice without copying: the body can be up to 16MB
+        data_view = memoryview(data)
+        frame_ciphertext = data_view[:read_size]
+        frame_mac = data_view[read_size:read_size + MAC_LEN]
 
         self._ingress_mac.update(frame_ciphertext)
         fmac_seed = self._ingress_mac.digest()[:MAC_LEN]
@@ -403,7 +534,18 @@ class Transport(TransportAPI):
             raise DecryptionError(
                 f'Invalid frame mac: expected {expected_frame_mac.hex()}, got {frame_mac.hex()}'
             )
-        return self._aes_dec.update(frame_ciphertext)[:body_size]
+
+        buffer = self._get_decryption_buffer(read_size + AES_BLOCK_SIZE)
+        self._aes_dec.update_into(frame_ciphertext, buffer)
+        # the buffer is overwritten by the next frame, so the body must be copied out of it
+        return bytes(memoryview(buffer)[:body_size])
+
+    def _get_decryption_buffer(self, size: int) -> bytearray:
+        if size > MAX_REUSED_DECRYPTION_BUFFER_SIZE:
+            return bytearray(size)
+        elif len(self._decryption_buffer) < size:
+            self._decryption_buffer = bytearray(size)
+        return self._decryption_buffer
 
     def _get_frame_size(self, header: bytes) -> int:
         # The frame size is encoded in the header as a 3-byte int, so before we unpack we need
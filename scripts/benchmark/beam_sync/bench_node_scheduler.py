@@ -0,0 +1,225 @@
+"""
+Compare urgent GetNodeData scheduling strategies of beam sync, by replaying a
+peer latency trace against simulated peers.
+
+The trace is a JSON object mapping each peer name to a list of observed
+GetNodeData round trip times, in seconds. Each simulated peer replays its
+round trip times in order, wrapping around at the end. Without a trace, a
+synthetic one is generated, where each peer occasionally stalls.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+
+from eth_utils.toolz import partition_all
+
+from p2p.stats.ema import EMA
+
+from trinity.protocol.eth.constants import MAX_STATE_FETCH
+from trinity.sync.beam.scheduler import NodeDataScheduler
+
+logger = logging.getLogger('trinity.scripts.benchmark')
+logger.setLevel(logging.INFO)
+
+handler_stream = logging.StreamHandler(sys.stderr)
+handler_stream.setLevel(logging.INFO)
+
+logger.addHandler(handler_stream)
+
+
+class SimulatedTracker:
+    def __init__(self) -> None:
+        self.round_trip_ema = EMA(initial_value=1, smoothing_factor=0.05)
+        self.items_per_second_ema = EMA(initial_value=0, smoothing_factor=0.05)
+
+
+class SimulatedGetNodeData:
+    """
+    Stands in for the GetNodeData exchange of a peer, answering every request
+    after the next round trip time of the trace.
+    """
+    def __init__(self, round_trip_times, per_node_time):
+        self._round_trip_times = itertools.cycle(round_trip_times)
+        self._per_node_time = per_node_time
+        self._lock = asyncio.Lock()
+        self.tracker = SimulatedTracker()
+
+    @property
+    def is_requesting(self):
+        return self._lock.locked()
+
+    async def __call__(self, node_hashes, timeout=None):
+        async with self._lock:
+            round_trip_time = next(self._round_trip_times) + self._per_node_time * len(node_hashes)
+            if timeout is not None and round_trip_time > timeout:
+                await asyncio.sleep(timeout)
+                raise asyncio.TimeoutError()
+
+            await asyncio.sleep(round_trip_time)
+            self.tracker.round_trip_ema.update(round_trip_time)
+            self.tracker.items_per_second_ema.update(len(node_hashes) / round_trip_time)
+            return tuple((node_hash, node_hash) for node_hash in node_hashes)
+
+
+class SimulatedETHAPI:
+    def __init__(self, get_node_data):
+        self.get_node_data = get_node_data
+
+
+class SimulatedPeer:
+    is_operational = True
+
+    def __init__(self, name, round_trip_times, per_node_time):
+        self.name = name
+        self.eth_api = SimulatedETHAPI(SimulatedGetNodeData(round_trip_times, per_node_time))
+
+    def __repr__(self):
+        return f"<SimulatedPeer {self.name}>"
+
+
+def synthetic_trace(num_peers, num_samples, seed):
+    rng = random.Random(seed)
+    trace = {}
+    for peer_index in range(num_peers):
+        median = rng.uniform(0.05, 0.3)
+        trace[f"peer-{peer_index}"] = [
+            # occasionally, a peer stalls for much longer than usual
+            median * rng.lognormvariate(0, 0.3) * (10 if rng.random() < 0.05 else 1)
+            for _ in range(num_samples)
+        ]
+    return trace
+
+
+def queen_sort_key(peer):
+    return -1 * peer.eth_api.get_node_data.tracker.items_per_second_ema.value
+
+
+async def request_from_queen(peers, node_hashes, timeout):
+    queen = min(peers, key=queen_sort_key)
+    try:
+        return await queen.eth_api.get_node_data(node_hashes, timeout=timeout)
+    except asyncio.TimeoutError:
+        return ()
+
+
+async def run_strategy(name, request_nodes, trace, args):
+    peers = [
+        SimulatedPeer(peer_name, round_trip_times, args.per_node_ms / 1000)
+        for peer_name, round_trip_times in trace.items()
+    ]
+    # one node hash per unique integer, so every reply can be checked
+    node_hashes = tuple(i.to_bytes(32, 'big') for i in range(args.num_batches * args.batch_size))
+
+    batch_times = []
+    missing = 0
+    for batch in partition_all(args.batch_size, node_hashes):
+        start = time.perf_counter()
+        nodes = await request_nodes(peers, batch)
+        batch_times.append(time.perf_counter() - start)
+        missing += len(batch) - len(nodes)
+
+    batch_times.sort()
+    logger.info(
+        "%s: mean=%.3fs  median=%.3fs  p95=%.3fs  max=%.3fs  missing=%d",
+        name,
+        statistics.mean(batch_times),
+        statistics.median(batch_times),
+        batch_times[int(len(batch_times) * 0.95)],
+        batch_times[-1],
+        missing,
+    )
+
+
+parser = argparse.ArgumentParser(description='Beam Sync Node Data Scheduler Benchmark')
+parser.add_argument(
+    '--trace',
+    type=argparse.FileType('r'),
+    required=False,
+    help=(
+        "JSON file mapping peer names to lists of GetNodeData round trip times, in seconds"
+    ),
+)
+parser.add_argument(
+    '--num-peers',
+    type=int,
+    required=False,
+    default=6,
+    help=(
+        "Number of peers in the synthetic trace, if no trace is given"
+    ),
+)
+parser.add_argument(
+    '--num-batches',
+    type=int,
+    required=False,
+    default=100,
+    help=(
+        "Number of urgent batches to request, one after the other"
+    ),
+)
+parser.add_argument(
+    '--batch-size',
+    type=int,
+    required=False,
+    default=64,
+    help=(
+        "Number of node hashes in each urgent batch"
+    ),
+)
+parser.add_argument(
+    '--per-node-ms',
+    type=float,
+    required=False,
+    default=0.2,
+    help=(
+        "Time a peer takes to serve each node, on top of the round trip time"
+    ),
+)
+parser.add_argument(
+    '--timeout',
+    type=float,
+    required=False,
+    default=10,
+    help=(
+        "Reply timeout for each request, in seconds"
+    ),
+)
+
+
+async def main(args):
+    if args.trace:
+        trace = json.load(args.trace)
+    else:
+        trace = synthetic_trace(args.num_peers, 1000, seed=0)
+
+    logger.info(
+        "Running beam node scheduler benchmark:\n - %d peer(s)\n - %d batches of %d nodes\n"
+        "*****************************\n",
+        len(trace),
+        args.num_batches,
+        min(args.batch_size, MAX_STATE_FETCH),
+    )
+
+    await run_strategy(
+        "Queen only",
+        lambda peers, batch: request_from_queen(peers, batch, args.timeout),
+        trace,
+        args,
+    )
+
+    scheduler = NodeDataScheduler(args.timeout)
+    await run_strategy("Multi-peer scheduler", scheduler.get_node_data, trace, args)
+    logger.info("Scheduler: %s", scheduler)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    args.batch_size = min(args.batch_size, MAX_STATE_FETCH)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main(args))
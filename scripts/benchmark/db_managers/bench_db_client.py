@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import logging
 import multiprocessing
 import os
@@ -9,11 +10,15 @@ import sys
 import tempfile
 import time
 
+from eth_utils.toolz import partition_all
+
 from eth.db.backends.level import LevelDB
 
 from trinity.db.manager import (
+    AsyncDBClient,
     DBManager,
     DBClient,
+    PipelinedDBClient,
 )
 
 logger = logging.getLogger('trinity.scripts.benchmark')
@@ -65,6 +70,61 @@ def run_client(ipc_path, client_id, num_operations):
     )
 
 
+def run_pipelined_client(ipc_path, client_id, num_operations, pipeline_depth):
+    key_values = {
+        random_bytes(32): random_bytes(256)
+        for i in range(num_operations)
+    }
+
+    db_client = PipelinedDBClient.connect(ipc_path)
+
+    start = time.perf_counter()
+    for window in partition_all(pipeline_depth, key_values.items()):
+        set_futures = [db_client.submit_set(key, value) for key, value in window]
+        for future in set_futures:
+            future.result()
+        get_futures = [db_client.submit_get(key) for key, _ in window]
+        for future in get_futures:
+            future.result()
+    end = time.perf_counter()
+    duration = end - start
+
+    logger.info(
+        "Pipelined client %d: %d get-set per second",
+        client_id,
+        num_operations / duration,
+    )
+
+
+async def _run_async_client(ipc_path, key_values, pipeline_depth):
+    db_client = await AsyncDBClient.connect(ipc_path)
+    try:
+        for window in partition_all(pipeline_depth, key_values.items()):
+            await asyncio.gather(*(db_client.coro_set(key, value) for key, value in window))
+            await asyncio.gather(*(db_client.coro_get(key) for key, _ in window))
+    finally:
+        db_client.close()
+
+
+def run_async_client(ipc_path, client_id, num_operations, pipeline_depth):
+    key_values = {
+        random_bytes(32): random_bytes(256)
+        for i in range(num_operations)
+    }
+
+    loop = asyncio.get_event_loop()
+    start = time.perf_counter()
+    loop.run_until_complete(_run_async_client(ipc_path, key_values, pipeline_depth))
+    end = time.perf_counter()
+    duration = end - start
+
+    logger.info(
+        "Async client %d: %d get-set per second",
+        client_id,
+        num_operations / duration,
+    )
+
+
 parser = argparse.ArgumentParser(description='Database Manager Benchmark')
 parser.add_argument(
     '--num-clients',
@@ -84,15 +144,27 @@ parser.add_argument(
         "Number of set+get operations that should be performed for each client"
     ),
 )
+parser.add_argument(
+    '--protocol',
+    choices=('original', 'pipelined', 'async', 'all'),
+    required=False,
+    default='all',
+    help=(
+        "Which database client protocol to benchmark"
+    ),
+)
+parser.add_argument(
+    '--pipeline-depth',
+    type=int,
+    required=False,
+    default=64,
+    help=(
+        "Number of requests each pipelined or async client keeps in flight"
+    ),
+)
 
 
-if __name__ == '__main__':
-    args = parser.parse_args()
-    logger.info(
-        "Running database manager benchmark:\n - %d client(s)\n - %d get-set operations\n*****************************\n",  # noqa: E501
-        args.num_clients,
-        args.num_operations,
-    )
+def run_benchmark(num_clients, client_target, client_args):
     with tempfile.TemporaryDirectory() as ipc_base_dir:
         ipc_path = pathlib.Path(ipc_base_dir) / 'db.ipc'
 
@@ -100,9 +172,9 @@ if __name__ == '__main__':
 
         clients = [
             multiprocessing.Process(
-                target=run_client,
-                args=(ipc_path, client_id, args.num_operations),
-            ) for client_id in range(args.num_clients)
+                target=client_target,
+                args=(ipc_path, client_id) + client_args,
+            ) for client_id in range(num_clients)
         ]
         server.start()
         for client in clients:
@@ -112,4 +184,27 @@ if __name__ == '__main__':
 
         os.kill(server.pid, signal.SIGINT)
         server.join(1)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    logger.info(
+        "Running database manager benchmark:\n - %d client(s)\n - %d get-set operations\n*****************************\n",  # noqa: E501
+        args.num_clients,
+        args.num_operations,
+    )
+    if args.protocol in ('original', 'all'):
+        run_benchmark(args.num_clients, run_client, (args.num_operations,))
+    if args.protocol in ('pipelined', 'all'):
+        run_benchmark(
+            args.num_clients,
+            run_pipelined_client,
+            (args.num_operations, args.pipeline_depth),
+        )
+    if args.protocol in ('async', 'all'):
+        run_benchmark(
+            args.num_clients,
+            run_async_client,
+            (args.num_operations, args.pipeline_depth),
+        )
     logger.info('\n')
@@ -0,0 +1,416 @@
+"""
+Measure the throughput of the skeleton and meat-filling header sync, by syncing a
+pre-generated chain of headers from in-process simulated peers.
+
+Each simulated peer serves GetBlockHeaders with a profile of latency, bandwidth and
+misbehaviour, one request at a time like a real peer. The headers have no proof of
+work, so the benchmark measures the sync machinery rather than the seal checks.
+
+Reports headers per second, time to tip and the utilization of each peer. A sync that
+stops before the tip is reported as failed, with the headers per second it did sync.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from typing import NamedTuple
+
+from eth.db.atomic import AtomicDB
+from eth.rlp.headers import BlockHeader
+from eth.vm.forks.istanbul import IstanbulVM
+import rlp
+
+from p2p.peer import PeerMessage
+from p2p.service import BaseService
+from p2p.stats.ema import EMA
+from p2p.tools.factories import SessionFactory
+
+from trinity.chains.full import FullChain
+from trinity.db.eth1.header import AsyncHeaderDB
+from trinity.protocol.eth.commands import (
+    BlockHeaders,
+    NewBlock,
+)
+from trinity.protocol.eth.constants import MAX_HEADERS_FETCH
+from trinity.protocol.eth.payloads import (
+    BlockFields,
+    NewBlockPayload,
+)
+from trinity.protocol.eth.peer import ETHPeerPool
+from trinity.protocol.eth.sync import ETHHeaderChainSyncer
+from trinity.sync.full.constants import HEADER_QUEUE_SIZE_TARGET
+
+logger = logging.getLogger('trinity.scripts.benchmark')
+logger.setLevel(logging.INFO)
+
+handler_stream = logging.StreamHandler(sys.stderr)
+handler_stream.setLevel(logging.INFO)
+
+logger.addHandler(handler_stream)
+
+
+class PeerProfile(NamedTuple):
+    # seconds before the first byte of a response arrives
+    latency: float
+    # bytes per second of a response
+    bandwidth: float
+    # share of requests that time out
+    timeout_rate: float = 0
+    # share of requests that get an empty response
+    empty_rate: float = 0
+    # share of requests that get headers which don't link up to their parents
+    invalid_rate: float = 0
+
+
+PROFILES = {
+    'fast': PeerProfile(latency=0.05, bandwidth=2 * 1024 * 1024),
+    'slow': PeerProfile(latency=0.3, bandwidth=128 * 1024),
+    'flaky': PeerProfile(latency=0.1, bandwidth=512 * 1024, timeout_rate=0.2, empty_rate=0.1),
+    'bad': PeerProfile(latency=0.1, bandwidth=512 * 1024, invalid_rate=0.3),
+}
+
+
+class SimulatedVM(IstanbulVM):
+    @classmethod
+    def validate_seal(cls, header):
+        # the simulated chain is not mined
+        pass
+
+
+class SimulatedChain(FullChain):
+    vm_configuration = ((0, SimulatedVM), )
+    network_id = 999
+
+
+def generate_headers(num_headers):
+    headers = [BlockHeader(
+        difficulty=131072,
+        block_number=0,
+        gas_limit=8000000,
+        timestamp=1514764800,
+    )]
+    for block_number in range(1, num_headers + 1):
+        parent = headers[-1]
+        headers.append(BlockHeader(
+            difficulty=131072,
+            block_number=block_number,
+            gas_limit=8000000,
+            timestamp=parent.timestamp + 15,
+            parent_hash=parent.hash,
+        ))
+    return tuple(headers)
+
+
+class SimulatedHeadInfo(NamedTuple):
+    head_hash: bytes
+    head_td: int
+    head_number: int
+
+
+class SimulatedTracker:
+    def __init__(self):
+        self.items_per_second_ema = EMA(initial_value=0, smoothing_factor=0.05)
+
+
+class SimulatedHeadersExchange:
+    def __init__(self):
+        self.tracker = SimulatedTracker()
+
+    @classmethod
+    def get_response_cmd_type(cls):
+        return BlockHeaders
+
+
+class PeerStats:
+    def __init__(self):
+        self.num_requests = 0
+        self.num_headers = 0
+        self.num_timeouts = 0
+        self.num_empty = 0
+        self.num_invalid = 0
+        self.busy_seconds = 0.0
+
+
+class SimulatedETHAPI:
+    def __init__(self, headers, profile, request_timeout):
+        self._headers = headers
+        self._headers_by_hash = {header.hash: header for header in headers}
+        self.tip = headers[-1]
+        self._header_size = len(rlp.encode(headers[-1]))
+        self._profile = profile
+        self._request_timeout = request_timeout
+        self._lock = asyncio.Lock()
+
+        self.exchanges = (SimulatedHeadersExchange(), )
+        self.stats = PeerStats()
+
+    async def get_block_headers(self, block_number_or_hash, max_headers, skip=0, reverse=True):
+        # like a real peer, serve a single request at a time
+        async with self._lock:
+            start = time.perf_counter()
+            try:
+                return await self._serve_block_headers(
+                    block_number_or_hash,
+                    min(max_headers, MAX_HEADERS_FETCH),
+                    skip,
+                    reverse,
+                )
+            finally:
+                self.stats.busy_seconds += time.perf_counter() - start
+
+    async def _serve_block_headers(self, block_number_or_hash, max_headers, skip, reverse):
+        self.stats.num_requests += 1
+        profile = self._profile
+
+        if random.random() < profile.timeout_rate:
+            self.stats.num_timeouts += 1
+            await asyncio.sleep(self._request_timeout)
+            raise asyncio.TimeoutError()
+
+        headers = self._lookup_headers(block_number_or_hash, max_headers, skip, reverse)
+        if random.random() < profile.empty_rate:
+            self.stats.num_empty += 1
+            headers = ()
+        elif headers and random.random() < profile.invalid_rate:
+            self.stats.num_invalid += 1
+            headers = tuple(header.copy(extra_data=b'invalid') for header in headers)
+
+        duration = profile.latency + len(headers) * self._header_size / profile.bandwidth
+        await asyncio.sleep(duration)
+
+        self.stats.num_headers += len(headers)
+        self.exchanges[0].tracker.items_per_second_ema.update(len(headers) / duration)
+        return headers
+
+    def _lookup_headers(self, block_number_or_hash, max_headers, skip, reverse):
+        if isinstance(block_number_or_hash, bytes):
+            if block_number_or_hash not in self._headers_by_hash:
+                return ()
+            block_number = self._headers_by_hash[block_number_or_hash].block_number
+        else:
+            block_number = block_number_or_hash
+
+        step = -(skip + 1) if reverse else skip + 1
+        block_numbers = range(block_number, block_number + step * max_headers, step)
+        return tuple(
+            self._headers[number] for number in block_numbers
+            if 0 <= number < len(self._headers)
+        )
+
+
+class SimulatedPeer(BaseService):
+    max_headers_fetch = MAX_HEADERS_FETCH
+
+    def __init__(self, name, headers, profile, request_timeout, announce_interval):
+        super().__init__()
+        self.name = name
+        self.session = SessionFactory()
+        self.chain_api = SimulatedETHAPI(headers, profile, request_timeout)
+        self.head_info = SimulatedHeadInfo(
+            head_hash=headers[-1].hash,
+            head_td=sum(header.difficulty for header in headers),
+            head_number=headers[-1].block_number,
+        )
+        self._announce_interval = announce_interval
+        self._subscribers = []
+
+    def __str__(self):
+        return f"SimulatedPeer<{self.name}>"
+
+    def add_subscriber(self, subscriber):
+        self._subscribers.append(subscriber)
+
+    def remove_subscriber(self, subscriber):
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+
+    async def _run(self):
+        # Re-announce the tip as NewBlock gossip would, which is what gets the header
+        # syncer to pick a new skeleton peer after the previous one failed
+        new_block = NewBlock(NewBlockPayload(
+            BlockFields(self.chain_api.tip, (), ()),
+            self.head_info.head_td,
+        ))
+        while self.is_operational:
+            await self.sleep(self._announce_interval)
+            for subscriber in self._subscribers:
+                subscriber.add_msg(PeerMessage(self, new_block))
+
+
+class SimulatedPeerPool(ETHPeerPool):
+    def __init__(self, peers):
+        super().__init__(privkey=None, context=None)
+        for peer in peers:
+            self.connected_nodes[peer.session] = peer
+
+    async def _run(self):
+        raise NotImplementedError("The simulated peer pool must not be run")
+
+
+async def sync_headers(headers, peers):
+    """
+    Sync headers from the peers until reaching their tip, persisting them in the same
+    batches that a chain syncer would. Return the last synced header, which is not the
+    tip if the syncer stopped early, and the number of seconds it took.
+    """
+    headerdb = AsyncHeaderDB(AtomicDB())
+    headerdb.persist_header(headers[0])
+    chain = SimulatedChain(headerdb.db)
+    tip = headers[-1]
+
+    for peer in peers:
+        asyncio.ensure_future(peer.run())
+        await peer.events.started.wait()
+
+    syncer = ETHHeaderChainSyncer(chain, headerdb, SimulatedPeerPool(peers))
+    asyncio.ensure_future(syncer.run())
+    await syncer.events.started.wait()
+
+    start = time.perf_counter()
+    last_report = start
+    head = headers[0]
+    async for batch in syncer.new_sync_headers(HEADER_QUEUE_SIZE_TARGET):
+        await headerdb.coro_persist_header_chain(batch)
+
+        head = batch[-1]
+        if head == tip:
+            break
+        elif time.perf_counter() - last_report > 5:
+            last_report = time.perf_counter()
+            logger.info("  ... synced to #%d", head.block_number)
+
+    duration = time.perf_counter() - start
+
+    await syncer.cancel()
+    for peer in peers:
+        await peer.cancel()
+
+    return head, duration
+
+
+def parse_peers(value):
+    """
+    Parse a comma-separated list of profile=count, like fast=4,slow=2
+    """
+    profile_counts = []
+    for item in value.split(','):
+        profile_name, _, count = item.partition('=')
+        if profile_name not in PROFILES:
+            raise argparse.ArgumentTypeError(
+                f"Unknown peer profile {profile_name!r}, pick from {', '.join(PROFILES)}"
+            )
+        profile_counts.append((profile_name, int(count or 1)))
+    return tuple(profile_counts)
+
+
+def run(num_headers, profile_counts, request_timeout, announce_interval, seed):
+    random.seed(seed)
+
+    start = time.perf_counter()
+    headers = generate_headers(num_headers)
+    logger.info("Generated %d headers in %.1fs", num_headers, time.perf_counter() - start)
+
+    peers = tuple(
+        SimulatedPeer(
+            f"{profile_name}-{index}",
+            headers,
+            PROFILES[profile_name],
+            request_timeout,
+            announce_interval,
+        )
+        for profile_name, count in profile_counts
+        for index in range(count)
+    )
+
+    loop = asyncio.get_event_loop()
+    head, duration = loop.run_until_complete(sync_headers(headers, peers))
+
+    # the genesis header is not synced
+    num_synced = head.block_number
+    if head == headers[-1]:
+        logger.info("\nheaders/s: %.1f  time to tip: %.1fs\n", num_synced / duration, duration)
+    else:
+        logger.error(
+            "\nFAILED: the sync stopped at #%d, before the tip #%d\n"
+            "headers/s: %.1f  time to stop: %.1fs\n",
+            head.block_number,
+            num_headers,
+            num_synced / duration,
+            duration,
+        )
+    logger.info(
+        "%-10s %8s %8s %9s %8s %8s %8s",
+        'peer', 'requests', 'headers', 'timeouts', 'empty', 'invalid', 'busy',
+    )
+    for peer in peers:
+        stats = peer.chain_api.stats
+        logger.info(
+            "%-10s %8d %8d %9d %8d %8d %7.0f%%",
+            peer.name,
+            stats.num_requests,
+            stats.num_headers,
+            stats.num_timeouts,
+            stats.num_empty,
+            stats.num_invalid,
+            100 * stats.busy_seconds / duration,
+        )
+
+    return head == headers[-1]
+
+
+parser = argparse.ArgumentParser(description='Header sync benchmark with simulated peers')
+parser.add_argument(
+    '--num-headers',
+    type=int,
+    required=False,
+    default=100000,
+    help="Number of headers in the simulated chain",
+)
+parser.add_argument(
+    '--peers',
+    type=parse_peers,
+    required=False,
+    default=parse_peers('fast=4,slow=2,flaky=1,bad=1'),
+    help=f"Comma-separated profile=count of simulated peers. Profiles: {', '.join(PROFILES)}",
+)
+parser.add_argument(
+    '--request-timeout',
+    type=float,
+    required=False,
+    default=2.0,
+    help="Seconds before a request to a simulated peer times out",
+)
+parser.add_argument(
+    '--announce-interval',
+    type=float,
+    required=False,
+    default=15.0,
+    help="Seconds between each simulated peer announcing its tip, like a new block would",
+)
+parser.add_argument(
+    '--seed',
+    type=int,
+    required=False,
+    default=0,
+    help="Random seed, to repeat the same misbehaviour and headers between runs",
+)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    logger.info(
+        "Running header sync benchmark:\n - %d headers\n - peers: %s\n*****************************\n",  # noqa: E501
+        args.num_headers,
+        ', '.join(f"{count} {profile_name}" for profile_name, count in args.peers),
+    )
+    reached_tip = run(
+        args.num_headers,
+        args.peers,
+        args.request_timeout,
+        args.announce_interval,
+        args.seed,
+    )
+    if not reached_tip:
+        sys.exit(1)
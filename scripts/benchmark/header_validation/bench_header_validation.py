@@ -0,0 +1,117 @@
+"""
+Compare the headers per second of validating a recorded range of mainnet headers:
+
+- serial: Chain.validate_chain(), which checks every seal in the calling process
+- parallel: validate_header_chain(), which checks the seals in the worker pool,
+  while the headers are checked against their parents in order
+"""
+import argparse
+import asyncio
+import logging
+import pathlib
+import sys
+import time
+
+from eth.db.atomic import AtomicDB
+from eth.rlp.headers import BlockHeader
+import rlp
+
+from trinity.sync.common.seals import validate_header_chain
+from trinity.tools.chain import AsyncMainnetChain
+from trinity._utils.mp import NUM_WORKER_PROCESSES
+
+logger = logging.getLogger('trinity.scripts.benchmark')
+logger.setLevel(logging.INFO)
+
+handler_stream = logging.StreamHandler(sys.stderr)
+handler_stream.setLevel(logging.INFO)
+
+logger.addHandler(handler_stream)
+
+DEFAULT_HEADERS_PATH = (
+    pathlib.Path(__file__).parents[3] / 'tests' / 'p2p' / 'fixtures' / 'sample_1000_headers_rlp'
+)
+
+
+def load_headers(path):
+    return rlp.decode(path.read_bytes(), sedes=rlp.sedes.CountableList(BlockHeader))
+
+
+def validate_serially(chain, parent, headers, batch_size, seal_check_random_sample_rate):
+    for start in range(0, len(headers), batch_size):
+        batch = headers[start:start + batch_size]
+        chain.validate_chain(parent, batch, seal_check_random_sample_rate)
+        parent = batch[-1]
+
+
+async def validate_in_parallel(chain, parent, headers, batch_size, seal_check_random_sample_rate):
+    # validate several batches at once, like the header syncers do with several peers
+    batches = tuple(
+        headers[start:start + batch_size] for start in range(0, len(headers), batch_size)
+    )
+    parents = (parent, ) + tuple(batch[-1] for batch in batches[:-1])
+    await asyncio.gather(*(
+        validate_header_chain(chain, batch_parent, batch, seal_check_random_sample_rate)
+        for batch_parent, batch in zip(parents, batches)
+    ))
+
+
+def run(headers_path, batch_size, seal_check_random_sample_rate):
+    parent, *headers = load_headers(headers_path)
+    chain = AsyncMainnetChain(AtomicDB())
+    loop = asyncio.get_event_loop()
+
+    # generate the ethash caches in this process and in the workers, before timing anything
+    validate_serially(chain, parent, headers[:1], batch_size, 1)
+    loop.run_until_complete(
+        validate_in_parallel(chain, parent, headers, batch_size, 1)
+    )
+
+    start = time.perf_counter()
+    validate_serially(chain, parent, headers, batch_size, seal_check_random_sample_rate)
+    serial_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loop.run_until_complete(
+        validate_in_parallel(chain, parent, headers, batch_size, seal_check_random_sample_rate)
+    )
+    parallel_duration = time.perf_counter() - start
+
+    logger.info("serial    %8.1f headers/s", len(headers) / serial_duration)
+    logger.info("parallel  %8.1f headers/s", len(headers) / parallel_duration)
+
+
+parser = argparse.ArgumentParser(description='Header validation benchmark')
+parser.add_argument(
+    '--headers',
+    type=pathlib.Path,
+    required=False,
+    default=DEFAULT_HEADERS_PATH,
+    help="Path to a file of consecutive headers, stored as CountableList(BlockHeader)",
+)
+parser.add_argument(
+    '--batch-size',
+    type=int,
+    required=False,
+    default=192,
+    help="Number of headers validated at a time",
+)
+parser.add_argument(
+    '--seal-check-rate',
+    type=int,
+    required=False,
+    default=1,
+    help="Check the seal of one out of this many headers (0 to skip seal checks)",
+)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    logger.info(
+        "Running header validation benchmark:\n - %s\n - %d headers per batch\n - 1 in %d seals checked\n - %d worker processes\n*****************************\n",  # noqa: E501
+        args.headers,
+        args.batch_size,
+        args.seal_check_rate,
+        NUM_WORKER_PROCESSES,
+    )
+    run(args.headers, args.batch_size, args.seal_check_rate)
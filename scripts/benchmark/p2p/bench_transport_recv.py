@@ -0,0 +1,192 @@
+"""
+Measure the RLPx frame receive path of Transport.recv(), by sending a burst of encrypted
+messages over an in-memory stream and timing how fast the other side receives them.
+
+- copying: the previous receive path, which waited on the header and the body
+  separately, sliced the frame for the MAC check, decrypted the body into fresh
+  buffers and re-encoded the header data of every frame
+- current: Transport as it is, which waits on the whole frame at once, checks the MAC
+  on views of the frame, decrypts into a buffer that it reuses for every frame and
+  caches the header data
+
+Besides messages per second, it reports the peak memory allocated while receiving a
+single message, as traced by tracemalloc.
+"""
+import argparse
+import asyncio
+import hmac
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+from cancel_token import CancelToken
+import rlp
+
+from p2p._utils import roundup_16
+from p2p.constants import (
+    HEADER_LEN,
+    MAC_LEN,
+    RLPX_HEADER_DATA,
+)
+from p2p.exceptions import DecryptionError
+from p2p.message import Message
+from p2p.tools.factories import TransportPairFactory
+from p2p.transport import (
+    HEADER_DATA_SEDES,
+    Transport,
+)
+from p2p.transport_state import TransportState
+
+logger = logging.getLogger('trinity.scripts.benchmark')
+logger.setLevel(logging.INFO)
+
+handler_stream = logging.StreamHandler(sys.stderr)
+handler_stream.setLevel(logging.INFO)
+
+logger.addHandler(handler_stream)
+
+
+def copying_sxor(s1, s2):
+    return bytes(x ^ y for x, y in zip(s1, s2))
+
+
+class CopyingTransport(Transport):
+    """
+    The receive path before frames were decrypted into a reused buffer
+    """
+    async def recv(self, token):
+        self.read_state = TransportState.HEADER
+        header_bytes = await self.read(HEADER_LEN + MAC_LEN, token)
+
+        self.read_state = TransportState.BODY
+        padded_header = self._decrypt_header(header_bytes)
+        frame_size = self._get_frame_size(padded_header)
+        read_size = roundup_16(frame_size)
+        frame_data = await self.read(read_size + MAC_LEN, token)
+        body = self._decrypt_body(frame_data, frame_size)
+
+        self.read_state = TransportState.IDLE
+        header_data = rlp.decode(padded_header[3:], sedes=HEADER_DATA_SEDES, strict=False)
+        header = padded_header[:3] + rlp.encode(header_data)
+        return Message(header, body)
+
+    def _decrypt_header(self, data):
+        header_ciphertext = data[:HEADER_LEN]
+        header_mac = data[HEADER_LEN:]
+        mac_secret = self._ingress_mac.digest()[:HEADER_LEN]
+        aes = self._mac_enc(mac_secret)[:HEADER_LEN]
+        self._ingress_mac.update(copying_sxor(aes, header_ciphertext))
+        expected_header_mac = self._ingress_mac.digest()[:HEADER_LEN]
+        if not hmac.compare_digest(expected_header_mac, header_mac):
+            raise DecryptionError("Invalid header mac")
+        return self._aes_dec.update(header_ciphertext)
+
+    def _decrypt_body(self, data, body_size):
+        read_size = roundup_16(body_size)
+        frame_ciphertext = data[:read_size]
+        frame_mac = data[read_size:read_size + MAC_LEN]
+
+        self._ingress_mac.update(frame_ciphertext)
+        fmac_seed = self._ingress_mac.digest()[:MAC_LEN]
+        self._ingress_mac.update(copying_sxor(self._mac_enc(fmac_seed), fmac_seed))
+        expected_frame_mac = self._ingress_mac.digest()[:MAC_LEN]
+        if not hmac.compare_digest(expected_frame_mac, frame_mac):
+            raise DecryptionError("Invalid frame mac")
+        return self._aes_dec.update(frame_ciphertext)[:body_size]
+
+
+def make_message(body_size):
+    # a command id of 0x10, followed by an opaque payload
+    body = b'\x10' + os.urandom(body_size - 1)
+    header = len(body).to_bytes(3, 'big') + RLPX_HEADER_DATA
+    return Message(header, body)
+
+
+async def receive_messages(transport, num_messages, token, trace_allocations):
+    peak_allocations = 0
+    for _ in range(num_messages):
+        if trace_allocations:
+            # resets the peak too
+            tracemalloc.clear_traces()
+        await transport.recv(token)
+        if trace_allocations:
+            _, peak = tracemalloc.get_traced_memory()
+            peak_allocations += peak
+    return peak_allocations
+
+
+async def measure(transport_class, num_messages, body_size, trace_allocations):
+    token = CancelToken('bench_transport_recv')
+    sender, receiver = await TransportPairFactory(token=token)
+    # the ciphers and MACs are already set up, so only the receive path changes
+    receiver.__class__ = transport_class
+
+    message = make_message(body_size)
+    for _ in range(num_messages):
+        sender.send(message)
+    # let the sender write the whole burst, so that only the receive path is measured
+    await asyncio.sleep(0)
+
+    if trace_allocations:
+        tracemalloc.start()
+    start = time.perf_counter()
+    peak_allocations = await receive_messages(receiver, num_messages, token, trace_allocations)
+    duration = time.perf_counter() - start
+    if trace_allocations:
+        tracemalloc.stop()
+
+    sender.close()
+    receiver.close()
+    return num_messages / duration, peak_allocations / num_messages
+
+
+def run(num_messages, body_sizes):
+    loop = asyncio.get_event_loop()
+    logger.info(
+        "%-8s %10s %14s %18s",
+        'path', 'body size', 'messages/s', 'peak bytes/message',
+    )
+    for body_size in body_sizes:
+        for name, transport_class in (('copying', CopyingTransport), ('current', Transport)):
+            messages_per_second, _ = loop.run_until_complete(
+                measure(transport_class, num_messages, body_size, trace_allocations=False)
+            )
+            _, bytes_per_message = loop.run_until_complete(
+                measure(transport_class, num_messages, body_size, trace_allocations=True)
+            )
+            logger.info(
+                "%-8s %10d %14.0f %18.0f",
+                name,
+                body_size,
+                messages_per_second,
+                bytes_per_message,
+            )
+
+
+parser = argparse.ArgumentParser(description='RLPx transport receive benchmark')
+parser.add_argument(
+    '--num-messages',
+    type=int,
+    required=False,
+    default=5000,
+    help="Number of messages to receive for each body size",
+)
+parser.add_argument(
+    '--body-sizes',
+    type=lambda value: tuple(int(size) for size in value.split(',')),
+    required=False,
+    default=(64, 1024, 16 * 1024),
+    help="Comma-separated sizes of the message bodies, in bytes",
+)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    logger.info(
+        "Running transport receive benchmark:\n - %d messages\n - body sizes: %s\n*****************************\n",  # noqa: E501
+        args.num_messages,
+        ', '.join(map(str, args.body_sizes)),
+    )
+    run(args.num_messages, args.body_sizes)
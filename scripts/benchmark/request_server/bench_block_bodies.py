@@ -0,0 +1,280 @@
+"""
+Compare ways of serving GetBlockBodies and GetReceipts from a database behind
+the database manager, by replaying a scripted peer that requests the same
+full, mainnet-sized blocks over and over.
+
+- decode: decode every transaction, uncle and receipt, then re-encode them for the wire
+- raw: splice the raw transactions, uncles and receipts into the reply
+- cached: like raw, but with the encoded reply cache of the request server warmed up
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import pathlib
+import random
+import signal
+import sys
+import tempfile
+import time
+
+from cancel_token import CancelToken
+from eth.db.atomic import AtomicDB
+from eth.db.backends.level import LevelDB
+from eth.rlp.headers import BlockHeader
+from eth.rlp.logs import Log
+from eth.rlp.receipts import Receipt
+from eth.rlp.transactions import BaseTransactionFields
+from eth_hash.auto import keccak
+import rlp
+from trie import HexaryTrie
+
+from trinity.db.eth1.chain import AsyncChainDB
+from trinity.db.manager import (
+    DBClient,
+    DBManager,
+)
+from trinity.protocol.eth.commands import (
+    BlockBodies,
+    GetBlockBodies,
+    GetReceipts,
+    Receipts,
+)
+from trinity.protocol.eth.constants import MAX_BODIES_FETCH
+from trinity.protocol.eth.response_cache import ETHResponseCache
+from trinity.protocol.eth.servers import ETHPeerRequestHandler
+from trinity.rlp.block_body import BlockBody
+
+logger = logging.getLogger('trinity.scripts.benchmark')
+logger.setLevel(logging.INFO)
+
+handler_stream = logging.StreamHandler(sys.stderr)
+handler_stream.setLevel(logging.INFO)
+
+logger.addHandler(handler_stream)
+
+
+def make_transaction(nonce):
+    return BaseTransactionFields(
+        nonce=nonce,
+        gas_price=random.randint(1, 100) * 10**9,
+        gas=random.randint(21000, 500000),
+        to=os.urandom(20),
+        value=random.randint(0, 10**18),
+        data=os.urandom(random.choice((0, 4, 68, 68, 132, 600))),
+        v=27,
+        r=random.getrandbits(256),
+        s=random.getrandbits(256),
+    )
+
+
+def make_receipt(gas_used):
+    logs = tuple(
+        Log(os.urandom(20), [random.getrandbits(256) for _ in range(3)], os.urandom(64))
+        for _ in range(random.randint(0, 3))
+    )
+    return Receipt(b'\x01', gas_used, logs, bloom=random.getrandbits(2048))
+
+
+def make_indexed_trie_root(db, encoded_values):
+    trie = HexaryTrie(db)
+    for index, encoded_value in enumerate(encoded_values):
+        trie[rlp.encode(index)] = encoded_value
+    return trie.root_hash
+
+
+def persist_blocks(db, num_blocks, num_transactions):
+    """
+    Write the headers, bodies and receipts of ``num_blocks`` made up blocks, and
+    return the hashes of the blocks.
+    """
+    block_hashes = []
+    for block_number in range(num_blocks):
+        transactions = [make_transaction(nonce) for nonce in range(num_transactions)]
+        receipts = [make_receipt(gas_used) for gas_used in range(num_transactions)]
+        uncles = [
+            BlockHeader(difficulty=1, block_number=block_number, gas_limit=8000000)
+            for _ in range(block_number % 3)
+        ]
+
+        with db.atomic_batch() as batch:
+            transaction_root = make_indexed_trie_root(batch, map(rlp.encode, transactions))
+            receipt_root = make_indexed_trie_root(batch, map(rlp.encode, receipts))
+            encoded_uncles = rlp.encode(uncles)
+            batch[keccak(encoded_uncles)] = encoded_uncles
+
+            header = BlockHeader(
+                difficulty=1,
+                block_number=block_number,
+                gas_limit=8000000,
+                uncles_hash=keccak(encoded_uncles),
+                transaction_root=transaction_root,
+                receipt_root=receipt_root,
+            )
+            batch[header.hash] = rlp.encode(header)
+
+        block_hashes.append(header.hash)
+
+    return tuple(block_hashes)
+
+
+class ScriptedETHAPI:
+    def __init__(self):
+        self.num_bytes_received = 0
+
+    def send_block_bodies(self, bodies):
+        self.num_bytes_received += len(BlockBodies.serialization_codec.encode(tuple(bodies)))
+
+    def send_receipts(self, receipts):
+        self.num_bytes_received += len(Receipts.serialization_codec.encode(tuple(receipts)))
+
+    def send_encoded_block_bodies(self, encoded_bodies):
+        self.num_bytes_received += len(encoded_bodies)
+
+    def send_encoded_receipts(self, encoded_receipts):
+        self.num_bytes_received += len(encoded_receipts)
+
+
+class ScriptedPeer:
+    def __init__(self):
+        self.eth_api = ScriptedETHAPI()
+
+    def __str__(self):
+        return 'ScriptedPeer'
+
+
+class DecodingRequestHandler(ETHPeerRequestHandler):
+    """
+    Serve bodies and receipts by decoding them from the database, and encoding
+    them again, which is how they were served before the raw path.
+    """
+    async def handle_get_block_bodies(self, peer, command):
+        bodies = []
+        for block_hash in command.payload[:MAX_BODIES_FETCH]:
+            header = await self.db.coro_get_block_header_by_hash(block_hash)
+            transactions = await self.db.coro_get_block_transactions(header, BaseTransactionFields)
+            uncles = await self.db.coro_get_block_uncles(header.uncles_hash)
+            bodies.append(BlockBody(transactions, uncles))
+        peer.eth_api.send_block_bodies(bodies)
+
+    async def handle_get_receipts(self, peer, command):
+        receipts = []
+        for block_hash in command.payload:
+            header = await self.db.coro_get_block_header_by_hash(block_hash)
+            receipts.append(await self.db.coro_get_receipts(header, Receipt))
+        peer.eth_api.send_receipts(receipts)
+
+
+async def _replay_requests(handler, block_hashes, num_requests):
+    peer = ScriptedPeer()
+
+    start = time.perf_counter()
+    for _ in range(num_requests):
+        await handler.handle_get_block_bodies(peer, GetBlockBodies(block_hashes))
+    bodies_duration = time.perf_counter() - start
+    bodies_bytes = peer.eth_api.num_bytes_received
+
+    start = time.perf_counter()
+    for _ in range(num_requests):
+        await handler.handle_get_receipts(peer, GetReceipts(block_hashes))
+    receipts_duration = time.perf_counter() - start
+    receipts_bytes = peer.eth_api.num_bytes_received - bodies_bytes
+
+    return bodies_duration, bodies_bytes, receipts_duration, receipts_bytes
+
+
+def run_server(ipc_path):
+    with tempfile.TemporaryDirectory() as db_path:
+        db = LevelDB(db_path=db_path)
+        manager = DBManager(db)
+
+        with manager.run(ipc_path):
+            try:
+                manager.wait_stopped()
+            except KeyboardInterrupt:
+                pass
+
+
+def run_client(ipc_path, num_blocks, num_transactions, num_requests):
+    db_client = DBClient.connect(ipc_path)
+    block_hashes = persist_blocks(AtomicDB(db_client), num_blocks, num_transactions)
+    # Like the request server, read straight from the database client
+    chaindb = AsyncChainDB(db_client)
+
+    handlers = (
+        ('decode', DecodingRequestHandler(chaindb, CancelToken('decode'))),
+        ('raw', ETHPeerRequestHandler(
+            chaindb,
+            CancelToken('raw'),
+            # never cache anything
+            ETHResponseCache(max_body_bytes=0, max_receipts_bytes=0),
+        )),
+        ('cached', ETHPeerRequestHandler(chaindb, CancelToken('cached'))),
+    )
+
+    loop = asyncio.get_event_loop()
+    for name, handler in handlers:
+        if name == 'cached':
+            # warm up the cache
+            loop.run_until_complete(_replay_requests(handler, block_hashes, 1))
+
+        bodies_duration, bodies_bytes, receipts_duration, receipts_bytes = loop.run_until_complete(
+            _replay_requests(handler, block_hashes, num_requests)
+        )
+        logger.info(
+            "%-6s  bodies: %6.1f requests/s %7.1f MB/s  receipts: %6.1f requests/s %7.1f MB/s",
+            name,
+            num_requests / bodies_duration,
+            bodies_bytes / bodies_duration / 1024 / 1024,
+            num_requests / receipts_duration,
+            receipts_bytes / receipts_duration / 1024 / 1024,
+        )
+
+
+parser = argparse.ArgumentParser(description='Block body and receipt serving benchmark')
+parser.add_argument(
+    '--num-blocks',
+    type=int,
+    required=False,
+    default=MAX_BODIES_FETCH,
+    help="Number of blocks in each request",
+)
+parser.add_argument(
+    '--num-transactions',
+    type=int,
+    required=False,
+    default=200,
+    help="Number of transactions in each block",
+)
+parser.add_argument(
+    '--num-requests',
+    type=int,
+    required=False,
+    default=5,
+    help="Number of times the scripted peer makes the requests",
+)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    logger.info(
+        "Running block body serving benchmark:\n - %d blocks per request\n - %d transactions per block\n - %d requests\n*****************************\n",  # noqa: E501
+        args.num_blocks,
+        args.num_transactions,
+        args.num_requests,
+    )
+    with tempfile.TemporaryDirectory() as ipc_base_dir:
+        ipc_path = pathlib.Path(ipc_base_dir) / 'db.ipc'
+
+        server = multiprocessing.Process(target=run_server, args=[ipc_path])
+        server.start()
+        client = multiprocessing.Process(
+            target=run_client,
+            args=(ipc_path, args.num_blocks, args.num_transactions, args.num_requests),
+        )
+        client.start()
+        client.join(3600)
+
+        os.kill(server.pid, signal.SIGINT)
+        server.join(1)
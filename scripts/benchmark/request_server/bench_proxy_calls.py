@@ -0,0 +1,212 @@
+"""
+Measure how many payload bytes per second go through the ETH proxy calls that the
+isolated request server uses to reply to peers, from the call on the ``ProxyETHAPI`` to
+the message that the peer pool writes to the peer.
+
+- objects: the previous proxy, which sent the decoded payload over the event bus, so
+  that the peer pool re-encoded it in the networking process
+- encoded: ``ProxyETHAPI`` as it is, which encodes the payload in the calling process,
+  so that it crosses the process boundary as opaque RLP bytes that the peer pool sends
+  as they are
+
+The event bus is simulated by serializing the events the same way lahja does.
+"""
+import argparse
+import collections
+import logging
+import os
+import pickle
+import random
+import sys
+import time
+
+from eth.rlp.transactions import BaseTransactionFields
+from lahja import BroadcastConfig
+import snappy
+
+from p2p.session import Session
+from p2p.tools.factories import NodeFactory
+
+from trinity.protocol.eth.commands import (
+    BlockBodies,
+    NodeData,
+)
+from trinity.protocol.eth.events import (
+    SendBlockBodiesEvent,
+    SendNodeDataEvent,
+)
+from trinity.protocol.eth.proxy import ProxyETHAPI
+from trinity.rlp.block_body import BlockBody
+
+logger = logging.getLogger('trinity.scripts.benchmark')
+logger.setLevel(logging.INFO)
+
+handler_stream = logging.StreamHandler(sys.stderr)
+handler_stream.setLevel(logging.INFO)
+
+logger.addHandler(handler_stream)
+
+# any command id will do, it only changes the first byte of the message body
+COMMAND_ID = 0x10
+
+Block = collections.namedtuple('Block', 'transactions uncles')
+
+
+class ObjectsProxyETHAPI(ProxyETHAPI):
+    """
+    The proxy before the payloads were encoded in the calling process
+    """
+    def send_block_bodies(self, blocks):
+        block_bodies = tuple(
+            BlockBody(block.transactions, block.uncles)
+            for block in blocks
+        )
+        self._event_bus.broadcast_nowait(
+            SendBlockBodiesEvent(self.session, BlockBodies(block_bodies)),
+            self._broadcast_config,
+        )
+
+    def send_node_data(self, nodes):
+        self._event_bus.broadcast_nowait(
+            SendNodeDataEvent(self.session, NodeData(tuple(nodes))),
+            self._broadcast_config,
+        )
+
+
+class RecordingEventBus:
+    """
+    Keep the serialized events, as lahja sends them to the other process
+    """
+    def __init__(self):
+        self.serialized_events = []
+
+    def broadcast_nowait(self, event, broadcast_config=None):
+        self.serialized_events.append(snappy.compress(pickle.dumps(event)))
+
+
+def make_transaction(nonce):
+    return BaseTransactionFields(
+        nonce=nonce,
+        gas_price=random.randint(1, 100) * 10**9,
+        gas=random.randint(21000, 500000),
+        to=os.urandom(20),
+        value=random.randint(0, 10**18),
+        data=os.urandom(random.choice((0, 4, 68, 68, 132, 600))),
+        v=27,
+        r=random.getrandbits(256),
+        s=random.getrandbits(256),
+    )
+
+
+def make_payloads(num_blocks, transactions_per_block, num_nodes):
+    blocks = tuple(
+        Block(tuple(make_transaction(nonce) for nonce in range(transactions_per_block)), ())
+        for _ in range(num_blocks)
+    )
+    # trie nodes are mostly branch nodes of about 532 bytes, and smaller leaves
+    nodes = tuple(
+        os.urandom(random.choice((532, 532, 532, 110, 150)))
+        for _ in range(num_nodes)
+    )
+    return (
+        ('send_block_bodies', blocks),
+        ('send_node_data', nodes),
+    )
+
+
+def measure(proxy_class, call_name, payload, num_calls):
+    event_bus = RecordingEventBus()
+    proxy = proxy_class(Session(NodeFactory()), event_bus, BroadcastConfig())
+    call = getattr(proxy, call_name)
+
+    # the process that calls the proxy
+    start = time.perf_counter()
+    for _ in range(num_calls):
+        call(payload)
+    caller_duration = time.perf_counter() - start
+
+    # the networking process, which runs the peer pool
+    start = time.perf_counter()
+    messages = []
+    for serialized_event in event_bus.serialized_events:
+        event = pickle.loads(snappy.decompress(serialized_event))
+        messages.append(event.command.encode(COMMAND_ID, snappy_support=False))
+    peer_pool_duration = time.perf_counter() - start
+
+    payload_bytes = sum(len(message.body) for message in messages) / num_calls
+    event_bytes = sum(map(len, event_bus.serialized_events)) / num_calls
+    return (
+        payload_bytes,
+        event_bytes,
+        caller_duration / num_calls,
+        peer_pool_duration / num_calls,
+    )
+
+
+def run(num_calls, num_blocks, transactions_per_block, num_nodes):
+    logger.info(
+        "%-18s %-8s %13s %12s %11s %14s %16s",
+        'call', 'proxy',
+        'payload bytes', 'event bytes', 'caller ms', 'peer pool ms', 'payload bytes/s',
+    )
+    for call_name, payload in make_payloads(num_blocks, transactions_per_block, num_nodes):
+        for name, proxy_class in (('objects', ObjectsProxyETHAPI), ('encoded', ProxyETHAPI)):
+            payload_bytes, event_bytes, caller_seconds, peer_pool_seconds = measure(
+                proxy_class,
+                call_name,
+                payload,
+                num_calls,
+            )
+            logger.info(
+                "%-18s %-8s %13d %12d %11.2f %14.2f %16.0f",
+                call_name,
+                name,
+                payload_bytes,
+                event_bytes,
+                caller_seconds * 1000,
+                peer_pool_seconds * 1000,
+                payload_bytes / (caller_seconds + peer_pool_seconds),
+            )
+
+
+parser = argparse.ArgumentParser(description='ETH proxy call benchmark')
+parser.add_argument(
+    '--num-calls',
+    type=int,
+    required=False,
+    default=20,
+    help="Number of calls to make to each proxy method",
+)
+parser.add_argument(
+    '--num-blocks',
+    type=int,
+    required=False,
+    default=16,
+    help="Number of block bodies to send in each call",
+)
+parser.add_argument(
+    '--transactions-per-block',
+    type=int,
+    required=False,
+    default=150,
+    help="Number of transactions in each block body",
+)
+parser.add_argument(
+    '--num-nodes',
+    type=int,
+    required=False,
+    default=384,
+    help="Number of trie nodes to send in each call",
+)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    logger.info(
+        "Running ETH proxy call benchmark:\n - %d calls per method\n - %d block bodies of %d transactions\n - %d trie nodes\n*****************************\n",  # noqa: E501
+        args.num_calls,
+        args.num_blocks,
+        args.transactions_per_block,
+        args.num_nodes,
+    )
+    run(args.num_calls, args.num_blocks, args.transactions_per_block, args.num_nodes)
@@ -1,3 +1,12 @@
+import asyncio
+
+import pytest
+
+from p2p.disconnect import DisconnectReason
+from p2p.service import run_service
+
+from trinity.protocol.les.commands import BlockHeaders
+from trinity.protocol.les.payloads import BlockHeadersPayload
 from trinity.sync.light.service import (
     LightPeerChain
 )
@@ -18,3 +27,45 @@ def test_can_instantiate_eventbus_light_peer_chain():
 def test_can_instantiate_light_peer_chain():
     chain = LightPeerChain(None, None)
     assert chain is not None
+
+
+class PeerPoolForTest:
+    def subscribe(self, subscriber):
+        pass
+
+    def unsubscribe(self, subscriber):
+        pass
+
+
+class PeerForTest:
+    def __init__(self):
+        self.disconnect_reasons = []
+
+    def disconnect_nowait(self, reason):
+        self.disconnect_reasons.append(reason)
+
+
+@pytest.mark.asyncio
+async def test_light_peer_chain_disconnects_peer_with_malformed_msg():
+    chain = LightPeerChain(None, PeerPoolForTest())
+    bad_peer, good_peer = PeerForTest(), PeerForTest()
+
+    reply = BlockHeaders(BlockHeadersPayload(request_id=1, buffer_value=0, headers=()))
+    message = reply.encode(0, snappy_support=False)
+    malformed_reply = BlockHeaders.decode(
+        type(message)(message.header, message.body[:-1]),
+        snappy_support=False,
+    )
+
+    async with run_service(chain):
+        pending_reply = asyncio.ensure_future(chain._wait_for_reply(1))
+        await asyncio.sleep(0)
+
+        chain.add_msg((bad_peer, malformed_reply))
+        chain.add_msg((good_peer, reply))
+
+        # the malformed reply is skipped, and the chain keeps waiting for replies
+        assert await asyncio.wait_for(pending_reply, timeout=1) is reply
+        assert bad_peer.disconnect_reasons == [DisconnectReason.BAD_PROTOCOL]
+        assert good_peer.disconnect_reasons == []
+        assert chain.is_operational
@@ -0,0 +1,203 @@
+import asyncio
+import pathlib
+import tempfile
+
+from eth.db.atomic import AtomicDB
+from eth.exceptions import HeaderNotFound
+from eth_utils import ValidationError
+import pytest
+import rlp
+from trie import HexaryTrie
+
+from trinity.db.eth1.chain import (
+    AsyncChainDB,
+    AsyncClientChainDB,
+)
+from trinity.db.manager import (
+    PIPELINED_PROTOCOL_BYTE,
+    PIPELINED_REQUEST_HEADER,
+    PIPELINED_RESPONSE_HEADER,
+    AsyncDBClient,
+    DBManager,
+)
+from trinity.rlp.block_body import BlockBody
+from trinity.tools.factories import (
+    BaseTransactionFieldsFactory,
+    BlockHeaderFactory,
+)
+
+
+@pytest.fixture
+def ipc_path():
+    with tempfile.TemporaryDirectory() as dir:
+        ipc_path = pathlib.Path(dir) / "db_manager.ipc"
+        yield ipc_path
+
+
+@pytest.fixture
+def base_db():
+    return AtomicDB()
+
+
+@pytest.fixture
+def db_manager(base_db, ipc_path):
+    with DBManager(base_db).run(ipc_path) as manager:
+        yield manager
+
+
+@pytest.fixture
+async def async_db_client(ipc_path, db_manager):
+    client = await AsyncDBClient.connect(ipc_path)
+    try:
+        yield client
+    finally:
+        client.close()
+
+
+@pytest.mark.asyncio
+async def test_async_db_client_operations(async_db_client, base_db):
+    await async_db_client.coro_set(b'key-a', b'value-a')
+    assert base_db[b'key-a'] == b'value-a'
+
+    assert await async_db_client.coro_get(b'key-a') == b'value-a'
+    assert await async_db_client.coro_exists(b'key-a')
+    assert not await async_db_client.coro_exists(b'missing')
+    with pytest.raises(KeyError):
+        await async_db_client.coro_get(b'missing')
+
+    assert await async_db_client.coro_multi_get((b'key-a', b'missing')) == (b'value-a', None)
+    assert await async_db_client.coro_multi_exists((b'key-a', b'missing')) == (True, False)
+
+    await async_db_client.coro_delete(b'key-a')
+    assert b'key-a' not in base_db
+    with pytest.raises(KeyError):
+        await async_db_client.coro_delete(b'key-a')
+
+
+@pytest.mark.asyncio
+async def test_async_db_client_concurrent_requests(async_db_client, base_db):
+    for i in range(200):
+        base_db[b'key-%d' % i] = b'value-%d' % i
+
+    values = await asyncio.gather(*(
+        async_db_client.coro_get(b'key-%d' % i) for i in range(200)
+    ))
+    assert values == [b'value-%d' % i for i in range(200)]
+
+
+@pytest.mark.asyncio
+async def test_async_db_client_atomic_batch(async_db_client, base_db):
+    base_db[b'deleted'] = b'old'
+
+    async with async_db_client.atomic_batch() as batch:
+        batch[b'written'] = b'new'
+        await batch.coro_delete(b'deleted')
+
+        # the batch sees its own writes, the database does not yet
+        assert await batch.coro_get(b'written') == b'new'
+        assert not await batch.coro_exists(b'deleted')
+        assert b'written' not in base_db
+        assert b'deleted' in base_db
+
+        with pytest.raises(KeyError):
+            await batch.coro_delete(b'missing')
+
+    assert base_db[b'written'] == b'new'
+    assert b'deleted' not in base_db
+
+    with pytest.raises(ValidationError):
+        await batch.coro_get(b'written')
+
+
+@pytest.mark.asyncio
+async def test_async_db_client_atomic_batch_aborts_on_exception(async_db_client, base_db):
+    with pytest.raises(ZeroDivisionError):
+        async with async_db_client.atomic_batch() as batch:
+            batch[b'written'] = b'new'
+            1 / 0
+
+    assert b'written' not in base_db
+
+
+@pytest.mark.asyncio
+async def test_async_db_client_raises_after_close(async_db_client):
+    async_db_client.close()
+    # closing twice is harmless
+    async_db_client.close()
+
+    with pytest.raises(ConnectionError):
+        await async_db_client.coro_get(b'key')
+
+
+@pytest.mark.asyncio
+async def test_async_db_client_fails_pending_requests_on_disconnect(async_db_client, db_manager):
+    db_manager.stop()
+    await asyncio.sleep(0.5)
+
+    with pytest.raises(ConnectionError):
+        await async_db_client.coro_get(b'key')
+
+
+@pytest.mark.asyncio
+async def test_async_db_client_fails_pending_requests_on_malformed_response(ipc_path):
+    async def serve_malformed_response(reader, writer):
+        assert await reader.readexactly(1) == PIPELINED_PROTOCOL_BYTE
+        header = await reader.readexactly(PIPELINED_REQUEST_HEADER.size)
+        request_id, _, payload_size = PIPELINED_REQUEST_HEADER.unpack(header)
+        await reader.readexactly(payload_size)
+        # an unknown result byte
+        writer.write(PIPELINED_RESPONSE_HEADER.pack(request_id, 1) + b'\x07')
+
+    server = await asyncio.start_unix_server(serve_malformed_response, str(ipc_path))
+    try:
+        reader, writer = await asyncio.open_unix_connection(str(ipc_path))
+        client = AsyncDBClient(reader, writer)
+
+        # the request that got the malformed response, and the one still waiting for its own
+        requests = (
+            asyncio.ensure_future(client.coro_get(b'key')),
+            asyncio.ensure_future(client.coro_get(b'other-key')),
+        )
+        for request in requests:
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(request, timeout=1)
+
+        with pytest.raises(ConnectionError):
+            await client.coro_get(b'key')
+        client.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_async_client_chain_db_reads(async_db_client, base_db):
+    chaindb = AsyncChainDB(base_db)
+    uncles = tuple(BlockHeaderFactory.create_batch(2))
+    transactions = tuple(BaseTransactionFieldsFactory.create_batch(3))
+    trie = HexaryTrie(base_db)
+    for index, transaction in enumerate(transactions):
+        trie[rlp.encode(index)] = rlp.encode(transaction)
+    header = BlockHeaderFactory(
+        uncles_hash=chaindb.persist_uncles(uncles),
+        transaction_root=trie.root_hash,
+    )
+    chaindb.persist_header(header)
+
+    client_chaindb = AsyncClientChainDB(base_db, async_db_client)
+
+    assert await client_chaindb.coro_get_block_header_by_hash(header.hash) == header
+    with pytest.raises(HeaderNotFound):
+        await client_chaindb.coro_get_block_header_by_hash(b'\x00' * 32)
+
+    headers = await client_chaindb.coro_get_canonical_block_headers_by_number(
+        (header.block_number, header.block_number + 1)
+    )
+    assert headers == (header, )
+
+    encoded_body = await client_chaindb.coro_get_encoded_block_body(header)
+    assert encoded_body == chaindb.get_encoded_block_body(header)
+    assert encoded_body == rlp.encode(BlockBody(transactions, uncles))
+
+    encoded_receipts = await client_chaindb.coro_get_encoded_receipts(header)
+    assert encoded_receipts == chaindb.get_encoded_receipts(header)
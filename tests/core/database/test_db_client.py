@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from eth.db.atomic import AtomicDB
 
 import pathlib
@@ -7,9 +8,15 @@ import tempfile
 from eth.tools.db.atomic import AtomicDatabaseBatchAPITestSuite
 from eth.tools.db.base import DatabaseAPITestSuite
 
+from trinity._utils.db import (
+    multi_exists,
+    multi_get,
+)
 from trinity.db.manager import (
     DBManager,
     DBClient,
+    PipelinedDBClient,
+    Result,
 )
 
 
@@ -56,3 +63,96 @@ class TestDBClientDatabaseAPI(DatabaseAPITestSuite):
 
 class TestDBClientAtomicBatchAPI(AtomicDatabaseBatchAPITestSuite):
     pass
+
+
+@pytest.fixture
+def pipelined_db_client(ipc_path, db_manager):
+    client = PipelinedDBClient.connect(ipc_path)
+    try:
+        yield client
+    finally:
+        client.close()
+
+
+class TestPipelinedDBClientDatabaseAPI(DatabaseAPITestSuite):
+    @pytest.fixture
+    def db(self, pipelined_db_client):
+        return pipelined_db_client
+
+
+class TestPipelinedDBClientAtomicBatchAPI(AtomicDatabaseBatchAPITestSuite):
+    @pytest.fixture
+    def atomic_db(self, pipelined_db_client):
+        return pipelined_db_client
+
+
+def test_pipelined_requests_resolve_independently(pipelined_db_client, base_db):
+    for i in range(100):
+        base_db[b'key-%d' % i] = b'value-%d' % i
+
+    futures = [pipelined_db_client.submit_get(b'key-%d' % i) for i in range(100)]
+    missing = pipelined_db_client.submit_get(b'missing')
+
+    for i, future in enumerate(futures):
+        assert future.result() == (Result.SUCCESS, b'value-%d' % i)
+    assert missing.result() == (Result.FAIL, b'')
+
+
+def test_pipelined_and_original_clients_share_server(db_client, pipelined_db_client):
+    db_client[b'key'] = b'value'
+    assert pipelined_db_client[b'key'] == b'value'
+
+    pipelined_db_client[b'other'] = b'other-value'
+    assert db_client[b'other'] == b'other-value'
+
+
+def test_pipelined_client_is_threadsafe(pipelined_db_client):
+    def worker(worker_id):
+        for i in range(50):
+            key = b'%d-%d' % (worker_id, i)
+            pipelined_db_client[key] = key
+            assert pipelined_db_client[key] == key
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(worker, worker_id) for worker_id in range(8)]:
+            future.result()
+
+
+def test_pipelined_client_pending_requests_fail_on_close(pipelined_db_client):
+    pipelined_db_client.close()
+
+    with pytest.raises(ConnectionError):
+        pipelined_db_client[b'key']
+
+
+@pytest.fixture(params=('original', 'pipelined'))
+def any_db_client(request, db_client, pipelined_db_client):
+    if request.param == 'original':
+        return db_client
+    else:
+        return pipelined_db_client
+
+
+@pytest.mark.parametrize(
+    'keys',
+    (
+        (),
+        (b'key-1',),
+        (b'key-1', b'missing', b'empty', b'key-2', b'key-1'),
+        (b'missing', b'also-missing'),
+    ),
+)
+def test_multi_get_and_multi_exists(any_db_client, base_db, keys):
+    base_db[b'key-1'] = b'value-1'
+    base_db[b'key-2'] = b'value-2'
+    base_db[b'empty'] = b''
+
+    expected_values = tuple(base_db.get(key) if key in base_db else None for key in keys)
+    assert any_db_client.multi_get(keys) == expected_values
+    assert multi_get(base_db, keys) == expected_values
+    assert multi_get(any_db_client, keys) == expected_values
+
+    expected_exists = tuple(key in base_db for key in keys)
+    assert any_db_client.multi_exists(keys) == expected_exists
+    assert multi_exists(base_db, keys) == expected_exists
+    assert multi_exists(any_db_client, keys) == expected_exists
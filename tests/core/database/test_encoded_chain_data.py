@@ -0,0 +1,95 @@
+import os
+
+from eth.db.atomic import AtomicDB
+from eth.rlp.receipts import Receipt
+from eth.rlp.transactions import BaseTransactionFields
+import pytest
+import rlp
+from rlp import sedes
+from trie import HexaryTrie
+from trie.exceptions import MissingTrieNode
+
+from trinity.db.eth1.chain import (
+    AsyncChainDB,
+    get_indexed_trie_values,
+)
+from trinity.rlp.block_body import BlockBody
+from trinity.tools.factories import (
+    BaseTransactionFieldsFactory,
+    BlockHeaderFactory,
+)
+
+from tests.core.integration_test_helpers import (
+    DBFixture,
+    load_fixture_db,
+    load_mining_chain,
+)
+
+
+def make_indexed_trie(values, db=None):
+    if db is None:
+        db = AtomicDB()
+    trie = HexaryTrie(db)
+    for index, value in enumerate(values):
+        trie[rlp.encode(index)] = value
+    return db, trie.root_hash
+
+
+@pytest.mark.parametrize(
+    'values',
+    (
+        (),
+        (os.urandom(100), ),
+        # more than 128 values, so one key is a prefix of another: 0x80 of 0x8180
+        tuple(os.urandom(100) for _ in range(300)),
+        # short values, so that nodes are embedded in their parents
+        tuple(bytes([index]) for index in range(20)),
+    ),
+)
+def test_get_indexed_trie_values(values):
+    db, root_hash = make_indexed_trie(values)
+    assert get_indexed_trie_values(db, root_hash) == values
+
+
+def test_get_indexed_trie_values_missing_node():
+    db, root_hash = make_indexed_trie(tuple(os.urandom(100) for _ in range(300)))
+    root_node = rlp.decode(db[root_hash])
+    missing_hash = next(child for child in root_node[:16] if child)
+    del db[missing_hash]
+
+    with pytest.raises(MissingTrieNode):
+        get_indexed_trie_values(db, root_hash)
+
+
+@pytest.fixture
+def churner_chaindb():
+    for leveldb in load_fixture_db(DBFixture.STATE_CHURNER):
+        yield AsyncChainDB(load_mining_chain(AtomicDB(leveldb)).chaindb.db)
+
+
+@pytest.mark.parametrize('block_number', (0, 1, 120))
+def test_encoded_block_body_and_receipts(churner_chaindb, block_number):
+    header = churner_chaindb.get_canonical_block_header_by_number(block_number)
+    transactions = churner_chaindb.get_block_transactions(header, BaseTransactionFields)
+    uncles = churner_chaindb.get_block_uncles(header.uncles_hash)
+    receipts = churner_chaindb.get_receipts(header, Receipt)
+
+    encoded_body = churner_chaindb.get_encoded_block_body(header)
+    assert encoded_body == rlp.encode(BlockBody(transactions, uncles))
+
+    encoded_receipts = churner_chaindb.get_encoded_receipts(header)
+    assert encoded_receipts == rlp.encode(receipts, sedes=sedes.CountableList(Receipt))
+
+
+def test_encoded_block_body_with_uncles():
+    chaindb = AsyncChainDB(AtomicDB())
+    uncles = tuple(BlockHeaderFactory.create_batch(2))
+    transactions = tuple(BaseTransactionFieldsFactory.create_batch(3))
+    _, transaction_root = make_indexed_trie(map(rlp.encode, transactions), chaindb.db)
+    header = BlockHeaderFactory(
+        uncles_hash=chaindb.persist_uncles(uncles),
+        transaction_root=transaction_root,
+    )
+
+    encoded_body = chaindb.get_encoded_block_body(header)
+    assert encoded_body == rlp.encode(BlockBody(transactions, uncles))
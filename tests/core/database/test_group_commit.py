@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import threading
+
+from eth.db.atomic import AtomicDB
+import pytest
+
+from trinity.db.group_commit import GroupCommitter
+
+
+class BlockingAtomicDB(AtomicDB):
+    """
+    Holds up the first atomic batch until released, so that other batches
+    queue up behind it.
+    """
+    def __init__(self):
+        super().__init__()
+        self.num_writes = 0
+        self.first_write_started = threading.Event()
+        self.release = threading.Event()
+
+    @contextlib.contextmanager
+    def atomic_batch(self):
+        self.num_writes += 1
+        if not self.first_write_started.is_set():
+            self.first_write_started.set()
+            self.release.wait(5)
+        with super().atomic_batch() as batch:
+            yield batch
+
+
+def test_group_commit_single_batch():
+    db = AtomicDB()
+    committer = GroupCommitter(db)
+
+    db[b'deleted'] = b'old'
+    committer.commit(((b'key', b'value'),), (b'deleted',))
+
+    assert db[b'key'] == b'value'
+    assert b'deleted' not in db
+    assert committer.stats.num_commits == 1
+    assert committer.stats.num_batches == 1
+    assert committer.stats.num_keys == 2
+
+
+def test_group_commit_coalesces_concurrent_batches():
+    db = BlockingAtomicDB()
+    committer = GroupCommitter(db)
+
+    with ThreadPoolExecutor(max_workers=9) as executor:
+        first = executor.submit(committer.commit, ((b'first', b'value'),), ())
+        assert db.first_write_started.wait(5)
+
+        queued = [
+            executor.submit(committer.commit, ((b'key-%d' % i, b'value-%d' % i),), ())
+            for i in range(8)
+        ]
+        # wait for all batches to be queued behind the first write
+        while len(committer._queue) < len(queued):
+            threading.Event().wait(0.01)
+        db.release.set()
+
+        first.result()
+        for future in queued:
+            future.result()
+
+    assert db[b'first'] == b'value'
+    for i in range(8):
+        assert db[b'key-%d' % i] == b'value-%d' % i
+
+    assert db.num_writes == 2
+    assert committer.stats.num_commits == 2
+    assert committer.stats.num_batches == 9
+    assert committer.stats.max_batches_per_commit == 8
+
+
+def test_group_commit_failed_batch_only_fails_its_caller():
+    db = BlockingAtomicDB()
+    committer = GroupCommitter(db)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        first = executor.submit(committer.commit, ((b'first', b'value'),), ())
+        assert db.first_write_started.wait(5)
+
+        bad = executor.submit(committer.commit, (), (b'missing',))
+        good = executor.submit(committer.commit, ((b'good', b'value'),), ())
+        while len(committer._queue) < 2:
+            threading.Event().wait(0.01)
+        db.release.set()
+
+        first.result()
+        good.result()
+        with pytest.raises(KeyError):
+            bad.result()
+
+    assert db[b'good'] == b'value'
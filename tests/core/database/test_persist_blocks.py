@@ -0,0 +1,95 @@
+from eth.db.atomic import AtomicDB
+from eth.db.backends.memory import MemoryDB
+from eth.exceptions import ParentNotFound
+from eth_utils import ValidationError
+import pytest
+
+from trinity.db.eth1.chain import AsyncChainDB
+
+from tests.core.integration_test_helpers import (
+    DBFixture,
+    load_fixture_db,
+    load_mining_chain,
+)
+
+
+@pytest.fixture(scope='module')
+def churner_blocks():
+    for leveldb in load_fixture_db(DBFixture.STATE_CHURNER):
+        chain = load_mining_chain(AtomicDB(leveldb))
+        head = chain.get_canonical_head()
+        yield tuple(
+            chain.get_canonical_block_by_number(block_number)
+            for block_number in range(head.block_number + 1)
+        )
+
+
+def make_chaindb(genesis):
+    memory_db = MemoryDB()
+    chaindb = AsyncChainDB(AtomicDB(memory_db))
+    chaindb.persist_header(genesis.header)
+    return memory_db, chaindb
+
+
+def test_persist_blocks_matches_persist_block(churner_blocks):
+    genesis, *blocks = churner_blocks
+
+    one_by_one_db, one_by_one_chaindb = make_chaindb(genesis)
+    for block in blocks:
+        one_by_one_chaindb.persist_block(block)
+
+    batched_db, batched_chaindb = make_chaindb(genesis)
+    half = len(blocks) // 2
+    new_hashes, old_hashes = batched_chaindb.persist_blocks(blocks[:half])
+    assert new_hashes == tuple(block.hash for block in blocks[:half])
+    assert old_hashes == ()
+    batched_chaindb.persist_blocks(blocks[half:])
+
+    assert batched_db.kv_store == one_by_one_db.kv_store
+    assert batched_chaindb.get_canonical_head() == blocks[-1].header
+
+    block_with_transactions = next(block for block in blocks if block.transactions)
+    for index, transaction in enumerate(block_with_transactions.transactions):
+        assert batched_chaindb.get_transaction_index(transaction.hash) == (
+            block_with_transactions.number,
+            index,
+        )
+
+
+def test_persist_blocks_is_atomic(churner_blocks):
+    genesis, *blocks = churner_blocks
+    memory_db, chaindb = make_chaindb(genesis)
+    kv_store_before = dict(memory_db.kv_store)
+
+    # the first block is written to the batch before the gap is found
+    with pytest.raises(ValidationError):
+        chaindb.persist_blocks((blocks[0], blocks[2]))
+
+    with pytest.raises(ParentNotFound):
+        chaindb.persist_blocks(blocks[2:4])
+
+    assert memory_db.kv_store == kv_store_before
+
+
+def test_persist_prepared_blocks(churner_blocks):
+    genesis, *blocks = churner_blocks
+
+    expected_db, expected_chaindb = make_chaindb(genesis)
+    expected_chaindb.persist_blocks(blocks)
+
+    # preparing the blocks doesn't need the database
+    prepared = AsyncChainDB.prepare_blocks(blocks)
+    assert prepared.blocks == tuple(blocks)
+
+    memory_db, chaindb = make_chaindb(genesis)
+    chaindb.persist_prepared_blocks(prepared)
+    assert memory_db.kv_store == expected_db.kv_store
+
+
+def test_prepare_blocks_validates_uncles(churner_blocks):
+    genesis, *blocks = churner_blocks
+    block = blocks[0]
+    bad_block = block.copy(header=block.header.copy(uncles_hash=b'\x01' * 32))
+
+    with pytest.raises(ValidationError):
+        AsyncChainDB.prepare_blocks((bad_block, ))
@@ -0,0 +1,196 @@
+import pathlib
+import tempfile
+
+from eth.db.atomic import AtomicDB
+from eth_hash.auto import keccak
+from eth_utils import ValidationError
+import pytest
+
+from trinity.db.manager import (
+    DBClient,
+    DBManager,
+    PipelinedDBClient,
+)
+from trinity.db.read_cache import (
+    ReadCacheStats,
+    SLOTS_OFFSET,
+    SLOT_HEADER,
+    SharedReadCache,
+    get_read_cache_path,
+    is_content_addressed,
+)
+
+
+CACHE_SIZE = 1024 * 1024
+
+
+@pytest.fixture
+def ipc_path():
+    with tempfile.TemporaryDirectory() as dir:
+        ipc_path = pathlib.Path(dir) / "db_manager.ipc"
+        yield ipc_path
+
+
+@pytest.fixture
+def read_cache(ipc_path):
+    cache = SharedReadCache.create(get_read_cache_path(ipc_path), CACHE_SIZE)
+    try:
+        yield cache
+    finally:
+        cache.close()
+
+
+@pytest.fixture
+def base_db():
+    return AtomicDB()
+
+
+@pytest.fixture
+def db_manager(base_db, ipc_path):
+    with DBManager(base_db, read_cache_size=CACHE_SIZE).run(ipc_path) as manager:
+        yield manager
+
+
+@pytest.fixture(params=[DBClient, PipelinedDBClient])
+def db_client(request, ipc_path, db_manager):
+    client = request.param.connect(ipc_path)
+    try:
+        yield client
+    finally:
+        client.close()
+
+
+def test_read_cache_get_insert_invalidate(read_cache):
+    value = b'trie node'
+    key = keccak(value)
+
+    assert read_cache.get(key) is None
+    assert read_cache.insert(key, value)
+    assert read_cache.get(key) == value
+
+    read_cache.invalidate(key)
+    assert read_cache.get(key) is None
+
+    assert read_cache.get_stats() == ReadCacheStats(
+        hits=1,
+        misses=2,
+        inserts=1,
+        evictions=0,
+        invalidations=1,
+    )
+
+
+def test_read_cache_skips_values_that_do_not_fit(read_cache):
+    assert not read_cache.insert(b'\x01' * 31, b'short key')
+    assert not read_cache.insert(b'\x01' * 32, b'\x00' * 4096)
+    assert read_cache.get_stats().inserts == 0
+
+
+def test_read_cache_evicts_least_recently_used(ipc_path, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr('trinity.db.read_cache._now', lambda: next(clock))
+
+    # a single set of two slots
+    slot_size = SLOT_HEADER.size + 32 + 32
+    cache = SharedReadCache.create(
+        get_read_cache_path(ipc_path),
+        SLOTS_OFFSET + 2 * slot_size,
+        ways=2,
+        slot_value_size=32,
+    )
+    try:
+        keys = [bytes([index]) * 32 for index in range(3)]
+
+        cache.insert(keys[0], b'zero')
+        cache.insert(keys[1], b'one')
+        # make the first key the most recently used one
+        assert cache.get(keys[0]) == b'zero'
+
+        cache.insert(keys[2], b'two')
+
+        assert cache.get(keys[0]) == b'zero'
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) == b'two'
+        assert cache.get_stats().evictions == 1
+    finally:
+        cache.close()
+
+
+def test_read_cache_is_shared_between_handles(read_cache):
+    value = b'bytecode'
+    read_cache.insert(keccak(value), value)
+
+    other = SharedReadCache.open(read_cache.path)
+    try:
+        assert other.get(keccak(value)) == value
+    finally:
+        other.close()
+
+
+def test_read_cache_rejects_bad_segment(ipc_path):
+    cache_path = get_read_cache_path(ipc_path)
+    cache_path.write_bytes(b'\x00' * 4096)
+    with pytest.raises(ValidationError):
+        SharedReadCache.open(cache_path)
+
+    with pytest.raises(ValidationError):
+        SharedReadCache.create(cache_path, 1024)
+
+
+def test_is_content_addressed():
+    value = b'header'
+    assert is_content_addressed(keccak(value), value)
+    assert not is_content_addressed(keccak(value), b'other')
+    assert not is_content_addressed(b'canonical-head', value)
+
+
+def test_db_client_reads_through_cache(db_client, db_manager):
+    value = b'trie node'
+    key = keccak(value)
+    db_client[key] = value
+    db_client[b'not-a-hash'] = b'mutable'
+
+    assert db_client.read_cache is not None
+    assert db_client[key] == value
+    assert db_client[b'not-a-hash'] == b'mutable'
+
+    # only the content-addressed value was cached
+    assert db_manager.read_cache.get(key) == value
+    assert db_manager.read_cache.get(b'not-a-hash') is None
+
+    hits_before = db_client.read_cache.get_stats().hits
+    assert db_client[key] == value
+    assert key in db_client
+    assert db_client.multi_get((key, b'not-a-hash', b'missing')) == (value, b'mutable', None)
+    assert db_client.read_cache.get_stats().hits == hits_before + 3
+
+
+def test_db_client_writes_invalidate_cache(db_client, db_manager):
+    value = b'trie node'
+    key = keccak(value)
+    db_client[key] = value
+    assert db_client[key] == value
+    assert db_manager.read_cache.get(key) == value
+
+    del db_client[key]
+    assert db_manager.read_cache.get(key) is None
+    assert key not in db_client
+
+    db_client[key] = value
+    assert db_client[key] == value
+    with db_client.atomic_batch() as batch:
+        del batch[key]
+    assert db_manager.read_cache.get(key) is None
+    with pytest.raises(KeyError):
+        db_client[key]
+
+
+def test_db_manager_without_cache_removes_stale_segment(base_db, ipc_path):
+    SharedReadCache.create(get_read_cache_path(ipc_path), CACHE_SIZE).close()
+
+    with DBManager(base_db).run(ipc_path):
+        client = DBClient.connect(ipc_path)
+        try:
+            assert client.read_cache is None
+        finally:
+            client.close()
@@ -0,0 +1,102 @@
+import os
+
+from cancel_token import CancelToken
+from eth.db.atomic import AtomicDB
+import pytest
+import rlp
+from trie import HexaryTrie
+
+from trinity.sync.beam.backfill import (
+    BeamStateBackfill,
+    SchemaV1,
+)
+
+
+@pytest.fixture
+def source_trie():
+    trie = HexaryTrie({})
+    for _ in range(1000):
+        trie[os.urandom(32)] = os.urandom(40)
+    return trie
+
+
+def make_local_db(source_trie):
+    """
+    Make a database with the root and the first level of nodes below it, so that
+    every range of the trie is missing some nodes.
+    """
+    db = AtomicDB()
+    root_node = source_trie.db[source_trie.root_hash]
+    db[source_trie.root_hash] = root_node
+    for child_hash in rlp.decode(root_node)[:16]:
+        db[child_hash] = source_trie.db[child_hash]
+    return db
+
+
+async def collect_requests(backfill):
+    """
+    Collect one request for each range with missing nodes, as if each one
+    went to a different peer.
+    """
+    requests = {}
+    while True:
+        trie_range, on_deck = await backfill._next_request()
+        if not on_deck:
+            return requests
+        trie_range.is_requesting = True
+        requests[trie_range.prefix] = on_deck
+
+
+@pytest.mark.asyncio
+async def test_backfill_requests_ranges_separately(source_trie):
+    backfill = BeamStateBackfill(make_local_db(source_trie), None, token=CancelToken('test'))
+    backfill.set_root_hash(source_trie.root_hash)
+
+    requests = await collect_requests(backfill)
+
+    assert set(requests) == {(nibble, ) for nibble in range(16)}
+    for prefix, on_deck in requests.items():
+        assert len(on_deck) > 0
+        for path, node_hash in on_deck:
+            assert path[:1] == prefix
+            assert len(path) == 2
+            assert node_hash in source_trie.db
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_range_from_checkpoint(source_trie):
+    local_db = make_local_db(source_trie)
+    local_db[SchemaV1.make_range_checkpoint_lookup_key((3, ))] = bytes((3, 8))
+
+    backfill = BeamStateBackfill(local_db, None, token=CancelToken('test'))
+    backfill.set_root_hash(source_trie.root_hash)
+
+    requests = await collect_requests(backfill)
+
+    root_node = rlp.decode(source_trie.db[source_trie.root_hash])
+    range_3_node = rlp.decode(source_trie.db[root_node[3]])
+    children_before_checkpoint = [child for child in range_3_node[:8] if child]
+
+    range_3 = backfill._ranges[(3, )]
+    assert range_3.num_skipped == len(children_before_checkpoint)
+    walked_paths = [path for path, _ in requests[(3, )] + tuple(range_3.pending)]
+    assert min(walked_paths) >= (3, 8)
+
+    # the other ranges are walked from the start
+    assert min(path for path, _ in requests[(4, )]) == (4, 0)
+
+
+@pytest.mark.asyncio
+async def test_backfill_saves_checkpoints(source_trie):
+    local_db = make_local_db(source_trie)
+    backfill = BeamStateBackfill(local_db, None, token=CancelToken('test'))
+    backfill.set_root_hash(source_trie.root_hash)
+
+    requests = await collect_requests(backfill)
+    range_5 = backfill._ranges[(5, )]
+    range_5.in_flight = requests[(5, )]
+    backfill._save_checkpoints()
+
+    expected_checkpoint = min(path for path, _ in requests[(5, )] + tuple(range_5.pending))
+    restarted_backfill = BeamStateBackfill(local_db, None, token=CancelToken('test'))
+    assert restarted_backfill._ranges[(5, )].checkpoint == expected_checkpoint
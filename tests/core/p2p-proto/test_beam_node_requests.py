@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from trinity.sync.beam.dedup import NodeRequestRegistry
+
+
+NODE_A = b'\x0a' * 32
+NODE_B = b'\x0b' * 32
+
+
+def test_skip_in_flight_nodes():
+    node_requests = NodeRequestRegistry()
+    assert node_requests.skip_in_flight((NODE_A, NODE_B)) == (NODE_A, NODE_B)
+    assert node_requests.num_deduplicated_nodes == 0
+
+    node_requests.start_requests((NODE_A, ))
+    assert NODE_A in node_requests
+    assert node_requests.skip_in_flight((NODE_A, NODE_B)) == (NODE_B, )
+    assert node_requests.num_deduplicated_nodes == 1
+    assert node_requests.num_saved_requests == 0
+
+    assert node_requests.skip_in_flight((NODE_A, )) == ()
+    assert node_requests.num_deduplicated_nodes == 2
+    assert node_requests.num_saved_requests == 1
+
+    node_requests.finish_requests((NODE_A, ), ((NODE_A, b'node-a'), ))
+    assert NODE_A not in node_requests
+    assert node_requests.num_saved_bytes == len(b'node-a')
+
+
+def test_overlapping_requests_stay_in_flight_until_all_finish():
+    node_requests = NodeRequestRegistry()
+    node_requests.start_requests((NODE_A, ))
+    assert node_requests.skip_in_flight((NODE_A, )) == ()
+    # e.g. the urgent path taking over from a slow backfill request
+    node_requests.start_requests((NODE_A, ))
+
+    node_requests.finish_requests((NODE_A, ), ())
+    assert NODE_A in node_requests
+    node_requests.finish_requests((NODE_A, ), ((NODE_A, b'node-a'), ))
+    assert NODE_A not in node_requests
+    assert len(node_requests) == 0
+
+
+def test_failed_request_saves_no_bytes():
+    node_requests = NodeRequestRegistry()
+    node_requests.start_requests((NODE_A, ))
+    node_requests.skip_in_flight((NODE_A, ))
+    node_requests.finish_requests((NODE_A, ), ())
+
+    assert node_requests.num_saved_bytes == 0
+    assert node_requests.num_deduplicated_nodes == 1
+
+
+@pytest.mark.asyncio
+async def test_finished_requests_notify_listeners():
+    node_requests = NodeRequestRegistry()
+    new_data = asyncio.Event()
+    node_requests.add_listener(new_data)
+
+    node_requests.start_requests((NODE_A, ))
+    assert not new_data.is_set()
+    node_requests.finish_requests((NODE_A, ), ())
+    assert new_data.is_set()
+
+    node_requests.remove_listener(new_data)
+    new_data.clear()
+    node_requests.start_requests((NODE_A, ))
+    node_requests.finish_requests((NODE_A, ), ())
+    assert not new_data.is_set()
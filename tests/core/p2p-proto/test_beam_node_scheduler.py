@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from p2p.stats.ema import EMA
+
+from trinity.sync.beam.scheduler import NodeDataScheduler
+
+
+class FakeTracker:
+    def __init__(self, round_trip_time):
+        self.round_trip_ema = EMA(initial_value=round_trip_time, smoothing_factor=0.5)
+
+
+class FakeGetNodeData:
+    def __init__(self, delay, has_nodes=True, error=None):
+        self.tracker = FakeTracker(delay)
+        self.is_requesting = False
+        self.requests = []
+        self.cancelled = False
+        self._delay = delay
+        self._has_nodes = has_nodes
+        self._error = error
+
+    async def __call__(self, node_hashes, timeout=None):
+        self.requests.append(node_hashes)
+        try:
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+        if self._error is not None:
+            raise self._error
+        elif self._has_nodes:
+            return tuple((node_hash, b'node') for node_hash in node_hashes)
+        else:
+            return ()
+
+
+class FakeETHAPI:
+    def __init__(self, get_node_data):
+        self.get_node_data = get_node_data
+
+
+class FakePeer:
+    def __init__(self, name, delay, **kwargs):
+        self.name = name
+        self.is_operational = True
+        self.eth_api = FakeETHAPI(FakeGetNodeData(delay, **kwargs))
+
+    def __repr__(self):
+        return f"<FakePeer {self.name}>"
+
+
+def _hashes(count):
+    return tuple(i.to_bytes(32, 'big') for i in range(count))
+
+
+def test_rank_peers_prefers_idle_low_latency_peers():
+    fast, slow, busy, gone = [FakePeer(name, delay) for name, delay in (
+        ('fast', 0.1), ('slow', 0.5), ('busy', 0.01), ('gone', 0.01),
+    )]
+    busy.eth_api.get_node_data.is_requesting = True
+    gone.is_operational = False
+
+    scheduler = NodeDataScheduler(reply_timeout=1, max_peers=3)
+    assert scheduler.rank_peers((slow, busy, gone, fast)) == (fast, slow, busy)
+
+
+def test_plan_splits_large_batches_and_races_each_part():
+    peers = tuple(FakePeer(str(i), i) for i in range(4))
+    scheduler = NodeDataScheduler(reply_timeout=1, race_width=2, min_sub_request_size=16)
+
+    # too small to split
+    plan = scheduler.plan(peers, _hashes(10))
+    assert plan == ((peers[:2], _hashes(10)), )
+
+    plan = scheduler.plan(peers, _hashes(64))
+    assert plan == (
+        ((peers[0], peers[2]), _hashes(32)),
+        ((peers[1], peers[3]), _hashes(64)[32:]),
+    )
+
+    assert scheduler.plan((), _hashes(10)) == ()
+
+
+@pytest.mark.asyncio
+async def test_first_reply_wins_and_cancels_the_rest():
+    fast = FakePeer('fast', 0.01)
+    slow = FakePeer('slow', 0.2)
+    scheduler = NodeDataScheduler(reply_timeout=1)
+
+    nodes = await scheduler.get_node_data((slow, fast), _hashes(4))
+
+    assert nodes == tuple((node_hash, b'node') for node_hash in _hashes(4))
+    assert len(slow.eth_api.get_node_data.requests) == 1
+    assert scheduler.num_cancelled == 1
+    await asyncio.sleep(0)
+    assert slow.eth_api.get_node_data.cancelled
+
+
+@pytest.mark.asyncio
+async def test_failed_and_empty_replies_fall_back_to_other_peers():
+    failing = FakePeer('failing', 0.001, error=asyncio.TimeoutError())
+    empty = FakePeer('empty', 0.002, has_nodes=False)
+    slow = FakePeer('slow', 0.05)
+    scheduler = NodeDataScheduler(reply_timeout=1, race_width=3)
+
+    nodes = await scheduler.get_node_data((failing, empty, slow), _hashes(2))
+
+    assert len(nodes) == 2
+    assert scheduler.num_failed == 1
+
+
+@pytest.mark.asyncio
+async def test_no_reply_returns_no_nodes():
+    failing = FakePeer('failing', 0.001, error=asyncio.TimeoutError())
+    scheduler = NodeDataScheduler(reply_timeout=1)
+
+    assert await scheduler.get_node_data((failing, ), _hashes(2)) == ()
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+from eth.constants import BLANK_ROOT_HASH
+from eth.db.atomic import AtomicDB
+from eth.db.backends.base import BaseDB
+from eth.rlp.accounts import Account
+from eth.vm.forks.petersburg import PetersburgVM
+from eth_hash.auto import keccak
+import pytest
+import rlp
+from trie import HexaryTrie
+
+from trinity.sync.beam import importer
+from trinity.sync.beam.importer import (
+    BlockPreviewServer,
+    make_pausing_beam_chain,
+    partial_prefetch_execute,
+)
+
+from tests.core.integration_test_helpers import (
+    DBFixture,
+    load_fixture_db,
+    load_mining_chain,
+)
+
+
+class HidingDB(BaseDB):
+    """
+    Pretend that some keys are missing from the wrapped database.
+    """
+    def __init__(self, db):
+        self.db = db
+        self.hidden = set()
+
+    def __getitem__(self, key):
+        if key in self.hidden:
+            raise KeyError(key)
+        return self.db[key]
+
+    def __setitem__(self, key, value):
+        self.db[key] = value
+
+    def __delitem__(self, key):
+        del self.db[key]
+
+    def _exists(self, key):
+        return key not in self.hidden and key in self.db
+
+
+@pytest.fixture
+def leveldb_churner():
+    yield from load_fixture_db(DBFixture.STATE_CHURNER)
+
+
+@pytest.fixture
+def prefetch_setup(event_loop, leveldb_churner):
+    chaindb = load_mining_chain(AtomicDB(leveldb_churner)).chaindb
+    hiding_db = HidingDB(leveldb_churner)
+    beam_chain = make_pausing_beam_chain(
+        ((0, PetersburgVM), ),
+        chain_id=999,
+        db=AtomicDB(hiding_db),
+        # Prefetching never pauses, so it never talks to the event bus
+        event_bus=None,
+        loop=event_loop,
+    )
+
+    header = chaindb.get_canonical_block_header_by_number(120)
+    parent = chaindb.get_block_header_by_hash(header.parent_hash)
+    transactions = chaindb.get_block_transactions(header, PetersburgVM.get_transaction_class())
+    # Previews execute on top of the parent state, like a DoStatelessBlockPreview
+    preview_header = header.copy(state_root=parent.state_root)
+
+    return beam_chain, hiding_db, preview_header, transactions
+
+
+def test_prefetch_with_all_state_present(prefetch_setup):
+    beam_chain, _, header, transactions = prefetch_setup
+
+    missing_state = partial_prefetch_execute(beam_chain, header, transactions)()
+
+    assert len(missing_state) == 0
+    assert not missing_state.node_hashes
+
+
+def test_prefetch_records_missing_account(prefetch_setup):
+    beam_chain, hiding_db, header, transactions = prefetch_setup
+    hiding_db.hidden.add(header.state_root)
+
+    missing_state = partial_prefetch_execute(beam_chain, header, transactions)()
+
+    assert missing_state.node_hashes == {header.state_root}
+    assert {state_root for _, state_root in missing_state.accounts} == {header.state_root}
+    assert not missing_state.storages
+
+
+def test_prefetch_records_all_missing_storage_at_once(prefetch_setup):
+    beam_chain, hiding_db, header, transactions = prefetch_setup
+
+    state_trie = HexaryTrie(hiding_db, header.state_root)
+    storage_roots = {
+        rlp.decode(state_trie[keccak(address)], sedes=Account).storage_root
+        for transaction in transactions
+        for address in (transaction.sender, transaction.to)
+    } - {BLANK_ROOT_HASH}
+    assert storage_roots
+    hiding_db.hidden.update(storage_roots)
+
+    missing_state = partial_prefetch_execute(beam_chain, header, transactions)()
+
+    # A pausing execution would have paused once for each of these storage slots
+    assert len(missing_state.storages) > 1
+    assert {storage_root for _, storage_root, _ in missing_state.storages} == storage_roots
+    assert not missing_state.accounts
+
+
+@pytest.mark.asyncio
+async def test_preview_does_not_wait_for_prefetching(monkeypatch):
+    previewed = threading.Event()
+
+    def failing_prefetch(beam_chain, header, transactions):
+        def prefetch():
+            # the pausing preview must run while the prefetch is still busy
+            assert previewed.wait(timeout=2)
+            raise Exception("prefetching failed")
+        return prefetch
+
+    def preview(beam_chain, header, transactions):
+        return previewed.set
+
+    monkeypatch.setattr(importer, 'partial_prefetch_execute', failing_prefetch)
+    monkeypatch.setattr(importer, 'partial_trigger_missing_state_downloads', preview)
+
+    server = BlockPreviewServer(event_bus=None, beam_chain=None, shard_num=0)
+    await asyncio.wait_for(server._prefetch_and_preview(None, None, ()), timeout=1)
+    assert previewed.is_set()
+
+    # a failed prefetch is logged, not raised
+    await asyncio.wait_for(server._prefetch(None, None, ()), timeout=1)
@@ -0,0 +1,87 @@
+import asyncio
+
+from eth.db.atomic import AtomicDB
+import pytest
+
+from trinity.sync.beam.hints import (
+    SchemaV1,
+    StateAccessHints,
+)
+
+
+def account_hash(index):
+    return index.to_bytes(32, 'big')
+
+
+def storage(index):
+    return (index.to_bytes(20, 'big'), index.to_bytes(32, 'big'))
+
+
+def test_state_hints_rank_most_touched_first():
+    hints = StateAccessHints(AtomicDB())
+
+    for block_number in range(4):
+        # account N is touched in the first N+1 blocks
+        for index in range(4 - block_number):
+            hints.record_account(account_hash(index))
+        hints.record_storage(*storage(block_number % 2))
+        hints.persist_block(block_number)
+
+    account_hashes, storages = hints.get_hot_keys()
+    assert account_hashes == tuple(account_hash(index) for index in range(4))
+    assert storages == (storage(0), storage(1))
+
+    account_hashes, storages = hints.get_hot_keys(max_accounts=2, max_storages=1)
+    assert account_hashes == (account_hash(0), account_hash(1))
+    assert storages == (storage(0), )
+
+
+def test_state_hints_survive_restart():
+    db = AtomicDB()
+    hints = StateAccessHints(db)
+    assert hints.get_hot_keys() == ((), ())
+
+    hints.record_account(account_hash(1))
+    hints.record_storage(*storage(2))
+    hints.persist_block(10)
+
+    restarted_hints = StateAccessHints(db)
+    assert restarted_hints.get_hot_keys() == ((account_hash(1), ), (storage(2), ))
+
+
+def test_state_hints_roll_over():
+    db = AtomicDB()
+    hints = StateAccessHints(db, num_blocks=3)
+
+    for block_number in range(5):
+        hints.record_account(account_hash(block_number))
+        hints.persist_block(block_number)
+
+    assert set(hints.get_hot_keys()[0]) == {account_hash(index) for index in (2, 3, 4)}
+    assert SchemaV1.make_block_hints_lookup_key(1) not in db
+
+    # after a jump ahead, like a restart, all of the old blocks are dropped
+    restarted_hints = StateAccessHints(db, num_blocks=3)
+    restarted_hints.record_account(account_hash(100))
+    restarted_hints.persist_block(100)
+
+    assert restarted_hints.get_hot_keys()[0] == (account_hash(100), )
+    for block_number in (2, 3, 4):
+        assert SchemaV1.make_block_hints_lookup_key(block_number) not in db
+
+
+@pytest.mark.asyncio
+async def test_state_hints_persist_in_executor():
+    hints = StateAccessHints(AtomicDB())
+
+    hints.record_account(account_hash(1))
+    persisting = asyncio.ensure_future(hints.coro_persist_block(10))
+    await asyncio.sleep(0)
+    # recorded while the previous block is being written, so it goes to the next one
+    hints.record_account(account_hash(2))
+    await persisting
+
+    assert await hints.coro_get_hot_keys() == ((account_hash(1), ), ())
+
+    await hints.coro_persist_block(11)
+    assert set((await hints.coro_get_hot_keys())[0]) == {account_hash(1), account_hash(2)}
@@ -0,0 +1,88 @@
+import asyncio
+import gc
+
+from eth.db.atomic import AtomicDB
+import pytest
+
+from trinity.sync.full.importer import PipelinedBlockImporter
+
+from tests.core.integration_test_helpers import (
+    DBFixture,
+    load_fixture_db,
+    load_mining_chain,
+)
+
+
+@pytest.fixture
+def churner_chain():
+    for leveldb in load_fixture_db(DBFixture.STATE_CHURNER):
+        yield load_mining_chain(AtomicDB(leveldb))
+
+
+def get_blocks(chain, block_numbers):
+    return tuple(chain.get_canonical_block_by_number(number) for number in block_numbers)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('preview_depth', (0, 1, 5))
+async def test_pipelined_block_importer(churner_chain, preview_depth):
+    blocks = get_blocks(churner_chain, range(1, 21))
+    assert any(block.transactions for block in blocks)
+
+    chain = load_mining_chain(AtomicDB())
+    importer = PipelinedBlockImporter(chain)
+
+    for index, block in enumerate(blocks):
+        # preview the blocks ahead of the one being imported, like the regular syncer does
+        for previewed in blocks[index:index + preview_depth]:
+            parent = churner_chain.get_block_header_by_hash(previewed.header.parent_hash)
+            await importer.preview_transactions(
+                previewed.header,
+                previewed.transactions,
+                parent.state_root,
+            )
+
+        _, new_canonical_blocks, _ = await importer.import_block(block)
+        assert new_canonical_blocks == (block, )
+
+    assert chain.get_canonical_head() == blocks[-1].header
+    assert blocks[-1].header.state_root in chain.chaindb.db
+
+
+@pytest.mark.asyncio
+async def test_pipelined_block_importer_failed_preparations(churner_chain, event_loop):
+    blocks = get_blocks(churner_chain, range(1, 4))
+    assert any(block.transactions for block in blocks)
+
+    unhandled_errors = []
+    event_loop.set_exception_handler(lambda loop, context: unhandled_errors.append(context))
+
+    chain = load_mining_chain(AtomicDB())
+    importer = PipelinedBlockImporter(chain)
+
+    async def fail_preparation(header, transactions, parent_state_root):
+        raise Exception("preparation failed")
+
+    importer._prepare_block = fail_preparation
+
+    async def preview(block):
+        parent = churner_chain.get_block_header_by_hash(block.header.parent_hash)
+        await importer.preview_transactions(block.header, block.transactions, parent.state_root)
+        # let the preparation fail
+        await asyncio.sleep(0)
+
+    # a failed preparation doesn't fail the import of the block
+    for block in blocks:
+        if block.transactions:
+            await preview(block)
+        await importer.import_block(block)
+
+    # a failed preparation of a block that was imported already is dropped quietly
+    imported_block = next(block for block in blocks if block.transactions)
+    await preview(imported_block)
+    await importer.import_block(get_blocks(churner_chain, (4, ))[0])
+    await asyncio.sleep(0)
+    gc.collect()
+
+    assert chain.get_canonical_head().block_number == 4
+    assert unhandled_errors == []
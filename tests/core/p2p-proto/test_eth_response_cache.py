@@ -0,0 +1,71 @@
+import os
+
+import pytest
+import rlp
+
+from trinity._utils.rlp import encode_rlp_list
+from trinity.protocol.eth.commands import (
+    BlockBodies,
+    BlockHeaders,
+    Receipts,
+)
+from trinity.protocol.eth.response_cache import EncodedLRU
+from trinity.tools.factories import (
+    BlockBodyFactory,
+    BlockHeaderFactory,
+    ReceiptFactory,
+)
+
+
+@pytest.mark.parametrize(
+    'command_type,payload',
+    (
+        (BlockHeaders, ()),
+        (BlockHeaders, tuple(BlockHeaderFactory.create_batch(2))),
+        (BlockBodies, tuple(BlockBodyFactory.create_batch(2))),
+        (Receipts, (tuple(ReceiptFactory.create_batch(2)), tuple(ReceiptFactory.create_batch(3)))),
+    ),
+)
+@pytest.mark.parametrize('snappy_support', (True, False))
+def test_reply_from_encoded_items(command_type, payload, snappy_support):
+    sedes = command_type.serialization_codec.sedes.element_sedes
+    encoded_payload = encode_rlp_list(rlp.encode(item, sedes=sedes) for item in payload)
+
+    command = command_type.from_encoded_payload(encoded_payload)
+    message = command.encode(command_type.protocol_command_id, snappy_support)
+    expected_message = command_type(payload).encode(
+        command_type.protocol_command_id,
+        snappy_support,
+    )
+
+    assert message.body == expected_message.body
+    assert command.payload == payload
+    assert command_type.decode(message, snappy_support).payload == payload
+
+
+def test_encoded_lru_evicts_by_size():
+    cache = EncodedLRU(max_bytes=250)
+    keys = [os.urandom(32) for _ in range(4)]
+
+    for key in keys[:2]:
+        cache.add(key, os.urandom(100))
+    assert cache.num_bytes == 200
+
+    # reading the first key makes the second one the least recently used
+    assert cache.get(keys[0]) is not None
+    cache.add(keys[2], os.urandom(100))
+
+    assert keys[0] in cache
+    assert keys[1] not in cache
+    assert keys[2] in cache
+    assert cache.num_bytes == 200
+
+    assert cache.get(keys[1]) is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.hit_rate == 0.5
+
+    # values bigger than the whole cache are never cached
+    cache.add(keys[3], os.urandom(251))
+    assert keys[3] not in cache
+    assert len(cache) == 2
@@ -0,0 +1,52 @@
+from cancel_token import CancelToken
+import pytest
+
+from trinity.db.eth1.header import AsyncHeaderDB
+from trinity.protocol.common.payloads import BlockHeadersQuery
+from trinity.protocol.common.servers import BasePeerRequestHandler
+
+
+@pytest.fixture
+def headerdb_20(chaindb_20):
+    return AsyncHeaderDB(chaindb_20.db)
+
+
+@pytest.mark.parametrize(
+    'block_numbers, expected_numbers',
+    (
+        ((), ()),
+        ((0, 1, 2), (0, 1, 2)),
+        ((20, 15, 10, 5, 0), (20, 15, 10, 5, 0)),
+        # stop at the first unavailable header
+        ((18, 19, 20, 21, 22), (18, 19, 20)),
+        ((5, 21, 6), (5, )),
+    ),
+)
+def test_get_canonical_block_headers_by_number(headerdb_20, block_numbers, expected_numbers):
+    headers = headerdb_20.get_canonical_block_headers_by_number(block_numbers)
+    assert headers == tuple(
+        headerdb_20.get_canonical_block_header_by_number(block_number)
+        for block_number in expected_numbers
+    )
+
+
+@pytest.mark.parametrize(
+    'query, expected_numbers',
+    (
+        (BlockHeadersQuery(0, 5, 0, False), (0, 1, 2, 3, 4)),
+        (BlockHeadersQuery(20, 3, 4, True), (20, 15, 10)),
+        (BlockHeadersQuery(10, 400, 0, False), tuple(range(10, 21))),
+        (BlockHeadersQuery(30, 5, 0, True), ()),
+    ),
+)
+@pytest.mark.asyncio
+async def test_lookup_headers(headerdb_20, query, expected_numbers):
+    handler = BasePeerRequestHandler(headerdb_20, CancelToken('test'))
+
+    headers = await handler.lookup_headers(query)
+    assert tuple(header.block_number for header in headers) == expected_numbers
+
+    # look up the same headers by the hash of the first one
+    if headers:
+        query_by_hash = query._replace(block_number_or_hash=headers[0].hash)
+        assert await handler.lookup_headers(query_by_hash) == headers
@@ -0,0 +1,130 @@
+import asyncio
+
+from lahja import BroadcastConfig
+import pytest
+
+from p2p.disconnect import DisconnectReason
+from p2p.tools.factories import SessionFactory
+
+from trinity.exceptions import TooManyPendingRequests
+from trinity.protocol.common.events import DisconnectPeerEvent
+from trinity.protocol.common.serving import RequestServingScheduler
+from trinity.protocol.eth.commands import GetBlockBodies
+from trinity.protocol.eth.servers import ETHRequestServer
+
+
+async def serve(scheduler, session, cost, release=None):
+    async with scheduler.reserve(session, cost) as stats:
+        if release is not None:
+            await release.wait()
+        stats.num_bytes += cost
+
+
+@pytest.mark.asyncio
+async def test_greedy_peer_waits_for_its_budget():
+    scheduler = RequestServingScheduler(reads_per_second=1000, burst_reads=100)
+    greedy_peer, other_peer = SessionFactory.create_batch(2)
+
+    await serve(scheduler, greedy_peer, 100)
+    greedy_request = asyncio.ensure_future(serve(scheduler, greedy_peer, 100))
+
+    # the other peer is served right away, while the greedy peer waits for its budget
+    await asyncio.wait_for(serve(scheduler, other_peer, 100), timeout=0.05)
+    assert not greedy_request.done()
+
+    await asyncio.wait_for(greedy_request, timeout=1)
+
+    greedy_stats = scheduler.peer_stats[greedy_peer]
+    assert greedy_stats.num_requests == 2
+    assert greedy_stats.num_reads == 200
+    assert greedy_stats.num_bytes == 200
+    assert greedy_stats.num_throttled == 1
+    assert greedy_stats.throttled_seconds > 0
+
+    other_stats = scheduler.peer_stats[other_peer]
+    assert other_stats.num_requests == 1
+    assert other_stats.num_throttled == 0
+
+    assert scheduler.get_busiest_peers(1) == ((greedy_peer, greedy_stats), )
+
+
+@pytest.mark.asyncio
+async def test_too_many_pending_requests_are_dropped():
+    scheduler = RequestServingScheduler(max_pending_per_peer=1)
+    peer = SessionFactory()
+    release = asyncio.Event()
+
+    pending_request = asyncio.ensure_future(serve(scheduler, peer, 1, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(TooManyPendingRequests):
+        await serve(scheduler, peer, 1)
+
+    release.set()
+    await asyncio.wait_for(pending_request, timeout=1)
+
+    # once the pending request is served, the peer may send another one
+    await serve(scheduler, peer, 1)
+
+    stats = scheduler.peer_stats[peer]
+    assert stats.num_requests == 2
+    assert stats.num_dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_capped():
+    scheduler = RequestServingScheduler(max_concurrent=1)
+    first_peer, second_peer = SessionFactory.create_batch(2)
+    release = asyncio.Event()
+
+    first_request = asyncio.ensure_future(serve(scheduler, first_peer, 1, release))
+    await asyncio.sleep(0)
+    second_request = asyncio.ensure_future(serve(scheduler, second_peer, 1))
+    await asyncio.sleep(0.01)
+    assert not second_request.done()
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(first_request, second_request), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_prune_idle_peers():
+    scheduler = RequestServingScheduler()
+    idle_peer, active_peer = SessionFactory.create_batch(2)
+
+    await serve(scheduler, idle_peer, 1)
+    await asyncio.sleep(0.05)
+    await serve(scheduler, active_peer, 1)
+
+    scheduler.prune_idle_peers(0.04)
+    assert set(scheduler.peer_stats) == {active_peer}
+
+
+class RecordingEventBus:
+    def __init__(self):
+        self.broadcasts = []
+
+    async def broadcast(self, event, broadcast_config=None):
+        self.broadcasts.append((event, broadcast_config))
+
+
+@pytest.mark.asyncio
+async def test_peer_with_malformed_request_is_disconnected():
+    message = GetBlockBodies((b'\x01' * 32, b'\x02' * 32)).encode(0, snappy_support=False)
+    malformed_request = GetBlockBodies.decode(
+        type(message)(message.header, message.body[:-1]),
+        snappy_support=False,
+    )
+    peer = SessionFactory()
+    event_bus = RecordingEventBus()
+    broadcast_config = BroadcastConfig()
+    server = ETHRequestServer(event_bus, broadcast_config, db=None)
+
+    await server._quiet_handle_msg(peer, malformed_request)
+
+    assert len(event_bus.broadcasts) == 1
+    event, config = event_bus.broadcasts[0]
+    assert isinstance(event, DisconnectPeerEvent)
+    assert event.session == peer
+    assert event.reason is DisconnectReason.BAD_PROTOCOL
+    assert config is broadcast_config
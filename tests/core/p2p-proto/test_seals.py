@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from eth.chains.mainnet import MAINNET_VM_CONFIGURATION
+from eth.db.atomic import AtomicDB
+from eth.rlp.headers import BlockHeader
+from eth_utils import ValidationError
+import pytest
+import rlp
+
+from trinity.sync.common.seals import (
+    _is_pow_sealed,
+    validate_header_chain,
+)
+from trinity.tools.chain import AsyncMainnetChain
+
+
+MAINNET_HEADERS_PATH = Path(__file__).parents[2] / 'p2p' / 'fixtures' / 'sample_1000_headers_rlp'
+
+
+@pytest.fixture(scope='module')
+def mainnet_headers():
+    encoded_headers = MAINNET_HEADERS_PATH.read_bytes()
+    return rlp.decode(encoded_headers, sedes=rlp.sedes.CountableList(BlockHeader))
+
+
+@pytest.fixture
+def mainnet_chain():
+    return AsyncMainnetChain(AtomicDB())
+
+
+@pytest.mark.asyncio
+async def test_validate_header_chain(mainnet_chain, mainnet_headers):
+    parent, *headers = mainnet_headers[:65]
+    await validate_header_chain(mainnet_chain, parent, headers)
+
+
+@pytest.mark.asyncio
+async def test_validate_header_chain_bad_seal(mainnet_chain, mainnet_headers):
+    parent, *headers = mainnet_headers[:65]
+    # a new nonce invalidates the seal, but doesn't change the mining hash or parent hash
+    headers[-1] = headers[-1].copy(nonce=b'\x00' * 8)
+
+    # the seal check is skipped
+    await validate_header_chain(mainnet_chain, parent, headers, seal_check_random_sample_rate=0)
+
+    with pytest.raises(ValidationError, match="mix hash mismatch"):
+        await validate_header_chain(mainnet_chain, parent, headers)
+
+
+@pytest.mark.asyncio
+async def test_validate_header_chain_bad_parent(mainnet_chain, mainnet_headers):
+    parent, *headers = mainnet_headers[:65]
+    del headers[30]
+
+    with pytest.raises(ValidationError, match="Invalid header chain"):
+        await validate_header_chain(mainnet_chain, parent, headers)
+
+
+@pytest.mark.asyncio
+async def test_validate_header_chain_configured_seal_check(mainnet_headers):
+    vm_configuration = tuple(
+        (block_number, vm_class.configure(validate_seal=lambda block: None))
+        for block_number, vm_class in MAINNET_VM_CONFIGURATION
+    )
+    chain = AsyncMainnetChain.configure(vm_configuration=vm_configuration)(AtomicDB())
+
+    parent, *headers = mainnet_headers[:65]
+    vm_class = chain.get_vm_class_for_block_number(headers[-1].block_number)
+    assert not _is_pow_sealed(vm_class)
+    assert _is_pow_sealed(AsyncMainnetChain.get_vm_class_for_block_number(0))
+
+    # the configured check accepts any seal, and is the one that runs
+    headers[-1] = headers[-1].copy(nonce=b'\x00' * 8)
+    await validate_header_chain(chain, parent, headers)
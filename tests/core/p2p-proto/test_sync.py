@@ -1,7 +1,10 @@
 import asyncio
 import logging
+import pathlib
+import tempfile
 import uuid
 
+from async_generator import asynccontextmanager
 from eth.db.atomic import AtomicDB
 from eth.exceptions import HeaderNotFound
 from eth.vm.forks.petersburg import PetersburgVM
@@ -10,7 +13,14 @@ from lahja import ConnectionConfig, AsyncioEndpoint
 from p2p.service import BaseService
 import pytest
 
-from trinity.db.eth1.chain import AsyncChainDB
+from trinity.db.eth1.chain import (
+    AsyncChainDB,
+    AsyncClientChainDB,
+)
+from trinity.db.manager import (
+    AsyncDBClient,
+    DBManager,
+)
 from trinity.protocol.eth.peer import ETHPeerPoolEventServer
 from trinity.sync.beam.importer import (
     make_pausing_beam_chain,
@@ -169,7 +179,12 @@ async def test_beam_syncer(
         chaindb_fresh,
         chaindb_churner,
         beam_to_block,
-        checkpoint=None):
+        checkpoint=None,
+        server_chaindb=None,
+        client_async_db=None):
+
+    if server_chaindb is None:
+        server_chaindb = AsyncChainDB(chaindb_churner.db)
 
     client_context = ChainContextFactory(headerdb__db=chaindb_fresh.db)
     server_context = ChainContextFactory(headerdb__db=chaindb_churner.db)
@@ -196,7 +211,7 @@ async def test_beam_syncer(
         async with run_peer_pool_event_server(
             event_bus, server_peer_pool, handler_type=ETHPeerPoolEventServer
         ), run_request_server(
-            event_bus, AsyncChainDB(chaindb_churner.db)
+            event_bus, server_chaindb
         ), AsyncioEndpoint.serve(
             pausing_config
         ) as pausing_endpoint, AsyncioEndpoint.serve(gatherer_config) as gatherer_endpoint:
@@ -217,6 +232,7 @@ async def test_beam_syncer(
                 gatherer_endpoint,
                 force_beam_block_number=beam_to_block,
                 checkpoint=checkpoint,
+                async_db=client_async_db,
             )
 
             client_peer.logger.info("%s is serving churner blocks", client_peer)
@@ -245,6 +261,41 @@ async def test_beam_syncer(
             await client.cancel()
 
 
+@asynccontextmanager
+async def serve_async_db(db):
+    with tempfile.TemporaryDirectory() as ipc_dir:
+        ipc_path = pathlib.Path(ipc_dir) / "db_manager.ipc"
+        with DBManager(db).run(ipc_path):
+            async_db = await AsyncDBClient.connect(ipc_path)
+            try:
+                yield async_db
+            finally:
+                async_db.close()
+
+
+@pytest.mark.asyncio
+async def test_beam_syncer_with_async_db_clients(
+        request,
+        event_loop,
+        event_bus,
+        chaindb_fresh,
+        chaindb_churner):
+
+    # the request server and the beam downloader both read and write over IPC
+    async with serve_async_db(chaindb_churner.db) as server_async_db:
+        async with serve_async_db(chaindb_fresh.db) as client_async_db:
+            await test_beam_syncer(
+                request,
+                event_loop,
+                event_bus,
+                chaindb_fresh,
+                chaindb_churner,
+                beam_to_block=66,
+                server_chaindb=AsyncClientChainDB(chaindb_churner.db, server_async_db),
+                client_async_db=client_async_db,
+            )
+
+
 @pytest.mark.asyncio
 async def test_regular_syncer(request, event_loop, event_bus, chaindb_fresh, chaindb_20):
     client_context = ChainContextFactory(headerdb__db=chaindb_fresh.db)
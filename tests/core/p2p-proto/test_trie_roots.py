@@ -0,0 +1,24 @@
+from eth.db.trie import make_trie_root_and_nodes
+import pytest
+import rlp
+
+from trinity.protocol.eth.trie_roots import build_trie_roots_and_nodes
+from trinity.tools.factories import BaseTransactionFieldsFactory
+
+
+@pytest.mark.parametrize('min_parallel_bytes', (0, 2**64))
+def test_build_trie_roots_and_nodes(min_parallel_bytes):
+    transaction_lists = tuple(
+        tuple(BaseTransactionFieldsFactory.create_batch(num_transactions))
+        for num_transactions in (0, 1, 3, 200, 3, 0)
+    )
+    encoded_transaction_lists = tuple(
+        tuple(map(rlp.encode, transactions)) for transactions in transaction_lists
+    )
+
+    trie_roots_and_nodes = build_trie_roots_and_nodes(
+        encoded_transaction_lists,
+        min_parallel_bytes,
+    )
+
+    assert trie_roots_and_nodes == tuple(map(make_trie_root_and_nodes, transaction_lists))
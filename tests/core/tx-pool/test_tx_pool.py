@@ -6,6 +6,7 @@ from eth._utils.address import (
     force_bytes_to_address
 )
 
+from p2p.disconnect import DisconnectReason
 from p2p.service import run_service
 from p2p.tools.factories import SessionFactory
 
@@ -16,6 +17,7 @@ from trinity.components.builtin.tx_pool.validators import (
     DefaultTransactionValidator
 )
 from trinity.protocol.common.events import (
+    DisconnectPeerEvent,
     GetConnectedPeersRequest,
     GetConnectedPeersResponse,
 )
@@ -169,6 +171,61 @@ async def test_does_not_propagate_invalid_tx(event_bus,
             ]
 
 
+@pytest.mark.asyncio
+async def test_disconnects_peer_with_malformed_txs(event_bus,
+                                                   funded_address_private_key,
+                                                   chain_with_block_validation,
+                                                   tx_validator):
+
+    node_one, node_two, node_three = SessionFactory.create_batch(3)
+
+    async with run_proxy_peer_pool(event_bus) as peer_pool:
+        tx_pool = TxPool(event_bus, peer_pool, tx_validator)
+        async with run_service(tx_pool):
+            run_mock_request_response(
+                GetConnectedPeersRequest,
+                GetConnectedPeersResponse((node_one, node_two, node_three)),
+                event_bus,
+            )
+
+            await asyncio.sleep(0.01)
+
+            disconnects = []
+            got_disconnect = asyncio.Event()
+
+            async def _disconnect_handler(event):
+                disconnects.append((event.session, event.reason))
+                got_disconnect.set()
+
+            event_bus.subscribe(DisconnectPeerEvent, _disconnect_handler)
+
+            tx = create_random_tx(chain_with_block_validation, funded_address_private_key)
+            message = Transactions((tx, )).encode(0, snappy_support=False)
+            malformed_txs = Transactions.decode(
+                type(message)(message.header, message.body[:-1]),
+                snappy_support=False,
+            )
+
+            # Peer1 sends txs that can't be decoded
+            await event_bus.broadcast(TransactionsEvent(session=node_one, command=malformed_txs))
+            await asyncio.wait_for(got_disconnect.wait(), timeout=0.1)
+
+            assert disconnects == [(node_one, DisconnectReason.BAD_PROTOCOL)]
+
+            # the pool keeps relaying the txs of the other peers
+            assert tx_pool.is_operational
+            outgoing_tx, _ = observe_outgoing_transactions(event_bus)
+            await event_bus.broadcast(
+                TransactionsEvent(session=node_two, command=Transactions([tx]))
+            )
+
+            async def relayed_to_node_three():
+                while (node_three, (tx, )) not in outgoing_tx:
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(relayed_to_node_three(), timeout=0.5)
+
+
 def create_random_tx(chain, private_key, is_valid=True):
     return chain.create_unsigned_transaction(
         nonce=0,
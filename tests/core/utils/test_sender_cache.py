@@ -0,0 +1,96 @@
+from eth.vm.forks.homestead.transactions import HomesteadTransaction
+from eth.vm.forks.istanbul.transactions import IstanbulTransaction
+from eth_keys import keys
+import pytest
+import rlp
+
+from trinity._utils import senders as senders_module
+from trinity._utils.senders import (
+    MIN_SENDERS_PER_WORKER_TASK,
+    SenderCache,
+    recover_transaction_senders,
+)
+
+
+PRIVATE_KEY = keys.PrivateKey(b'\x45' * 32)
+
+
+def make_transactions(transaction_class, num_transactions):
+    return tuple(
+        transaction_class.create_unsigned_transaction(
+            nonce=nonce,
+            gas_price=1,
+            gas=21000,
+            to=b'\x01' * 20,
+            value=nonce,
+            data=b'',
+        ).as_signed_transaction(PRIVATE_KEY)
+        for nonce in range(num_transactions)
+    )
+
+
+def test_recover_transaction_senders():
+    transactions = make_transactions(IstanbulTransaction, 3)
+    bad_signature = transactions[1].copy(v=0)
+    encoded_transactions = tuple(map(rlp.encode, (transactions[0], bad_signature, transactions[2])))
+
+    senders = recover_transaction_senders(IstanbulTransaction, encoded_transactions)
+
+    sender = PRIVATE_KEY.public_key.to_canonical_address()
+    assert senders == (sender, None, sender)
+
+
+@pytest.mark.asyncio
+async def test_sender_cache():
+    cache = SenderCache()
+    transactions = make_transactions(IstanbulTransaction, 3)
+    bad_signature = transactions[1].copy(v=0)
+    sender = PRIVATE_KEY.public_key.to_canonical_address()
+
+    assert cache.get(transactions[0]) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    senders = await cache.recover_senders((transactions[0], bad_signature, transactions[2]))
+    assert senders == (sender, None, sender)
+    assert transactions[0].__dict__['sender'] == sender
+
+    # a fresh copy of a transaction gets its sender from the cache
+    decoded = rlp.decode(rlp.encode(transactions[2]), sedes=IstanbulTransaction)
+    assert cache.get(decoded) == sender
+    assert decoded.__dict__['sender'] == sender
+
+    # invalid transactions are not cached, and neither are other classes of transactions
+    assert cache.get(bad_signature) is None
+    homestead_copy = HomesteadTransaction(**transactions[0].as_dict())
+    assert cache.get(homestead_copy) is None
+
+    senders = await cache.recover_senders(transactions)
+    assert senders == (sender, ) * 3
+    assert (cache.hits, cache.misses) == (3, 7)
+    assert cache.hit_rate == 0.3
+
+
+@pytest.mark.asyncio
+async def test_sender_cache_recovers_big_batches_in_workers(monkeypatch):
+    used_pools = []
+
+    class RecordingPool(senders_module.LazyProcessPool):
+        def get(self):
+            pool = super().get()
+            used_pools.append(pool)
+            return pool
+
+    monkeypatch.setattr(senders_module, '_sender_recovery_pool', RecordingPool(1))
+    cache = SenderCache()
+    sender = PRIVATE_KEY.public_key.to_canonical_address()
+
+    # a few transactions are recovered in a thread
+    small_batch = make_transactions(IstanbulTransaction, MIN_SENDERS_PER_WORKER_TASK - 1)
+    assert await cache.recover_senders(small_batch) == (sender, ) * len(small_batch)
+    assert used_pools == []
+
+    big_batch = make_transactions(HomesteadTransaction, MIN_SENDERS_PER_WORKER_TASK)
+    assert await cache.recover_senders(big_batch) == (sender, ) * len(big_batch)
+    assert len(used_pools) == 1
+    assert used_pools[0]._max_workers == 1
+    used_pools[0].shutdown()
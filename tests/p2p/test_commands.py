@@ -0,0 +1,60 @@
+import pickle
+
+import pytest
+from rlp import sedes
+
+from p2p.commands import BaseCommand, RLPCodec
+from p2p.exceptions import MalformedMessage
+
+
+class CommandForTest(BaseCommand):
+    protocol_command_id = 0
+    serialization_codec = RLPCodec(sedes=sedes.CountableList(sedes.binary))
+
+
+@pytest.mark.parametrize('snappy_support', (True, False))
+def test_command_decodes_payload_lazily(snappy_support):
+    payload = (b'unicorns', b'rainbows')
+    message = CommandForTest(payload).encode(0, snappy_support=snappy_support)
+
+    command = CommandForTest.decode(message, snappy_support=snappy_support)
+    assert '_payload' not in command.__dict__
+
+    # the raw payload is sent as-is, without decoding it
+    assert command.encode(0, snappy_support=snappy_support) == message
+    assert '_payload' not in command.__dict__
+
+    assert command.payload == payload
+    assert command.payload is command.payload
+
+
+def test_command_pickles_encoded_payload():
+    message = CommandForTest((b'unicorns',)).encode(0, snappy_support=False)
+    command = CommandForTest.decode(message, snappy_support=False)
+
+    # a command that was never decoded crosses process boundaries as raw bytes
+    unpickled = pickle.loads(pickle.dumps(command))
+    assert '_payload' not in unpickled.__dict__
+    assert unpickled.payload == (b'unicorns',)
+    assert unpickled.encode(0, snappy_support=False) == message
+
+    # and so does one that was decoded, without its decoded payload
+    assert command.payload == (b'unicorns',)
+    unpickled = pickle.loads(pickle.dumps(command))
+    assert '_payload' not in unpickled.__dict__
+    assert unpickled.payload == (b'unicorns',)
+
+    # a command that was built from its payload has nothing else to send
+    unpickled = pickle.loads(pickle.dumps(CommandForTest((b'unicorns',))))
+    assert unpickled.payload == (b'unicorns',)
+
+
+def test_command_with_malformed_payload():
+    message = CommandForTest((b'unicorns',)).encode(0, snappy_support=False)
+    truncated = type(message)(message.header, message.body[:-1])
+
+    # decoding the message doesn't look at the payload yet
+    command = CommandForTest.decode(truncated, snappy_support=False)
+    with pytest.raises(MalformedMessage):
+        command.payload
+    assert 'malformed payload' in repr(command)
@@ -173,3 +173,28 @@ async def test_connection_protocol_and_command_handlers():
         assert len(messages_second_protocol) == 5
         assert len(messages_cmd_A) == 2
         assert len(messages_cmd_D) == 3
+
+
+@pytest.mark.asyncio
+async def test_connection_disconnects_on_malformed_payload_in_handler():
+    alice_handshakers = (NoopHandshaker(SecondProtocol), )
+    bob_handshakers = (NoopHandshaker(SecondProtocol), )
+    pair_factory = ConnectionPairFactory(
+        alice_handshakers=alice_handshakers,
+        bob_handshakers=bob_handshakers,
+    )
+    async with pair_factory as (alice_connection, bob_connection):
+        async def _handler_cmd_A(conn, cmd):
+            # the payload is decoded on first access
+            cmd.payload
+
+        alice_connection.add_command_handler(CommandA, _handler_cmd_A)
+
+        alice_connection.start_protocol_streams()
+        bob_connection.start_protocol_streams()
+
+        bob_second_protocol = bob_connection.get_protocol_by_type(SecondProtocol)
+        bob_second_protocol.send(CommandA.from_encoded_payload(b'\x01'))
+
+        await asyncio.wait_for(alice_connection.events.cancelled.wait(), timeout=1)
+        await asyncio.wait_for(bob_connection.events.cancelled.wait(), timeout=1)
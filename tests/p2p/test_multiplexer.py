@@ -231,3 +231,61 @@ async def test_connection_get_protocol_for_command_type():
 
     with pytest.raises(ValidationError):
         multiplexer.get_protocol_for_command_type(CommandB)
+
+
+@pytest.mark.asyncio
+async def test_multiplexer_backpressure():
+    alice_multiplexer, bob_multiplexer = MultiplexerPairFactory(
+        protocol_types=(SecondProtocol,),
+        max_queue_size=2,
+    )
+
+    async with bob_multiplexer.multiplex():
+        alice_second_protocol = alice_multiplexer.get_protocol_by_type(SecondProtocol)
+        for _ in range(9):
+            alice_second_protocol.send(CommandA(None))
+        alice_second_protocol.send(CommandB(None))
+        await asyncio.sleep(0.05)
+
+        # the lagging protocol gets one message over its bound, then the multiplexer
+        # stops reading instead of dropping the messages
+        assert bob_multiplexer.get_queue_depths() == {'p2p': 0, 'second': 3}
+
+        bob_second_stream = bob_multiplexer.stream_protocol_messages(SecondProtocol)
+        for _ in range(9):
+            cmd = await asyncio.wait_for(bob_second_stream.asend(None), timeout=0.1)
+            assert isinstance(cmd, CommandA)
+        cmd = await asyncio.wait_for(bob_second_stream.asend(None), timeout=0.1)
+        assert isinstance(cmd, CommandB)
+
+        assert bob_multiplexer.get_queue_depths() == {'p2p': 0, 'second': 0}
+        assert bob_multiplexer.get_total_stall_time() > 0
+
+
+@pytest.mark.parametrize(
+    'protocol_priority, expected_p2p_depth',
+    (
+        # Ping has a higher priority, so it gets through while the second protocol lags
+        (None, 2),
+        # Ping has a lower priority, so it waits for the second protocol to catch up
+        ((SecondProtocol, P2PProtocolV5), 0),
+    ),
+)
+@pytest.mark.asyncio
+async def test_multiplexer_protocol_priority(protocol_priority, expected_p2p_depth):
+    alice_multiplexer, bob_multiplexer = MultiplexerPairFactory(
+        protocol_types=(SecondProtocol,),
+        max_queue_size=2,
+        protocol_priority=protocol_priority,
+    )
+
+    async with bob_multiplexer.multiplex():
+        alice_p2p_protocol = alice_multiplexer.get_protocol_by_type(P2PProtocolV5)
+        alice_second_protocol = alice_multiplexer.get_protocol_by_type(SecondProtocol)
+        for _ in range(3):
+            alice_second_protocol.send(CommandA(None))
+        alice_p2p_protocol.send(Ping(None))
+        alice_p2p_protocol.send(Ping(None))
+        await asyncio.sleep(0.05)
+
+        assert bob_multiplexer.get_queue_depths() == {'p2p': expected_p2p_depth, 'second': 3}
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from p2p import transport as transport_module
+from p2p._utils import roundup_16
+from p2p.constants import (
+    HEADER_LEN,
+    MAC_LEN,
+    MAX_REUSED_EGRESS_BUFFER_SIZE,
+    RLPX_HEADER_DATA,
+)
+from p2p.message import Message
+from p2p.tools.factories import (
+    CancelTokenFactory,
+    TransportPairFactory,
+)
+
+
+def make_message(body):
+    header = len(body).to_bytes(3, 'big') + RLPX_HEADER_DATA
+    return Message(header, body)
+
+
+def get_frame_size(message):
+    return HEADER_LEN + MAC_LEN + roundup_16(len(message.body)) + MAC_LEN
+
+
+@pytest.fixture
+async def transport_pair():
+    alice, bob = await TransportPairFactory()
+    yield alice, bob
+    alice.close()
+    bob.close()
+
+
+@pytest.mark.asyncio
+async def test_transport_coalesces_egress(transport_pair):
+    alice, bob = transport_pair
+    token = CancelTokenFactory()
+
+    writes = []
+    write = alice._writer.write
+
+    def tracking_write(data):
+        writes.append(len(data))
+        write(data)
+
+    alice._writer.write = tracking_write
+
+    messages = tuple(
+        make_message(body)
+        for body in (b'\x10', b'\x11' + b'\x00' * 31, b'\x12' + b'\x01' * 3000, b'\x13')
+    )
+    for message in messages:
+        alice.send(message)
+
+    assert alice.egress_queue_depth == len(messages)
+    assert writes == []
+
+    for message in messages:
+        received = await asyncio.wait_for(bob.recv(token), timeout=1)
+        assert received == message
+
+    total_size = sum(get_frame_size(message) for message in messages)
+    assert writes == [total_size]
+    assert alice.egress_bytes == total_size
+    assert alice.egress_queue_depth == 0
+
+    # the buffer is reused for the next messages
+    alice.send(messages[0])
+    received = await asyncio.wait_for(bob.recv(token), timeout=1)
+    assert received == messages[0]
+    assert writes == [total_size, get_frame_size(messages[0])]
+
+    # a burst that fills up the buffer is written without waiting for the next loop iteration
+    big_message = make_message(b'\x14' * MAX_REUSED_EGRESS_BUFFER_SIZE)
+    alice.send(big_message)
+    assert writes[-1] == get_frame_size(big_message)
+    assert alice.egress_queue_depth == 0
+    received = await asyncio.wait_for(bob.recv(token), timeout=1)
+    assert received == big_message
+
+
+@pytest.mark.asyncio
+async def test_transport_writes_pending_egress_on_close(transport_pair):
+    alice, bob = transport_pair
+    token = CancelTokenFactory()
+
+    message = make_message(b'\x10')
+    alice.send(message)
+    alice.close()
+
+    received = await asyncio.wait_for(bob.recv(token), timeout=1)
+    assert received == message
+    assert alice.egress_queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_transport_idle_timeout_applies_to_each_read(transport_pair, monkeypatch):
+    alice, bob = transport_pair
+    token = CancelTokenFactory()
+    monkeypatch.setattr(transport_module, 'CONN_IDLE_TIMEOUT', 0.2)
+
+    frames = []
+    alice._writer.write = frames.append
+    message = make_message(b'\x10' + b'\x00' * 3000)
+    alice.send(message)
+    await asyncio.sleep(0)
+    frame, = frames
+    header, body = frame[:HEADER_LEN + MAC_LEN], frame[HEADER_LEN + MAC_LEN:]
+
+    async def feed_after(delay, data):
+        await asyncio.sleep(delay)
+        bob._reader.feed_data(data)
+
+    # the header and the body each arrive before the idle timeout, but not the whole frame
+    asyncio.ensure_future(feed_after(0.15, header))
+    asyncio.ensure_future(feed_after(0.3, body))
+    assert await bob.recv(token) == message
+
+    with pytest.raises(asyncio.TimeoutError):
+        await bob.recv(token)
@@ -1,4 +1,49 @@
-from typing import Dict
+from typing import (
+    Dict,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from eth.abc import DatabaseAPI
+
+from trinity.db.manager import (
+    DBClient,
+    PipelinedDBClient,
+)
+
+
+def multi_get(db: DatabaseAPI, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+    """
+    Look up all ``keys`` in ``db``, returning their values in the same order,
+    with ``None`` for each key that is not present.
+
+    A database served over IPC answers in a single round trip; any other
+    database is queried one key at a time.
+    """
+    if isinstance(db, (DBClient, PipelinedDBClient)):
+        return db.multi_get(keys)
+
+    values = []
+    for key in keys:
+        try:
+            values.append(db[key])
+        except KeyError:
+            values.append(None)
+    return tuple(values)
+
+
+def multi_exists(db: DatabaseAPI, keys: Sequence[bytes]) -> Tuple[bool, ...]:
+    """
+    Check whether each of ``keys`` is present in ``db``.
+
+    A database served over IPC answers in a single round trip; any other
+    database is queried one key at a time.
+    """
+    if isinstance(db, (DBClient, PipelinedDBClient)):
+        return db.multi_exists(keys)
+    else:
+        return tuple(key in db for key in keys)
 
 
 class MemoryDB:
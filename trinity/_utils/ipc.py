@@ -1,3 +1,4 @@
+import asyncio
 from logging import Logger
 from multiprocessing import Process
 import os
@@ -29,6 +30,20 @@ def wait_for_ipc(ipc_path: pathlib.Path, timeout: int = 30) -> None:
         raise TimeoutError("IPC socket file has not appeared in %d seconds!" % timeout)
 
 
+async def coro_wait_for_ipc(ipc_path: pathlib.Path, timeout: int = 30) -> None:
+    """
+    Like :func:`wait_for_ipc`, without blocking the event loop.
+    """
+    start_at = time.monotonic()
+    while time.monotonic() - start_at < timeout:
+        if ipc_path.exists():
+            return
+        else:
+            await asyncio.sleep(0.05)
+    else:
+        raise TimeoutError("IPC socket file has not appeared in %d seconds!" % timeout)
+
+
 def remove_dangling_ipc_files(logger: Logger,
                               ipc_dir: pathlib.Path,
                               except_file: pathlib.Path = None) -> None:
@@ -1,6 +1,8 @@
+from concurrent.futures import ProcessPoolExecutor
 import inspect
 import multiprocessing
 import os
+import threading
 import traceback
 from typing import (
     Any,
@@ -18,6 +20,54 @@ MP_CONTEXT = os.environ.get('TRINITY_MP_CONTEXT', 'spawn')
 # sets the type of process that multiprocessing will create.
 ctx = multiprocessing.get_context(MP_CONTEXT)
 
+# Number of worker processes for CPU-bound sync work, like building tries and checking seals
+NUM_WORKER_PROCESSES = max(1, (os.cpu_count() or 1) - 1)
+
+
+class LazyProcessPool:
+    """
+    A pool of worker processes that is only started on first use, and that is started
+    again after it broke.
+    """
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._pool: ProcessPoolExecutor = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.max_workers, mp_context=ctx)
+            return self._pool
+
+    def discard(self, pool: ProcessPoolExecutor) -> None:
+        """
+        Drop a pool that broke, so that the next call to :meth:`get` starts a new one.
+        """
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+
+_worker_pool = LazyProcessPool(NUM_WORKER_PROCESSES)
+
+
+def get_worker_pool() -> ProcessPoolExecutor:
+    """
+    Get the pool of worker processes that is shared by all CPU-bound sync work, starting
+    it on first use. Workers keep their module-level caches between tasks.
+    """
+    return _worker_pool.get()
+
+
+def discard_worker_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Drop a worker pool that broke, so that the next call to :func:`get_worker_pool`
+    starts a new one.
+    """
+    _worker_pool.discard(pool)
+
 
 class TracebackRecorder:
     """
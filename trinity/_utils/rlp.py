@@ -0,0 +1,11 @@
+from typing import Iterable
+
+from rlp.codec import length_prefix
+
+
+def encode_rlp_list(encoded_items: Iterable[bytes]) -> bytes:
+    """
+    RLP-encode a list, given the encoding of each of its items.
+    """
+    joined_items = b''.join(encoded_items)
+    return length_prefix(len(joined_items), 0xc0) + joined_items
@@ -0,0 +1,186 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import os
+from typing import (
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from cachetools import LRUCache
+from eth.abc import SignedTransactionAPI
+from eth_typing import Address
+from eth_utils import ValidationError
+from eth_utils.toolz import (
+    groupby,
+    partition_all,
+)
+import rlp
+
+from trinity._utils.mp import LazyProcessPool
+
+logger = logging.getLogger('trinity._utils.senders')
+
+# How many transaction senders to remember in each process. At about 100 bytes per entry,
+# this is on the order of 10MB, which covers the transactions of several hundred blocks.
+SENDER_CACHE_SIZE = 100000
+
+# How many transactions to send to a worker process in a single task. Bigger batches
+# amortize the cost of the round trip to the worker over more signature recoveries.
+MAX_SENDERS_PER_WORKER_TASK = 256
+
+# Smaller batches are recovered in a thread, because a few recoveries take less time
+# than the round trip to a worker process.
+MIN_SENDERS_PER_WORKER_TASK = 16
+
+# How many worker processes each process that recovers senders starts. The tx pool,
+# the syncer, the block import and each of the block preview processes have their own,
+# so this stays low unless it is overridden.
+NUM_SENDER_RECOVERY_PROCESSES = int(os.environ.get('TRINITY_SENDER_RECOVERY_PROCESSES', '1'))
+
+
+def recover_transaction_senders(
+        transaction_class: Type[SignedTransactionAPI],
+        encoded_transactions: Sequence[bytes]) -> Tuple[Optional[Address], ...]:
+    """
+    Run the validation of the transactions that doesn't need any state, like the signature
+    check, and recover their senders. The sender of an invalid transaction is ``None``.
+
+    This runs in the worker processes, so the transactions are passed in encoded.
+    """
+    senders: List[Optional[Address]] = []
+    for encoded in encoded_transactions:
+        transaction = rlp.decode(encoded, sedes=transaction_class)
+        try:
+            transaction.validate()
+        except ValidationError:
+            senders.append(None)
+        else:
+            senders.append(transaction.sender)
+    return tuple(senders)
+
+
+def _set_sender(transaction: SignedTransactionAPI, sender: Address) -> None:
+    # SignedTransactionAPI.sender is a cached_property, which reads the instance's
+    # __dict__ before recovering the sender again
+    transaction.__dict__['sender'] = sender
+
+
+class SenderCache:
+    """
+    Remember the senders of the transactions that passed their stateless validation,
+    like the signature check, so that the transaction pool, block previews and block
+    imports only ever recover the sender of a transaction once.
+
+    Transactions are keyed by their class and hash, because the validation rules depend
+    on the fork.
+    """
+    def __init__(self, maxsize: int = SENDER_CACHE_SIZE) -> None:
+        self._senders: Dict[Hashable, Address] = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, transaction: SignedTransactionAPI) -> Optional[Address]:
+        """
+        Get the sender of a transaction that was previously validated, or ``None`` if
+        it wasn't. On a hit, the sender is also set on the transaction, so that reading
+        ``transaction.sender`` doesn't recover it again.
+        """
+        try:
+            sender = self._senders[(type(transaction), transaction.hash)]
+        except KeyError:
+            self.misses += 1
+            return None
+        else:
+            self.hits += 1
+            _set_sender(transaction, sender)
+            return sender
+
+    async def recover_senders(
+            self,
+            transactions: Sequence[SignedTransactionAPI]) -> Tuple[Optional[Address], ...]:
+        """
+        Validate the transactions and recover their senders, for the ones that aren't
+        cached yet. Big batches are recovered in this process's sender recovery workers.
+        The sender of an invalid transaction is ``None``.
+        """
+        senders = [self.get(transaction) for transaction in transactions]
+        missing = [index for index, sender in enumerate(senders) if sender is None]
+
+        missing_by_class = groupby(lambda index: type(transactions[index]), missing)
+        batches = tuple(
+            (transaction_class, batch)
+            for transaction_class, indices in missing_by_class.items()
+            for batch in partition_all(MAX_SENDERS_PER_WORKER_TASK, indices)
+        )
+        recovered_batches = await asyncio.gather(*(
+            _recover_in_worker(
+                transaction_class,
+                tuple(rlp.encode(transactions[index]) for index in batch),
+            )
+            for transaction_class, batch in batches
+        ))
+
+        for (_, batch), recovered_senders in zip(batches, recovered_batches):
+            for index, sender in zip(batch, recovered_senders):
+                if sender is not None:
+                    transaction = transactions[index]
+                    self._senders[(type(transaction), transaction.hash)] = sender
+                    _set_sender(transaction, sender)
+                    senders[index] = sender
+
+        return tuple(senders)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups:
+            return self.hits / lookups
+        else:
+            return 0.0
+
+    def __str__(self) -> str:
+        return f"SenderCache(size={len(self._senders)}, hit_rate={self.hit_rate:.0%})"
+
+
+_sender_recovery_pool = LazyProcessPool(NUM_SENDER_RECOVERY_PROCESSES)
+
+
+async def _recover_in_worker(
+        transaction_class: Type[SignedTransactionAPI],
+        encoded_transactions: Sequence[bytes]) -> Tuple[Optional[Address], ...]:
+    loop = asyncio.get_event_loop()
+    if len(encoded_transactions) < MIN_SENDERS_PER_WORKER_TASK:
+        return await loop.run_in_executor(
+            None,
+            recover_transaction_senders,
+            transaction_class,
+            encoded_transactions,
+        )
+
+    pool = _sender_recovery_pool.get()
+    try:
+        return await loop.run_in_executor(
+            pool,
+            recover_transaction_senders,
+            transaction_class,
+            encoded_transactions,
+        )
+    except BrokenProcessPool:
+        logger.exception("Sender recovery worker pool died, restarting it")
+        _sender_recovery_pool.discard(pool)
+        return await loop.run_in_executor(
+            None,
+            recover_transaction_senders,
+            transaction_class,
+            encoded_transactions,
+        )
+
+
+# The cache that is shared by all users of transaction senders in this process
+sender_cache = SenderCache()
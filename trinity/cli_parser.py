@@ -177,6 +177,17 @@ trinity_parser.add_argument(
         " directory as provided by the ``tempfile`` library."
     ),
 )
+trinity_parser.add_argument(
+    '--db-read-cache-size',
+    type=int,
+    required=False,
+    default=0,
+    metavar="MB",
+    help=(
+        "Size in megabytes of the read cache that the database process shares with all "
+        "other processes.  Default: 0 (disabled)"
+    ),
+)
 
 
 #
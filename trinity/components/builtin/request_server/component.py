@@ -15,12 +15,16 @@ from p2p.service import (
 from trinity.config import (
     Eth1AppConfig,
     Eth1DbMode,
+    TrinityConfig,
 )
 from trinity.constants import (
     TO_NETWORKING_BROADCAST_CONFIG,
 )
-from trinity.db.manager import DBClient
-from trinity.db.eth1.chain import AsyncChainDB
+from trinity.db.manager import (
+    AsyncDBClient,
+    DBClient,
+)
+from trinity.db.eth1.chain import AsyncClientChainDB
 from trinity.db.eth1.header import AsyncHeaderDB
 from trinity.extensibility import (
     AsyncioIsolatedComponent,
@@ -49,24 +53,32 @@ class RequestServerComponent(AsyncioIsolatedComponent):
         )
 
     def do_start(self) -> None:
-
         trinity_config = self.boot_info.trinity_config
+        if not trinity_config.has_app_config(Eth1AppConfig):
+            raise Exception("Trinity config must have eth1 config")
+
+        asyncio.ensure_future(self.launch_server(trinity_config))
+
+    async def launch_server(self, trinity_config: TrinityConfig) -> None:
         base_db = DBClient.connect(trinity_config.database_ipc_path)
+        async_db = await AsyncDBClient.connect(trinity_config.database_ipc_path)
 
-        if trinity_config.has_app_config(Eth1AppConfig):
-            server = self.make_eth1_request_server(
-                trinity_config.get_app_config(Eth1AppConfig),
-                base_db,
-            )
-        else:
-            raise Exception("Trinity config must have eth1 config")
+        server = self.make_eth1_request_server(
+            trinity_config.get_app_config(Eth1AppConfig),
+            base_db,
+            async_db,
+        )
 
         asyncio.ensure_future(exit_with_services(server, self._event_bus_service))
-        asyncio.ensure_future(server.run())
+        try:
+            await server.run()
+        finally:
+            async_db.close()
 
     def make_eth1_request_server(self,
                                  app_config: Eth1AppConfig,
-                                 base_db: BaseAtomicDB) -> BaseService:
+                                 base_db: BaseAtomicDB,
+                                 async_db: AsyncDBClient) -> BaseService:
 
         if app_config.database_mode is Eth1DbMode.LIGHT:
             header_db = AsyncHeaderDB(base_db)
@@ -76,7 +88,8 @@ class RequestServerComponent(AsyncioIsolatedComponent):
                 header_db
             )
         elif app_config.database_mode is Eth1DbMode.FULL:
-            chain_db = AsyncChainDB(base_db)
+            # the lookups of all the requests that are being served can be in flight at once
+            chain_db = AsyncClientChainDB(base_db, async_db)
             server = ETHRequestServer(
                 self.event_bus,
                 TO_NETWORKING_BROADCAST_CONFIG,
@@ -39,8 +39,9 @@ from trinity.constants import (
     SYNC_BEAM,
 )
 from trinity.chains.base import AsyncChainAPI
-from trinity.db.eth1.chain import AsyncChainDB
+from trinity.db.eth1.chain import AsyncClientChainDB
 from trinity.db.eth1.header import AsyncHeaderDB
+from trinity.db.manager import AsyncDBClient
 from trinity.extensibility.asyncio import (
     AsyncioIsolatedComponent
 )
@@ -102,6 +103,7 @@ class BaseSyncStrategy(ABC):
                    logger: Logger,
                    chain: AsyncChainAPI,
                    base_db: AtomicDatabaseAPI,
+                   async_base_db: AsyncDBClient,
                    peer_pool: BasePeerPool,
                    event_bus: EndpointAPI,
                    cancel_token: CancelToken) -> None:
@@ -123,6 +125,7 @@ class NoopSyncStrategy(BaseSyncStrategy):
                    logger: Logger,
                    chain: AsyncChainAPI,
                    base_db: AtomicDatabaseAPI,
+                   async_base_db: AsyncDBClient,
                    peer_pool: BasePeerPool,
                    event_bus: EndpointAPI,
                    cancel_token: CancelToken) -> None:
@@ -141,13 +144,14 @@ class FullSyncStrategy(BaseSyncStrategy):
                    logger: Logger,
                    chain: AsyncChainAPI,
                    base_db: AtomicDatabaseAPI,
+                   async_base_db: AsyncDBClient,
                    peer_pool: BasePeerPool,
                    event_bus: EndpointAPI,
                    cancel_token: CancelToken) -> None:
 
         syncer = FullChainSyncer(
             chain,
-            AsyncChainDB(base_db),
+            AsyncClientChainDB(base_db, async_base_db),
             base_db,
             cast(ETHPeerPool, peer_pool),
             cancel_token,
@@ -187,19 +191,21 @@ class BeamSyncStrategy(BaseSyncStrategy):
                    logger: Logger,
                    chain: AsyncChainAPI,
                    base_db: AtomicDatabaseAPI,
+                   async_base_db: AsyncDBClient,
                    peer_pool: BasePeerPool,
                    event_bus: EndpointAPI,
                    cancel_token: CancelToken) -> None:
 
         syncer = BeamSyncService(
             chain,
-            AsyncChainDB(base_db),
+            AsyncClientChainDB(base_db, async_base_db),
             base_db,
             cast(ETHPeerPool, peer_pool),
             event_bus,
             args.beam_from_checkpoint,
             args.force_beam_block_number,
             cancel_token,
+            async_db=async_base_db,
         )
 
         await syncer.run()
@@ -216,6 +222,7 @@ class LightSyncStrategy(BaseSyncStrategy):
                    logger: Logger,
                    chain: AsyncChainAPI,
                    base_db: AtomicDatabaseAPI,
+                   async_base_db: AsyncDBClient,
                    peer_pool: BasePeerPool,
                    event_bus: EndpointAPI,
                    cancel_token: CancelToken) -> None:
@@ -317,15 +324,20 @@ class SyncerComponent(AsyncioIsolatedComponent):
 
     async def launch_sync(self, node: Node[BasePeer]) -> None:
         await node.events.started.wait()
-        await self.active_strategy.sync(
-            self.boot_info.args,
-            self.logger,
-            node.get_chain(),
-            node.base_db,
-            node.get_peer_pool(),
-            self.event_bus,
-            node.cancel_token
-        )
+        async_base_db = await AsyncDBClient.connect(node.trinity_config.database_ipc_path)
+        try:
+            await self.active_strategy.sync(
+                self.boot_info.args,
+                self.logger,
+                node.get_chain(),
+                node.base_db,
+                async_base_db,
+                node.get_peer_pool(),
+                self.event_bus,
+                node.cancel_token
+            )
+        finally:
+            async_base_db.close()
 
         if self.active_strategy.shutdown_node_on_halt:
             self.logger.error("Sync ended unexpectedly. Shutting down trinity")
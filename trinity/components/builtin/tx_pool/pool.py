@@ -1,6 +1,5 @@
 import asyncio
 from typing import (
-    Callable,
     Iterable,
     List,
     Sequence,
@@ -16,9 +15,16 @@ from eth_utils.toolz import partition_all
 from eth.abc import SignedTransactionAPI
 
 from p2p.abc import SessionAPI
+from p2p.disconnect import DisconnectReason
+from p2p.exceptions import MalformedMessage
 from p2p.service import BaseService
 
 from trinity._utils.bloom import RollingBloom
+from trinity._utils.senders import sender_cache
+from trinity.components.builtin.tx_pool.validators import DefaultTransactionValidator
+from trinity.constants import TO_NETWORKING_BROADCAST_CONFIG
+from trinity.protocol.common.events import DisconnectPeerEvent
+from trinity.protocol.eth.commands import Transactions
 from trinity.protocol.eth.events import (
     TransactionsEvent,
 )
@@ -56,7 +62,7 @@ class TxPool(BaseService):
     def __init__(self,
                  event_bus: EndpointAPI,
                  peer_pool: ETHProxyPeerPool,
-                 tx_validation_fn: Callable[[SignedTransactionAPI], bool],
+                 tx_validation_fn: DefaultTransactionValidator,
                  token: CancelToken = None) -> None:
         super().__init__(token)
         self._event_bus = event_bus
@@ -104,13 +110,29 @@ class TxPool(BaseService):
         self.run_daemon_task(self._process_transactions())
 
         async for event in self.wait_iter(self._event_bus.stream(TransactionsEvent)):
-            self.run_task(self._handle_tx(event.session, event.command.payload))
-
-    async def _handle_tx(self, sender: SessionAPI, txs: Sequence[SignedTransactionAPI]) -> None:
+            self.run_task(self._handle_tx(event.session, event.command))
+
+    async def _handle_tx(self, sender: SessionAPI, command: Transactions) -> None:
+        try:
+            txs = command.payload
+        except MalformedMessage as err:
+            # The payload is decoded when it is first read, so like Connection.run() does
+            #   for the messages it decodes, disconnect the peer that sent it.
+            self.logger.debug("Disconnecting peer %s for sending MalformedMessage: %s", sender, err)
+            await self._event_bus.broadcast(
+                DisconnectPeerEvent(sender, DisconnectReason.BAD_PROTOCOL),
+                TO_NETWORKING_BROADCAST_CONFIG,
+            )
+            return
 
         self.logger.debug2('Received %d transactions from %s', len(txs), sender)
 
         self._add_txs_to_bloom(sender, txs)
+
+        # Validate the whole batch at once, off the event loop. The transactions are
+        # validated again for each peer they are relayed to, which then hits the cache.
+        await self.tx_validation_fn.recover_senders(txs)
+        self.logger.debug2('Validated %d transactions from %s, %s', len(txs), sender, sender_cache)
         await self._internal_queue.put(txs)
 
     async def _process_transactions(self) -> None:
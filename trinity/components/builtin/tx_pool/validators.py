@@ -1,6 +1,9 @@
 import cachetools.func
 
-from typing import Type
+from typing import (
+    Sequence,
+    Type,
+)
 
 from eth_typing import (
     BlockNumber,
@@ -15,6 +18,8 @@ from eth.abc import (
     SignedTransactionAPI,
 )
 
+from trinity._utils.senders import sender_cache
+
 
 class DefaultTransactionValidator():
     """
@@ -55,6 +60,10 @@ class DefaultTransactionValidator():
 
         transaction_class = self.get_appropriate_tx_class()
         tx = transaction_class(**transaction.as_dict())
+        if sender_cache.get(tx) is not None:
+            # it passed the same validation before
+            return True
+
         try:
             tx.validate()
         except ValidationError:
@@ -62,6 +71,16 @@ class DefaultTransactionValidator():
         else:
             return True
 
+    async def recover_senders(self, transactions: Sequence[SignedTransactionAPI]) -> None:
+        """
+        Validate a batch of transactions and recover their senders in the worker pool, so
+        that validating them again later only needs a lookup in the sender cache.
+        """
+        transaction_class = self.get_appropriate_tx_class()
+        await sender_cache.recover_senders(tuple(
+            transaction_class(**transaction.as_dict()) for transaction in transactions
+        ))
+
     @cachetools.func.ttl_cache(maxsize=1024, ttl=300)
     def get_appropriate_tx_class(self) -> Type[SignedTransactionAPI]:
         head = self.chain.get_canonical_head()
@@ -551,10 +551,14 @@ class Eth1DbMode(Enum):
 
 class Eth1AppConfig(BaseAppConfig):
 
-    def __init__(self, trinity_config: TrinityConfig, sync_mode: str):
+    def __init__(self,
+                 trinity_config: TrinityConfig,
+                 sync_mode: str,
+                 db_read_cache_size: int = 0):
         super().__init__(trinity_config)
         self.trinity_config = trinity_config
         self._sync_mode = sync_mode
+        self._db_read_cache_size = db_read_cache_size
 
     @classmethod
     def from_parser_args(cls,
@@ -564,7 +568,7 @@ class Eth1AppConfig(BaseAppConfig):
         Initialize from the namespace object produced by
         an ``argparse.ArgumentParser`` and the :class:`~trinity.config.TrinityConfig`
         """
-        return cls(trinity_config, args.sync_mode)
+        return cls(trinity_config, args.sync_mode, args.db_read_cache_size * 1024 * 1024)
 
     @property
     def database_dir(self) -> Path:
@@ -625,6 +629,13 @@ class Eth1AppConfig(BaseAppConfig):
         """
         return self._sync_mode
 
+    @property
+    def db_read_cache_size(self) -> int:
+        """
+        Return the size in bytes of the database read cache, ``0`` if it is disabled
+        """
+        return self._db_read_cache_size
+
 
 class BeaconGenesisData(NamedTuple):
     """
@@ -1,24 +1,175 @@
 from abc import abstractmethod
+from itertools import takewhile
 from typing import (
+    Any,
     Dict,
     Iterable,
+    List,
+    NamedTuple,
+    Optional,
     Sequence,
     Tuple,
     Type,
 )
 
-from eth_typing import Hash32
+from eth_hash.auto import keccak
+from eth_typing import (
+    BlockNumber,
+    Hash32,
+)
+from eth_utils import (
+    ValidationError,
+    encode_hex,
+)
 
 from eth.abc import (
+    AtomicDatabaseAPI,
     BlockAPI,
     BlockHeaderAPI,
+    DatabaseAPI,
     ReceiptAPI,
     SignedTransactionAPI,
 )
-from eth.db.chain import ChainDB
+from eth.constants import (
+    BLANK_ROOT_HASH,
+    EMPTY_UNCLE_HASH,
+    GENESIS_PARENT_HASH,
+)
+from eth.db.chain import (
+    ChainDB,
+    TransactionKey,
+)
+from eth.db.schema import SchemaV1
+from eth.exceptions import HeaderNotFound
+from eth.rlp.headers import BlockHeader
+from eth.validation import validate_word
+import rlp
+from trie.exceptions import MissingTrieNode
+from trie.utils.nibbles import nibbles_to_bytes
+from trie.utils.nodes import (
+    NODE_TYPE_BRANCH,
+    NODE_TYPE_EXTENSION,
+    NODE_TYPE_LEAF,
+    extract_key,
+    get_node_type,
+)
 
 from trinity._utils.async_dispatch import async_method
+from trinity._utils.db import multi_get
+from trinity._utils.rlp import encode_rlp_list
 from trinity.db.eth1.header import BaseAsyncHeaderDB
+from trinity.db.manager import AsyncDBClient
+
+# The RLP encoding of an empty list
+EMPTY_RLP_LIST = b'\xc0'
+
+
+def get_indexed_trie_values(db: DatabaseAPI, root_hash: Hash32) -> Tuple[bytes, ...]:
+    """
+    Get the raw values of a trie that is keyed by the RLP-encoded index of each
+    value, like the transaction and receipt tries of a block, in order of index.
+
+    The trie is read one level at a time, with one batched lookup per level,
+    instead of one lookup per node.
+    """
+    if root_hash == BLANK_ROOT_HASH:
+        return ()
+
+    values_by_key: Dict[bytes, bytes] = {}
+    pending: List[Tuple[Tuple[int, ...], Hash32]] = [((), root_hash)]
+    while pending:
+        encoded_nodes = multi_get(db, tuple(node_hash for _, node_hash in pending))
+        pending = _collect_trie_level(root_hash, pending, encoded_nodes, values_by_key)
+
+    return _order_indexed_values(values_by_key)
+
+
+async def coro_get_indexed_trie_values(
+        db: AsyncDBClient,
+        root_hash: Hash32) -> Tuple[bytes, ...]:
+    """
+    Like :func:`get_indexed_trie_values`, with one awaited lookup per level.
+    """
+    if root_hash == BLANK_ROOT_HASH:
+        return ()
+
+    values_by_key: Dict[bytes, bytes] = {}
+    pending: List[Tuple[Tuple[int, ...], Hash32]] = [((), root_hash)]
+    while pending:
+        encoded_nodes = await db.coro_multi_get(tuple(node_hash for _, node_hash in pending))
+        pending = _collect_trie_level(root_hash, pending, encoded_nodes, values_by_key)
+
+    return _order_indexed_values(values_by_key)
+
+
+def _collect_trie_level(
+        root_hash: Hash32,
+        pending: Sequence[Tuple[Tuple[int, ...], Hash32]],
+        encoded_nodes: Sequence[Optional[bytes]],
+        values_by_key: Dict[bytes, bytes]) -> List[Tuple[Tuple[int, ...], Hash32]]:
+
+    next_pending: List[Tuple[Tuple[int, ...], Hash32]] = []
+    for (path, node_hash), encoded_node in zip(pending, encoded_nodes):
+        if encoded_node is None:
+            # Every key below the missing node starts with its path
+            key_prefix = nibbles_to_bytes(path[:len(path) - len(path) % 2])
+            raise MissingTrieNode(node_hash, root_hash, key_prefix)
+        _collect_trie_node(path, rlp.decode(encoded_node), values_by_key, next_pending)
+    return next_pending
+
+
+def _order_indexed_values(values_by_key: Dict[bytes, bytes]) -> Tuple[bytes, ...]:
+    return tuple(
+        value for _, value in sorted(
+            (rlp.decode(key, sedes=rlp.sedes.big_endian_int), value)
+            for key, value in values_by_key.items()
+        )
+    )
+
+
+def _collect_trie_node(
+        path: Tuple[int, ...],
+        node: Any,
+        values_by_key: Dict[bytes, bytes],
+        pending: List[Tuple[Tuple[int, ...], Hash32]]) -> None:
+
+    node_type = get_node_type(node)
+    if node_type == NODE_TYPE_LEAF:
+        values_by_key[nibbles_to_bytes(path + tuple(extract_key(node)))] = node[1]
+    elif node_type == NODE_TYPE_EXTENSION:
+        _collect_trie_child(path + tuple(extract_key(node)), node[1], values_by_key, pending)
+    elif node_type == NODE_TYPE_BRANCH:
+        for nibble, child in enumerate(node[:16]):
+            _collect_trie_child(path + (nibble, ), child, values_by_key, pending)
+        if node[16]:
+            # An RLP-encoded index can be a prefix of another one, like 0x80 of 0x8180
+            values_by_key[nibbles_to_bytes(path)] = node[16]
+
+
+def _collect_trie_child(
+        path: Tuple[int, ...],
+        child: Any,
+        values_by_key: Dict[bytes, bytes],
+        pending: List[Tuple[Tuple[int, ...], Hash32]]) -> None:
+
+    if child == b'':
+        return
+    elif isinstance(child, list):
+        # Nodes shorter than 32 bytes are embedded in their parent
+        _collect_trie_node(path, child, values_by_key, pending)
+    else:
+        pending.append((path, child))
+
+
+class PreparedBlocks(NamedTuple):
+    """
+    Blocks, along with the database writes of their transaction lookups and uncles.
+    """
+    blocks: Tuple[BlockAPI, ...]
+    # block hash -> writes that add the transactions of the block to the canonical lookup
+    transaction_lookups: Dict[Hash32, Dict[bytes, bytes]]
+    # writes of the uncles of all the blocks
+    uncle_writes: Dict[bytes, bytes]
 
 
 class BaseAsyncChainDB(BaseAsyncHeaderDB, ChainDB):
@@ -34,6 +185,145 @@ class BaseAsyncChainDB(BaseAsyncHeaderDB, ChainDB):
     async def coro_get(self, key: bytes) -> bytes:
         ...
 
+    def multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        """
+        Look up all ``keys`` in the underlying database, with ``None`` for each
+        key that is not present.  This is a single round trip when the
+        database is served over IPC.
+        """
+        return multi_get(self.db, keys)
+
+    @abstractmethod
+    async def coro_multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        ...
+
+    def get_encoded_block_body(self, header: BlockHeaderAPI) -> bytes:
+        """
+        Get the RLP encoding of the body of the block with the given header, spliced
+        together from the raw transactions and uncles in the database, without
+        decoding them.
+        """
+        encoded_transactions = get_indexed_trie_values(self.db, header.transaction_root)
+        if header.uncles_hash == EMPTY_UNCLE_HASH:
+            encoded_uncles = EMPTY_RLP_LIST
+        else:
+            try:
+                encoded_uncles = self.db[header.uncles_hash]
+            except KeyError:
+                raise HeaderNotFound(f"No uncles found for hash {header.uncles_hash!r}")
+
+        return encode_rlp_list((encode_rlp_list(encoded_transactions), encoded_uncles))
+
+    def get_encoded_receipts(self, header: BlockHeaderAPI) -> bytes:
+        """
+        Get the RLP encoding of the list of receipts of the block with the given
+        header, spliced together from the raw receipts in the database.
+        """
+        return encode_rlp_list(get_indexed_trie_values(self.db, header.receipt_root))
+
+    @abstractmethod
+    async def coro_get_encoded_block_body(self, header: BlockHeaderAPI) -> bytes:
+        ...
+
+    @abstractmethod
+    async def coro_get_encoded_receipts(self, header: BlockHeaderAPI) -> bytes:
+        ...
+
+    @classmethod
+    def prepare_blocks(cls, blocks: Sequence[BlockAPI]) -> 'PreparedBlocks':
+        """
+        Build the database writes of the transaction lookups and uncles of the given
+        blocks, without touching the database, so that it can run ahead of the writes of
+        earlier blocks.
+
+        Raises ``ValidationError`` if the uncles of a block don't match its header.
+        """
+        transaction_lookups: Dict[Hash32, Dict[bytes, bytes]] = {}
+        uncle_writes: Dict[bytes, bytes] = {}
+        for block in blocks:
+            transaction_lookups[block.hash] = {
+                SchemaV1.make_transaction_hash_to_block_lookup_key(transaction.hash): rlp.encode(
+                    TransactionKey(block.number, index),
+                )
+                for index, transaction in enumerate(block.transactions)
+            }
+
+            if block.uncles:
+                uncles_hash = keccak(rlp.encode(block.uncles))
+                uncle_writes[uncles_hash] = rlp.encode(
+                    block.uncles,
+                    sedes=rlp.sedes.CountableList(BlockHeader),
+                )
+            else:
+                uncles_hash = EMPTY_UNCLE_HASH
+            if uncles_hash != block.header.uncles_hash:
+                raise ValidationError(
+                    "Block's uncles_hash (%s) does not match actual uncles' hash (%s)",
+                    block.header.uncles_hash, uncles_hash)
+
+        return PreparedBlocks(tuple(blocks), transaction_lookups, uncle_writes)
+
+    @abstractmethod
+    async def coro_prepare_blocks(self, blocks: Sequence[BlockAPI]) -> 'PreparedBlocks':
+        ...
+
+    def persist_blocks(
+            self,
+            blocks: Sequence[BlockAPI],
+            genesis_parent_hash: Hash32 = GENESIS_PARENT_HASH,
+    ) -> Tuple[Tuple[Hash32, ...], Tuple[Hash32, ...]]:
+        """
+        Persist the headers and uncles of a contiguous sequence of blocks, and add their
+        transactions to the canonical lookup, as a single atomic batch.
+
+        Like :meth:`persist_block`, assumes all block transactions and receipts
+        have been persisted already.
+        """
+        return self.persist_prepared_blocks(self.prepare_blocks(blocks), genesis_parent_hash)
+
+    def persist_prepared_blocks(
+            self,
+            prepared: 'PreparedBlocks',
+            genesis_parent_hash: Hash32 = GENESIS_PARENT_HASH,
+    ) -> Tuple[Tuple[Hash32, ...], Tuple[Hash32, ...]]:
+        """
+        Like :meth:`persist_blocks`, for blocks that went through :meth:`prepare_blocks`.
+        """
+        with self.db.atomic_batch() as db:
+            return self._persist_prepared_blocks(db, prepared, genesis_parent_hash)
+
+    @classmethod
+    def _persist_prepared_blocks(
+            cls,
+            db: DatabaseAPI,
+            prepared: 'PreparedBlocks',
+            genesis_parent_hash: Hash32) -> Tuple[Tuple[Hash32, ...], Tuple[Hash32, ...]]:
+        # Persist all the headers as one chain, so that the score and canonical head
+        # are looked up once for the whole batch, instead of once per block.
+        new_canonical_headers, old_canonical_headers = cls._persist_header_chain(
+            db,
+            tuple(block.header for block in prepared.blocks),
+            genesis_parent_hash,
+        )
+
+        for header in new_canonical_headers:
+            if header.hash in prepared.transaction_lookups:
+                for key, value in prepared.transaction_lookups[header.hash].items():
+                    db[key] = value
+            else:
+                # an earlier block that became canonical again, with the new blocks
+                tx_hashes = cls._get_block_transaction_hashes(db, header)
+                for index, transaction_hash in enumerate(tx_hashes):
+                    cls._add_transaction_to_canonical_chain(db, transaction_hash, header, index)
+
+        for key, value in prepared.uncle_writes.items():
+            db[key] = value
+
+        new_canonical_hashes = tuple(header.hash for header in new_canonical_headers)
+        old_canonical_hashes = tuple(header.hash for header in old_canonical_headers)
+
+        return new_canonical_hashes, old_canonical_hashes
+
     @abstractmethod
     async def coro_persist_block(
         self,
@@ -41,6 +331,20 @@ class BaseAsyncChainDB(BaseAsyncHeaderDB, ChainDB):
     ) -> Tuple[Tuple[Hash32, ...], Tuple[Hash32, ...]]:
         ...
 
+    @abstractmethod
+    async def coro_persist_blocks(
+        self,
+        blocks: Sequence[BlockAPI],
+    ) -> Tuple[Tuple[Hash32, ...], Tuple[Hash32, ...]]:
+        ...
+
+    @abstractmethod
+    async def coro_persist_prepared_blocks(
+        self,
+        prepared: 'PreparedBlocks',
+    ) -> Tuple[Tuple[Hash32, ...], Tuple[Hash32, ...]]:
+        ...
+
     @abstractmethod
     async def coro_persist_uncles(self, uncles: Sequence[BlockHeaderAPI]) -> Hash32:
         ...
@@ -72,19 +376,96 @@ class BaseAsyncChainDB(BaseAsyncHeaderDB, ChainDB):
 class AsyncChainDB(BaseAsyncChainDB):
     coro_exists = async_method(BaseAsyncChainDB.exists)
     coro_get = async_method(BaseAsyncChainDB.get)
+    coro_multi_get = async_method(BaseAsyncChainDB.multi_get)
     coro_get_block_header_by_hash = async_method(BaseAsyncChainDB.get_block_header_by_hash)
     coro_get_canonical_head = async_method(BaseAsyncChainDB.get_canonical_head)
     coro_get_score = async_method(BaseAsyncChainDB.get_score)
     coro_header_exists = async_method(BaseAsyncChainDB.header_exists)
     coro_get_canonical_block_hash = async_method(BaseAsyncChainDB.get_canonical_block_hash)
     coro_get_canonical_block_header_by_number = async_method(BaseAsyncChainDB.get_canonical_block_header_by_number)  # noqa: E501
+    coro_get_canonical_block_headers_by_number = async_method(BaseAsyncChainDB.get_canonical_block_headers_by_number)  # noqa: E501
     coro_persist_checkpoint_header = async_method(BaseAsyncChainDB.persist_checkpoint_header)
     coro_persist_header = async_method(BaseAsyncChainDB.persist_header)
     coro_persist_header_chain = async_method(BaseAsyncChainDB.persist_header_chain)
     coro_persist_block = async_method(BaseAsyncChainDB.persist_block)
+    coro_persist_blocks = async_method(BaseAsyncChainDB.persist_blocks)
+    coro_prepare_blocks = async_method(BaseAsyncChainDB.prepare_blocks)
+    coro_persist_prepared_blocks = async_method(BaseAsyncChainDB.persist_prepared_blocks)
     coro_persist_header_chain = async_method(BaseAsyncChainDB.persist_header_chain)
     coro_persist_uncles = async_method(BaseAsyncChainDB.persist_uncles)
     coro_persist_trie_data_dict = async_method(BaseAsyncChainDB.persist_trie_data_dict)
     coro_get_block_transactions = async_method(BaseAsyncChainDB.get_block_transactions)
     coro_get_block_uncles = async_method(BaseAsyncChainDB.get_block_uncles)
     coro_get_receipts = async_method(BaseAsyncChainDB.get_receipts)
+    coro_get_encoded_block_body = async_method(BaseAsyncChainDB.get_encoded_block_body)
+    coro_get_encoded_receipts = async_method(BaseAsyncChainDB.get_encoded_receipts)
+
+
+class AsyncClientChainDB(AsyncChainDB):
+    """
+    An :class:`AsyncChainDB` that serves its reads through an :class:`AsyncDBClient`, so that
+    they are awaited on the event loop instead of blocking a thread of the executor. Many
+    of them can then be in flight at the same time, like the lookups of concurrent
+    requests from peers.
+
+    Writes, and the reads that aren't overridden here, still go through ``db`` in the
+    executor.
+    """
+    def __init__(self, db: AtomicDatabaseAPI, async_db: AsyncDBClient) -> None:
+        super().__init__(db)
+        self.async_db = async_db
+
+    async def coro_exists(self, key: bytes) -> bool:
+        return await self.async_db.coro_exists(key)
+
+    async def coro_get(self, key: bytes) -> bytes:
+        return await self.async_db.coro_get(key)
+
+    async def coro_multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        return await self.async_db.coro_multi_get(keys)
+
+    async def coro_get_block_header_by_hash(self, block_hash: Hash32) -> BlockHeaderAPI:
+        validate_word(block_hash, title="Block Hash")
+        try:
+            encoded_header = await self.async_db.coro_get(block_hash)
+        except KeyError:
+            raise HeaderNotFound(f"No header with hash {encode_hex(block_hash)} found")
+        return rlp.decode(encoded_header, sedes=BlockHeader)
+
+    async def coro_get_canonical_block_headers_by_number(
+            self,
+            block_numbers: Sequence[BlockNumber]) -> Tuple[BlockHeaderAPI, ...]:
+        encoded_hashes = await self.async_db.coro_multi_get(tuple(
+            SchemaV1.make_block_number_to_hash_lookup_key(block_number)
+            for block_number in block_numbers
+        ))
+        block_hashes = tuple(
+            rlp.decode(encoded_hash, sedes=rlp.sedes.binary)
+            for encoded_hash in takewhile(lambda value: value is not None, encoded_hashes)
+        )
+
+        encoded_headers = await self.async_db.coro_multi_get(block_hashes)
+        return tuple(
+            rlp.decode(encoded_header, sedes=BlockHeader)
+            for encoded_header in takewhile(lambda value: value is not None, encoded_headers)
+        )
+
+    async def coro_get_encoded_block_body(self, header: BlockHeaderAPI) -> bytes:
+        encoded_transactions = await coro_get_indexed_trie_values(
+            self.async_db,
+            header.transaction_root,
+        )
+        if header.uncles_hash == EMPTY_UNCLE_HASH:
+            encoded_uncles = EMPTY_RLP_LIST
+        else:
+            try:
+                encoded_uncles = await self.async_db.coro_get(header.uncles_hash)
+            except KeyError:
+                raise HeaderNotFound(f"No uncles found for hash {header.uncles_hash!r}")
+
+        return encode_rlp_list((encode_rlp_list(encoded_transactions), encoded_uncles))
+
+    async def coro_get_encoded_receipts(self, header: BlockHeaderAPI) -> bytes:
+        return encode_rlp_list(
+            await coro_get_indexed_trie_values(self.async_db, header.receipt_root)
+        )
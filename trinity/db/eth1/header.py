@@ -1,6 +1,8 @@
 from abc import abstractmethod
+from itertools import takewhile
 from typing import (
     Iterable,
+    Sequence,
     Tuple,
     TypeVar,
 )
@@ -14,8 +16,12 @@ from eth.abc import (
     BlockHeaderAPI,
 )
 from eth.db.header import HeaderDB
+from eth.db.schema import SchemaV1
+from eth.rlp.headers import BlockHeader
+import rlp
 
 from trinity._utils.async_dispatch import async_method
+from trinity._utils.db import multi_get
 
 
 TReturn = TypeVar('TReturn')
@@ -25,6 +31,37 @@ class BaseAsyncHeaderDB(HeaderDB):
     """
     Abstract base class for the async counterpart to ``HeaderDatabaseAPI``.
     """
+    def get_canonical_block_headers_by_number(
+            self,
+            block_numbers: Sequence[BlockNumber]) -> Tuple[BlockHeaderAPI, ...]:
+        """
+        Look up the canonical headers with the given numbers, in the given order,
+        stopping at the first one that is not available.
+
+        All the canonical hashes are looked up in one batch, and then all the headers
+        in another, which is two round trips when the database is served over IPC.
+        """
+        encoded_hashes = multi_get(self.db, tuple(
+            SchemaV1.make_block_number_to_hash_lookup_key(block_number)
+            for block_number in block_numbers
+        ))
+        block_hashes = tuple(
+            rlp.decode(encoded_hash, sedes=rlp.sedes.binary)
+            for encoded_hash in takewhile(lambda value: value is not None, encoded_hashes)
+        )
+
+        encoded_headers = multi_get(self.db, block_hashes)
+        return tuple(
+            rlp.decode(encoded_header, sedes=BlockHeader)
+            for encoded_header in takewhile(lambda value: value is not None, encoded_headers)
+        )
+
+    @abstractmethod
+    async def coro_get_canonical_block_headers_by_number(
+            self,
+            block_numbers: Sequence[BlockNumber]) -> Tuple[BlockHeaderAPI, ...]:
+        ...
+
     @abstractmethod
     async def coro_get_canonical_block_hash(self, block_number: BlockNumber) -> Hash32:
         ...
@@ -76,6 +113,7 @@ class AsyncHeaderDB(BaseAsyncHeaderDB):
     coro_get_block_header_by_hash = async_method(BaseAsyncHeaderDB.get_block_header_by_hash)
     coro_get_canonical_block_hash = async_method(BaseAsyncHeaderDB.get_canonical_block_hash)
     coro_get_canonical_block_header_by_number = async_method(BaseAsyncHeaderDB.get_canonical_block_header_by_number)  # noqa: E501
+    coro_get_canonical_block_headers_by_number = async_method(BaseAsyncHeaderDB.get_canonical_block_headers_by_number)  # noqa: E501
     coro_get_canonical_head = async_method(BaseAsyncHeaderDB.get_canonical_head)
     coro_get_score = async_method(BaseAsyncHeaderDB.get_score)
     coro_header_exists = async_method(BaseAsyncHeaderDB.header_exists)
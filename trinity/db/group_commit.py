@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from typing import (
+    List,
+    Sequence,
+    Tuple,
+)
+
+from eth.abc import AtomicDatabaseAPI
+
+
+# How often the leader of a group commit logs the accumulated stats
+STATS_LOG_INTERVAL = 60
+
+
+class GroupCommitStats:
+    num_commits = 0
+    num_batches = 0
+    num_keys = 0
+    max_batches_per_commit = 0
+
+    # How much time is spent writing to the database?
+    commit_time = 0.0
+    max_commit_time = 0.0
+
+    def __str__(self) -> str:
+        if self.num_commits:
+            avg_batches = self.num_batches / self.num_commits
+            avg_commit_time = self.commit_time / self.num_commits
+        else:
+            avg_batches = 0
+            avg_commit_time = 0
+
+        return (
+            f"GroupCommitStats: commits={self.num_commits}, batches={self.num_batches}, "
+            f"keys={self.num_keys}, batches/commit={avg_batches:.1f} "
+            f"(max {self.max_batches_per_commit}), "
+            f"latency={avg_commit_time * 1000:.1f}ms (max {self.max_commit_time * 1000:.1f}ms)"
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"GroupCommitStats(num_commits={self.num_commits}, num_batches={self.num_batches}, "
+            f"num_keys={self.num_keys}, max_batches_per_commit={self.max_batches_per_commit}, "
+            f"commit_time={self.commit_time:.3f}s, max_commit_time={self.max_commit_time:.3f}s)"
+        )
+
+
+class _PendingBatch:
+    def __init__(self, kv_pairs: Sequence[Tuple[bytes, bytes]], deletes: Sequence[bytes]) -> None:
+        self.kv_pairs = kv_pairs
+        self.deletes = deletes
+        self.is_committed = False
+        self.error: Exception = None
+
+    @property
+    def num_keys(self) -> int:
+        return len(self.kv_pairs) + len(self.deletes)
+
+
+class GroupCommitter:
+    """
+    Coalesce atomic batches that arrive concurrently from many threads into a
+    single database write.
+
+    The first thread to find no commit in progress becomes the leader: it takes
+    every batch queued so far, including batches from threads that are blocked
+    behind it, and writes them in one atomic batch.  :meth:`commit` only
+    returns once the caller's batch has been written.  If the combined write
+    fails, the batches are retried one at a time so that a bad batch only fails
+    its own caller.
+    """
+    logger = logging.getLogger('trinity.db.group_commit.GroupCommitter')
+
+    def __init__(self, db: AtomicDatabaseAPI) -> None:
+        self.db = db
+        self.stats = GroupCommitStats()
+
+        self._queue: List[_PendingBatch] = []
+        self._queue_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._last_logged_at = time.monotonic()
+
+    def commit(self, kv_pairs: Sequence[Tuple[bytes, bytes]], deletes: Sequence[bytes]) -> None:
+        """
+        Write the key/value pairs and delete the keys, atomically.  Blocks until
+        the write is done, possibly together with the batches of other threads.
+        """
+        pending = _PendingBatch(kv_pairs, deletes)
+        with self._queue_lock:
+            self._queue.append(pending)
+
+        with self._commit_lock:
+            # The previous leader may have committed this batch already
+            if not pending.is_committed:
+                with self._queue_lock:
+                    group, self._queue = self._queue, []
+                self._commit_group(group)
+
+        if pending.error is not None:
+            raise pending.error
+
+    def _commit_group(self, group: Sequence[_PendingBatch]) -> None:
+        start = time.perf_counter()
+        try:
+            self._write(group)
+        except Exception as err:
+            if len(group) == 1:
+                group[0].error = err
+            else:
+                self.logger.debug(
+                    "Group commit of %d batches failed, committing them one at a time: %s",
+                    len(group),
+                    err,
+                )
+                for pending in group:
+                    try:
+                        self._write((pending, ))
+                    except Exception as batch_err:
+                        pending.error = batch_err
+        finally:
+            for pending in group:
+                pending.is_committed = True
+            self._record(group, time.perf_counter() - start)
+
+    def _write(self, group: Sequence[_PendingBatch]) -> None:
+        with self.db.atomic_batch() as batch:
+            for pending in group:
+                for key, value in pending.kv_pairs:
+                    batch[key] = value
+                for key in pending.deletes:
+                    del batch[key]
+
+    def _record(self, group: Sequence[_PendingBatch], commit_time: float) -> None:
+        stats = self.stats
+        stats.num_commits += 1
+        stats.num_batches += len(group)
+        stats.num_keys += sum(pending.num_keys for pending in group)
+        stats.max_batches_per_commit = max(stats.max_batches_per_commit, len(group))
+        stats.commit_time += commit_time
+        stats.max_commit_time = max(stats.max_commit_time, commit_time)
+
+        now = time.monotonic()
+        if now - self._last_logged_at >= STATS_LOG_INTERVAL:
+            self._last_logged_at = now
+            self.logger.debug("%s", stats)
@@ -1,16 +1,28 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import contextlib
 import enum
 import errno
 import itertools
 import logging
 import pathlib
+import selectors
 import socket
 import struct
 import threading
 from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
     Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
 )
 
+from async_generator import asynccontextmanager
 from eth_utils import ValidationError
 from eth_utils.toolz import partition
 
@@ -22,14 +34,24 @@ from eth.db.backends.base import BaseDB, BaseAtomicDB
 from eth.db.diff import DBDiffTracker, DBDiff, DiffMissingError
 
 from trinity._utils.ipc import (
+    coro_wait_for_ipc,
     wait_for_ipc,
 )
+from trinity.db.group_commit import (
+    GroupCommitter,
+)
+from trinity.db.read_cache import (
+    CachePolicy,
+    SharedReadCache,
+    get_read_cache_path,
+    is_content_addressed,
+)
 
 
 class BufferedSocket:
-    def __init__(self, sock: socket.socket) -> None:
+    def __init__(self, sock: socket.socket, initial_data: bytes = b'') -> None:
         self._socket = sock
-        self._buffer = bytearray()
+        self._buffer = bytearray(initial_data)
         self.sendall = sock.sendall
         self.close = sock.close
         self.shutdown = sock.shutdown
@@ -43,9 +65,10 @@ class BufferedSocket:
                 raise OSError("Connection closed")
 
             self._buffer.extend(data)
-        payload = self._buffer[:num_bytes]
-        self._buffer = self._buffer[num_bytes:]
-        return bytes(payload)
+        payload = bytes(self._buffer[:num_bytes])
+        # deleting from the front of a bytearray does not copy the remainder
+        del self._buffer[:num_bytes]
+        return payload
 
 
 @enum.unique
@@ -55,6 +78,8 @@ class Operation(enum.Enum):
     DELETE = b'\x02'
     EXISTS = b'\x03'
     ATOMIC_BATCH = b'\x04'
+    MULTI_GET = b'\x05'
+    MULTI_EXISTS = b'\x06'
 
 
 GET = Operation.GET
@@ -133,38 +158,318 @@ ATOMIC_BATCH Response:
 - Success Byte: 0x01
 """
 
+MULTI_GET = Operation.MULTI_GET
+"""
+MULTI_GET Request:
+
+- Operation Byte: 0x05
+- Key Count: 4-byte little endian
+- Key Sizes: Array of 4-byte little endian
+- Keys: Array of raw bytes
+
+MULTI_GET Response:
+
+- Success Byte: 0x01
+- Value Sizes: Array of 4-byte little endian, one per requested key, 0xffffffff
+  for keys that are not present
+- Values: Array of raw bytes for the keys that are present
+"""
+
+MULTI_EXISTS = Operation.MULTI_EXISTS
+"""
+MULTI_EXISTS Request:
+
+- Operation Byte: 0x06
+- Key Count: 4-byte little endian
+- Key Sizes: Array of 4-byte little endian
+- Keys: Array of raw bytes
+
+MULTI_EXISTS Response:
+
+- Success Byte: 0x01
+- Response Bytes: One per requested key, True: 0x01 or False: 0x00
+"""
+
+PIPELINED_PROTOCOL_BYTE = b'\xff'
+"""
+Pipelined Protocol (v2):
+
+A client that sends ``0xff`` as the very first byte on a new connection opts
+into the pipelined protocol.  Every request is then framed with a request id so
+that many requests can be outstanding on the same connection, and responses may
+arrive in any order.
+
+Request Frame:
+
+- Request ID: 4-byte little endian
+- Operation Byte: one of the operation bytes above
+- Payload Length: 4-byte little endian
+- Payload: raw
+
+Response Frame:
+
+- Request ID: 4-byte little endian
+- Payload Length: 4-byte little endian
+- Payload: result byte followed by the response data
+
+Request payloads are the same as the original protocol with the redundant
+length prefixes removed:
+
+- GET, DELETE, EXISTS: the raw key
+- SET: 4-byte little endian key length, key, value
+- ATOMIC_BATCH, MULTI_GET, MULTI_EXISTS: identical to the original request body
+
+Response payloads are the result byte, followed by the raw value for a
+successful GET, or by the original response body for MULTI_GET and
+MULTI_EXISTS.  A result byte of ``0x02`` signals that the server failed to
+execute the request.
+"""
+
+PIPELINED_REQUEST_HEADER = struct.Struct('<IcI')
+PIPELINED_RESPONSE_HEADER = struct.Struct('<II')
+
 
 LEN_BYTES = 4
 DOUBLE_LEN_BYTES = 2 * LEN_BYTES
 
+# Value size used in a MULTI_GET response for a key that is not present
+MISSING_VALUE_SIZE = 2**32 - 1
+
 
 SUCCESS_BYTE = b'\x01'
 FAIL_BYTE = b'\x00'
+ERROR_BYTE = b'\x02'
 
 
 @enum.unique
 class Result(enum.Enum):
     SUCCESS = SUCCESS_BYTE
     FAIL = FAIL_BYTE
+    ERROR = ERROR_BYTE
 
 
 SUCCESS = Result.SUCCESS
 FAIL = Result.FAIL
+ERROR = Result.ERROR
+
+# Number of threads that execute requests from pipelined connections
+DEFAULT_MAX_WORKERS = 8
+
+# How long the server waits for socket activity before re-checking whether it
+# has been stopped.
+SELECT_TIMEOUT = 0.1
+
+RECV_SIZE = 65536
+
+
+def encode_atomic_batch(diff: DBDiff) -> bytes:
+    """
+    Encode the body of an ATOMIC_BATCH request from the pending changes in ``diff``.
+    """
+    pending_deletes = diff.deleted_keys()
+    pending_kv_pairs = diff.pending_items()
+
+    kv_pair_count = len(pending_kv_pairs)
+    delete_count = len(pending_deletes)
+
+    kv_sizes = tuple(len(item) for item in itertools.chain(*pending_kv_pairs))
+    delete_sizes = tuple(len(key) for key in pending_deletes)
+
+    # We encode all of the *sizes* in one shot using `struct.pack` and this
+    # dynamically constructed format string.
+    fmt_str = '<II' + 'I' * (len(kv_sizes) + len(pending_deletes))
+    kv_pair_count_and_size_data = struct.pack(
+        fmt_str,
+        kv_pair_count,
+        delete_count,
+        *kv_sizes,
+        *delete_sizes,
+    )
+    kv_and_delete_data = b''.join(itertools.chain(*pending_kv_pairs, pending_deletes))
+    return kv_pair_count_and_size_data + kv_and_delete_data
+
+
+def decode_atomic_batch(
+        payload: bytes) -> Tuple[Tuple[Tuple[bytes, bytes], ...], Tuple[bytes, ...]]:
+    """
+    Decode the body of an ATOMIC_BATCH request into the key/value pairs to set
+    and the keys to delete.
+    """
+    kv_pair_count, delete_count = struct.unpack_from('<II', payload)
+    total_kv_count = 2 * kv_pair_count
+    fmt_str = '<' + 'I' * (total_kv_count + delete_count)
+    sizes = struct.unpack_from(fmt_str, payload, DOUBLE_LEN_BYTES)
+
+    offset = DOUBLE_LEN_BYTES + struct.calcsize(fmt_str)
+    kv_pairs = []
+    for key_size, value_size in partition(2, sizes[:total_kv_count]):
+        key = payload[offset:offset + key_size]
+        value = payload[offset + key_size:offset + key_size + value_size]
+        kv_pairs.append((key, value))
+        offset += key_size + value_size
+
+    deletes = []
+    for key_size in sizes[total_kv_count:]:
+        deletes.append(payload[offset:offset + key_size])
+        offset += key_size
+
+    if offset != len(payload):
+        raise ValidationError(
+            f"ATOMIC_BATCH payload has {len(payload) - offset} unexpected trailing bytes"
+        )
+    return tuple(kv_pairs), tuple(deletes)
+
+
+def encode_keys(keys: Sequence[bytes]) -> bytes:
+    """
+    Encode the body of a MULTI_GET or MULTI_EXISTS request.
+    """
+    sizes = struct.pack('<' + 'I' * (len(keys) + 1), len(keys), *(len(key) for key in keys))
+    return sizes + b''.join(keys)
+
+
+def decode_keys(payload: bytes) -> Tuple[bytes, ...]:
+    """
+    Decode the body of a MULTI_GET or MULTI_EXISTS request into the requested keys.
+    """
+    key_count = int.from_bytes(payload[:LEN_BYTES], 'little')
+    key_sizes = struct.unpack_from('<' + 'I' * key_count, payload, LEN_BYTES)
+    offset = LEN_BYTES * (key_count + 1)
+
+    keys = []
+    for key_size in key_sizes:
+        keys.append(payload[offset:offset + key_size])
+        offset += key_size
+
+    if offset != len(payload):
+        raise ValidationError(
+            f"Multi-key payload has {len(payload) - offset} unexpected trailing bytes"
+        )
+    return tuple(keys)
+
+
+def encode_values(values: Sequence[Optional[bytes]]) -> bytes:
+    """
+    Encode the body of a MULTI_GET response, where ``None`` marks a missing key.
+    """
+    sizes = struct.pack(
+        '<' + 'I' * len(values),
+        *(MISSING_VALUE_SIZE if value is None else len(value) for value in values)
+    )
+    return sizes + b''.join(value for value in values if value is not None)
+
+
+def decode_values(sizes_data: bytes, values_data: bytes) -> Tuple[Optional[bytes], ...]:
+    """
+    Decode the value sizes and values of a MULTI_GET response, returning
+    ``None`` for each missing key.
+    """
+    sizes = struct.unpack('<' + 'I' * (len(sizes_data) // LEN_BYTES), sizes_data)
+    values: List[Optional[bytes]] = []
+    offset = 0
+    for size in sizes:
+        if size == MISSING_VALUE_SIZE:
+            values.append(None)
+        else:
+            values.append(values_data[offset:offset + size])
+            offset += size
+    return tuple(values)
+
+
+def _present_size(sizes_data: bytes) -> int:
+    sizes = struct.unpack('<' + 'I' * (len(sizes_data) // LEN_BYTES), sizes_data)
+    return sum(size for size in sizes if size != MISSING_VALUE_SIZE)
+
+
+class PipelinedConnection:
+    """
+    Server side state of a connection that speaks the pipelined protocol.
+    """
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self._buffer = bytearray()
+        self._send_lock = threading.Lock()
+
+    def feed(self, data: bytes) -> List[Tuple[int, bytes, bytes]]:
+        """
+        Buffer ``data`` read from the socket and return all request frames that
+        are now complete as ``(request_id, operation_byte, payload)`` tuples.
+        """
+        self._buffer.extend(data)
+        header_size = PIPELINED_REQUEST_HEADER.size
+
+        frames = []
+        offset = 0
+        while len(self._buffer) - offset >= header_size:
+            request_id, operation_byte, payload_size = PIPELINED_REQUEST_HEADER.unpack_from(
+                self._buffer,
+                offset,
+            )
+            payload_end = offset + header_size + payload_size
+            if len(self._buffer) < payload_end:
+                break
+            payload = bytes(self._buffer[offset + header_size:payload_end])
+            frames.append((request_id, operation_byte, payload))
+            offset = payload_end
+
+        del self._buffer[:offset]
+        return frames
+
+    def send_responses(self, responses: Sequence[Tuple[int, bytes]]) -> None:
+        data = b''.join(
+            PIPELINED_RESPONSE_HEADER.pack(request_id, len(response)) + response
+            for request_id, response in responses
+        )
+        with self._send_lock:
+            self.sock.sendall(data)
+
+    def close(self) -> None:
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            # The peer may have already gone away
+            pass
+        self.sock.close()
 
 
 class DBManager:
     """
     Implements an interface for serving the BaseAtomicDB API over a socket.
+
+    Connections using the original protocol are each served by a dedicated
+    thread.  Connections using the pipelined protocol are multiplexed onto the
+    serving thread and their requests are executed by a bounded pool of
+    ``max_workers`` threads.
+
+    Atomic batches that arrive concurrently, on any connection, are combined
+    into a single database write by a
+    :class:`~trinity.db.group_commit.GroupCommitter`.  Each client is only
+    acknowledged once the write that contains its batch has completed.
+
+    If ``read_cache_size`` is non-zero, the manager also owns a
+    :class:`~trinity.db.read_cache.SharedReadCache` of that many bytes, which
+    clients read from directly.  Values read by clients are cached when
+    ``cache_policy`` allows it, and every key that is written or deleted is
+    invalidated before the write is acknowledged.
     """
     logger = logging.getLogger('trinity.db.manager.DBManager')
 
-    def __init__(self, db: AtomicDatabaseAPI):
+    def __init__(self,
+                 db: AtomicDatabaseAPI,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 read_cache_size: int = 0,
+                 cache_policy: CachePolicy = is_content_addressed):
         """
         The AtomicDatabaseAPI that this wraps must be threadsafe.
         """
         self._started = threading.Event()
         self._stopped = threading.Event()
+        self._max_workers = max_workers
+        self._read_cache_size = read_cache_size
+        self._cache_policy = cache_policy
+        self.read_cache: SharedReadCache = None
         self.db = db
+        self.group_committer = GroupCommitter(db)
 
     @property
     def is_started(self) -> bool:
@@ -224,6 +529,10 @@ class DBManager:
             if ipc_path.exists():
                 ipc_path.unlink()
 
+            cache_path = get_read_cache_path(ipc_path)
+            if cache_path.exists():
+                cache_path.unlink()
+
     def serve(self, ipc_path: pathlib.Path) -> None:
         self.logger.debug("Starting database server over IPC socket: %s", ipc_path)
 
@@ -240,31 +549,210 @@ class DBManager:
             # already being used since it accepts many client connection.
             # https://stackoverflow.com/questions/6380057/python-binding-socket-address-already-in-use
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            cache_path = get_read_cache_path(ipc_path)
+            if self._read_cache_size:
+                # must exist before the socket does, so that clients find it on connect
+                self.read_cache = SharedReadCache.create(cache_path, self._read_cache_size)
+            elif cache_path.exists():
+                # left behind by an earlier run, and nothing would invalidate it
+                cache_path.unlink()
+
             sock.bind(str(ipc_path))
             sock.listen(1)
 
-            self._started.set()
+            executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="DBManager",
+            )
+            with selectors.DefaultSelector() as selector, executor:
+                selector.register(sock, selectors.EVENT_READ)
+
+                self._started.set()
 
-            while self.is_running:
                 try:
-                    conn, addr = sock.accept()
-                except (ConnectionAbortedError, OSError) as err:
-                    self.logger.debug("Server stopping: %s", err)
-                    self._stopped.set()
-                    break
-                self.logger.debug('Server accepted connection: %r', addr)
-                threading.Thread(
-                    name="_serve_conn",
-                    target=self._serve_conn,
-                    args=(conn,),
-                    daemon=False,
-                ).start()
-
-    def _serve_conn(self, raw_socket: socket.socket) -> None:
+                    self._serve_selector(sock, selector, executor)
+                finally:
+                    for key in tuple(selector.get_map().values()):
+                        if isinstance(key.data, PipelinedConnection):
+                            key.data.close()
+
+        if self.read_cache is not None:
+            self.read_cache.close()
+
+        self.logger.debug("Database server stopped: %s", self.group_committer.stats)
+
+    def _serve_selector(self,
+                        listening_socket: socket.socket,
+                        selector: selectors.BaseSelector,
+                        executor: ThreadPoolExecutor) -> None:
+        while self.is_running:
+            for key, _ in selector.select(timeout=SELECT_TIMEOUT):
+                if key.fileobj is listening_socket:
+                    try:
+                        conn, addr = listening_socket.accept()
+                    except (ConnectionAbortedError, OSError) as err:
+                        self.logger.debug("Server stopping: %s", err)
+                        self._stopped.set()
+                        return
+                    self.logger.debug('Server accepted connection: %r', addr)
+                    # The protocol is not known until the client sends its first byte
+                    selector.register(conn, selectors.EVENT_READ)
+                elif key.data is None:
+                    self._handle_first_read(cast(socket.socket, key.fileobj), selector, executor)
+                else:
+                    self._handle_pipelined_read(key.data, selector, executor)
+
+    def _handle_first_read(self,
+                           raw_socket: socket.socket,
+                           selector: selectors.BaseSelector,
+                           executor: ThreadPoolExecutor) -> None:
+        try:
+            data = raw_socket.recv(RECV_SIZE)
+        except OSError:
+            data = b''
+
+        if data == b'':
+            self.logger.debug("%s: client closed before sending data: %s", self, raw_socket)
+            selector.unregister(raw_socket)
+            raw_socket.close()
+        elif data[:1] == PIPELINED_PROTOCOL_BYTE:
+            self.logger.debug("%s: serving pipelined client %s", self, raw_socket)
+            conn = PipelinedConnection(raw_socket)
+            selector.modify(raw_socket, selectors.EVENT_READ, conn)
+            self._dispatch_pipelined_requests(conn, data[1:], selector, executor)
+        else:
+            selector.unregister(raw_socket)
+            threading.Thread(
+                name="_serve_conn",
+                target=self._serve_conn,
+                args=(raw_socket, data),
+                daemon=False,
+            ).start()
+
+    def _handle_pipelined_read(self,
+                               conn: PipelinedConnection,
+                               selector: selectors.BaseSelector,
+                               executor: ThreadPoolExecutor) -> None:
+        try:
+            data = conn.sock.recv(RECV_SIZE)
+        except OSError:
+            data = b''
+
+        if data == b'':
+            self.logger.debug("%s: closing pipelined client connection: %s", self, conn.sock)
+            selector.unregister(conn.sock)
+            conn.close()
+        else:
+            self._dispatch_pipelined_requests(conn, data, selector, executor)
+
+    def _dispatch_pipelined_requests(self,
+                                     conn: PipelinedConnection,
+                                     data: bytes,
+                                     selector: selectors.BaseSelector,
+                                     executor: ThreadPoolExecutor) -> None:
+        requests = []
+        for request_id, operation_byte, payload in conn.feed(data):
+            try:
+                operation = Operation(operation_byte)
+            except ValueError:
+                self.logger.error("Unrecognized database operation: %s", operation_byte.hex())
+                selector.unregister(conn.sock)
+                conn.close()
+                return
+            requests.append((request_id, operation, payload))
+
+        if requests:
+            # Requests that arrive together are served together by one worker,
+            # which keeps the thread pool overhead and the number of writes
+            # low when a client pipelines many small requests.
+            executor.submit(self._serve_pipelined_requests, conn, requests)
+
+    def _serve_pipelined_requests(self,
+                                  conn: PipelinedConnection,
+                                  requests: Sequence[Tuple[int, Operation, bytes]]) -> None:
+        responses = []
+        for request_id, operation, payload in requests:
+            try:
+                response = self._execute(operation, payload)
+            except Exception:
+                self.logger.exception("Unhandled error during operation: %s", operation)
+                response = ERROR_BYTE
+            responses.append((request_id, response))
+
+        try:
+            conn.send_responses(responses)
+        except OSError:
+            self.logger.debug("%s: client went away before receiving response: %s", self, conn.sock)
+
+    def _read(self, key: bytes) -> bytes:
+        value = self.db[key]
+        if self.read_cache is not None and self._cache_policy(key, value):
+            self.read_cache.insert(key, value)
+        return value
+
+    def _invalidate(self, key: bytes) -> None:
+        if self.read_cache is not None:
+            self.read_cache.invalidate(key)
+
+    def _execute(self, operation: Operation, payload: bytes) -> bytes:
+        """
+        Execute a request from a pipelined connection, returning the response payload.
+        """
+        if operation is GET:
+            try:
+                value = self._read(payload)
+            except KeyError:
+                return FAIL_BYTE
+            else:
+                return SUCCESS_BYTE + value
+        elif operation is SET:
+            key_size = int.from_bytes(payload[:LEN_BYTES], 'little')
+            key = payload[LEN_BYTES:LEN_BYTES + key_size]
+            self.db[key] = payload[LEN_BYTES + key_size:]
+            self._invalidate(key)
+            return SUCCESS_BYTE
+        elif operation is DELETE:
+            try:
+                del self.db[payload]
+            except KeyError:
+                return FAIL_BYTE
+            else:
+                self._invalidate(payload)
+                return SUCCESS_BYTE
+        elif operation is EXISTS:
+            return SUCCESS_BYTE if payload in self.db else FAIL_BYTE
+        elif operation is ATOMIC_BATCH:
+            kv_pairs, deletes = decode_atomic_batch(payload)
+            self.group_committer.commit(kv_pairs, deletes)
+            for key, _ in kv_pairs:
+                self._invalidate(key)
+            for key in deletes:
+                self._invalidate(key)
+            return SUCCESS_BYTE
+        elif operation is MULTI_GET:
+            return SUCCESS_BYTE + encode_values(self._multi_get(decode_keys(payload)))
+        elif operation is MULTI_EXISTS:
+            return SUCCESS_BYTE + self._multi_exists(decode_keys(payload))
+        else:
+            raise ValidationError(f"Got unhandled operation {operation}")
+
+    def _multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        values: List[Optional[bytes]] = []
+        for key in keys:
+            try:
+                values.append(self._read(key))
+            except KeyError:
+                values.append(None)
+        return tuple(values)
+
+    def _multi_exists(self, keys: Sequence[bytes]) -> bytes:
+        return b''.join(SUCCESS_BYTE if key in self.db else FAIL_BYTE for key in keys)
+
+    def _serve_conn(self, raw_socket: socket.socket, initial_data: bytes = b'') -> None:
         self.logger.debug("%s: starting client handler for %s", self, raw_socket)
 
         with raw_socket:
-            sock = BufferedSocket(raw_socket)
+            sock = BufferedSocket(raw_socket, initial_data)
 
             while self.is_running:
                 try:
@@ -293,6 +781,10 @@ class DBManager:
                         self.handle_EXISTS(sock)
                     elif operation is ATOMIC_BATCH:
                         self.handle_ATOMIC_BATCH(sock)
+                    elif operation is MULTI_GET:
+                        self.handle_MULTI_GET(sock)
+                    elif operation is MULTI_EXISTS:
+                        self.handle_MULTI_EXISTS(sock)
                     else:
                         self.logger.error("Got unhandled operation %s", operation)
                 except Exception:
@@ -303,7 +795,7 @@ class DBManager:
         key_size_data = sock.read_exactly(LEN_BYTES)
         key = sock.read_exactly(int.from_bytes(key_size_data, 'little'))
         try:
-            value = self.db[key]
+            value = self._read(key)
         except KeyError:
             sock.sendall(FAIL_BYTE)
         else:
@@ -317,6 +809,7 @@ class DBManager:
         key = key_and_value_data[:key_size]
         value = key_and_value_data[key_size:]
         self.db[key] = value
+        self._invalidate(key)
         sock.sendall(SUCCESS_BYTE)
 
     def handle_DELETE(self, sock: BufferedSocket) -> None:
@@ -327,6 +820,7 @@ class DBManager:
         except KeyError:
             sock.sendall(FAIL_BYTE)
         else:
+            self._invalidate(key)
             sock.sendall(SUCCESS_BYTE)
 
     def handle_EXISTS(self, sock: BufferedSocket) -> None:
@@ -352,28 +846,88 @@ class DBManager:
             kv_sizes = kv_and_delete_sizes[:total_kv_count]
             delete_sizes = kv_and_delete_sizes[total_kv_count:total_kv_count + delete_count]
 
-            with self.db.atomic_batch() as batch:
-                for key_size, value_size in partition(2, kv_sizes):
-                    combined_size = key_size + value_size
-                    key_and_value_data = sock.read_exactly(combined_size)
-                    key = key_and_value_data[:key_size]
-                    value = key_and_value_data[key_size:]
-                    batch[key] = value
-                for key_size in delete_sizes:
-                    key = sock.read_exactly(key_size)
-                    del batch[key]
+            kv_pairs = []
+            for key_size, value_size in partition(2, kv_sizes):
+                combined_size = key_size + value_size
+                key_and_value_data = sock.read_exactly(combined_size)
+                kv_pairs.append((key_and_value_data[:key_size], key_and_value_data[key_size:]))
+            deletes = [sock.read_exactly(key_size) for key_size in delete_sizes]
+
+            self.group_committer.commit(kv_pairs, deletes)
+
+            for key, _ in kv_pairs:
+                self._invalidate(key)
+            for key in deletes:
+                self._invalidate(key)
 
         sock.sendall(SUCCESS_BYTE)
 
+    def _read_keys(self, sock: BufferedSocket) -> Tuple[bytes, ...]:
+        key_count = int.from_bytes(sock.read_exactly(LEN_BYTES), 'little')
+        key_sizes = struct.unpack(
+            '<' + 'I' * key_count,
+            sock.read_exactly(LEN_BYTES * key_count),
+        )
+        keys_data = sock.read_exactly(sum(key_sizes))
+
+        keys = []
+        offset = 0
+        for key_size in key_sizes:
+            keys.append(keys_data[offset:offset + key_size])
+            offset += key_size
+        return tuple(keys)
+
+    def handle_MULTI_GET(self, sock: BufferedSocket) -> None:
+        keys = self._read_keys(sock)
+        sock.sendall(SUCCESS_BYTE + encode_values(self._multi_get(keys)))
+
+    def handle_MULTI_EXISTS(self, sock: BufferedSocket) -> None:
+        keys = self._read_keys(sock)
+        sock.sendall(SUCCESS_BYTE + self._multi_exists(keys))
+
+
+def _open_read_cache(ipc_path: pathlib.Path) -> Optional[SharedReadCache]:
+    cache_path = get_read_cache_path(ipc_path)
+    if cache_path.exists():
+        return SharedReadCache.open(cache_path)
+    else:
+        return None
+
+
+def _read_through(read_cache: Optional[SharedReadCache],
+                  keys: Sequence[bytes],
+                  multi_get: Callable[[Sequence[bytes]], Tuple[Optional[bytes], ...]],
+                  ) -> Tuple[Optional[bytes], ...]:
+    """
+    Look up ``keys`` in the shared read cache, fetching only the ones that miss
+    with ``multi_get``.
+    """
+    if read_cache is None:
+        return multi_get(keys)
+
+    values = [read_cache.get(key) for key in keys]
+    missing_indices = [index for index, value in enumerate(values) if value is None]
+    if missing_indices:
+        fetched = multi_get([keys[index] for index in missing_indices])
+        for index, value in zip(missing_indices, fetched):
+            values[index] = value
+    return tuple(values)
+
 
 class DBClient(BaseAtomicDB):
     logger = logging.getLogger('trinity.db.client.DBClient')
 
-    def __init__(self, sock: socket.socket):
+    def __init__(self, sock: socket.socket, read_cache: SharedReadCache = None):
         self._socket = BufferedSocket(sock)
         self._lock = threading.Lock()
+        self.read_cache = read_cache
 
     def __getitem__(self, key: bytes) -> bytes:
+        if self.read_cache is not None:
+            cached_value = self.read_cache.get(key)
+            if cached_value is not None:
+                return cached_value
+
         with self._lock:
             self._socket.sendall(GET.value + len(key).to_bytes(LEN_BYTES, 'little') + key)
             result_byte = self._socket.read_exactly(1)
@@ -407,6 +961,9 @@ class DBClient(BaseAtomicDB):
             raise Exception(f"Unknown result byte: {result_byte.hex}")
 
     def _exists(self, key: bytes) -> bool:
+        if self.read_cache is not None and self.read_cache.get(key) is not None:
+            return True
+
         with self._lock:
             self._socket.sendall(EXISTS.value + len(key).to_bytes(4, 'little') + key)
             result_byte = self._socket.read_exactly(1)
@@ -418,35 +975,39 @@ class DBClient(BaseAtomicDB):
         else:
             raise Exception(f"Unknown result byte: {result_byte.hex}")
 
+    def multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        """
+        Look up all ``keys`` in a single round trip, returning their values in
+        the same order, with ``None`` for each key that is not present.
+        """
+        return _read_through(self.read_cache, keys, self._multi_get)
+
+    def _multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        with self._lock:
+            self._socket.sendall(MULTI_GET.value + encode_keys(keys))
+            Result(self._socket.read_exactly(1))
+            sizes_data = self._socket.read_exactly(LEN_BYTES * len(keys))
+            values_data = self._socket.read_exactly(_present_size(sizes_data))
+        return decode_values(sizes_data, values_data)
+
+    def multi_exists(self, keys: Sequence[bytes]) -> Tuple[bool, ...]:
+        """
+        Check whether each of ``keys`` is present, in a single round trip.
+        """
+        with self._lock:
+            self._socket.sendall(MULTI_EXISTS.value + encode_keys(keys))
+            Result(self._socket.read_exactly(1))
+            response = self._socket.read_exactly(len(keys))
+        return tuple(response[i:i + 1] == SUCCESS_BYTE for i in range(len(keys)))
+
     @contextlib.contextmanager
     def atomic_batch(self) -> Iterator['AtomicBatch']:
         batch = AtomicBatch(self)
         yield batch
         diff = batch.finalize()
-        pending_deletes = diff.deleted_keys()
-        pending_kv_pairs = diff.pending_items()
-
-        kv_pair_count = len(pending_kv_pairs)
-        delete_count = len(pending_deletes)
-
-        kv_sizes = tuple(len(item) for item in itertools.chain(*pending_kv_pairs))
-        delete_sizes = tuple(len(key) for key in pending_deletes)
-
-        # We encode all of the *sizes* in one shot using `struct.pack` and this
-        # dynamically constructed format string.
-        fmt_str = '<II' + 'I' * (len(kv_sizes) + len(pending_deletes))
-        kv_pair_count_and_size_data = struct.pack(
-            fmt_str,
-            kv_pair_count,
-            delete_count,
-            *kv_sizes,
-            *delete_sizes,
-        )
-        kv_and_delete_data = b''.join(itertools.chain(*pending_kv_pairs, pending_deletes))
+        batch_data = encode_atomic_batch(diff)
         with self._lock:
-            self._socket.sendall(
-                ATOMIC_BATCH.value + kv_pair_count_and_size_data + kv_and_delete_data
-            )
+            self._socket.sendall(ATOMIC_BATCH.value + batch_data)
             Result(self._socket.read_exactly(1))
 
     def close(self) -> None:
@@ -458,6 +1019,8 @@ class DBClient(BaseAtomicDB):
             if e.errno != errno.ENOTCONN:
                 raise
         self._socket.close()
+        if self.read_cache is not None:
+            self.read_cache.close()
 
     @classmethod
     def connect(cls, path: pathlib.Path) -> "DBClient":
@@ -465,7 +1028,374 @@ class DBClient(BaseAtomicDB):
         s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         cls.logger.debug("Opened connection to %s: %s", path, s)
         s.connect(str(path))
-        return cls(s)
+        return cls(s, _open_read_cache(path))
+
+
+class PendingResponse:
+    """
+    Handle to a request that was sent on a :class:`PipelinedDBClient`.
+    """
+    def __init__(self, client: 'PipelinedDBClient', request_id: int) -> None:
+        self._client = client
+        self.request_id = request_id
+
+    def result(self) -> Tuple[Result, bytes]:
+        """
+        Block until the response has arrived and return the result with the
+        response data.
+        """
+        return self._client.wait_for(self.request_id)
+
+
+class PipelinedDBClient(BaseAtomicDB):
+    """
+    Database client that speaks the pipelined protocol.
+
+    Any number of threads may use the client concurrently, and each thread may
+    keep many requests in flight through the ``submit_*`` methods, which return
+    a :class:`PendingResponse`.  Requests are buffered until a response is
+    waited on (or the buffer fills up), so a burst of submitted requests is
+    written with a single system call.  The server may execute outstanding
+    requests in any order, so a read that must observe a write has to wait for
+    the write's response first.
+    """
+    logger = logging.getLogger('trinity.db.client.PipelinedDBClient')
+
+    def __init__(self, sock: socket.socket, read_cache: SharedReadCache = None):
+        self._raw_socket = sock
+        self._socket = BufferedSocket(sock)
+        self._send_lock = threading.Lock()
+        self._recv_lock = threading.Lock()
+        self._outgoing = bytearray()
+        self._request_ids = itertools.count()
+        self._responses: Dict[int, Tuple[Result, bytes]] = {}
+        self.read_cache = read_cache
+
+        self._socket.sendall(PIPELINED_PROTOCOL_BYTE)
+
+    def _submit(self, operation: Operation, payload: bytes) -> PendingResponse:
+        with self._send_lock:
+            request_id = next(self._request_ids) % 2**32
+            self._outgoing.extend(
+                PIPELINED_REQUEST_HEADER.pack(request_id, operation.value, len(payload))
+            )
+            self._outgoing.extend(payload)
+            if len(self._outgoing) >= RECV_SIZE:
+                self._flush()
+        return PendingResponse(self, request_id)
+
+    def _flush(self) -> None:
+        # must be called while holding the send lock
+        if self._outgoing:
+            self._socket.sendall(self._outgoing)
+            self._outgoing.clear()
+
+    def flush(self) -> None:
+        """
+        Send all buffered requests to the server.
+        """
+        with self._send_lock:
+            self._flush()
+
+    def wait_for(self, request_id: int) -> Tuple[Result, bytes]:
+        """
+        Block until the response to the request with ``request_id`` has arrived.
+
+        There is no background reader.  Whichever thread holds the receive lock
+        reads responses off the socket, storing those meant for other threads,
+        until its own response arrives.
+        """
+        try:
+            self.flush()
+        except OSError as err:
+            raise ConnectionError("Database connection closed") from err
+
+        while True:
+            with self._recv_lock:
+                if request_id in self._responses:
+                    result, data = self._responses.pop(request_id)
+                    break
+
+                try:
+                    header = self._socket.read_exactly(PIPELINED_RESPONSE_HEADER.size)
+                    response_id, response_size = PIPELINED_RESPONSE_HEADER.unpack(header)
+                    response = self._socket.read_exactly(response_size)
+                except OSError as err:
+                    raise ConnectionError("Database connection closed") from err
+
+                if response_id == request_id:
+                    result, data = Result(response[:1]), response[1:]
+                    break
+                else:
+                    self._responses[response_id] = (Result(response[:1]), response[1:])
+
+        if result is ERROR:
+            raise Exception("Database server failed to execute the request")
+        return result, data
+
+    def submit_get(self, key: bytes) -> PendingResponse:
+        return self._submit(GET, key)
+
+    def submit_set(self, key: bytes, value: bytes) -> PendingResponse:
+        return self._submit(SET, len(key).to_bytes(LEN_BYTES, 'little') + key + value)
+
+    def submit_delete(self, key: bytes) -> PendingResponse:
+        return self._submit(DELETE, key)
+
+    def submit_exists(self, key: bytes) -> PendingResponse:
+        return self._submit(EXISTS, key)
+
+    def submit_multi_get(self, keys: Sequence[bytes]) -> PendingResponse:
+        return self._submit(MULTI_GET, encode_keys(keys))
+
+    def submit_multi_exists(self, keys: Sequence[bytes]) -> PendingResponse:
+        return self._submit(MULTI_EXISTS, encode_keys(keys))
+
+    def multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        """
+        Look up all ``keys`` in a single round trip, returning their values in
+        the same order, with ``None`` for each key that is not present.
+        """
+        return _read_through(self.read_cache, keys, self._multi_get)
+
+    def _multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        _, response = self.submit_multi_get(keys).result()
+        sizes_size = LEN_BYTES * len(keys)
+        return decode_values(response[:sizes_size], response[sizes_size:])
+
+    def multi_exists(self, keys: Sequence[bytes]) -> Tuple[bool, ...]:
+        """
+        Check whether each of ``keys`` is present, in a single round trip.
+        """
+        _, response = self.submit_multi_exists(keys).result()
+        return tuple(response[i:i + 1] == SUCCESS_BYTE for i in range(len(keys)))
+
+    def __getitem__(self, key: bytes) -> bytes:
+        if self.read_cache is not None:
+            cached_value = self.read_cache.get(key)
+            if cached_value is not None:
+                return cached_value
+
+        result, value = self.submit_get(key).result()
+        if result is SUCCESS:
+            return value
+        else:
+            raise KeyError(key)
+
+    def __setitem__(self, key: bytes, value: bytes) -> None:
+        self.submit_set(key, value).result()
+
+    def __delitem__(self, key: bytes) -> None:
+        result, _ = self.submit_delete(key).result()
+        if result is FAIL:
+            raise KeyError(key)
+
+    def _exists(self, key: bytes) -> bool:
+        if self.read_cache is not None and self.read_cache.get(key) is not None:
+            return True
+
+        result, _ = self.submit_exists(key).result()
+        return result is SUCCESS
+
+    @contextlib.contextmanager
+    def atomic_batch(self) -> Iterator['AtomicBatch']:
+        batch = AtomicBatch(self)
+        yield batch
+        diff = batch.finalize()
+        self._submit(ATOMIC_BATCH, encode_atomic_batch(diff)).result()
+
+    def close(self) -> None:
+        if self._raw_socket.fileno() == -1:
+            # already closed
+            return
+
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError as e:
+            # on mac OS this can result in the following error:
+            # OSError: [Errno 57] Socket is not connected
+            if e.errno != errno.ENOTCONN:
+                raise
+        self._socket.close()
+        if self.read_cache is not None:
+            self.read_cache.close()
+
+    @classmethod
+    def connect(cls, path: pathlib.Path) -> "PipelinedDBClient":
+        wait_for_ipc(path)
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        cls.logger.debug("Opened connection to %s: %s", path, s)
+        s.connect(str(path))
+        return cls(s, _open_read_cache(path))
+
+
+class AsyncDBClient:
+    """
+    Database client for processes that run an asyncio event loop.
+
+    It speaks the pipelined protocol over asyncio streams, so any number of
+    coroutines can keep requests in flight at the same time without blocking
+    the event loop or tying up executor threads.  Requests that are made in
+    the same iteration of the event loop are written to the socket together.
+    The server may execute outstanding requests in any order, so a read that
+    must observe a write has to await the write first.
+    """
+    logger = logging.getLogger('trinity.db.client.AsyncDBClient')
+
+    def __init__(self,
+                 reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter,
+                 read_cache: SharedReadCache = None) -> None:
+        self._reader = reader
+        self._writer = writer
+        self.read_cache = read_cache
+
+        self._request_ids = itertools.count()
+        self._pending: Dict[int, 'asyncio.Future[Tuple[Result, bytes]]'] = {}
+        self._outgoing = bytearray()
+        self._drain_lock = asyncio.Lock()
+        self._is_closed = False
+
+        self._writer.write(PIPELINED_PROTOCOL_BYTE)
+        self._read_task = asyncio.ensure_future(self._read_responses())
+
+    async def _read_responses(self) -> None:
+        try:
+            while True:
+                header = await self._reader.readexactly(PIPELINED_RESPONSE_HEADER.size)
+                request_id, response_size = PIPELINED_RESPONSE_HEADER.unpack(header)
+                response = await self._reader.readexactly(response_size)
+                result = Result(response[:1])
+
+                future = self._pending.pop(request_id, None)
+                # the caller may have stopped waiting for the response
+                if future is not None and not future.done():
+                    future.set_result((result, response[1:]))
+        except (asyncio.IncompleteReadError, ConnectionError) as err:
+            self.logger.debug("%s: connection to database lost: %s", self, err)
+        except ValueError as err:
+            # the responses that follow can't be trusted either
+            self.logger.error("%s: malformed response from database: %s", self, err)
+            self._writer.close()
+        finally:
+            self._is_closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Database connection closed"))
+            self._pending.clear()
+
+    def _flush(self) -> None:
+        if self._outgoing and not self._is_closed:
+            self._writer.write(bytes(self._outgoing))
+        self._outgoing.clear()
+
+    async def _request(self, operation: Operation, payload: bytes) -> Tuple[Result, bytes]:
+        if self._is_closed:
+            raise ConnectionError("Database connection closed")
+
+        request_id = next(self._request_ids) % 2**32
+        future: 'asyncio.Future[Tuple[Result, bytes]]' = asyncio.Future()
+        self._pending[request_id] = future
+
+        if not self._outgoing:
+            asyncio.get_event_loop().call_soon(self._flush)
+        self._outgoing.extend(
+            PIPELINED_REQUEST_HEADER.pack(request_id, operation.value, len(payload))
+        )
+        self._outgoing.extend(payload)
+
+        # concurrent calls to drain() are not allowed on python 3.7 and older
+        async with self._drain_lock:
+            await self._writer.drain()
+
+        try:
+            result, data = await future
+        finally:
+            self._pending.pop(request_id, None)
+
+        if result is ERROR:
+            raise Exception("Database server failed to execute the request")
+        return result, data
+
+    async def coro_get(self, key: bytes) -> bytes:
+        if self.read_cache is not None:
+            cached_value = self.read_cache.get(key)
+            if cached_value is not None:
+                return cached_value
+
+        result, value = await self._request(GET, key)
+        if result is SUCCESS:
+            return value
+        else:
+            raise KeyError(key)
+
+    async def coro_set(self, key: bytes, value: bytes) -> None:
+        await self._request(SET, len(key).to_bytes(LEN_BYTES, 'little') + key + value)
+
+    async def coro_delete(self, key: bytes) -> None:
+        result, _ = await self._request(DELETE, key)
+        if result is FAIL:
+            raise KeyError(key)
+
+    async def coro_exists(self, key: bytes) -> bool:
+        if self.read_cache is not None and self.read_cache.get(key) is not None:
+            return True
+
+        result, _ = await self._request(EXISTS, key)
+        return result is SUCCESS
+
+    async def coro_multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        """
+        Look up all ``keys`` in a single round trip, returning their values in
+        the same order, with ``None`` for each key that is not present.
+        """
+        if self.read_cache is None:
+            return await self._multi_get(keys)
+
+        values = [self.read_cache.get(key) for key in keys]
+        missing_indices = [index for index, value in enumerate(values) if value is None]
+        if missing_indices:
+            fetched = await self._multi_get([keys[index] for index in missing_indices])
+            for index, value in zip(missing_indices, fetched):
+                values[index] = value
+        return tuple(values)
+
+    async def _multi_get(self, keys: Sequence[bytes]) -> Tuple[Optional[bytes], ...]:
+        _, response = await self._request(MULTI_GET, encode_keys(keys))
+        sizes_size = LEN_BYTES * len(keys)
+        return decode_values(response[:sizes_size], response[sizes_size:])
+
+    async def coro_multi_exists(self, keys: Sequence[bytes]) -> Tuple[bool, ...]:
+        """
+        Check whether each of ``keys`` is present, in a single round trip.
+        """
+        _, response = await self._request(MULTI_EXISTS, encode_keys(keys))
+        return tuple(response[i:i + 1] == SUCCESS_BYTE for i in range(len(keys)))
+
+    @asynccontextmanager
+    async def atomic_batch(self) -> AsyncIterator['AsyncAtomicBatch']:
+        """
+        Collect writes and commit them together when the context exits.  Nothing
+        is written if the context exits with an exception.
+        """
+        batch = AsyncAtomicBatch(self)
+        yield batch
+        diff = batch.finalize()
+        await self._request(ATOMIC_BATCH, encode_atomic_batch(diff))
+
+    def close(self) -> None:
+        self._is_closed = True
+        self._read_task.cancel()
+        self._writer.close()
+        if self.read_cache is not None:
+            self.read_cache.close()
+
+    @classmethod
+    async def connect(cls, path: pathlib.Path) -> "AsyncDBClient":
+        await coro_wait_for_ipc(path)
+        reader, writer = await asyncio.open_unix_connection(str(path))
+        cls.logger.debug("Opened connection to %s", path)
+        return cls(reader, writer, _open_read_cache(path))
 
 
 class AtomicBatch(BaseDB):
@@ -520,3 +1450,52 @@ class AtomicBatch(BaseDB):
         self._track_diff = None
         self._db = None
         return diff
+
+
+class AsyncAtomicBatch:
+    """
+    This is returned by an AsyncDBClient during an atomic_batch, to provide a
+    temporary view of the database, before commit.
+    """
+    def __init__(self, db: AsyncDBClient) -> None:
+        self._db = db
+        self._track_diff = DBDiffTracker()
+
+    async def coro_get(self, key: bytes) -> bytes:
+        if self._track_diff is None:
+            raise ValidationError("Cannot get data from a write batch, out of context")
+
+        try:
+            value = self._track_diff[key]
+        except DiffMissingError as missing:
+            if missing.is_deleted:
+                raise KeyError(key)
+            else:
+                return await self._db.coro_get(key)
+        else:
+            return value
+
+    def __setitem__(self, key: bytes, value: bytes) -> None:
+        if self._track_diff is None:
+            raise ValidationError("Cannot set data from a write batch, out of context")
+
+        self._track_diff[key] = value
+
+    async def coro_delete(self, key: bytes) -> None:
+        if not await self.coro_exists(key):
+            raise KeyError(key)
+        del self._track_diff[key]
+
+    async def coro_exists(self, key: bytes) -> bool:
+        try:
+            await self.coro_get(key)
+        except KeyError:
+            return False
+        else:
+            return True
+
+    def finalize(self) -> DBDiff:
+        diff = self._track_diff.diff()
+        self._track_diff = None
+        self._db = None
+        return diff
@@ -0,0 +1,297 @@
+import mmap
+import os
+import pathlib
+import struct
+import threading
+import time
+from typing import (
+    Callable,
+    NamedTuple,
+    Optional,
+)
+
+from eth_hash.auto import keccak
+from eth_utils import ValidationError
+
+
+CACHE_MAGIC = b'TRNCACHE'
+CACHE_VERSION = 1
+
+# Only 32-byte keys (hashes) are ever cached
+CACHE_KEY_SIZE = 32
+
+# Trie nodes are at most 532 bytes and headers are a little over 500 bytes, so
+# this is enough to hold the values we want cached.  Larger values are skipped.
+DEFAULT_SLOT_VALUE_SIZE = 1024
+
+# Number of slots that a key may occupy.  On insertion the least recently used
+# of them is evicted.
+DEFAULT_WAYS = 4
+
+# Hit and miss counters are spread over lanes, one per process (by pid), so
+# that processes do not overwrite each other's increments.
+NUM_COUNTER_LANES = 64
+
+EMPTY_SLOT = 2**32 - 1
+
+#
+# Segment layout:
+#
+# Header:
+# - Magic: 8 bytes
+# - Version, Number of Sets, Ways, Slot Value Size: 4-byte little endian each
+# - Inserts, Evictions, Invalidations: 8-byte little endian each
+# - Counter lanes: NUM_COUNTER_LANES x (Hits, Misses), 8-byte little endian each
+#
+# Slots, one after another:
+# - Sequence Number: 4-byte little endian, odd while the slot is being written
+# - Value Length: 4-byte little endian, 0xffffffff when the slot is empty
+# - Last Access: 8-byte little endian, milliseconds of the monotonic clock
+# - Key: 32 bytes
+# - Value: ``slot_value_size`` bytes
+#
+HEADER = struct.Struct('<8sIIII' + 'QQQ')
+COUNTER_LANE = struct.Struct('<QQ')
+SLOT_HEADER = struct.Struct('<IIQ')
+
+COUNTERS_OFFSET = struct.calcsize('<8sIIII')
+LANES_OFFSET = HEADER.size
+SLOTS_OFFSET = LANES_OFFSET + NUM_COUNTER_LANES * COUNTER_LANE.size
+
+U32 = struct.Struct('<I')
+U64 = struct.Struct('<Q')
+
+
+def get_read_cache_path(ipc_path: pathlib.Path) -> pathlib.Path:
+    """
+    Return the path of the shared read cache segment that belongs to the
+    database served at ``ipc_path``.
+    """
+    return ipc_path.with_name(ipc_path.name + '.cache')
+
+
+# Decides whether a key/value pair read from the database may be cached
+CachePolicy = Callable[[bytes, bytes], bool]
+
+
+def is_content_addressed(key: bytes, value: bytes) -> bool:
+    """
+    Trie nodes, bytecode and headers are stored under the hash of their value.
+    Such a value can never change, so it is always safe to cache.
+    """
+    return len(key) == CACHE_KEY_SIZE and keccak(value) == key
+
+
+def _now() -> int:
+    # The monotonic clock is shared by all processes on the machine
+    return int(time.monotonic() * 1000)
+
+
+class ReadCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    inserts: int
+    evictions: int
+    invalidations: int
+
+
+class SharedReadCache:
+    """
+    A content-addressed, set-associative LRU cache of database values held in
+    a memory-mapped file, so that all processes can read it without a round
+    trip to the database process.
+
+    Only the :class:`~trinity.db.manager.DBManager` inserts and invalidates
+    entries.  Readers in other processes never block: every slot carries a
+    sequence number that is odd while the slot is being written, and a read
+    that overlaps a write is treated as a miss.
+    """
+    def __init__(self, path: pathlib.Path, segment: mmap.mmap) -> None:
+        self.path = path
+        self._segment = segment
+
+        magic, version, num_sets, ways, slot_value_size, *_ = HEADER.unpack_from(segment)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            raise ValidationError(f"{path} is not a version {CACHE_VERSION} read cache segment")
+
+        self._num_sets = num_sets
+        self._ways = ways
+        self._slot_value_size = slot_value_size
+        self._slot_size = SLOT_HEADER.size + CACHE_KEY_SIZE + slot_value_size
+        self._lane_offset = LANES_OFFSET + (os.getpid() % NUM_COUNTER_LANES) * COUNTER_LANE.size
+
+        # serializes writers within the owning process
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def create(cls,
+               path: pathlib.Path,
+               size: int,
+               ways: int = DEFAULT_WAYS,
+               slot_value_size: int = DEFAULT_SLOT_VALUE_SIZE) -> 'SharedReadCache':
+        """
+        Create a new, empty cache segment of about ``size`` bytes at ``path``,
+        replacing any existing segment.
+        """
+        slot_size = SLOT_HEADER.size + CACHE_KEY_SIZE + slot_value_size
+        num_sets = (size - SLOTS_OFFSET) // (slot_size * ways)
+        if num_sets < 1:
+            raise ValidationError(f"Read cache size of {size} bytes is too small")
+
+        total_size = SLOTS_OFFSET + num_sets * ways * slot_size
+        with open(path, 'wb') as segment_file:
+            segment_file.truncate(total_size)
+
+        with open(path, 'r+b') as segment_file:
+            segment = mmap.mmap(segment_file.fileno(), total_size)
+
+        HEADER.pack_into(
+            segment,
+            0,
+            CACHE_MAGIC,
+            CACHE_VERSION,
+            num_sets,
+            ways,
+            slot_value_size,
+            0,
+            0,
+            0,
+        )
+        for slot_index in range(num_sets * ways):
+            SLOT_HEADER.pack_into(segment, SLOTS_OFFSET + slot_index * slot_size, 0, EMPTY_SLOT, 0)
+
+        return cls(path, segment)
+
+    @classmethod
+    def open(cls, path: pathlib.Path) -> 'SharedReadCache':
+        """
+        Attach to the existing cache segment at ``path``.
+        """
+        with open(path, 'r+b') as segment_file:
+            segment = mmap.mmap(segment_file.fileno(), 0)
+        return cls(path, segment)
+
+    def close(self) -> None:
+        self._segment.close()
+
+    def _slot_offsets(self, key: bytes) -> range:
+        set_index = int.from_bytes(key[:8], 'little') % self._num_sets
+        first_slot = SLOTS_OFFSET + set_index * self._ways * self._slot_size
+        return range(first_slot, first_slot + self._ways * self._slot_size, self._slot_size)
+
+    def _find(self, key: bytes) -> Optional[bytes]:
+        if len(key) != CACHE_KEY_SIZE:
+            return None
+
+        segment = self._segment
+        key_start = SLOT_HEADER.size
+        for offset in self._slot_offsets(key):
+            sequence, value_length, _ = SLOT_HEADER.unpack_from(segment, offset)
+            if sequence % 2 or value_length == EMPTY_SLOT:
+                continue
+            if segment[offset + key_start:offset + key_start + CACHE_KEY_SIZE] != key:
+                continue
+
+            value_start = offset + key_start + CACHE_KEY_SIZE
+            value = segment[value_start:value_start + value_length]
+
+            if U32.unpack_from(segment, offset)[0] != sequence:
+                # the slot was rewritten while we were reading it
+                return None
+
+            # A racy write, but it is only a hint for choosing what to evict
+            U64.pack_into(segment, offset + 8, _now())
+            return value
+
+        return None
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """
+        Return the cached value for ``key``, or ``None`` if it is not cached.
+        """
+        value = self._find(key)
+        hits, misses = COUNTER_LANE.unpack_from(self._segment, self._lane_offset)
+        if value is None:
+            COUNTER_LANE.pack_into(self._segment, self._lane_offset, hits, misses + 1)
+        else:
+            COUNTER_LANE.pack_into(self._segment, self._lane_offset, hits + 1, misses)
+        return value
+
+    def _increment(self, counter_index: int) -> None:
+        offset = COUNTERS_OFFSET + counter_index * U64.size
+        U64.pack_into(self._segment, offset, U64.unpack_from(self._segment, offset)[0] + 1)
+
+    def _write_slot(self, offset: int, value_length: int, key: bytes, value: bytes) -> None:
+        segment = self._segment
+        sequence = U32.unpack_from(segment, offset)[0]
+        # an odd sequence number marks the slot as being written
+        U32.pack_into(segment, offset, (sequence + 1) % 2**32)
+        key_start = offset + SLOT_HEADER.size
+        segment[key_start:key_start + CACHE_KEY_SIZE] = key
+        value_start = key_start + CACHE_KEY_SIZE
+        segment[value_start:value_start + len(value)] = value
+        U32.pack_into(segment, offset + 4, value_length)
+        U64.pack_into(segment, offset + 8, _now())
+        U32.pack_into(segment, offset, (sequence + 2) % 2**32)
+
+    def insert(self, key: bytes, value: bytes) -> bool:
+        """
+        Cache ``value`` under ``key``, evicting the least recently used entry
+        that ``key`` may occupy if necessary.  Returns whether it was cached.
+        """
+        if len(key) != CACHE_KEY_SIZE or len(value) > self._slot_value_size:
+            return False
+
+        with self._write_lock:
+            if self._find(key) is not None:
+                return True
+
+            victim_offset = None
+            oldest_access = None
+            for offset in self._slot_offsets(key):
+                _, value_length, last_access = SLOT_HEADER.unpack_from(self._segment, offset)
+                if value_length == EMPTY_SLOT:
+                    victim_offset = offset
+                    break
+                elif oldest_access is None or last_access < oldest_access:
+                    victim_offset = offset
+                    oldest_access = last_access
+            else:
+                self._increment(1)
+
+            self._write_slot(victim_offset, len(value), key, value)
+            self._increment(0)
+            return True
+
+    def invalidate(self, key: bytes) -> None:
+        """
+        Drop ``key`` from the cache, if it is cached.
+        """
+        if len(key) != CACHE_KEY_SIZE:
+            return
+
+        with self._write_lock:
+            key_start = SLOT_HEADER.size
+            for offset in self._slot_offsets(key):
+                _, value_length, _ = SLOT_HEADER.unpack_from(self._segment, offset)
+                if value_length == EMPTY_SLOT:
+                    continue
+                if self._segment[offset + key_start:offset + key_start + CACHE_KEY_SIZE] == key:
+                    self._write_slot(offset, EMPTY_SLOT, b'\x00' * CACHE_KEY_SIZE, b'')
+                    self._increment(2)
+
+    def get_stats(self) -> ReadCacheStats:
+        """
+        Return the counters summed over all processes using the cache.
+        """
+        header = HEADER.unpack_from(self._segment)
+        inserts, evictions, invalidations = header[-3:]
+        hits = misses = 0
+        for lane in range(NUM_COUNTER_LANES):
+            lane_hits, lane_misses = COUNTER_LANE.unpack_from(
+                self._segment,
+                LANES_OFFSET + lane * COUNTER_LANE.size,
+            )
+            hits += lane_hits
+            misses += lane_misses
+        return ReadCacheStats(hits, misses, inserts, evictions, invalidations)
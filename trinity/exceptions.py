@@ -36,6 +36,13 @@ class SyncRequestAlreadyProcessed(BaseTrinityError):
     pass
 
 
+class TooManyPendingRequests(BaseTrinityError):
+    """
+    Raised when a peer sends more requests than we are willing to queue up for it.
+    """
+    pass
+
+
 class OversizeObject(BaseTrinityError):
     """
     Raised when an object is bigger than comfortably fits in memory.
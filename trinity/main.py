@@ -105,7 +105,7 @@ def run_database_process(trinity_config: TrinityConfig, db_class: Type[LevelDB])
             chain_config = app_config.get_chain_config()
             initialize_database(chain_config, chaindb, base_db)
 
-        manager = DBManager(base_db)
+        manager = DBManager(base_db, read_cache_size=app_config.db_read_cache_size)
         with manager.run(trinity_config.database_ipc_path):
             try:
                 manager.wait_stopped()
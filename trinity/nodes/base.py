@@ -33,6 +33,8 @@ from trinity.protocol.common.peer_pool_event_bus import (
 )
 
 from .events import (
+    DatabaseReadCacheStatsRequest,
+    DatabaseReadCacheStatsResponse,
     NetworkIdRequest,
     NetworkIdResponse,
 )
@@ -70,6 +72,15 @@ class Node(BaseService, Generic[TPeer]):
                 req.broadcast_config()
             )
 
+    async def handle_read_cache_stats_requests(self) -> None:
+        async for req in self.wait_iter(self.event_bus.stream(DatabaseReadCacheStatsRequest)):
+            read_cache = self._base_db.read_cache
+            stats = None if read_cache is None else read_cache.get_stats()
+            await self.event_bus.broadcast(
+                DatabaseReadCacheStatsResponse(stats),
+                req.broadcast_config()
+            )
+
     _chain_config: Eth1ChainConfig = None
 
     @property
@@ -125,6 +136,7 @@ class Node(BaseService, Generic[TPeer]):
 
     async def _run(self) -> None:
         self.run_daemon_task(self.handle_network_id_requests())
+        self.run_daemon_task(self.handle_read_cache_stats_requests())
         self.run_daemon(self.get_p2p_server())
         self.run_daemon(self.get_event_server())
         await self.cancellation()
@@ -2,6 +2,7 @@ from dataclasses import (
     dataclass,
 )
 from typing import (
+    Optional,
     Type,
 )
 
@@ -10,6 +11,8 @@ from lahja import (
     BaseRequestResponseEvent,
 )
 
+from trinity.db.read_cache import ReadCacheStats
+
 
 @dataclass
 class NetworkIdResponse(BaseEvent):
@@ -22,3 +25,17 @@ class NetworkIdRequest(BaseRequestResponseEvent[NetworkIdResponse]):
     @staticmethod
     def expected_response_type() -> Type[NetworkIdResponse]:
         return NetworkIdResponse
+
+
+@dataclass
+class DatabaseReadCacheStatsResponse(BaseEvent):
+
+    # ``None`` if the database is served without a read cache
+    stats: Optional[ReadCacheStats]
+
+
+class DatabaseReadCacheStatsRequest(BaseRequestResponseEvent[DatabaseReadCacheStatsResponse]):
+
+    @staticmethod
+    def expected_response_type() -> Type[DatabaseReadCacheStatsResponse]:
+        return DatabaseReadCacheStatsResponse
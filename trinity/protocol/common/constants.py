@@ -1,3 +1,34 @@
 # Timeout used when performing the check to ensure peers are on the same side of chain splits as
 # us.
 CHAIN_SPLIT_CHECK_TIMEOUT = 15
+
+# Number of headers to look up from the database in one batch, when serving a header
+# request. Both ETH and LES peers ask for up to 192 headers at a time, but a request
+# may ask for more, and that should not become one huge database request.
+HEADER_LOOKUP_BATCH_SIZE = 192
+
+# Budget of database reads, per peer, for serving its requests. A peer asking for more
+# than this waits for its budget to refill, while requests of other peers are served.
+PEER_SERVING_READS_PER_SECOND = 2000
+PEER_SERVING_BURST_READS = 4000
+
+# Number of requests, from all peers, that are served at the same time, so that
+# serving peers never uses up the database bandwidth that our own sync needs.
+MAX_CONCURRENT_REQUESTS_SERVED = 8
+
+# Number of requests of a single peer that may wait for its budget. More requests
+# than that are dropped, instead of piling up.
+MAX_PENDING_REQUESTS_PER_PEER = 16
+
+# How often, in seconds, request servers log what they served. Peers that made no
+# request in that time are forgotten.
+REQUEST_SERVER_STATS_INTERVAL = 60
+
+# Estimated number of database reads to serve each requested header: one for the
+# canonical hash and one for the header.
+HEADER_READS_COST = 2
+
+# Estimated size, in bytes, of an RLP-encoded header. Mainnet headers are a little over
+# 500 bytes, depending on the size of their extra data. Used to report the bytes served
+# when the reply is encoded elsewhere, without encoding the headers just to measure them.
+ENCODED_HEADER_SIZE_ESTIMATE = 512
@@ -1,7 +1,6 @@
 from abc import abstractmethod
 from typing import (
     Any,
-    AsyncIterator,
     Iterable,
     Tuple,
     Type,
@@ -13,6 +12,7 @@ from lahja import EndpointAPI
 
 from eth_typing import Hash32
 from eth_utils import get_extended_debug_logger
+from eth_utils.toolz import partition_all
 
 from eth.exceptions import (
     HeaderNotFound,
@@ -20,13 +20,15 @@ from eth.exceptions import (
 from eth_typing import (
     BlockNumber,
 )
-from eth.rlp.headers import BlockHeader
+from eth.abc import BlockHeaderAPI
 from lahja import (
     BroadcastConfig,
 )
 
 from p2p.abc import CommandAPI, SessionAPI
 from p2p.cancellable import CancellableMixin
+from p2p.disconnect import DisconnectReason
+from p2p.exceptions import MalformedMessage
 from p2p.peer import (
     BasePeer,
     PeerSubscriber,
@@ -35,10 +37,16 @@ from p2p.service import BaseService
 
 from trinity._utils.headers import sequence_builder
 from trinity.db.eth1.header import BaseAsyncHeaderDB
+from trinity.exceptions import TooManyPendingRequests
+from trinity.protocol.common.constants import (
+    HEADER_LOOKUP_BATCH_SIZE,
+    REQUEST_SERVER_STATS_INTERVAL,
+)
 from trinity.protocol.common.peer import BasePeerPool
 from trinity.protocol.common.payloads import BlockHeadersQuery
+from trinity.protocol.common.serving import RequestServingScheduler
 
-from .events import PeerPoolMessageEvent
+from .events import DisconnectPeerEvent, PeerPoolMessageEvent
 
 
 class BaseRequestServer(BaseService, PeerSubscriber):
@@ -74,6 +82,11 @@ class BaseRequestServer(BaseService, PeerSubscriber):
             cmd: CommandAPI[Any]) -> None:
         try:
             await self._handle_msg(peer, cmd)
+        except MalformedMessage as err:
+            # The payloads are decoded when they are first read, so like Connection.run()
+            #   does for the messages it decodes, disconnect the peer that sent it.
+            self.logger.debug("Disconnecting peer %s for sending MalformedMessage: %s", peer, err)
+            peer.disconnect_nowait(DisconnectReason.BAD_PROTOCOL)
         except OperationCancelled:
             # Silently swallow OperationCancelled exceptions because otherwise they'll be caught
             # by the except below and treated as unexpected.
@@ -100,19 +113,37 @@ class BaseIsolatedRequestServer(BaseService):
             event_bus: EndpointAPI,
             broadcast_config: BroadcastConfig,
             subscribed_events: Iterable[Type[PeerPoolMessageEvent]],
-            token: CancelToken = None) -> None:
+            token: CancelToken = None,
+            scheduler: RequestServingScheduler = None) -> None:
         super().__init__(token)
         self.event_bus = event_bus
         self.broadcast_config = broadcast_config
         self._subscribed_events = subscribed_events
+        if scheduler is None:
+            self._scheduler = RequestServingScheduler()
+        else:
+            self._scheduler = scheduler
 
     async def _run(self) -> None:
 
         for event_type in self._subscribed_events:
             self.run_daemon_task(self.handle_stream(event_type))
 
+        self.run_daemon_task(self._periodically_report_stats())
+
         await self.cancellation()
 
+    async def _periodically_report_stats(self) -> None:
+        while self.is_operational:
+            await self.sleep(REQUEST_SERVER_STATS_INTERVAL)
+            self._report_stats()
+            self._scheduler.prune_idle_peers(REQUEST_SERVER_STATS_INTERVAL)
+
+    def _report_stats(self) -> None:
+        self.logger.debug("Served requests: %s", self._scheduler)
+        for session, stats in self._scheduler.get_busiest_peers(5):
+            self.logger.debug("Served %s: %s", session, stats)
+
     async def handle_stream(self, event_type: Type[PeerPoolMessageEvent]) -> None:
         while self.is_operational:
             async for event in self.wait_iter(self.event_bus.stream(event_type)):
@@ -123,7 +154,22 @@ class BaseIsolatedRequestServer(BaseService):
             session: SessionAPI,
             cmd: CommandAPI[Any]) -> None:
         try:
-            await self._handle_msg(session, cmd)
+            async with self._scheduler.reserve(session, self._estimate_cost(cmd)) as stats:
+                stats.num_bytes += await self._handle_msg(session, cmd)
+        except TooManyPendingRequests as exc:
+            self.logger.debug("Dropping request %s: %s", cmd, exc)
+        except MalformedMessage as err:
+            # The payloads are decoded when they are first read, so like Connection.run()
+            #   does for the messages it decodes, disconnect the peer that sent it.
+            self.logger.debug(
+                "Disconnecting peer %s for sending MalformedMessage: %s",
+                session,
+                err,
+            )
+            await self.event_bus.broadcast(
+                DisconnectPeerEvent(session, DisconnectReason.BAD_PROTOCOL),
+                self.broadcast_config,
+            )
         except OperationCancelled:
             # Silently swallow OperationCancelled exceptions because otherwise they'll be caught
             # by the except below and treated as unexpected.
@@ -134,7 +180,18 @@ class BaseIsolatedRequestServer(BaseService):
     @abstractmethod
     async def _handle_msg(self,
                           session: SessionAPI,
-                          cmd: CommandAPI[Any]) -> None:
+                          cmd: CommandAPI[Any]) -> int:
+        """
+        Identify the command, and react appropriately. Return the number of bytes
+        served in reply.
+        """
+        ...
+
+    @abstractmethod
+    def _estimate_cost(self, cmd: CommandAPI[Any]) -> int:
+        """
+        Estimate the number of database reads needed to serve the command.
+        """
         ...
 
 
@@ -146,7 +203,7 @@ class BasePeerRequestHandler(CancellableMixin):
         self.cancel_token = token
 
     async def lookup_headers(self,
-                             query: BlockHeadersQuery) -> Tuple[BlockHeader, ...]:
+                             query: BlockHeadersQuery) -> Tuple[BlockHeaderAPI, ...]:
         """
         Lookup :max_headers: headers starting at :block_number_or_hash:, skipping :skip: items
         between each, in reverse order if :reverse: is True.
@@ -159,11 +216,17 @@ class BasePeerRequestHandler(CancellableMixin):
                 query.block_number_or_hash)
             return tuple()
 
-        headers: Tuple[BlockHeader, ...] = tuple([
-            header
-            async for header
-            in self._generate_available_headers(block_numbers)
-        ])
+        headers: Tuple[BlockHeaderAPI, ...] = ()
+        for batch in partition_all(HEADER_LOOKUP_BATCH_SIZE, block_numbers):
+            batch_headers = await self.wait(
+                self.db.coro_get_canonical_block_headers_by_number(batch))
+            headers += batch_headers
+            if len(batch_headers) < len(batch):
+                self.logger.debug(
+                    "Peer requested header number %s that is unavailable, stopping search.",
+                    batch[len(batch_headers)],
+                )
+                break
         return headers
 
     async def _get_block_numbers_for_query(self,
@@ -188,19 +251,3 @@ class BasePeerRequestHandler(CancellableMixin):
             skip=query.skip,
             reverse=query.reverse,
         )
-
-    async def _generate_available_headers(
-            self, block_numbers: Tuple[BlockNumber, ...]) -> AsyncIterator[BlockHeader]:
-        """
-        Generates the headers requested, halting on the first header that is not locally available.
-        """
-        for block_num in block_numbers:
-            try:
-                yield await self.wait(
-                    self.db.coro_get_canonical_block_header_by_number(block_num))
-            except HeaderNotFound:
-                self.logger.debug(
-                    "Peer requested header number %s that is unavailable, stopping search.",
-                    block_num,
-                )
-                break
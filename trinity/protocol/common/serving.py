@@ -0,0 +1,146 @@
+import asyncio
+from collections import defaultdict
+import time
+from typing import (
+    AsyncIterator,
+    DefaultDict,
+    Dict,
+    Tuple,
+)
+
+from async_generator import asynccontextmanager
+
+from p2p.abc import SessionAPI
+from p2p.token_bucket import TokenBucket
+
+from trinity.exceptions import TooManyPendingRequests
+from trinity.protocol.common.constants import (
+    MAX_CONCURRENT_REQUESTS_SERVED,
+    MAX_PENDING_REQUESTS_PER_PEER,
+    PEER_SERVING_BURST_READS,
+    PEER_SERVING_READS_PER_SECOND,
+)
+
+
+class PeerServingStats:
+    """
+    What was served to a single peer, and how often it had to wait for its budget.
+    """
+    def __init__(self) -> None:
+        self.num_requests = 0
+        self.num_reads = 0
+        self.num_bytes = 0
+        self.num_throttled = 0
+        self.throttled_seconds = 0.0
+        self.num_dropped = 0
+        self.last_request_at = time.monotonic()
+
+    def __str__(self) -> str:
+        return (
+            f"requests={self.num_requests} reads={self.num_reads} "
+            f"served={self.num_bytes // 1024}KB throttled={self.num_throttled} "
+            f"({self.throttled_seconds:.1f}s) dropped={self.num_dropped}"
+        )
+
+
+class RequestServingScheduler:
+    """
+    Share the database among the peers that send us requests.
+
+    Each request has a cost: the estimated number of database reads needed to serve
+    it. Each peer gets a token bucket of reads, so a peer that asks for more than its
+    share waits for its bucket to refill, while other peers are served. On top of
+    that, only a limited number of requests are served at once, so that serving
+    peers never takes over the database bandwidth needed by our own sync.
+    """
+    def __init__(
+            self,
+            reads_per_second: float = PEER_SERVING_READS_PER_SECOND,
+            burst_reads: float = PEER_SERVING_BURST_READS,
+            max_concurrent: int = MAX_CONCURRENT_REQUESTS_SERVED,
+            max_pending_per_peer: int = MAX_PENDING_REQUESTS_PER_PEER) -> None:
+        self._reads_per_second = reads_per_second
+        self._burst_reads = burst_reads
+        self._max_pending_per_peer = max_pending_per_peer
+        self._concurrency = asyncio.Semaphore(max_concurrent)
+
+        self._buckets: Dict[SessionAPI, TokenBucket] = {}
+        self._num_pending: DefaultDict[SessionAPI, int] = defaultdict(int)
+        self.peer_stats: DefaultDict[SessionAPI, PeerServingStats] = defaultdict(PeerServingStats)
+
+    @asynccontextmanager
+    async def reserve(self, session: SessionAPI, cost: int) -> AsyncIterator[PeerServingStats]:
+        """
+        Wait until the peer has enough budget for a request with the given cost, and
+        until there is room to serve it. The request is served inside the context.
+
+        Raise :class:`~trinity.exceptions.TooManyPendingRequests` if the peer already
+        has too many requests waiting, instead of queueing up more.
+        """
+        stats = self.peer_stats[session]
+        stats.last_request_at = time.monotonic()
+
+        if self._num_pending[session] >= self._max_pending_per_peer:
+            stats.num_dropped += 1
+            raise TooManyPendingRequests(
+                f"{session} already has {self._num_pending[session]} requests waiting to be served"
+            )
+
+        self._num_pending[session] += 1
+        try:
+            bucket = self._get_bucket(session)
+            if bucket.can_take(cost):
+                bucket.take_nowait(cost)
+            else:
+                stats.num_throttled += 1
+                throttled_at = time.perf_counter()
+                await bucket.take(cost)
+                stats.throttled_seconds += time.perf_counter() - throttled_at
+
+            async with self._concurrency:
+                yield stats
+
+            stats.num_requests += 1
+            stats.num_reads += cost
+        finally:
+            self._num_pending[session] -= 1
+
+    def _get_bucket(self, session: SessionAPI) -> TokenBucket:
+        if session not in self._buckets:
+            self._buckets[session] = TokenBucket(self._reads_per_second, self._burst_reads)
+        return self._buckets[session]
+
+    def prune_idle_peers(self, idle_seconds: float) -> None:
+        """
+        Forget the budget and stats of peers that sent no request for ``idle_seconds``,
+        which are most likely disconnected.
+        """
+        idle_since = time.monotonic() - idle_seconds
+        idle_sessions = tuple(
+            session for session, stats in self.peer_stats.items()
+            if stats.last_request_at < idle_since and not self._num_pending[session]
+        )
+        for session in idle_sessions:
+            del self.peer_stats[session]
+            self._buckets.pop(session, None)
+            self._num_pending.pop(session, None)
+
+    def get_busiest_peers(self, count: int) -> Tuple[Tuple[SessionAPI, PeerServingStats], ...]:
+        """
+        Get the peers that cost us the most database reads, busiest first.
+        """
+        return tuple(sorted(
+            self.peer_stats.items(),
+            key=lambda session_stats: session_stats[1].num_reads,
+            reverse=True,
+        )[:count])
+
+    def __str__(self) -> str:
+        all_stats = tuple(self.peer_stats.values())
+        return (
+            f"peers={len(all_stats)} "
+            f"requests={sum(stats.num_requests for stats in all_stats)} "
+            f"served={sum(stats.num_bytes for stats in all_stats) // 1024}KB "
+            f"throttled={sum(stats.num_throttled for stats in all_stats)} "
+            f"dropped={sum(stats.num_dropped for stats in all_stats)}"
+        )
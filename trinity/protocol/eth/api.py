@@ -186,6 +186,15 @@ class ETHAPI(Application):
         )
         self.protocol.send(BlockBodies(block_bodies))
 
+    def send_encoded_block_headers(self, encoded_headers: bytes) -> None:
+        self.protocol.send(BlockHeaders.from_encoded_payload(encoded_headers))
+
+    def send_encoded_block_bodies(self, encoded_bodies: bytes) -> None:
+        self.protocol.send(BlockBodies.from_encoded_payload(encoded_bodies))
+
+    def send_encoded_receipts(self, encoded_receipts: bytes) -> None:
+        self.protocol.send(Receipts.from_encoded_payload(encoded_receipts))
+
     def send_get_receipts(self, block_hashes: Sequence[Hash32]) -> None:
         self.protocol.send(GetReceipts(tuple(block_hashes)))
 
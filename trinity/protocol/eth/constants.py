@@ -4,3 +4,20 @@ MAX_STATE_FETCH = 384
 MAX_BODIES_FETCH = 128
 MAX_RECEIPTS_FETCH = 256
 MAX_HEADERS_FETCH = 192
+
+# Byte budgets for the already-encoded replies that the request server keeps around,
+# because syncing peers ask for the same recent headers, bodies and receipts over and over.
+MAX_CACHED_HEADER_BYTES = 8 * 1024 * 1024
+MAX_CACHED_BODY_BYTES = 64 * 1024 * 1024
+MAX_CACHED_RECEIPTS_BYTES = 32 * 1024 * 1024
+
+# Estimated number of database reads to serve each item of a request, used to share
+# the database among the peers that send us requests. See also HEADER_READS_COST.
+BLOCK_BODY_READS_COST = 8
+RECEIPTS_READS_COST = 8
+NODE_DATA_READS_COST = 1
+
+# Responses with fewer bytes of transactions or receipts than this have their trie roots
+# built in the calling thread, because shipping them to a worker process costs more
+# than building the tries.
+MIN_PARALLEL_TRIE_ROOT_BYTES = 64 * 1024
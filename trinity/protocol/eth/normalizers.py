@@ -7,7 +7,6 @@ from eth_utils import (
     to_tuple,
 )
 from eth.abc import BlockHeaderAPI
-from eth.db.trie import make_trie_root_and_nodes
 from eth_hash.auto import keccak
 import rlp
 
@@ -19,6 +18,7 @@ from trinity.protocol.common.typing import (
     NodeDataBundles,
     ReceiptsBundles,
 )
+from trinity.protocol.eth.trie_roots import build_trie_roots_and_nodes
 
 from .commands import (
     BlockHeaders,
@@ -52,7 +52,9 @@ class ReceiptsNormalizer(BaseNormalizer[Receipts, ReceiptsBundles]):
 
     @staticmethod
     def normalize_result(cmd: Receipts) -> ReceiptsBundles:
-        trie_roots_and_data = map(make_trie_root_and_nodes, cmd.payload)
+        trie_roots_and_data = build_trie_roots_and_nodes(tuple(
+            tuple(map(rlp.encode, receipts)) for receipts in cmd.payload
+        ))
         return tuple(zip(cmd.payload, trie_roots_and_data))
 
 
@@ -62,7 +64,9 @@ class GetBlockBodiesNormalizer(BaseNormalizer[BlockBodies, BlockBodyBundles]):
     @staticmethod
     @to_tuple
     def normalize_result(cmd: BlockBodies) -> Iterable[BlockBodyBundle]:
-        for body in cmd.payload:
+        transaction_roots_and_nodes = build_trie_roots_and_nodes(tuple(
+            tuple(map(rlp.encode, body.transactions)) for body in cmd.payload
+        ))
+        for body, transaction_root_and_nodes in zip(cmd.payload, transaction_roots_and_nodes):
             uncle_hashes = keccak(rlp.encode(body.uncles))
-            transaction_root_and_nodes = make_trie_root_and_nodes(body.transactions)
             yield body, transaction_root_and_nodes, uncle_hashes
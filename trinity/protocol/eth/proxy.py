@@ -169,19 +169,25 @@ class ProxyETHAPI:
 
         return response.bundles
 
+    #
+    # The payloads of the commands that are sent through the peer pool are encoded here,
+    # so that they cross the process boundary as opaque RLP bytes. The peer pool then
+    # forwards the bytes to the peer as-is, instead of re-encoding the payloads in the
+    # networking process.
+    #
     def send_transactions(self,
                           txns: Sequence[SignedTransactionAPI]) -> None:
-        command = Transactions(tuple(txns))
+        command = Transactions.from_encoded_payload(
+            Transactions.serialization_codec.encode(tuple(txns))
+        )
         self._event_bus.broadcast_nowait(
             SendTransactionsEvent(self.session, command),
             self._broadcast_config,
         )
 
     def send_block_headers(self, headers: Sequence[BlockHeaderAPI]) -> None:
-        command = BlockHeaders(tuple(headers))
-        self._event_bus.broadcast_nowait(
-            SendBlockHeadersEvent(self.session, command),
-            self._broadcast_config,
+        self.send_encoded_block_headers(
+            BlockHeaders.serialization_codec.encode(tuple(headers))
         )
 
     def send_block_bodies(self, blocks: Sequence[BlockAPI]) -> None:
@@ -189,21 +195,51 @@ class ProxyETHAPI:
             BlockBody(block.transactions, block.uncles)
             for block in blocks
         )
-        command = BlockBodies(block_bodies)
+        self.send_encoded_block_bodies(BlockBodies.serialization_codec.encode(block_bodies))
+
+    def send_receipts(self, receipts: Sequence[Sequence[ReceiptAPI]]) -> None:
+        self.send_encoded_receipts(
+            Receipts.serialization_codec.encode(tuple(map(tuple, receipts)))
+        )
+
+    def send_encoded_block_headers(self, encoded_headers: bytes) -> None:
+        """
+        Send a ``BlockHeaders`` reply, given its already RLP-encoded payload.
+        """
+        command = BlockHeaders.from_encoded_payload(encoded_headers)
+        self._event_bus.broadcast_nowait(
+            SendBlockHeadersEvent(self.session, command),
+            self._broadcast_config,
+        )
+
+    def send_encoded_block_bodies(self, encoded_bodies: bytes) -> None:
+        """
+        Send a ``BlockBodies`` reply, given its already RLP-encoded payload.
+        """
+        command = BlockBodies.from_encoded_payload(encoded_bodies)
         self._event_bus.broadcast_nowait(
             SendBlockBodiesEvent(self.session, command),
             self._broadcast_config,
         )
 
-    def send_receipts(self, receipts: Sequence[Sequence[ReceiptAPI]]) -> None:
-        command = Receipts(tuple(map(tuple, receipts)))
+    def send_encoded_receipts(self, encoded_receipts: bytes) -> None:
+        """
+        Send a ``Receipts`` reply, given its already RLP-encoded payload.
+        """
+        command = Receipts.from_encoded_payload(encoded_receipts)
         self._event_bus.broadcast_nowait(
             SendReceiptsEvent(self.session, command),
             self._broadcast_config,
         )
 
     def send_node_data(self, nodes: Sequence[bytes]) -> None:
-        command = NodeData(tuple(nodes))
+        self.send_encoded_node_data(NodeData.serialization_codec.encode(tuple(nodes)))
+
+    def send_encoded_node_data(self, encoded_nodes: bytes) -> None:
+        """
+        Send a ``NodeData`` reply, given its already RLP-encoded payload.
+        """
+        command = NodeData.from_encoded_payload(encoded_nodes)
         self._event_bus.broadcast_nowait(
             SendNodeDataEvent(self.session, command),
             self._broadcast_config,
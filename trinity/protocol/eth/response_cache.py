@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from typing import (
+    Iterable,
+    Optional,
+)
+
+from eth_typing import Hash32
+
+from trinity._utils.rlp import encode_rlp_list
+from trinity.protocol.eth.constants import (
+    MAX_CACHED_BODY_BYTES,
+    MAX_CACHED_HEADER_BYTES,
+    MAX_CACHED_RECEIPTS_BYTES,
+)
+
+
+class EncodedLRU:
+    """
+    A least-recently-used cache of RLP-encoded values, keyed by hash, and bounded
+    by the total size of the values rather than by their count.
+    """
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._values: 'OrderedDict[Hash32, bytes]' = OrderedDict()
+        self.num_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hash32) -> Optional[bytes]:
+        try:
+            encoded = self._values[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        else:
+            self.hits += 1
+            self._values.move_to_end(key)
+            return encoded
+
+    def add(self, key: Hash32, encoded: bytes) -> bytes:
+        if len(encoded) > self._max_bytes:
+            return encoded
+
+        if key in self._values:
+            self.num_bytes -= len(self._values.pop(key))
+        self._values[key] = encoded
+        self.num_bytes += len(encoded)
+
+        while self.num_bytes > self._max_bytes:
+            _, evicted = self._values.popitem(last=False)
+            self.num_bytes -= len(evicted)
+
+        return encoded
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: Hash32) -> bool:
+        return key in self._values
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        else:
+            return self.hits / lookups
+
+
+class ETHResponseCache:
+    """
+    Keep the RLP encoding of recently served headers, block bodies and receipts, so
+    that a reply to a repeated request is assembled by concatenating cached bytes,
+    instead of reading, decoding and re-encoding every item.
+
+    Entries are keyed by header hash, which commits to the header, the body and the
+    receipts, so a reorg never makes an entry stale. Reorgs only change which hashes
+    are canonical, and that is always looked up in the database.
+    """
+    def __init__(
+            self,
+            max_header_bytes: int = MAX_CACHED_HEADER_BYTES,
+            max_body_bytes: int = MAX_CACHED_BODY_BYTES,
+            max_receipts_bytes: int = MAX_CACHED_RECEIPTS_BYTES) -> None:
+        self.headers = EncodedLRU(max_header_bytes)
+        self.bodies = EncodedLRU(max_body_bytes)
+        self.receipts = EncodedLRU(max_receipts_bytes)
+
+        self.bytes_served = 0
+
+    def encode_reply(self, encoded_items: Iterable[bytes]) -> bytes:
+        encoded_reply = encode_rlp_list(encoded_items)
+        self.bytes_served += len(encoded_reply)
+        return encoded_reply
+
+    def __str__(self) -> str:
+        return (
+            f"headers={len(self.headers)} hit={self.headers.hit_rate:.0%}  "
+            f"bodies={len(self.bodies)} hit={self.bodies.hit_rate:.0%}  "
+            f"receipts={len(self.receipts)} hit={self.receipts.hit_rate:.0%}  "
+            f"cached={self._num_bytes_cached() // 1024}KB  "
+            f"served={self.bytes_served // 1024}KB"
+        )
+
+    def _num_bytes_cached(self) -> int:
+        return self.headers.num_bytes + self.bodies.num_bytes + self.receipts.num_bytes
@@ -5,12 +5,14 @@ from typing import (
 from cancel_token import (
     CancelToken,
 )
+from eth.abc import BlockHeaderAPI
 from eth.exceptions import (
     HeaderNotFound,
 )
 from eth_utils import (
     to_hex,
 )
+import rlp
 from lahja import (
     BroadcastConfig,
     EndpointAPI,
@@ -22,6 +24,7 @@ from trie.exceptions import (
 from p2p.abc import CommandAPI, SessionAPI
 
 from trinity.db.eth1.chain import BaseAsyncChainDB
+from trinity.protocol.common.constants import HEADER_READS_COST
 from trinity.protocol.common.servers import (
     BaseIsolatedRequestServer,
     BasePeerRequestHandler,
@@ -36,16 +39,17 @@ from trinity.protocol.eth.events import (
 from trinity.protocol.eth.peer import (
     ETHProxyPeer,
 )
-
-from eth.rlp.receipts import Receipt
-from eth.rlp.transactions import BaseTransactionFields
+from trinity.protocol.eth.response_cache import ETHResponseCache
 
 from trinity.protocol.eth.constants import (
+    BLOCK_BODY_READS_COST,
     MAX_BODIES_FETCH,
+    MAX_HEADERS_FETCH,
     MAX_RECEIPTS_FETCH,
     MAX_STATE_FETCH,
+    NODE_DATA_READS_COST,
+    RECEIPTS_READS_COST,
 )
-from trinity.rlp.block_body import BlockBody
 
 from .commands import (
     GetBlockHeaders,
@@ -56,29 +60,53 @@ from .commands import (
 
 
 class ETHPeerRequestHandler(BasePeerRequestHandler):
-    def __init__(self, db: BaseAsyncChainDB, token: CancelToken) -> None:
+    def __init__(
+            self,
+            db: BaseAsyncChainDB,
+            token: CancelToken,
+            response_cache: ETHResponseCache = None) -> None:
         super().__init__(db, token)
         self.db: BaseAsyncChainDB = db
+        if response_cache is None:
+            self.response_cache = ETHResponseCache()
+        else:
+            self.response_cache = response_cache
 
     async def handle_get_block_headers(
             self,
             peer: ETHProxyPeer,
-            command: GetBlockHeaders) -> None:
+            command: GetBlockHeaders) -> int:
         self.logger.debug("%s requested headers: %s", peer, command.payload)
 
         headers = await self.lookup_headers(command.payload)
+        encoded_headers = tuple(self._encode_header(header) for header in headers)
         self.logger.debug2("Replying to %s with %d headers", peer, len(headers))
-        peer.eth_api.send_block_headers(headers)
+        encoded_reply = self.response_cache.encode_reply(encoded_headers)
+        peer.eth_api.send_encoded_block_headers(encoded_reply)
+        return len(encoded_reply)
+
+    def _encode_header(self, header: BlockHeaderAPI) -> bytes:
+        cached_headers = self.response_cache.headers
+        encoded_header = cached_headers.get(header.hash)
+        if encoded_header is None:
+            return cached_headers.add(header.hash, rlp.encode(header))
+        else:
+            return encoded_header
 
     async def handle_get_block_bodies(self,
                                       peer: ETHProxyPeer,
-                                      command: GetBlockBodies) -> None:
+                                      command: GetBlockBodies) -> int:
         block_hashes = command.payload
 
         self.logger.debug2("%s requested bodies for %d blocks", peer, len(block_hashes))
-        bodies = []
+        encoded_bodies = []
         # Only serve up to MAX_BODIES_FETCH items in every request.
         for block_hash in block_hashes[:MAX_BODIES_FETCH]:
+            encoded_body = self.response_cache.bodies.get(block_hash)
+            if encoded_body is not None:
+                encoded_bodies.append(encoded_body)
+                continue
+
             try:
                 header = await self.wait(self.db.coro_get_block_header_by_hash(block_hash))
             except HeaderNotFound:
@@ -87,8 +115,7 @@ class ETHPeerRequestHandler(BasePeerRequestHandler):
                 )
                 continue
             try:
-                transactions = await self.wait(
-                    self.db.coro_get_block_transactions(header, BaseTransactionFields))
+                encoded_body = await self.wait(self.db.coro_get_encoded_block_body(header))
             except MissingTrieNode as exc:
                 self.logger.debug(
                     "%s asked for block transactions we don't have: %s, "
@@ -98,24 +125,29 @@ class ETHPeerRequestHandler(BasePeerRequestHandler):
                     exc,
                 )
                 continue
-            try:
-                uncles = await self.wait(self.db.coro_get_block_uncles(header.uncles_hash))
             except HeaderNotFound as exc:
                 self.logger.debug(
                     "%s asked for a block with uncles we don't have: %s", peer, exc
                 )
                 continue
-            bodies.append(BlockBody(transactions, uncles))
-        self.logger.debug2("Replying to %s with %d block bodies", peer, len(bodies))
-        peer.eth_api.send_block_bodies(bodies)
+            encoded_bodies.append(self.response_cache.bodies.add(block_hash, encoded_body))
+        self.logger.debug2("Replying to %s with %d block bodies", peer, len(encoded_bodies))
+        encoded_reply = self.response_cache.encode_reply(encoded_bodies)
+        peer.eth_api.send_encoded_block_bodies(encoded_reply)
+        return len(encoded_reply)
 
-    async def handle_get_receipts(self, peer: ETHProxyPeer, command: GetReceipts) -> None:
+    async def handle_get_receipts(self, peer: ETHProxyPeer, command: GetReceipts) -> int:
         block_hashes = command.payload
 
         self.logger.debug2("%s requested receipts for %d blocks", peer, len(block_hashes))
-        receipts = []
+        encoded_receipts = []
         # Only serve up to MAX_RECEIPTS_FETCH items in every request.
         for block_hash in block_hashes[:MAX_RECEIPTS_FETCH]:
+            encoded_block_receipts = self.response_cache.receipts.get(block_hash)
+            if encoded_block_receipts is not None:
+                encoded_receipts.append(encoded_block_receipts)
+                continue
+
             try:
                 header = await self.wait(self.db.coro_get_block_header_by_hash(block_hash))
             except HeaderNotFound:
@@ -124,7 +156,7 @@ class ETHPeerRequestHandler(BasePeerRequestHandler):
                 )
                 continue
             try:
-                block_receipts = await self.wait(self.db.coro_get_receipts(header, Receipt))
+                encoded_block_receipts = await self.wait(self.db.coro_get_encoded_receipts(header))
             except MissingTrieNode as exc:
                 self.logger.debug(
                     "%s asked for block receipts we don't have: %s, "
@@ -134,20 +166,26 @@ class ETHPeerRequestHandler(BasePeerRequestHandler):
                     exc,
                 )
                 continue
-            receipts.append(block_receipts)
-        self.logger.debug2("Replying to %s with receipts for %d blocks", peer, len(receipts))
-        peer.eth_api.send_receipts(receipts)
+            encoded_receipts.append(
+                self.response_cache.receipts.add(block_hash, encoded_block_receipts)
+            )
+        self.logger.debug2(
+            "Replying to %s with receipts for %d blocks", peer, len(encoded_receipts)
+        )
+        encoded_reply = self.response_cache.encode_reply(encoded_receipts)
+        peer.eth_api.send_encoded_receipts(encoded_reply)
+        return len(encoded_reply)
 
-    async def handle_get_node_data(self, peer: ETHProxyPeer, command: GetNodeData) -> None:
+    async def handle_get_node_data(self, peer: ETHProxyPeer, command: GetNodeData) -> int:
         node_hashes = command.payload
 
         self.logger.debug2("%s requested %d trie nodes", peer, len(node_hashes))
         nodes = []
         # Only serve up to MAX_STATE_FETCH items in every request.
-        for node_hash in node_hashes[:MAX_STATE_FETCH]:
-            try:
-                node = await self.wait(self.db.coro_get(node_hash))
-            except KeyError:
+        requested_hashes = node_hashes[:MAX_STATE_FETCH]
+        values = await self.wait(self.db.coro_multi_get(requested_hashes))
+        for node_hash, node in zip(requested_hashes, values):
+            if node is None:
                 self.logger.debug(
                     "%s asked for a trie node we don't have: %s", peer, to_hex(node_hash)
                 )
@@ -155,6 +193,7 @@ class ETHPeerRequestHandler(BasePeerRequestHandler):
             nodes.append(node)
         self.logger.debug2("Replying to %s with %d trie nodes", peer, len(nodes))
         peer.eth_api.send_node_data(tuple(nodes))
+        return sum(len(node) for node in nodes)
 
 
 class ETHRequestServer(BaseIsolatedRequestServer):
@@ -177,20 +216,37 @@ class ETHRequestServer(BaseIsolatedRequestServer):
         )
         self._handler = ETHPeerRequestHandler(db, self.cancel_token)
 
+    def _report_stats(self) -> None:
+        super()._report_stats()
+        self.logger.debug("Cached replies: %s", self._handler.response_cache)
+
+    def _estimate_cost(self, cmd: CommandAPI[Any]) -> int:
+        if isinstance(cmd, commands.GetBlockHeaders):
+            return HEADER_READS_COST * min(cmd.payload.max_headers, MAX_HEADERS_FETCH)
+        elif isinstance(cmd, commands.GetBlockBodies):
+            return BLOCK_BODY_READS_COST * min(len(cmd.payload), MAX_BODIES_FETCH)
+        elif isinstance(cmd, commands.GetReceipts):
+            return RECEIPTS_READS_COST * min(len(cmd.payload), MAX_RECEIPTS_FETCH)
+        elif isinstance(cmd, commands.GetNodeData):
+            return NODE_DATA_READS_COST * min(len(cmd.payload), MAX_STATE_FETCH)
+        else:
+            return 0
+
     async def _handle_msg(self,
                           session: SessionAPI,
-                          cmd: CommandAPI[Any]) -> None:
+                          cmd: CommandAPI[Any]) -> int:
 
         self.logger.debug2("Peer %s requested %s", session, cmd)
         peer = ETHProxyPeer.from_session(session, self.event_bus, self.broadcast_config)
 
         if isinstance(cmd, commands.GetBlockHeaders):
-            await self._handler.handle_get_block_headers(peer, cmd)
+            return await self._handler.handle_get_block_headers(peer, cmd)
         elif isinstance(cmd, commands.GetBlockBodies):
-            await self._handler.handle_get_block_bodies(peer, cmd)
+            return await self._handler.handle_get_block_bodies(peer, cmd)
         elif isinstance(cmd, commands.GetReceipts):
-            await self._handler.handle_get_receipts(peer, cmd)
+            return await self._handler.handle_get_receipts(peer, cmd)
         elif isinstance(cmd, commands.GetNodeData):
-            await self._handler.handle_get_node_data(peer, cmd)
+            return await self._handler.handle_get_node_data(peer, cmd)
         else:
             self.logger.debug("%s msg not handled yet, needs to be implemented", cmd)
+            return 0
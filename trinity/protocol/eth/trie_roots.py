@@ -0,0 +1,71 @@
+from concurrent.futures.process import BrokenProcessPool
+import logging
+from typing import (
+    Dict,
+    Sequence,
+    Tuple,
+)
+
+from eth.constants import BLANK_ROOT_HASH
+from eth.db.trie import TrieRootAndData
+from eth_typing import Hash32
+from eth_utils.toolz import partition_all
+import rlp
+from trie import HexaryTrie
+
+from trinity._utils.mp import (
+    NUM_WORKER_PROCESSES,
+    discard_worker_pool,
+    get_worker_pool,
+)
+from trinity.protocol.eth.constants import MIN_PARALLEL_TRIE_ROOT_BYTES
+
+logger = logging.getLogger('trinity.protocol.eth.trie_roots')
+
+
+def make_indexed_trie_root_and_nodes(encoded_items: Sequence[bytes]) -> TrieRootAndData:
+    """
+    Build the trie of the given RLP-encoded transactions or receipts, keyed by their
+    index in the block, and return its root hash and all of its nodes.
+    """
+    kv_store: Dict[Hash32, bytes] = {}
+    trie = HexaryTrie(kv_store, BLANK_ROOT_HASH)
+    with trie.squash_changes() as memory_trie:
+        for index, item in enumerate(encoded_items):
+            index_key = rlp.encode(index, sedes=rlp.sedes.big_endian_int)
+            memory_trie[index_key] = item
+    return trie.root_hash, kv_store
+
+
+def make_indexed_trie_roots_and_nodes(
+        encoded_item_lists: Sequence[Sequence[bytes]]) -> Tuple[TrieRootAndData, ...]:
+    return tuple(map(make_indexed_trie_root_and_nodes, encoded_item_lists))
+
+
+def build_trie_roots_and_nodes(
+        encoded_item_lists: Sequence[Sequence[bytes]],
+        min_parallel_bytes: int = MIN_PARALLEL_TRIE_ROOT_BYTES) -> Tuple[TrieRootAndData, ...]:
+    """
+    Build the trie roots and nodes of each list of RLP-encoded transactions or
+    receipts, like the ones in a BlockBodies or Receipts response, in order.
+
+    Big batches are split among a pool of worker processes, so that building the
+    tries of many responses at once uses all cores. This blocks until all tries are
+    built, so call it from a thread, like the slow normalizers are.
+    """
+    num_bytes = sum(len(item) for items in encoded_item_lists for item in items)
+    if num_bytes < min_parallel_bytes:
+        return make_indexed_trie_roots_and_nodes(encoded_item_lists)
+
+    chunk_size = -(-len(encoded_item_lists) // NUM_WORKER_PROCESSES)
+    pool = get_worker_pool()
+    try:
+        chunk_results = pool.map(
+            make_indexed_trie_roots_and_nodes,
+            partition_all(chunk_size, encoded_item_lists),
+        )
+        return tuple(result for chunk in chunk_results for result in chunk)
+    except BrokenProcessPool:
+        logger.exception("Trie root worker pool died, restarting it")
+        discard_worker_pool(pool)
+        return make_indexed_trie_roots_and_nodes(encoded_item_lists)
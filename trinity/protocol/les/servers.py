@@ -9,11 +9,16 @@ from lahja import (
 from p2p.abc import CommandAPI, SessionAPI
 
 from trinity.db.eth1.header import BaseAsyncHeaderDB
+from trinity.protocol.common.constants import (
+    ENCODED_HEADER_SIZE_ESTIMATE,
+    HEADER_READS_COST,
+)
 from trinity.protocol.common.servers import (
     BaseIsolatedRequestServer,
     BasePeerRequestHandler,
 )
 from trinity.protocol.les import commands
+from trinity.protocol.les.constants import MAX_HEADERS_FETCH
 from trinity.protocol.les.events import GetBlockHeadersEvent
 from trinity.protocol.les.peer import (
     LESProxyPeer,
@@ -23,12 +28,14 @@ from trinity.protocol.les.peer import (
 class LESPeerRequestHandler(BasePeerRequestHandler):
     async def handle_get_block_headers(self,
                                        peer: LESProxyPeer,
-                                       cmd: commands.GetBlockHeaders) -> None:
+                                       cmd: commands.GetBlockHeaders) -> int:
 
         self.logger.debug("Peer %s made header request: %s", peer, cmd)
         headers = await self.lookup_headers(cmd.payload.query)
         self.logger.debug2("Replying to %s with %d headers", peer, len(headers))
         peer.les_api.send_block_headers(headers, request_id=cmd.payload.request_id)
+        # the reply is encoded in the networking process, so only estimate its size
+        return ENCODED_HEADER_SIZE_ESTIMATE * len(headers)
 
 
 class LightRequestServer(BaseIsolatedRequestServer):
@@ -51,13 +58,20 @@ class LightRequestServer(BaseIsolatedRequestServer):
         )
         self._handler = LESPeerRequestHandler(db, self.cancel_token)
 
+    def _estimate_cost(self, cmd: CommandAPI[Any]) -> int:
+        if isinstance(cmd, commands.GetBlockHeaders):
+            return HEADER_READS_COST * min(cmd.payload.query.max_headers, MAX_HEADERS_FETCH)
+        else:
+            return 0
+
     async def _handle_msg(self,
                           session: SessionAPI,
-                          cmd: CommandAPI[Any]) -> None:
+                          cmd: CommandAPI[Any]) -> int:
 
         self.logger.debug2("Peer %s requested %s", session, cmd)
         peer = LESProxyPeer.from_session(session, self.event_bus, self.broadcast_config)
         if isinstance(cmd, commands.GetBlockHeaders):
-            await self._handler.handle_get_block_headers(peer, cmd)
+            return await self._handler.handle_get_block_headers(peer, cmd)
         else:
             self.logger.debug("%s msg not handled yet, needs to be implemented", cmd)
+            return 0
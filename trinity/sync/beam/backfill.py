@@ -1,8 +1,10 @@
 import asyncio
 from collections import Counter
+import itertools
+import time
 import typing
 from typing import (
-    Iterable,
+    Dict,
     List,
     Set,
     Tuple,
@@ -12,14 +14,18 @@ from cancel_token import CancelToken, OperationCancelled
 from eth.abc import AtomicDatabaseAPI
 from eth_typing import Hash32
 import rlp
+from trie.utils.nodes import extract_key
 
 from p2p.exceptions import BaseP2PError, PeerConnectionLost
 from p2p.service import BaseService
 
+from trinity._utils.db import multi_get
+from trinity.protocol.common.typing import NodeDataBundles
 from trinity.protocol.eth.peer import ETHPeer, ETHPeerPool
 from trinity.sync.beam.constants import (
     GAP_BETWEEN_TESTS,
 )
+from trinity.sync.beam.dedup import NodeRequestRegistry
 
 from .queen import (
     QueeningQueue,
@@ -28,13 +34,88 @@ from .queen import (
 
 REQUEST_SIZE = 16
 
+# How many queued node hashes to look up in the database at once while walking the trie
+WALK_LOOKUP_SIZE = 256
+
+# The path to a trie node, as the nibbles of the keys below it
+Nibbles = Tuple[int, ...]
+
+# (path, node hash) of a trie node that is queued for the walk
+PathNode = Tuple[Nibbles, Hash32]
+
+
+class SchemaV1:
+    @staticmethod
+    def make_range_checkpoint_lookup_key(prefix: Nibbles) -> bytes:
+        return b"v1:beam_backfill_checkpoint:" + bytes(prefix)
+
+
+class TrieRange:
+    """
+    All the nodes of the state trie with paths that start with the same prefix.
+
+    Each range is walked depth-first on its own, and requested from one peer at
+    a time, so that several peers backfill different parts of the trie at once.
+    """
+    def __init__(self, prefix: Nibbles, checkpoint: Nibbles = ()) -> None:
+        self.prefix = prefix
+
+        # Pending nodes to download, as a stack with the lowest path on top
+        self.pending: List[PathNode] = []
+        self.is_missing: Set[Hash32] = set()
+
+        # Nodes that are currently requested from a peer
+        self.in_flight: Tuple[PathNode, ...] = ()
+        self.is_requesting = False
+
+        # Every path below the checkpoint was walked during the current pass
+        #   over the range, so skip it, even at a newer state root.
+        self.checkpoint = checkpoint
+        self._is_walking = False
+
+        self.num_added = 0
+        self.num_missed = 0
+        self.num_skipped = 0
+
+    def push(self, path: Nibbles, node_hash: Hash32) -> None:
+        if path < self.checkpoint[:len(path)]:
+            self.num_skipped += 1
+        else:
+            self.pending.append((path, node_hash))
+            self._is_walking = True
+
+    def update_checkpoint(self) -> None:
+        """
+        Move the checkpoint up to the lowest path that is not walked yet. When the
+        range runs out of nodes, the pass is done, and the next one starts over.
+        """
+        if not self._is_walking:
+            return
+
+        paths = [path for path, _ in itertools.chain(self.pending, self.in_flight)]
+        if paths:
+            self.checkpoint = min(paths)
+        else:
+            self.checkpoint = ()
+            self._is_walking = False
+
+    @property
+    def name(self) -> str:
+        if self.prefix:
+            return ''.join(f'{nibble:x}' for nibble in self.prefix)
+        else:
+            return 'root'
+
 
 class BeamStateBackfill(BaseService, QueenTrackerAPI):
     """
     Use a very simple strategy to fill in state in the background.
 
-    Ask each peer in sequence for some nodes, ignoring the lowest RTT node.
-    Reduce memory pressure by using a depth-first strategy.
+    The state trie is split into ranges by the first nibble of the key. Every
+    idle peer gets a request for the next range that is not being requested
+    yet, except for the lowest RTT node. Reduce memory pressure by walking
+    each range depth-first. Each range records how far it was walked, so that
+    the walk resumes after a restart.
 
     An intended side-effect is to build & maintain an accurate measurement of
     the round-trip-time that peers take to respond to GetNodeData commands.
@@ -51,7 +132,8 @@ class BeamStateBackfill(BaseService, QueenTrackerAPI):
             self,
             db: AtomicDatabaseAPI,
             peer_pool: ETHPeerPool,
-            token: CancelToken = None) -> None:
+            token: CancelToken = None,
+            node_requests: NodeRequestRegistry = None) -> None:
 
         # in case there is no token set, make sure this gets cancelled when the peer pool does
         if token is None:
@@ -62,13 +144,24 @@ class BeamStateBackfill(BaseService, QueenTrackerAPI):
 
         self._db = db
 
-        # Pending nodes to download
-        self._node_hashes: List[Hash32] = []
+        # The root node has its own range, the rest is split up by the first nibble
+        root_prefix: Nibbles = ()
+        prefixes = (root_prefix, ) + tuple((nibble, ) for nibble in range(16))
+        self._ranges: Dict[Nibbles, TrieRange] = {
+            prefix: TrieRange(prefix, self._load_checkpoint(prefix))
+            for prefix in prefixes
+        }
+        # Which range is the first candidate for the next request
+        self._next_range_index = 0
 
         self._peer_pool = peer_pool
         self._available_peers = asyncio.Event()
 
-        self._is_missing: Set[Hash32] = set()
+        # Nodes in flight to any of beam sync's state downloaders
+        if node_requests is None:
+            self._node_requests = NodeRequestRegistry()
+        else:
+            self._node_requests = node_requests
 
         self._num_requests_by_peer = Counter()
 
@@ -87,17 +180,16 @@ class BeamStateBackfill(BaseService, QueenTrackerAPI):
 
         await self.wait(self._run_backfill())
 
+    async def _cleanup(self) -> None:
+        self._save_checkpoints()
+
     async def _run_backfill(self) -> None:
         while self.is_operational:
             peer = await self._queening_queue.pop_fastest_peasant()
 
-            # collect node hashes that might be missing
-            await self._walk()
-
-            self._node_hashes, on_deck = (
-                self._node_hashes[:-1 * REQUEST_SIZE],
-                tuple(self._node_hashes[-1 * REQUEST_SIZE:]),
-            )
+            # collect node hashes that might be missing, in the next range that
+            #   isn't waiting on a peer
+            trie_range, on_deck = await self._next_request()
 
             if len(on_deck) == 0:
                 # Nothing left to request, break and wait for new data to come in
@@ -106,131 +198,270 @@ class BeamStateBackfill(BaseService, QueenTrackerAPI):
                 await self.sleep(2)
                 continue
 
-            self.run_task(self._make_request(peer, on_deck))
+            node_paths = dict((node_hash, path) for path, node_hash in on_deck)
+            request_hashes = self._node_requests.skip_in_flight(tuple(node_paths))
+            if len(request_hashes) < len(on_deck):
+                self._requeue_in_flight(trie_range, tuple(
+                    (node_paths[node_hash], node_hash)
+                    for node_hash in set(node_paths).difference(request_hashes)
+                ))
+
+            if len(request_hashes) == 0:
+                # Everything is being requested already, give the requests a moment to finish
+                self._queening_queue.readd_peasant(peer)
+                await self.sleep(GAP_BETWEEN_TESTS)
+                continue
+
+            request_nodes = tuple(
+                (node_paths[node_hash], node_hash) for node_hash in request_hashes
+            )
+            trie_range.in_flight = request_nodes
+            trie_range.is_requesting = True
+            self.run_task(self._make_request(peer, trie_range, request_nodes))
+
+    async def _next_request(self) -> Tuple[TrieRange, Tuple[PathNode, ...]]:
+        """
+        Find the next range that is not being requested yet, and that has nodes
+        to request. Take turns, so that every range makes progress.
+        """
+        ranges = tuple(self._ranges.values())
+        for offset in range(len(ranges)):
+            trie_range = ranges[(self._next_range_index + offset) % len(ranges)]
+            if trie_range.is_requesting:
+                continue
+
+            await self._walk(trie_range)
+
+            if trie_range.pending:
+                self._next_range_index = (self._next_range_index + offset + 1) % len(ranges)
+                on_deck = tuple(trie_range.pending[-1 * REQUEST_SIZE:])
+                del trie_range.pending[-1 * REQUEST_SIZE:]
+                return trie_range, on_deck
+
+        return None, ()
+
+    def _requeue_in_flight(self, trie_range: TrieRange, nodes: Tuple[PathNode, ...]) -> None:
+        """
+        Another downloader is already requesting these nodes. Move them to the
+        bottom of the stack, and check the database again when they come back
+        up, so that the children of the nodes are still walked.
+        """
+        trie_range.pending[:0] = nodes
+        trie_range.is_missing.difference_update(node_hash for _, node_hash in nodes)
+
+    async def _make_request(
+            self,
+            peer: ETHPeer,
+            trie_range: TrieRange,
+            request_nodes: Tuple[PathNode, ...]) -> None:
 
-    async def _make_request(self, peer: ETHPeer, request_hashes: Tuple[Hash32, ...]) -> None:
+        request_hashes = tuple(node_hash for _, node_hash in request_nodes)
         self._num_requests_by_peer[peer] += 1
+        self._node_requests.start_requests(request_hashes)
+        nodes: NodeDataBundles = ()
         try:
             nodes = await peer.eth_api.get_node_data(request_hashes)
         except asyncio.TimeoutError:
-            self._node_hashes.extend(request_hashes)
+            trie_range.pending.extend(request_nodes)
             self._queening_queue.readd_peasant(peer, GAP_BETWEEN_TESTS * 2)
         except (PeerConnectionLost, OperationCancelled):
             # Something unhappy, but we don't really care, peer will be gone by next loop
-            self._node_hashes.extend(request_hashes)
+            trie_range.pending.extend(request_nodes)
         except (BaseP2PError, Exception) as exc:
             self.logger.info("Unexpected err while getting background nodes from %s: %s", peer, exc)
             self.logger.debug("Problem downloading background nodes from peer...", exc_info=True)
-            self._node_hashes.extend(request_hashes)
+            trie_range.pending.extend(request_nodes)
             self._queening_queue.readd_peasant(peer, GAP_BETWEEN_TESTS * 2)
         else:
             self._queening_queue.readd_peasant(peer, GAP_BETWEEN_TESTS)
-            self._insert_results(request_hashes, nodes)
+            self._insert_results(trie_range, request_nodes, nodes)
+        finally:
+            trie_range.in_flight = ()
+            trie_range.is_requesting = False
+            # wake up anyone waiting on these nodes, after they were inserted
+            self._node_requests.finish_requests(request_hashes, nodes)
 
     def _insert_results(
             self,
-            requested_hashes: Tuple[Hash32, ...],
+            trie_range: TrieRange,
+            requested_nodes: Tuple[PathNode, ...],
             nodes: Tuple[Tuple[Hash32, bytes], ...]) -> None:
 
         returned_nodes = dict(nodes)
         with self._db.atomic_batch() as write_batch:
-            for requested_hash in requested_hashes:
+            for path, requested_hash in requested_nodes:
                 if requested_hash in returned_nodes:
                     self._num_added += 1
                     self._total_processed_nodes += 1
+                    trie_range.num_added += 1
                     encoded_node = returned_nodes[requested_hash]
                     write_batch[requested_hash] = encoded_node
-                    self._is_missing.discard(requested_hash)
-                    self._node_hashes.extend(self._get_children(encoded_node))
+                    trie_range.is_missing.discard(requested_hash)
+                    self._push_children(path, encoded_node)
                 else:
                     self._num_missed += 1
-                    self._node_hashes.append(requested_hash)
+                    trie_range.num_missed += 1
+                    trie_range.pending.append((path, requested_hash))
 
-    def _has_full_request_worth_of_queued_hashes(self) -> bool:
-        if len(self._node_hashes) < REQUEST_SIZE:
+    def _range_of(self, path: Nibbles) -> TrieRange:
+        return self._ranges[path[:1]]
+
+    def _push_children(self, path: Nibbles, encoded_node: bytes) -> None:
+        # Push the highest path first, so the lowest one is walked first
+        for child_path, child_hash in reversed(self._get_children(path, encoded_node)):
+            self._range_of(child_path).push(child_path, child_hash)
+
+    def _has_full_request_worth_of_queued_hashes(self, trie_range: TrieRange) -> bool:
+        if len(trie_range.pending) < REQUEST_SIZE:
             # there are too few hashes available
             return False
 
-        next_request_preview = self._node_hashes[-1 * REQUEST_SIZE:]
+        next_request_preview = trie_range.pending[-1 * REQUEST_SIZE:]
 
         # confirm that all queued hashes are missing from the database
-        # self._is_missing is cached to avoid excessive I/O of checking repeatedly
-        return all(node_hash not in self._is_missing for node_hash in next_request_preview)
+        # trie_range.is_missing is cached to avoid excessive I/O of checking repeatedly
+        return all(node_hash in trie_range.is_missing for _, node_hash in next_request_preview)
 
-    async def _walk(self) -> None:
+    async def _walk(self, trie_range: TrieRange) -> None:
         """
         Evaluate queued node hashes, checking which ones are locally available. For
         anything that is locally available, load it up and put its children on the queue.
         """
-        while not self._has_full_request_worth_of_queued_hashes():
-            for reversed_idx, node_hash in enumerate(reversed(self._node_hashes)):
-                if node_hash in self._is_missing:
-                    continue
-
-                try:
-                    encoded_node = self._db[node_hash]
-                except KeyError:
-                    self._is_missing.add(node_hash)
-                    # release the event loop, because doing a bunch of db reads is slow
-                    await self.sleep(0)
-                    continue
-                else:
-                    # found a node to expand out
-                    remove_idx = len(self._node_hashes) - reversed_idx - 1
-                    break
-            else:
+        pending = trie_range.pending
+        while not self._has_full_request_worth_of_queued_hashes(trie_range):
+            # Look up a window of the most recently queued, unchecked hashes
+            # in a single database round trip
+            candidate_indices = tuple(itertools.islice(
+                (
+                    idx for idx in reversed(range(len(pending)))
+                    if pending[idx][1] not in trie_range.is_missing
+                ),
+                WALK_LOOKUP_SIZE,
+            ))
+            if not candidate_indices:
                 # Didn't find any nodes to expand. Give up the walk
                 return
 
-            # remove the already-present node hash
-            del self._node_hashes[remove_idx]
+            candidates = tuple(pending[idx] for idx in candidate_indices)
+            encoded_nodes = multi_get(self._db, tuple(node_hash for _, node_hash in candidates))
+
+            present_nodes = []
+            for idx, (path, node_hash), encoded_node in zip(
+                    candidate_indices,
+                    candidates,
+                    encoded_nodes):
+                if encoded_node is None:
+                    trie_range.is_missing.add(node_hash)
+                else:
+                    present_nodes.append((idx, path, encoded_node))
+
+            # remove the already-present node hashes. Indices are in descending
+            # order, so deleting one does not shift the ones still to be deleted.
+            for idx, _, _ in present_nodes:
+                del pending[idx]
 
-            # Expand out the node that's already present
-            self._node_hashes.extend(self._get_children(encoded_node))
+            # Expand out the nodes that are already present
+            for _, path, encoded_node in reversed(present_nodes):
+                self._push_children(path, encoded_node)
 
             # Release the event loop, because this could be long
             await self.sleep(0)
 
             # Continue until the pending stack is big enough
 
-    def _get_children(self, encoded_node: bytes) -> Iterable[Hash32]:
+    def _get_children(self, path: Nibbles, encoded_node: bytes) -> Tuple[PathNode, ...]:
+        """
+        Get the (path, node hash) of each child of the node, in order of the path.
+        """
         try:
             decoded_node = rlp.decode(encoded_node)
         except rlp.DecodingError:
             # Could not decode rlp, it's probably a bytecode, carry on...
-            return set()
+            return ()
 
         if len(decoded_node) == 17:
             # branch node
-            return set(node_hash for node_hash in decoded_node[:16] if len(node_hash) == 32)
+            return tuple(
+                (path + (nibble, ), node_hash)
+                for nibble, node_hash in enumerate(decoded_node[:16])
+                if len(node_hash) == 32
+            )
         elif len(decoded_node) == 2 and len(decoded_node[1]) == 32:
             # leaf or extension node
-            return {decoded_node[1]}
+            try:
+                key = extract_key(decoded_node)
+            except (IndexError, TypeError):
+                # Not a trie node after all, so there is no path to it
+                return ()
+            return ((path + tuple(key), decoded_node[1]), )
         else:
             # final value, ignore
-            return set()
+            return ()
 
     def set_root_hash(self, root_hash: Hash32) -> None:
-        if len(self._node_hashes) < REQUEST_SIZE:
-            self._node_hashes.append(root_hash)
+        if self._num_pending_nodes() < REQUEST_SIZE:
+            self._ranges[()].push((), root_hash)
+
+    def _num_pending_nodes(self) -> int:
+        return sum(len(trie_range.pending) for trie_range in self._ranges.values())
+
+    def _load_checkpoint(self, prefix: Nibbles) -> Nibbles:
+        try:
+            encoded_checkpoint = self._db[SchemaV1.make_range_checkpoint_lookup_key(prefix)]
+        except KeyError:
+            return ()
+        else:
+            return tuple(encoded_checkpoint)
+
+    def _save_checkpoints(self) -> None:
+        with self._db.atomic_batch() as write_batch:
+            for prefix, trie_range in self._ranges.items():
+                trie_range.update_checkpoint()
+                key = SchemaV1.make_range_checkpoint_lookup_key(prefix)
+                write_batch[key] = bytes(trie_range.checkpoint)
 
     async def _periodically_report_progress(self) -> None:
+        last_report_at = time.monotonic()
         while self.is_operational:
             await self.sleep(self._report_interval)
 
-            if len(self._node_hashes) == 0:
+            self._save_checkpoints()
+
+            if self._num_pending_nodes() == 0:
                 self.logger.debug("Beam-Backfill: waiting for new state root")
                 continue
 
+            elapsed = time.monotonic() - last_report_at
+            last_report_at = time.monotonic()
+
             msg = "all=%d" % self._total_processed_nodes
             msg += "  new=%d" % self._num_added
             msg += "  missed=%d" % self._num_missed
+            msg += "  nodes/s=%.1f" % (self._num_added / elapsed)
             msg += "  queen=%s" % self._queening_queue.queen
             self.logger.debug("Beam-Backfill: %s", msg)
 
             self._num_added = 0
             self._num_missed = 0
 
+            # log per-range throughput, and how far each range was walked
+            self.logger.debug(
+                "Beam-Backfill-Ranges: %s",
+                "  ".join(
+                    "%s=%d/%.1fps@%s" % (
+                        trie_range.name,
+                        trie_range.num_added,
+                        trie_range.num_added / elapsed,
+                        ''.join(f'{nibble:x}' for nibble in trie_range.checkpoint) or '-',
+                    )
+                    for trie_range in self._ranges.values()
+                    if trie_range.num_added or trie_range.pending
+                ),
+            )
+            for trie_range in self._ranges.values():
+                trie_range.num_added = 0
+                trie_range.num_missed = 0
+
             # log peer counts
             show_top_n_peers = 3
             self.logger.debug(
@@ -13,9 +13,11 @@ from eth.constants import GENESIS_PARENT_HASH
 from eth.exceptions import (
     HeaderNotFound,
 )
+from eth.rlp.accounts import Account
 from eth.rlp.blocks import BaseBlock
 from eth.rlp.headers import BlockHeader
 from eth.rlp.transactions import BaseTransaction
+from eth_hash.auto import keccak
 from eth_typing import (
     BlockNumber,
     Hash32,
@@ -31,6 +33,7 @@ from p2p.service import BaseService
 from trinity.chains.base import AsyncChainAPI
 from trinity.db.eth1.chain import BaseAsyncChainDB
 from trinity.db.eth1.header import BaseAsyncHeaderDB
+from trinity.db.manager import AsyncDBClient
 from trinity.protocol.eth.peer import ETHPeerPool
 from trinity.protocol.eth.sync import ETHHeaderChainSyncer
 from trinity.sync.beam.constants import (
@@ -45,11 +48,13 @@ from trinity.sync.common.chain import (
 from trinity.sync.common.events import (
     CollectMissingAccount,
     CollectMissingBytecode,
+    CollectMissingState,
     CollectMissingStorage,
     DoStatelessBlockImport,
     DoStatelessBlockPreview,
     MissingAccountCollected,
     MissingBytecodeCollected,
+    MissingStateCollected,
     MissingStorageCollected,
 )
 from trinity.sync.common.headers import (
@@ -74,6 +79,8 @@ from trinity.sync.beam.state import (
 from trinity._utils.timer import Timer
 
 from .backfill import BeamStateBackfill
+from .dedup import NodeRequestRegistry
+from .hints import StateAccessHints
 
 STATS_DISPLAY_PERIOD = 10
 
@@ -105,7 +112,8 @@ class BeamSyncer(BaseService):
             event_bus: EndpointAPI,
             checkpoint: Checkpoint = None,
             force_beam_block_number: BlockNumber = None,
-            token: CancelToken = None) -> None:
+            token: CancelToken = None,
+            async_db: AsyncDBClient = None) -> None:
         super().__init__(token=token)
 
         if checkpoint is None:
@@ -136,7 +144,20 @@ class BeamSyncer(BaseService):
             self.cancel_token,
         )
 
-        self._backfiller = BeamStateBackfill(db, peer_pool, token=self.cancel_token)
+        # Shared, so that the backfill and the urgent and preview downloads
+        #   never request the same node at the same time
+        node_requests = NodeRequestRegistry()
+
+        # Shared, so that the state touched by previews and imports is logged
+        #   along with the imported blocks
+        state_hints = StateAccessHints(db)
+
+        self._backfiller = BeamStateBackfill(
+            db,
+            peer_pool,
+            token=self.cancel_token,
+            node_requests=node_requests,
+        )
 
         self._state_downloader = BeamDownloader(
             db,
@@ -144,10 +165,13 @@ class BeamSyncer(BaseService):
             self._backfiller,
             event_bus,
             self.cancel_token,
+            node_requests=node_requests,
+            async_db=async_db,
         )
         self._data_hunter = MissingDataEventHandler(
             self._state_downloader,
             event_bus,
+            state_hints,
             token=self.cancel_token,
         )
 
@@ -157,6 +181,7 @@ class BeamSyncer(BaseService):
             self._state_downloader,
             self._backfiller,
             event_bus,
+            state_hints,
             self.cancel_token,
         )
         self._checkpoint_header_syncer = HeaderCheckpointSyncer(self._header_syncer)
@@ -531,6 +556,7 @@ class BeamBlockImporter(BaseBlockImporter, BaseService):
             state_getter: BeamDownloader,
             backfiller: BeamStateBackfill,
             event_bus: EndpointAPI,
+            state_hints: StateAccessHints,
             token: CancelToken = None) -> None:
         super().__init__(token=token)
 
@@ -538,6 +564,8 @@ class BeamBlockImporter(BaseBlockImporter, BaseService):
         self._db = db
         self._state_downloader = state_getter
         self._backfiller = backfiller
+        self._state_hints = state_hints
+        self._prefetched_hints = False
 
         self._blocks_imported = 0
         self._preloaded_account_state = 0
@@ -573,6 +601,7 @@ class BeamBlockImporter(BaseBlockImporter, BaseService):
         if import_done.block.hash != block.hash:
             raise ValidationError(f"Requsted {block} to be imported, but ran {import_done.block}")
         self._blocks_imported += 1
+        await self._state_hints.coro_persist_block(block.header.block_number)
         self._log_stats()
         return import_done.result
 
@@ -583,6 +612,12 @@ class BeamBlockImporter(BaseBlockImporter, BaseService):
             parent_state_root: Hash32,
             lagging: bool = True) -> None:
 
+        if not self._prefetched_hints:
+            # The first block to preview after startup, so warm up the state that
+            #   recent blocks touched most often, before the last shutdown
+            self._prefetched_hints = True
+            self.run_task(self._prefetch_hinted_state(parent_state_root))
+
         self.run_task(self._preview_address_load(header, parent_state_root, transactions))
 
         # This is a hack, so that preview executions can load ancestor block-hashes
@@ -613,6 +648,49 @@ class BeamBlockImporter(BaseBlockImporter, BaseService):
         self._preloaded_previewed_account_state += new_account_nodes
         self._preloaded_previewed_account_time += collection_time
 
+    async def _prefetch_hinted_state(self, state_root: Hash32) -> None:
+        """
+        Download the accounts and storage slots that were touched most often in
+        the recently imported blocks, at the given state root.
+        """
+        account_hashes, storages = await self._state_hints.coro_get_hot_keys()
+        if not account_hashes and not storages:
+            return
+
+        t = Timer()
+        storage_account_hashes = {Hash32(keccak(address)): address for address, _ in storages}
+        all_account_hashes = tuple(set(account_hashes).union(storage_account_hashes))
+        account_downloads = await asyncio.gather(*(
+            self._state_downloader.download_account(account_hash, state_root, urgent=False)
+            for account_hash in all_account_hashes
+        ))
+
+        storage_roots = {}
+        for account_hash, (account_rlp, _) in zip(all_account_hashes, account_downloads):
+            if account_hash in storage_account_hashes and account_rlp:
+                account = rlp.decode(account_rlp, sedes=Account)
+                storage_roots[storage_account_hashes[account_hash]] = account.storage_root
+
+        storage_downloads = await asyncio.gather(*(
+            self._state_downloader.download_storage(
+                storage_key,
+                storage_roots[address],
+                address,
+                urgent=False,
+            )
+            for address, storage_key in storages
+            if address in storage_roots
+        ))
+
+        num_account_nodes = sum(num_nodes for _, num_nodes in account_downloads)
+        self.logger.info(
+            "Prefetched %d hinted accounts and %d storage slots in %.1fs; got %d trie nodes",
+            len(all_account_hashes),
+            len(storage_downloads),
+            t.elapsed,
+            num_account_nodes + sum(storage_downloads),
+        )
+
     async def _load_address_state(
             self,
             header: BlockHeader,
@@ -678,6 +756,8 @@ class BeamBlockImporter(BaseBlockImporter, BaseService):
         senders = [transaction.sender for transaction in transactions]
         recipients = [transaction.to for transaction in transactions if transaction.to]
         addresses = set(senders + recipients + [header.coinbase])
+        for address in addresses:
+            self._state_hints.record_account(Hash32(keccak(address)))
         collected_nodes = await self._state_downloader.download_accounts(
             addresses,
             parent_state_root,
@@ -699,10 +779,12 @@ class MissingDataEventHandler(BaseService):
             self,
             state_downloader: BeamDownloader,
             event_bus: EndpointAPI,
+            state_hints: StateAccessHints,
             token: CancelToken = None) -> None:
         super().__init__(token=token)
         self._state_downloader = state_downloader
         self._event_bus = event_bus
+        self._state_hints = state_hints
 
     async def _run(self) -> None:
         await self._launch_server()
@@ -712,6 +794,7 @@ class MissingDataEventHandler(BaseService):
         self.run_daemon_task(self._provide_missing_account_tries())
         self.run_daemon_task(self._provide_missing_bytecode())
         self.run_daemon_task(self._provide_missing_storage())
+        self.run_daemon_task(self._provide_missing_state())
 
     async def _provide_missing_account_tries(self) -> None:
         async for event in self.wait_iter(self._event_bus.stream(CollectMissingAccount)):
@@ -725,7 +808,12 @@ class MissingDataEventHandler(BaseService):
         async for event in self.wait_iter(self._event_bus.stream(CollectMissingStorage)):
             self.run_task(self._serve_storage(event))
 
+    async def _provide_missing_state(self) -> None:
+        async for event in self.wait_iter(self._event_bus.stream(CollectMissingState)):
+            self.run_task(self._serve_state(event))
+
     async def _serve_account(self, event: CollectMissingAccount) -> None:
+        self._state_hints.record_account(event.address_hash)
         _, num_nodes_collected = await self._state_downloader.download_account(
             event.address_hash,
             event.state_root_hash,
@@ -745,6 +833,7 @@ class MissingDataEventHandler(BaseService):
         await self._event_bus.broadcast(MissingBytecodeCollected(), event.broadcast_config())
 
     async def _serve_storage(self, event: CollectMissingStorage) -> None:
+        self._state_hints.record_storage(event.account_address, event.storage_key)
         num_nodes_collected = await self._state_downloader.download_storage(
             event.storage_key,
             event.storage_root_hash,
@@ -759,3 +848,32 @@ class MissingDataEventHandler(BaseService):
             MissingStorageCollected(num_nodes_collected + bonus_node),
             event.broadcast_config(),
         )
+
+    async def _serve_state(self, event: CollectMissingState) -> None:
+        for address_hash, _ in event.accounts:
+            self._state_hints.record_account(address_hash)
+        for storage_key, _, address in event.storages:
+            self._state_hints.record_storage(address, storage_key)
+
+        # Nothing is paused on any one of these, so download them all concurrently
+        downloader = self._state_downloader
+        account_downloads, storage_downloads, bonus_nodes = await asyncio.gather(
+            asyncio.gather(*(
+                downloader.download_account(address_hash, state_root_hash, event.urgent)
+                for address_hash, state_root_hash in event.accounts
+            )),
+            asyncio.gather(*(
+                downloader.download_storage(storage_key, storage_root_hash, address, event.urgent)
+                for storage_key, storage_root_hash, address in event.storages
+            )),
+            downloader.ensure_nodes_present(
+                set(event.bytecode_hashes + event.node_hashes),
+                event.urgent,
+            ),
+        )
+        num_account_nodes = sum(num_nodes for _, num_nodes in account_downloads)
+        num_nodes_collected = num_account_nodes + sum(storage_downloads) + bonus_nodes
+        await self._event_bus.broadcast(
+            MissingStateCollected(num_nodes_collected),
+            event.broadcast_config(),
+        )
@@ -6,6 +6,41 @@ from eth.constants import MAX_UNCLE_DEPTH
 #   even at a small value (like 1ms), this timeout is rarely triggered.
 DELAY_BEFORE_NON_URGENT_REQUEST = 0.05
 
+# Urgent nodes that are already being requested, by the backfill or for a
+#   preview, are awaited instead of requested again. Backfill requests go to
+#   slower peers though, so stop waiting after this many seconds and request
+#   them from the queen peer anyway.
+MAX_URGENT_WAIT_FOR_IN_FLIGHT_NODES = 0.5
+
+# Urgent nodes are requested from up to this many of the peers with the
+#   lowest GetNodeData round trip time, concurrently.
+MAX_URGENT_PEERS = 4
+# Each urgent sub-request is sent to this many peers at once. The first
+#   reply wins, and the other requests are cancelled.
+URGENT_RACE_WIDTH = 2
+# An urgent batch is only split up into parallel sub-requests if each of
+#   them asks for at least this many nodes.
+MIN_URGENT_SUB_REQUEST_SIZE = 16
+
+# Before a block is previewed, its transactions are executed without pausing on
+#   missing state data. Every missing account, storage slot and bytecode is
+#   recorded, and they are all downloaded at once. The next round can find the
+#   data that is only reachable through the newly downloaded data, like the
+#   storage of a newly downloaded account. Stop after this many rounds, and leave
+#   the rest to the pausing preview.
+MAX_PREFETCH_ROUNDS = 3
+# How many seconds to wait for all the state found missing in one prefetch round?
+PREFETCH_ROUND_TIMEOUT = 20
+
+# Keep a log of the accounts and storage slots that were touched in each of this
+#   many recent blocks. After a restart, the most frequently touched ones are
+#   prefetched at the new state root.
+STATE_HINT_BLOCKS = 256
+# How many of the most frequently touched accounts and storage slots to prefetch
+#   after a restart. They are downloaded like preview data, behind urgent nodes.
+MAX_HINTED_ACCOUNTS = 2048
+MAX_HINTED_STORAGES = 4096
+
 # How much large should our buffer be? This is a multiplier on how many
 # nodes we can request at once from a single peer.
 REQUEST_BUFFER_MULTIPLIER = 16
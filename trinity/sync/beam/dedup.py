@@ -0,0 +1,99 @@
+import asyncio
+from collections import Counter
+import typing
+from typing import (
+    Iterable,
+    Set,
+    Tuple,
+)
+
+from eth_typing import Hash32
+
+from trinity.protocol.common.typing import (
+    NodeDataBundles,
+)
+
+
+class NodeRequestRegistry:
+    """
+    Track which trie nodes are currently being requested from peers, by any of
+    the beam sync state downloaders: the urgent path, the preview path and the
+    backfill. Share one registry between them, so that a node that is already
+    on its way can be awaited instead of requested again.
+
+    Anyone waiting on a node can register an :class:`asyncio.Event`, which is
+    set whenever a request finishes.
+    """
+    num_deduplicated_nodes = 0
+    num_saved_requests = 0
+    num_saved_bytes = 0
+
+    def __init__(self) -> None:
+        self._in_flight: typing.Counter[Hash32] = Counter()
+
+        # Nodes that someone decided not to request, because they were in flight
+        self._awaited: Set[Hash32] = set()
+
+        self._listeners: Set[asyncio.Event] = set()
+
+    def __contains__(self, node_hash: Hash32) -> bool:
+        return node_hash in self._in_flight
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def skip_in_flight(self, node_hashes: Tuple[Hash32, ...]) -> Tuple[Hash32, ...]:
+        """
+        Return the node hashes that are not being requested yet. The others are
+        counted as deduplicated, and their data will arrive with the request
+        that is already in flight.
+        """
+        not_in_flight = tuple(
+            node_hash for node_hash in node_hashes if node_hash not in self._in_flight
+        )
+        num_deduplicated = len(node_hashes) - len(not_in_flight)
+        if num_deduplicated:
+            self._awaited.update(node_hash for node_hash in node_hashes if node_hash in self)
+            self.num_deduplicated_nodes += num_deduplicated
+            if not not_in_flight:
+                self.num_saved_requests += 1
+        return not_in_flight
+
+    def start_requests(self, node_hashes: Iterable[Hash32]) -> None:
+        """
+        Mark the node hashes as being requested from a peer.
+        """
+        self._in_flight.update(set(node_hashes))
+
+    def finish_requests(self, node_hashes: Iterable[Hash32], nodes: NodeDataBundles) -> None:
+        """
+        Mark the node hashes as no longer requested, whether or not the peer
+        returned them, and notify everyone waiting on a request to finish.
+
+        Call this after the returned nodes were written to the database.
+        """
+        returned_nodes = dict(nodes)
+        for node_hash in set(node_hashes):
+            self._in_flight[node_hash] -= 1
+            if self._in_flight[node_hash] <= 0:
+                del self._in_flight[node_hash]
+
+            if node_hash in self._awaited and node_hash not in self._in_flight:
+                self._awaited.remove(node_hash)
+                if node_hash in returned_nodes:
+                    self.num_saved_bytes += len(returned_nodes[node_hash])
+
+        for new_data in self._listeners:
+            new_data.set()
+
+    def add_listener(self, new_data: asyncio.Event) -> None:
+        self._listeners.add(new_data)
+
+    def remove_listener(self, new_data: asyncio.Event) -> None:
+        self._listeners.remove(new_data)
+
+    def __str__(self) -> str:
+        return (
+            f"in_flight={len(self)}  dedup={self.num_deduplicated_nodes}  "
+            f"saved_reqs={self.num_saved_requests}  saved_kb={self.num_saved_bytes // 1024}"
+        )
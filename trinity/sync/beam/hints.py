@@ -0,0 +1,183 @@
+import asyncio
+from collections import Counter
+import typing
+from typing import (
+    Set,
+    Tuple,
+)
+
+from eth.abc import AtomicDatabaseAPI
+from eth_typing import (
+    Address,
+    BlockNumber,
+    Hash32,
+)
+import rlp
+from rlp.sedes import (
+    Binary,
+    CountableList,
+    List,
+)
+
+from trinity._utils.async_dispatch import async_method
+from trinity._utils.db import (
+    multi_exists,
+    multi_get,
+)
+from trinity.sync.beam.constants import (
+    MAX_HINTED_ACCOUNTS,
+    MAX_HINTED_STORAGES,
+    STATE_HINT_BLOCKS,
+)
+
+hash32 = Binary.fixed_length(32)
+address = Binary.fixed_length(20)
+
+# (account hashes, (account address, storage key) pairs)
+block_hints_sedes = List([
+    CountableList(hash32),
+    CountableList(List([address, hash32])),
+])
+
+
+class SchemaV1:
+    @staticmethod
+    def make_block_hints_lookup_key(block_number: BlockNumber) -> bytes:
+        return b"v1:beam_state_hints:" + block_number.to_bytes(8, "big")
+
+    @staticmethod
+    def make_latest_block_lookup_key() -> bytes:
+        return b"v1:beam_state_hints:latest"
+
+
+class StateAccessHints:
+    """
+    Keep a rolling log, in the database, of the accounts and storage slots that
+    beam sync touched in each of the most recent blocks.
+
+    Hot contract state is touched in almost every block, but at a new state root
+    each time. After a restart, the most frequently touched keys can be prefetched
+    at the new state root, instead of being rediscovered one pause at a time.
+
+    The log is approximate: the state is logged with the next block to be imported,
+    even when it was touched by the preview of a later block. Only how often keys
+    show up across the logged blocks matters for the hints, so that's good enough.
+    """
+    def __init__(self, db: AtomicDatabaseAPI, num_blocks: int = STATE_HINT_BLOCKS) -> None:
+        self._db = db
+        self._num_blocks = num_blocks
+        self._latest_block: int = None
+
+        self._account_hashes: Set[Hash32] = set()
+        self._storages: Set[Tuple[Address, Hash32]] = set()
+
+    def record_account(self, address_hash: Hash32) -> None:
+        self._account_hashes.add(address_hash)
+
+    def record_storage(self, account_address: Address, storage_key: Hash32) -> None:
+        self._storages.add((account_address, storage_key))
+
+    def persist_block(self, block_number: BlockNumber) -> None:
+        """
+        Save everything recorded since the last block, as the hints for the given
+        block, and drop the hints of any blocks that fell out of the log.
+        """
+        self._write_block_hints(block_number, self._pop_recorded_hints())
+
+    async def coro_persist_block(self, block_number: BlockNumber) -> None:
+        """
+        Like :meth:`persist_block`, with the database reads and writes in the executor.
+        """
+        # take the recorded hints here, so that the ones recorded in the meantime
+        #   go to the next block
+        encoded = self._pop_recorded_hints()
+        await asyncio.get_event_loop().run_in_executor(
+            None,
+            self._write_block_hints,
+            block_number,
+            encoded,
+        )
+
+    def _pop_recorded_hints(self) -> bytes:
+        encoded = rlp.encode(
+            (tuple(self._account_hashes), tuple(self._storages)),
+            sedes=block_hints_sedes,
+        )
+        self._account_hashes.clear()
+        self._storages.clear()
+        return encoded
+
+    def _write_block_hints(self, block_number: BlockNumber, encoded: bytes) -> None:
+        if self._latest_block is None:
+            self._latest_block = self._get_latest_block()
+        latest_block = max(block_number, self._latest_block or 0)
+
+        # Usually only one block falls out of the log, but more do if beam sync
+        #   jumped ahead, like after a restart
+        if self._latest_block is None:
+            expired_keys: Tuple[bytes, ...] = ()
+        else:
+            oldest_logged = max(0, self._latest_block - self._num_blocks + 1)
+            newest_expired = min(self._latest_block, block_number - self._num_blocks)
+            expired_keys = tuple(
+                SchemaV1.make_block_hints_lookup_key(BlockNumber(expired_block))
+                for expired_block in range(oldest_logged, newest_expired + 1)
+            )
+        # blocks are skipped when beam sync jumps ahead, so check all at once which are logged
+        is_logged = multi_exists(self._db, expired_keys)
+
+        with self._db.atomic_batch() as batch:
+            batch[SchemaV1.make_block_hints_lookup_key(block_number)] = encoded
+            batch[SchemaV1.make_latest_block_lookup_key()] = latest_block.to_bytes(8, "big")
+            for expired_key, logged in zip(expired_keys, is_logged):
+                if logged:
+                    del batch[expired_key]
+
+        self._latest_block = latest_block
+
+    def _get_latest_block(self) -> int:
+        try:
+            encoded_latest = self._db[SchemaV1.make_latest_block_lookup_key()]
+        except KeyError:
+            return None
+        else:
+            return int.from_bytes(encoded_latest, "big")
+
+    def get_hot_keys(
+            self,
+            max_accounts: int = MAX_HINTED_ACCOUNTS,
+            max_storages: int = MAX_HINTED_STORAGES,
+    ) -> Tuple[Tuple[Hash32, ...], Tuple[Tuple[Address, Hash32], ...]]:
+        """
+        Get the account hashes and storage slots that were touched in the most
+        of the logged blocks, most frequently touched first.
+        """
+        account_counts: typing.Counter[Hash32] = Counter()
+        storage_counts: typing.Counter[Tuple[Address, Hash32]] = Counter()
+
+        latest_block = self._get_latest_block()
+        if latest_block is None:
+            return (), ()
+
+        # look up the hints of all logged blocks in one round trip
+        encoded_hints = multi_get(self._db, tuple(
+            SchemaV1.make_block_hints_lookup_key(BlockNumber(block_number))
+            for block_number
+            in range(max(0, latest_block - self._num_blocks + 1), latest_block + 1)
+        ))
+        for encoded in encoded_hints:
+            if encoded is None:
+                # Blocks are skipped when beam sync jumps ahead
+                continue
+            account_hashes, storages = rlp.decode(encoded, sedes=block_hints_sedes)
+            account_counts.update(account_hashes)
+            storage_counts.update(
+                (Address(account), Hash32(storage_key)) for account, storage_key in storages
+            )
+
+        return (
+            tuple(account_hash for account_hash, _ in account_counts.most_common(max_accounts)),
+            tuple(storage for storage, _ in storage_counts.most_common(max_storages)),
+        )
+
+    coro_get_hot_keys = async_method(get_hot_keys)
@@ -6,13 +6,14 @@ from typing import (
     Any,
     Callable,
     Optional,
+    Set,
     Tuple,
     Type,
     TypeVar,
     cast,
 )
 
-from cancel_token import CancelToken
+from cancel_token import CancelToken, OperationCancelled
 
 from eth.abc import (
     AtomicDatabaseAPI,
@@ -22,6 +23,7 @@ from eth.abc import (
     StateAPI,
     VirtualMachineAPI,
 )
+from eth.constants import EMPTY_SHA3
 from eth.typing import VMConfiguration
 from eth.vm.interrupt import (
     MissingAccountTrieNode,
@@ -46,15 +48,19 @@ from lahja.common import BroadcastConfig
 
 from p2p.service import BaseService
 
+from trinity._utils.senders import sender_cache
 from trinity._utils.timer import Timer
 from trinity.chains.full import FullChain
 from trinity.sync.beam.constants import (
+    MAX_PREFETCH_ROUNDS,
     MAX_SPECULATIVE_EXECUTIONS_PER_PROCESS,
     NUM_PREVIEW_SHARDS,
+    PREFETCH_ROUND_TIMEOUT,
 )
 from trinity.sync.common.events import (
     CollectMissingAccount,
     CollectMissingBytecode,
+    CollectMissingState,
     CollectMissingStorage,
     DoStatelessBlockImport,
     DoStatelessBlockPreview,
@@ -74,6 +80,9 @@ class BeamStats:
     num_storages = 0
     num_storage_nodes = 0
 
+    # How many times did execution pause, to wait on missing data?
+    num_pauses = 0
+
     # How much time is spent waiting on retrieving nodes?
     data_pause_time = 0.0
 
@@ -89,7 +98,8 @@ class BeamStats:
             f"BeamStat: accts={self.num_accounts}, "
             f"a_nodes={self.num_account_nodes}, codes={self.num_bytecodes}, "
             f"strg={self.num_storages}, s_nodes={self.num_storage_nodes}, "
-            f"nodes={node_count}, rtt={avg_rtt:.3f}s, wait={self.data_pause_time:.2f}s"
+            f"nodes={node_count}, pauses={self.num_pauses}, rtt={avg_rtt:.3f}s, "
+            f"wait={self.data_pause_time:.2f}s"
         )
 
     def __repr__(self) -> str:
@@ -97,10 +107,61 @@ class BeamStats:
             f"BeamStats(num_accounts={self.num_accounts}, "
             f"num_account_nodes={self.num_account_nodes}, num_bytecodes={self.num_bytecodes}, "
             f"num_storages={self.num_storages}, num_storage_nodes={self.num_storage_nodes}, "
-            f"data_pause_time={self.data_pause_time:.3f}s)"
+            f"num_pauses={self.num_pauses}, data_pause_time={self.data_pause_time:.3f}s)"
+        )
+
+
+class MissingStateKeys:
+    """
+    The accounts, storage slots and bytecodes that an execution tried to read,
+    but that are missing from the state database.
+    """
+    def __init__(self) -> None:
+        # (address hash, state root) pairs
+        self.accounts: Set[Tuple[Hash32, Hash32]] = set()
+        # (storage key, storage root, account address) triplets
+        self.storages: Set[Tuple[Hash32, Hash32, Address]] = set()
+        self.bytecodes: Set[Hash32] = set()
+        # The trie nodes that were found missing, which are not always on the
+        #   path to the account or storage slot, like during trie fixups.
+        self.node_hashes: Set[Hash32] = set()
+
+    def record(self, exc: Exception) -> None:
+        if isinstance(exc, MissingAccountTrieNode):
+            self.accounts.add((exc.address_hash, exc.state_root_hash))
+            self.node_hashes.add(exc.missing_node_hash)
+        elif isinstance(exc, MissingStorageTrieNode):
+            self.storages.add((exc.requested_key, exc.storage_root_hash, exc.account_address))
+            self.node_hashes.add(exc.missing_node_hash)
+        elif isinstance(exc, MissingBytecode):
+            self.bytecodes.add(exc.missing_code_hash)
+        else:
+            raise TypeError(f"Not an exception about missing state data: {exc!r}")
+
+    def __len__(self) -> int:
+        return len(self.accounts) + len(self.storages) + len(self.bytecodes)
+
+    def __str__(self) -> str:
+        return (
+            f"MissingState: accts={len(self.accounts)}, strg={len(self.storages)}, "
+            f"codes={len(self.bytecodes)}, nodes={len(self.node_hashes)}"
         )
 
 
+# When a speculative execution records missing state data instead of pausing,
+#   it carries on with these stand-in values. The other state methods return None.
+MISSING_STATE_STAND_INS = {
+    'get_balance': 0,
+    'get_code': b'',
+    'get_storage': 0,
+    'get_nonce': 0,
+    'get_code_hash': EMPTY_SHA3,
+    'has_code_or_nonce': False,
+    'account_exists': False,
+    'account_is_empty': True,
+}
+
+
 class PausingVMAPI(VirtualMachineAPI):
     logger: ExtendedDebugLogger
 
@@ -108,6 +169,16 @@ class PausingVMAPI(VirtualMachineAPI):
     def get_beam_stats(self) -> BeamStats:
         ...
 
+    @abstractmethod
+    def record_missing_state(self) -> MissingStateKeys:
+        """
+        Stop pausing on missing state data. Instead, record what is missing and
+        carry on with a stand-in value.
+
+        :return: the missing state, which fills up while the VM executes
+        """
+        ...
+
 
 class BeamChain(FullChain):
     """
@@ -206,6 +277,7 @@ def pausing_vm_decorator(
         A custom version of VMState that pauses EVM execution when required data is missing.
         """
         stats_counter: BeamStats
+        missing_state: MissingStateKeys = None
         node_retrieval_timeout = 20
 
         def __init__(self, *args: Any, **kwargs: Any) -> None:
@@ -221,6 +293,9 @@ def pausing_vm_decorator(
             Catch exceptions about missing state data and pause while waiting for
             the event bus to reply with the needed data. Repeat if there is a request timeout.
             """
+            if self.missing_state is not None:
+                return self._skip_missing_data(vm_method, *args, **kwargs)
+
             while True:
                 try:
                     return self._request_missing_data(vm_method, *args, **kwargs)
@@ -236,6 +311,21 @@ def pausing_vm_decorator(
                         self.stats_counter,
                     )
 
+        def _skip_missing_data(
+                self,
+                vm_method: Callable[[Any], TVMFuncReturn],
+                *args: Any,
+                **kwargs: Any) -> TVMFuncReturn:
+            """
+            Record missing state data instead of pausing, and carry on with a stand-in
+            value, so that a single execution can find many missing keys at once.
+            """
+            try:
+                return vm_method(*args, **kwargs)  # type: ignore
+            except (MissingAccountTrieNode, MissingBytecode, MissingStorageTrieNode) as exc:
+                self.missing_state.record(exc)
+                return MISSING_STATE_STAND_INS.get(vm_method.__name__)  # type: ignore
+
         def _request_missing_data(
                 self,
                 vm_method: Callable[[Any], TVMFuncReturn],
@@ -250,6 +340,7 @@ def pausing_vm_decorator(
                     return vm_method(*args, **kwargs)  # type: ignore
                 except MissingAccountTrieNode as exc:
                     t = Timer()
+                    self.stats_counter.num_pauses += 1
                     account_future = asyncio.run_coroutine_threadsafe(
                         request_missing_account(
                             exc.missing_node_hash,
@@ -264,6 +355,7 @@ def pausing_vm_decorator(
                     self.stats_counter.data_pause_time += t.elapsed
                 except MissingBytecode as exc:
                     t = Timer()
+                    self.stats_counter.num_pauses += 1
                     bytecode_future = asyncio.run_coroutine_threadsafe(
                         request_missing_bytecode(
                             exc.missing_code_hash,
@@ -275,6 +367,7 @@ def pausing_vm_decorator(
                     self.stats_counter.data_pause_time += t.elapsed
                 except MissingStorageTrieNode as exc:
                     t = Timer()
+                    self.stats_counter.num_pauses += 1
                     storage_future = asyncio.run_coroutine_threadsafe(
                         request_missing_storage(
                             exc.missing_node_hash,
@@ -353,6 +446,11 @@ def pausing_vm_decorator(
         def get_beam_stats(self) -> BeamStats:
             return self.state.stats_counter
 
+        def record_missing_state(self) -> MissingStateKeys:
+            missing_state = MissingStateKeys()
+            self.state.missing_state = missing_state
+            return missing_state
+
     return PausingVM
 
 
@@ -424,6 +522,9 @@ class BlockImportServer(BaseService):
         """
 
         async for event in self.wait_iter(event_bus.stream(DoStatelessBlockImport)):
+            # recover the senders in the worker pool, or from the transactions seen before
+            await sender_cache.recover_senders(event.block.transactions)
+
             # launch in new thread, so we don't block the event loop!
             import_completion = self.get_event_loop().run_in_executor(
                 # Maybe build the pausing chain inside the new process?
@@ -522,6 +623,34 @@ def partial_speculative_execute(
     return _trigger_missing_state_downloads
 
 
+def partial_prefetch_execute(
+        beam_chain: BeamChain,
+        header: BlockHeaderAPI,
+        transactions: Tuple[SignedTransactionAPI, ...]) -> Callable[[], MissingStateKeys]:
+    """
+    Get an argument-free function that will execute all the transactions, in the
+    context of the given header, without pausing on missing state data. It returns
+    all the state that was found missing, so it can be downloaded at once.
+    """
+    def _find_missing_state() -> MissingStateKeys:
+        vm = beam_chain.get_vm(header)
+        missing_state = vm.record_missing_state()
+        unused_header = header.copy(gas_used=0)
+
+        for transaction in transactions:
+            try:
+                vm.apply_transaction(unused_header, transaction)
+            except ValidationError:
+                # A stand-in value, like a zero balance, can invalidate a transaction.
+                #   Skip it, and look for the missing state of the others.
+                continue
+        vm.state.make_state_root()
+
+        return missing_state
+
+    return _find_missing_state
+
+
 class BlockPreviewServer(BaseService):
     def __init__(
             self,
@@ -562,21 +691,18 @@ class BlockPreviewServer(BaseService):
                 continue
 
             self.logger.debug(
-                "DoStatelessBlockPreview-%d is previewing new block: %s",
+                "DoStatelessBlockPreview-%d is previewing new block: %s, %s",
                 self._shard_num,
                 event.header,
+                sender_cache,
             )
+            # Both kinds of execution need the senders, so recover them all at once first
+            await self.wait(sender_cache.recover_senders(event.transactions))
+
             # Parallel Execution:
-            # Run a complete block end-to-end
-            asyncio.get_event_loop().run_in_executor(
-                # Maybe build the pausing chain inside the new process, so we can use process pool?
-                None,
-                partial_trigger_missing_state_downloads(
-                    beam_chain,
-                    event.header,
-                    event.transactions,
-                )
-            )
+            # Run a complete block end-to-end, pausing on each missing piece of state,
+            #   while prefetching as much state as possible without pausing
+            self.run_task(self._prefetch_and_preview(beam_chain, event.header, event.transactions))
 
             # Speculative Execution:
             # Split transactions into groups by sender, and run them independently.
@@ -598,3 +724,77 @@ class BlockPreviewServer(BaseService):
                 )
             # we don't need to broadcast that the preview is complete, so immediately
             # look for next preview request. That way, we can run them in parallel.
+
+    async def _prefetch_and_preview(
+            self,
+            beam_chain: BeamChain,
+            header: BlockHeaderAPI,
+            transactions: Tuple[SignedTransactionAPI, ...]) -> None:
+
+        # The pausing preview is what the import is waiting on, so it starts right away.
+        #   Meanwhile, the prefetch rounds request the state that it will pause on
+        #   in bigger batches.
+        prefetch = asyncio.ensure_future(self._prefetch(beam_chain, header, transactions))
+        try:
+            await self.wait(asyncio.get_event_loop().run_in_executor(
+                # Maybe build the pausing chain inside the new process, so we can use process pool?
+                None,
+                partial_trigger_missing_state_downloads(beam_chain, header, transactions),
+            ))
+        finally:
+            # Once the preview is done, any state left to prefetch isn't needed
+            prefetch.cancel()
+
+    async def _prefetch(
+            self,
+            beam_chain: BeamChain,
+            header: BlockHeaderAPI,
+            transactions: Tuple[SignedTransactionAPI, ...]) -> None:
+
+        loop = asyncio.get_event_loop()
+        for prefetch_round in range(MAX_PREFETCH_ROUNDS):
+            t = Timer()
+            try:
+                missing_state = await self.wait(loop.run_in_executor(
+                    None,
+                    partial_prefetch_execute(beam_chain, header, transactions),
+                ))
+                if not missing_state:
+                    break
+
+                collected = await self.wait(
+                    self._event_bus.request(CollectMissingState(
+                        tuple(missing_state.accounts),
+                        tuple(missing_state.storages),
+                        tuple(missing_state.bytecodes),
+                        tuple(missing_state.node_hashes),
+                        urgent=False,
+                    )),
+                    timeout=PREFETCH_ROUND_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                self.logger.debug(
+                    "Timed out prefetching state for %s, in round %d",
+                    header,
+                    prefetch_round,
+                )
+                break
+            except OperationCancelled:
+                raise
+            except Exception:
+                # Prefetching is only an optimization, the pausing preview gets the state anyway
+                self.logger.exception(
+                    "Unexpected error while prefetching state for %s, in round %d",
+                    header,
+                    prefetch_round,
+                )
+                break
+            else:
+                self.logger.debug(
+                    "Prefetched %s for %s in %.1fs, round %d, got %d trie nodes",
+                    missing_state,
+                    header,
+                    t.elapsed,
+                    prefetch_round,
+                    collected.num_nodes_collected,
+                )
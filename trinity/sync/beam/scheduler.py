@@ -0,0 +1,161 @@
+import asyncio
+from concurrent.futures import CancelledError
+import math
+from typing import (
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from cancel_token import OperationCancelled
+from eth_typing import Hash32
+from eth_utils import get_extended_debug_logger
+from eth_utils.toolz import partition_all
+
+from p2p.exceptions import BaseP2PError
+
+from trinity.protocol.common.typing import (
+    NodeDataBundles,
+)
+from trinity.protocol.eth.peer import ETHPeer
+from trinity.sync.beam.constants import (
+    MAX_URGENT_PEERS,
+    MIN_URGENT_SUB_REQUEST_SIZE,
+    URGENT_RACE_WIDTH,
+)
+
+
+def _peer_latency_sort(peer: ETHPeer) -> Tuple[bool, float]:
+    """
+    Sort idle peers first, then by their average GetNodeData round trip time.
+    """
+    exchange = peer.eth_api.get_node_data
+    return (exchange.is_requesting, exchange.tracker.round_trip_ema.value)
+
+
+class NodeDataScheduler:
+    """
+    Request trie nodes from several peers at once, to keep a single slow peer
+    out of the critical path of block import.
+
+    The fastest peers, by measured round trip time, are used. A large batch of
+    node hashes is split into sub-requests that run in parallel, and each
+    sub-request is raced on up to ``race_width`` peers. As soon as one of the
+    racing peers replies with any nodes, the redundant requests are cancelled.
+    """
+    logger = get_extended_debug_logger('trinity.sync.beam.scheduler.NodeDataScheduler')
+
+    num_requests = 0
+    num_sub_requests = 0
+    num_cancelled = 0
+    num_failed = 0
+
+    def __init__(
+            self,
+            reply_timeout: float,
+            max_peers: int = MAX_URGENT_PEERS,
+            race_width: int = URGENT_RACE_WIDTH,
+            min_sub_request_size: int = MIN_URGENT_SUB_REQUEST_SIZE) -> None:
+        self._reply_timeout = reply_timeout
+        self._max_peers = max_peers
+        self._race_width = race_width
+        self._min_sub_request_size = min_sub_request_size
+
+    def rank_peers(self, peers: Iterable[ETHPeer]) -> Tuple[ETHPeer, ...]:
+        """
+        Return the top peers to request urgent nodes from, fastest first.
+        """
+        operational_peers = (peer for peer in peers if peer.is_operational)
+        return tuple(sorted(operational_peers, key=_peer_latency_sort))[:self._max_peers]
+
+    def plan(
+            self,
+            ranked_peers: Sequence[ETHPeer],
+            node_hashes: Sequence[Hash32],
+    ) -> Tuple[Tuple[Tuple[ETHPeer, ...], Tuple[Hash32, ...]], ...]:
+        """
+        Split the node hashes into sub-requests, and pick the peers that race for
+        each one. Every sub-request gets ``race_width`` peers if there are enough
+        of them. The fastest peers each lead one sub-request, and the remaining
+        peers back them up in the same order.
+        """
+        if not ranked_peers or not node_hashes:
+            return ()
+
+        num_sub_requests = min(
+            math.ceil(len(ranked_peers) / self._race_width),
+            math.ceil(len(node_hashes) / self._min_sub_request_size),
+        )
+        sub_request_size = math.ceil(len(node_hashes) / num_sub_requests)
+
+        return tuple(
+            (tuple(ranked_peers[index::num_sub_requests][:self._race_width]), tuple(chunk))
+            for index, chunk in enumerate(partition_all(sub_request_size, node_hashes))
+        )
+
+    async def get_node_data(
+            self,
+            peers: Iterable[ETHPeer],
+            node_hashes: Sequence[Hash32]) -> NodeDataBundles:
+        """
+        Request the node hashes from the fastest of the given peers. Nodes that
+        no peer returned in time are missing from the result.
+        """
+        self.num_requests += 1
+        plan = self.plan(self.rank_peers(peers), node_hashes)
+        results = await asyncio.gather(*(
+            self._race(racing_peers, sub_request_hashes)
+            for racing_peers, sub_request_hashes in plan
+        ))
+
+        nodes: List[Tuple[Hash32, bytes]] = []
+        for sub_request_nodes in results:
+            nodes.extend(sub_request_nodes)
+        return tuple(nodes)
+
+    async def _race(
+            self,
+            peers: Sequence[ETHPeer],
+            node_hashes: Tuple[Hash32, ...]) -> NodeDataBundles:
+
+        self.num_sub_requests += 1
+        requests = [
+            asyncio.ensure_future(self._request(peer, node_hashes))
+            for peer in peers
+        ]
+        try:
+            for next_reply in asyncio.as_completed(requests):
+                nodes = await next_reply
+                if nodes:
+                    return nodes
+            else:
+                return ()
+        finally:
+            for request in requests:
+                if not request.done():
+                    request.cancel()
+                    self.num_cancelled += 1
+
+    async def _request(self, peer: ETHPeer, node_hashes: Tuple[Hash32, ...]) -> NodeDataBundles:
+        try:
+            return await peer.eth_api.get_node_data(node_hashes, timeout=self._reply_timeout)
+        except CancelledError:
+            # Another peer replied first
+            raise
+        except asyncio.TimeoutError:
+            self.logger.debug("Timed out requesting %d nodes from %s", len(node_hashes), peer)
+        except (BaseP2PError, OperationCancelled) as exc:
+            self.logger.debug("Could not request %d nodes from %s: %s", len(node_hashes), peer, exc)
+        except Exception as exc:
+            self.logger.info("Unexpected err while downloading nodes from %s: %s", peer, exc)
+            self.logger.debug("Problem downloading nodes from %s", peer, exc_info=True)
+
+        self.num_failed += 1
+        return ()
+
+    def __str__(self) -> str:
+        return (
+            f"sched_reqs={self.num_requests}  sub_reqs={self.num_sub_requests}  "
+            f"cancelled={self.num_cancelled}  failed={self.num_failed}"
+        )
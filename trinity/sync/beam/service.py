@@ -9,6 +9,7 @@ from p2p.service import BaseService
 
 from trinity.chains.base import AsyncChainAPI
 from trinity.db.eth1.chain import BaseAsyncChainDB
+from trinity.db.manager import AsyncDBClient
 from trinity.protocol.eth.peer import ETHPeerPool
 from trinity.sync.common.checkpoint import Checkpoint
 
@@ -26,7 +27,8 @@ class BeamSyncService(BaseService):
             event_bus: EndpointAPI,
             checkpoint: Checkpoint = None,
             force_beam_block_number: BlockNumber = None,
-            token: CancelToken = None) -> None:
+            token: CancelToken = None,
+            async_db: AsyncDBClient = None) -> None:
         super().__init__(token)
         self.chain = chain
         self.chaindb = chaindb
@@ -35,6 +37,7 @@ class BeamSyncService(BaseService):
         self.event_bus = event_bus
         self.checkpoint = checkpoint
         self.force_beam_block_number = force_beam_block_number
+        self.async_db = async_db
 
     async def _run(self) -> None:
         head = await self.wait(self.chaindb.coro_get_canonical_head())
@@ -57,5 +60,6 @@ class BeamSyncService(BaseService):
             self.checkpoint,
             self.force_beam_block_number,
             token=self.cancel_token,
+            async_db=self.async_db,
         )
         await beam_syncer.run()
@@ -10,6 +10,7 @@ from typing import (
     Set,
     Tuple,
     Type,
+    cast,
 )
 
 from lahja import EndpointAPI
@@ -37,7 +38,9 @@ from trie import HexaryTrie
 from trie.exceptions import MissingTrieNode
 
 from trinity._utils.datastructures import TaskQueue
+from trinity._utils.db import multi_exists
 from trinity._utils.timer import Timer
+from trinity.db.manager import AsyncDBClient
 from trinity.protocol.common.typing import (
     NodeDataBundles,
 )
@@ -56,8 +59,11 @@ from trinity.sync.beam.queen import (
 )
 from trinity.sync.beam.constants import (
     DELAY_BEFORE_NON_URGENT_REQUEST,
+    MAX_URGENT_WAIT_FOR_IN_FLIGHT_NODES,
     REQUEST_BUFFER_MULTIPLIER,
 )
+from trinity.sync.beam.dedup import NodeRequestRegistry
+from trinity.sync.beam.scheduler import NodeDataScheduler
 
 from trinity.sync.common.peers import WaitingPeers
 
@@ -95,10 +101,15 @@ class BeamDownloader(BaseService, PeerSubscriber):
             peer_pool: ETHPeerPool,
             queen_tracker: QueenTrackerAPI,
             event_bus: EndpointAPI,
-            token: CancelToken = None) -> None:
+            token: CancelToken = None,
+            node_requests: NodeRequestRegistry = None,
+            async_db: AsyncDBClient = None) -> None:
         super().__init__(token)
         self._db = db
         self._trie_db = HexaryTrie(db)
+        # When available, the presence checks and the writes of downloaded nodes are
+        #   awaited through this client, instead of blocking the event loop
+        self._async_db = async_db
         self._node_data_peers = WaitingPeers[ETHPeer](NodeData)
         self._event_bus = event_bus
 
@@ -106,8 +117,11 @@ class BeamDownloader(BaseService, PeerSubscriber):
         buffer_size = MAX_STATE_FETCH * REQUEST_BUFFER_MULTIPLIER
         self._node_tasks = TaskQueue[Hash32](buffer_size, lambda task: 0)
 
-        # list of events waiting on new data
-        self._new_data_events: Set[asyncio.Event] = set()
+        # Nodes in flight to any of beam sync's state downloaders, shared with the backfill
+        if node_requests is None:
+            self._node_requests = NodeRequestRegistry()
+        else:
+            self._node_requests = node_requests
 
         self._peer_pool = peer_pool
 
@@ -130,6 +144,9 @@ class BeamDownloader(BaseService, PeerSubscriber):
 
         self._queen_tracker = queen_tracker
 
+        # Urgent nodes are raced across the fastest peers, not only the queen
+        self._node_data_scheduler = NodeDataScheduler(self._reply_timeout)
+
     async def ensure_nodes_present(
             self,
             node_hashes: Iterable[Hash32],
@@ -147,35 +164,45 @@ class BeamDownloader(BaseService, PeerSubscriber):
         :return: how many nodes had to be downloaded
         """
         if urgent:
-            queue = self._node_tasks
+            return await self._wait_for_nodes(
+                node_hashes,
+                self._node_tasks,
+                MAX_URGENT_WAIT_FOR_IN_FLIGHT_NODES,
+            )
         else:
-            queue = self._maybe_useful_nodes
-
-        return await self._wait_for_nodes(node_hashes, queue)
+            return await self._wait_for_nodes(node_hashes, self._maybe_useful_nodes)
 
     async def _wait_for_nodes(
             self,
             node_hashes: Iterable[Hash32],
-            queue: TaskQueue[Hash32]) -> int:
-        missing_nodes = set(
-            node_hash for node_hash in node_hashes if self._is_node_missing(node_hash)
-        )
-        unrequested_nodes = tuple(
+            queue: TaskQueue[Hash32],
+            takeover_delay: float = None) -> int:
+        missing_nodes = await self._get_missing_nodes(tuple(node_hashes))
+        # Nodes that are already being requested, by this or another
+        #   downloader, are awaited instead of requested again
+        unrequested_nodes = self._node_requests.skip_in_flight(tuple(
             node_hash for node_hash in missing_nodes if node_hash not in queue
-        )
+        ))
         if unrequested_nodes:
             await queue.add(unrequested_nodes)
         if missing_nodes:
-            await self._node_hashes_present(missing_nodes)
+            await self._node_hashes_present(missing_nodes, queue, takeover_delay)
         return len(unrequested_nodes)
 
-    def _is_node_missing(self, node_hash: Hash32) -> bool:
-        if len(node_hash) != 32:
-            raise ValidationError(f"Must request node by its 32-byte hash: 0x{node_hash.hex()}")
+    async def _get_missing_nodes(self, node_hashes: Tuple[Hash32, ...]) -> Set[Hash32]:
+        for node_hash in node_hashes:
+            if len(node_hash) != 32:
+                raise ValidationError(
+                    f"Must request node by its 32-byte hash: 0x{node_hash.hex()}"
+                )
 
-        self.logger.debug2("checking if node 0x%s is present", node_hash.hex())
+        self.logger.debug2("checking if %d nodes are present", len(node_hashes))
 
-        return node_hash not in self._db
+        # check all nodes in one database round trip
+        is_present = await self._multi_exists(node_hashes)
+        return set(
+            node_hash for node_hash, present in zip(node_hashes, is_present) if not present
+        )
 
     async def download_accounts(
             self,
@@ -289,10 +316,17 @@ class BeamDownloader(BaseService, PeerSubscriber):
 
             predictive_batch_id, predictive_hashes = self._maybe_add_predictive_nodes(urgent_hashes)
 
-            # combine to single tuple of unique hashes
-            node_hashes = self._append_unique_hashes(urgent_hashes, predictive_hashes)
+            # combine to single tuple of unique hashes, skipping predictive hashes that
+            #   another request is already fetching
+            node_hashes = self._append_unique_hashes(
+                urgent_hashes,
+                self._node_requests.skip_in_flight(predictive_hashes),
+            )
 
             if not node_hashes:
+                if predictive_batch_id is not None:
+                    # All predictive hashes are in flight already
+                    self._maybe_useful_nodes.complete(predictive_batch_id, predictive_hashes)
                 # There are no urgent or predictive hashes waiting, retry
                 continue
 
@@ -375,7 +409,15 @@ class BeamDownloader(BaseService, PeerSubscriber):
             predictive_node_hashes: Tuple[Hash32, ...],
             predictive_batch_id: int) -> None:
 
-        nodes = await self._request_nodes(peer, node_hashes)
+        self._node_requests.start_requests(node_hashes)
+        try:
+            if urgent_batch_id is None:
+                nodes = await self._request_nodes(peer, node_hashes)
+            else:
+                nodes = await self._request_urgent_nodes(peer, node_hashes)
+        except BaseException:
+            self._node_requests.finish_requests(node_hashes, ())
+            raise
 
         urgent_nodes = {
             node_hash: node for node_hash, node in nodes
@@ -392,15 +434,21 @@ class BeamDownloader(BaseService, PeerSubscriber):
             self.logger.debug("%s returned no urgent nodes from %r", peer, urgent_node_hashes)
 
         # batch all DB writes into one, for performance
-        with self._db.atomic_batch() as batch:
-            for node_hash, node in nodes:
-                batch[node_hash] = node
+        await self._persist_nodes(nodes)
 
         if urgent_batch_id is not None:
             self._node_tasks.complete(urgent_batch_id, tuple(urgent_nodes.keys()))
 
         if predictive_batch_id is not None:
-            self._maybe_useful_nodes.complete(predictive_batch_id, tuple(predictive_nodes.keys()))
+            # Predictive hashes that were skipped are left to whoever is requesting them
+            skipped_hashes = set(predictive_node_hashes).difference(node_hashes)
+            self._maybe_useful_nodes.complete(
+                predictive_batch_id,
+                tuple(predictive_nodes.keys()) + tuple(skipped_hashes),
+            )
+
+        # wake up anyone waiting on these nodes, now that the queues are up to date
+        self._node_requests.finish_requests(node_hashes, nodes)
 
         self._urgent_processed_nodes += len(urgent_nodes)
         for node_hash in predictive_nodes.keys():
@@ -408,38 +456,81 @@ class BeamDownloader(BaseService, PeerSubscriber):
                 self._predictive_processed_nodes += 1
         self._total_processed_nodes += len(nodes)
 
-        if len(nodes):
-            for new_data in self._new_data_events:
-                new_data.set()
-
-    def _is_node_present(self, node_hash: Hash32) -> bool:
+    async def _get_present_nodes(self, node_hashes: Set[Hash32]) -> Set[Hash32]:
         """
-        Check if node_hash has data in the database or in the predicted node set.
+        Return the subset of node_hashes that has data in the database.
         """
-        return node_hash in self._db
+        ordered_hashes = tuple(node_hashes)
+        is_present = await self._multi_exists(ordered_hashes)
+        return set(
+            node_hash for node_hash, present in zip(ordered_hashes, is_present) if present
+        )
+
+    async def _multi_exists(self, node_hashes: Tuple[Hash32, ...]) -> Tuple[bool, ...]:
+        if self._async_db is None:
+            return multi_exists(self._db, node_hashes)
+        else:
+            return await self._async_db.coro_multi_exists(node_hashes)
+
+    async def _persist_nodes(self, nodes: NodeDataBundles) -> None:
+        if self._async_db is None:
+            with self._db.atomic_batch() as batch:
+                for node_hash, node in nodes:
+                    batch[node_hash] = node
+        else:
+            # the nodes are committed once this returns, so the trie lookups that
+            #   are woken up next find them
+            async with self._async_db.atomic_batch() as async_batch:
+                for node_hash, node in nodes:
+                    async_batch[node_hash] = node
 
-    async def _node_hashes_present(self, node_hashes: Set[Hash32]) -> None:
+    async def _node_hashes_present(
+            self,
+            node_hashes: Set[Hash32],
+            queue: TaskQueue[Hash32],
+            takeover_delay: float = None) -> None:
+        """
+        Wait until all nodes are in the database.
+
+        Nodes that were not queued, because another request was already fetching
+        them, are queued if that request finishes without them. If the other
+        request takes longer than ``takeover_delay``, they are queued anyway.
+        """
         remaining_hashes = node_hashes.copy()
 
-        # save an event that gets triggered when new data comes in
+        # save an event that gets triggered when a node request finishes
         new_data = asyncio.Event()
-        self._new_data_events.add(new_data)
+        self._node_requests.add_listener(new_data)
 
         iterations = itertools.count()
 
-        while remaining_hashes and next(iterations) < 1000:
-            await new_data.wait()
-
-            found_hashes = set(found for found in remaining_hashes if self._is_node_present(found))
-            remaining_hashes -= found_hashes
-
-            new_data.clear()
+        try:
+            while remaining_hashes and next(iterations) < 1000:
+                try:
+                    await self.wait(new_data.wait(), timeout=takeover_delay)
+                except asyncio.TimeoutError:
+                    is_taking_over = True
+                else:
+                    is_taking_over = False
+
+                remaining_hashes -= await self._get_present_nodes(remaining_hashes)
+
+                new_data.clear()
+
+                unqueued_hashes = tuple(
+                    node_hash for node_hash in remaining_hashes
+                    if node_hash not in queue and (
+                        is_taking_over or node_hash not in self._node_requests
+                    )
+                )
+                if unqueued_hashes:
+                    await queue.add(unqueued_hashes)
+        finally:
+            self._node_requests.remove_listener(new_data)
 
         if remaining_hashes:
             self.logger.error("Never collected node data for hashes %r", remaining_hashes)
 
-        self._new_data_events.remove(new_data)
-
     def register_peer(self, peer: BasePeer) -> None:
         super().register_peer(peer)
         # when a new peer is added to the pool, add it to the idle peer list
@@ -490,6 +581,24 @@ class BeamDownloader(BaseService, PeerSubscriber):
                 self._queen_tracker.penalize_queen(peer)
             return completed_nodes
 
+    async def _request_urgent_nodes(
+            self,
+            queen: ETHPeer,
+            node_hashes: Tuple[Hash32, ...]) -> NodeDataBundles:
+        """
+        Request the nodes from the fastest peers at once, so that a slow queen
+        does not stall block import.
+        """
+        peers = (queen, ) + tuple(
+            cast(ETHPeer, peer) for peer in self._peer_pool.connected_nodes.values()
+            if peer is not queen
+        )
+        nodes = await self._node_data_scheduler.get_node_data(peers, tuple(set(node_hashes)))
+        if len(nodes) == 0:
+            self.logger.debug("Peers returned 0 urgent state trie nodes, penalize queen...")
+            self._queen_tracker.penalize_queen(queen)
+        return nodes
+
     async def _make_node_request(
             self,
             peer: ETHPeer,
@@ -530,6 +639,8 @@ class BeamDownloader(BaseService, PeerSubscriber):
             msg += "  u_prog=%d" % self._node_tasks.num_in_progress()
             msg += "  p_pend=%d" % self._maybe_useful_nodes.num_pending()
             msg += "  p_prog=%d" % self._maybe_useful_nodes.num_in_progress()
+            msg += "  %s" % self._node_requests
+            msg += "  %s" % self._node_data_scheduler
             self.logger.debug("Beam-Sync: %s", msg)
 
             # log peer counts
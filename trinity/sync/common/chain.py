@@ -54,6 +54,7 @@ from eth2.beacon.chains.base import (
     BaseBeaconChain
 )
 
+from .seals import validate_header_chain
 from .types import SyncProgress
 
 
@@ -221,7 +222,8 @@ class PeerHeaderSyncer(BaseService):
                 new_headers[-1],
             )
             try:
-                await self.chain.coro_validate_chain(
+                await validate_header_chain(
+                    self.chain,
                     last_received_header or first_parent,
                     new_headers,
                     self._seal_check_random_sample_rate,
@@ -4,3 +4,7 @@ EMPTY_PEER_RESPONSE_PENALTY = 15.0
 # Picked a reorg number that is covered by a single skeleton header request,
 # which covers about 6 days at 15s blocks
 MAX_SKELETON_REORG_DEPTH = 35000
+
+# Most seals to check in a single task of the worker pool. Smaller tasks spread a big
+# batch of headers over more workers, bigger tasks save on round trips to the workers.
+MAX_SEALS_PER_WORKER_TASK = 16
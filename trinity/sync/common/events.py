@@ -110,6 +110,35 @@ class CollectMissingStorage(BaseRequestResponseEvent[MissingStorageCollected]):
         return MissingStorageCollected
 
 
+@dataclass
+class MissingStateCollected(BaseEvent):
+    """
+    Response to :cls:`CollectMissingState`, emitted only after all the state has
+    been downloaded from peers, and can be retrieved in the database.
+    """
+    num_nodes_collected: int
+
+
+@dataclass
+class CollectMissingState(BaseRequestResponseEvent[MissingStateCollected]):
+    """
+    A speculative execution found that the given accounts, storage slots, bytecodes
+    and trie nodes are missing from the state DB. Unlike the other Collect* events,
+    execution did not pause, so all the missing state can be downloaded at once.
+    """
+    # (address hash, state root hash) pairs
+    accounts: Tuple[Tuple[Hash32, Hash32], ...]
+    # (storage key, storage root hash, account address) triplets
+    storages: Tuple[Tuple[Hash32, Hash32, Address], ...]
+    bytecode_hashes: Tuple[Hash32, ...]
+    node_hashes: Tuple[Hash32, ...]
+    urgent: bool
+
+    @staticmethod
+    def expected_response_type() -> Type[MissingStateCollected]:
+        return MissingStateCollected
+
+
 @dataclass
 class StatelessBlockImportDone(BaseEvent):
     """
@@ -64,6 +64,7 @@ from trinity.sync.common.constants import (
 )
 from trinity.sync.common.events import SyncingRequest, SyncingResponse
 from trinity.sync.common.peers import TChainPeer, WaitingPeers
+from trinity.sync.common.seals import validate_header_chain
 from trinity.sync.common.strategies import (
     FromGenesisLaunchStrategy,
     SyncLaunchStrategyAPI,
@@ -177,7 +178,7 @@ class SkeletonSyncer(BaseService, Generic[TChainPeer]):
             pairs = tuple(zip(parents, children))
             try:
                 validate_pair_coros = (
-                    self.wait(self._chain.coro_validate_chain(parent, (child, )))
+                    self.wait(validate_header_chain(self._chain, parent, (child, )))
                     for parent, child in pairs
                 )
                 await self.wait(asyncio.gather(*validate_pair_coros, loop=self.get_event_loop()))
@@ -231,7 +232,8 @@ class SkeletonSyncer(BaseService, Generic[TChainPeer]):
             if len(final_headers) == 0:
                 break
 
-            await self.wait(self._chain.coro_validate_chain(
+            await self.wait(validate_header_chain(
+                self._chain,
                 previous_tail_header,
                 final_headers,
                 SEAL_CHECK_RANDOM_SAMPLE_RATE,
@@ -348,7 +350,8 @@ class SkeletonSyncer(BaseService, Generic[TChainPeer]):
                     f"First header {new_headers[0]} did not have parent in DB"
                 ) from exc
             # validate new headers against the parent in the database
-            await self.wait(self._chain.coro_validate_chain(
+            await self.wait(validate_header_chain(
+                self._chain,
                 launch_parent,
                 new_headers,
                 SEAL_CHECK_RANDOM_SAMPLE_RATE,
@@ -404,7 +407,8 @@ class SkeletonSyncer(BaseService, Generic[TChainPeer]):
         # validate the filled headers
         filled_gap_children = tuple(concatv(gap_headers, pairs[gap_index + 1]))
         try:
-            await self.wait(self._chain.coro_validate_chain(
+            await self.wait(validate_header_chain(
+                self._chain,
                 gap_parent,
                 filled_gap_children,
                 SEAL_CHECK_RANDOM_SAMPLE_RATE,
@@ -737,7 +741,8 @@ class HeaderMeatSyncer(BaseService, PeerSubscriber, Generic[TChainPeer]):
             return tuple()
         else:
             try:
-                await self.wait(self._chain.coro_validate_chain(
+                await self.wait(validate_header_chain(
+                    self._chain,
                     parent_header,
                     headers,
                     SEAL_CHECK_RANDOM_SAMPLE_RATE,
@@ -988,7 +993,8 @@ class BaseHeaderChainSyncer(BaseService, HeaderSyncerAPI, Generic[TChainPeer]):
                 raise ValidationError(f"Header skeleton gap of {gap_length} > {MAX_HEADERS_FETCH}")
             elif gap_length == 0:
                 # no need to fill in when there is no gap, just verify against previous header
-                await self.wait(self._chain.coro_validate_chain(
+                await self.wait(validate_header_chain(
+                    self._chain,
                     previous_segment[-1],
                     segment,
                     SEAL_CHECK_RANDOM_SAMPLE_RATE,
@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from inspect import getattr_static
+import logging
+import random
+from typing import (
+    Awaitable,
+    Iterable,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from eth.abc import (
+    BlockHeaderAPI,
+    VirtualMachineAPI,
+)
+from eth.consensus.pow import check_pow
+from eth.vm.base import VM
+from eth_typing import Hash32
+from eth_utils.toolz import (
+    groupby,
+    partition_all,
+)
+from pyethash import EPOCH_LENGTH
+
+from trinity.chains.base import AsyncChainAPI
+from trinity.sync.common.constants import MAX_SEALS_PER_WORKER_TASK
+from trinity._utils.mp import (
+    discard_worker_pool,
+    get_worker_pool,
+)
+
+logger = logging.getLogger('trinity.sync.common.seals')
+
+# The fields of a header that are needed to check its proof of work:
+# block number, mining hash, mix hash, nonce and difficulty
+PowSeal = Tuple[int, Hash32, Hash32, bytes, int]
+
+
+def check_pow_seals(seals: Iterable[PowSeal]) -> None:
+    """
+    Check the proof of work of each seal, raising a ``ValidationError`` at the first
+    invalid one.
+
+    This runs in the worker processes, each of which keeps its own ethash caches of
+    the most recent epochs, so the seals of a task should all be from the same epoch.
+    """
+    for seal in seals:
+        check_pow(*seal)
+
+
+def _get_pow_seal(header: BlockHeaderAPI) -> PowSeal:
+    return (
+        header.block_number,
+        header.mining_hash,
+        header.mix_hash,
+        header.nonce,
+        header.difficulty,
+    )
+
+
+def _is_pow_sealed(vm_class: Type[VirtualMachineAPI]) -> bool:
+    # VMs that replace the default proof of work check must be checked in-process. The
+    #   replacement may be any kind of attribute, like a plain function passed to
+    #   configure(), so compare the attributes as they are defined on the classes.
+    return getattr_static(vm_class, 'validate_seal') is getattr_static(VM, 'validate_seal')
+
+
+def _sample_seal_indices(num_headers: int, seal_check_random_sample_rate: int) -> Set[int]:
+    # The same sampling as Chain.validate_chain()
+    if seal_check_random_sample_rate == 1:
+        return set(range(num_headers))
+    elif seal_check_random_sample_rate == 0:
+        return set()
+    else:
+        sample_size = num_headers // seal_check_random_sample_rate
+        return set(random.sample(range(num_headers), sample_size))
+
+
+def _check_seals_in_process(
+        vm_classes_and_headers: Sequence[Tuple[Type[VirtualMachineAPI], BlockHeaderAPI]]) -> None:
+    for vm_class, header in vm_classes_and_headers:
+        vm_class.validate_seal(header)
+
+
+async def _check_pow_seals_in_worker(seals: Sequence[PowSeal]) -> None:
+    loop = asyncio.get_event_loop()
+    pool = get_worker_pool()
+    try:
+        await loop.run_in_executor(pool, check_pow_seals, seals)
+    except BrokenProcessPool:
+        logger.exception("Seal check worker pool died, restarting it")
+        discard_worker_pool(pool)
+        await loop.run_in_executor(None, check_pow_seals, seals)
+
+
+async def validate_header_chain(
+        chain: AsyncChainAPI,
+        parent: BlockHeaderAPI,
+        headers: Sequence[BlockHeaderAPI],
+        seal_check_random_sample_rate: int = 1) -> None:
+    """
+    Validate that the headers are a valid chain of descendants of ``parent``, like
+    ``Chain.validate_chain()`` does, raising a ``ValidationError`` if they are not.
+
+    The checks of each header against its parent run in order in a thread, while the
+    seals of the sampled headers are checked at the same time in the worker pool, in
+    tasks grouped by ethash epoch.
+    """
+    seal_indices = _sample_seal_indices(len(headers), seal_check_random_sample_rate)
+
+    pow_seals: List[PowSeal] = []
+    other_seals: List[Tuple[Type[VirtualMachineAPI], BlockHeaderAPI]] = []
+    for index in sorted(seal_indices):
+        header = headers[index]
+        vm_class = chain.get_vm_class_for_block_number(header.block_number)
+        if _is_pow_sealed(vm_class):
+            pow_seals.append(_get_pow_seal(header))
+        else:
+            other_seals.append((vm_class, header))
+
+    seals_by_epoch = groupby(lambda seal: seal[0] // EPOCH_LENGTH, pow_seals)
+    seal_checks: Tuple[Awaitable[None], ...] = tuple(
+        _check_pow_seals_in_worker(batch)
+        for epoch_seals in seals_by_epoch.values()
+        for batch in partition_all(MAX_SEALS_PER_WORKER_TASK, epoch_seals)
+    )
+
+    if other_seals:
+        loop = asyncio.get_event_loop()
+        seal_checks += (loop.run_in_executor(None, _check_seals_in_process, other_seals), )
+
+    await asyncio.gather(
+        chain.coro_validate_chain(parent, tuple(headers), seal_check_random_sample_rate=0),
+        *seal_checks,
+    )
@@ -58,7 +58,10 @@ from p2p.stats.ema import EMA
 from p2p.token_bucket import TokenBucket
 
 from trinity.chains.base import AsyncChainAPI
-from trinity.db.eth1.chain import BaseAsyncChainDB
+from trinity.db.eth1.chain import (
+    BaseAsyncChainDB,
+    PreparedBlocks,
+)
 from trinity.protocol.eth.monitors import ETHChainTipMonitor
 from trinity.protocol.eth import commands
 from trinity.protocol.eth.constants import (
@@ -68,10 +71,7 @@ from trinity.protocol.eth.constants import (
 from trinity.protocol.eth.peer import ETHPeer, ETHPeerPool
 from trinity.protocol.eth.sync import ETHHeaderChainSyncer
 from trinity.rlp.block_body import BlockBody
-from trinity.sync.common.chain import (
-    BaseBlockImporter,
-    SimpleBlockImporter,
-)
+from trinity.sync.common.chain import BaseBlockImporter
 from trinity.sync.common.constants import (
     EMPTY_PEER_RESPONSE_PENALTY,
 )
@@ -79,9 +79,11 @@ from trinity.sync.common.headers import HeaderSyncerAPI
 from trinity.sync.common.peers import WaitingPeers
 from trinity.sync.full.constants import (
     HEADER_QUEUE_SIZE_TARGET,
+    BLOCK_PERSIST_PIPELINE_DEPTH,
     BLOCK_QUEUE_SIZE_TARGET,
     BLOCK_IMPORT_QUEUE_SIZE,
 )
+from trinity.sync.full.importer import PipelinedBlockImporter
 from trinity._utils.datastructures import (
     BaseOrderedTaskPreparation,
     MissingDependency,
@@ -505,6 +507,9 @@ class ChainSyncStats(NamedTuple):
     num_transactions: int
     transactions_per_second: float
 
+    # seconds spent writing blocks to the database, since the previous report
+    time_in_persist: float
+
 
 class ChainSyncPerformanceTracker:
     def __init__(self, head: BlockHeaderAPI) -> None:
@@ -525,9 +530,15 @@ class ChainSyncPerformanceTracker:
         # Number of transactions processed
         self.num_transactions = 0
 
+        # Seconds spent persisting blocks
+        self.time_in_persist = 0.0
+
     def record_transactions(self, count: int) -> None:
         self.num_transactions += count
 
+    def record_persist(self, seconds: float) -> None:
+        self.time_in_persist += seconds
+
     def set_latest_head(self, head: BlockHeaderAPI) -> None:
         self.latest_head = head
 
@@ -549,10 +560,12 @@ class ChainSyncPerformanceTracker:
             blocks_per_second=self.blocks_per_second_ema.value,
             num_transactions=self.num_transactions,
             transactions_per_second=self.transactions_per_second_ema.value,
+            time_in_persist=self.time_in_persist,
         )
 
         # reset the counters
         self.num_transactions = 0
+        self.time_in_persist = 0.0
         self.prev_head = self.latest_head
 
         return stats
@@ -590,6 +603,10 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
             # make sure that a block is not persisted until the parent block is persisted
             dependency_extractor=attrgetter('parent_hash'),
         )
+        # blocks that are ready to be persisted, in order, while an earlier batch is written
+        self._prepared_blocks: 'asyncio.Queue[PreparedBlocks]' = asyncio.Queue(
+            BLOCK_PERSIST_PIPELINE_DEPTH,
+        )
         # Track whether the fast chain syncer completed its goal
         self.is_complete = False
 
@@ -609,6 +626,7 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
         self.run_daemon_task(self._assign_receipt_download_to_peers())
         self.run_daemon_task(self._assign_body_download_to_peers())
         self.run_daemon_task(self._persist_ready_blocks())
+        self.run_daemon_task(self._persist_prepared_blocks())
         self.run_daemon_task(self._display_stats())
         await super()._run()
 
@@ -669,6 +687,7 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
                     "bps=%-3d  "
                     "tps=%-4d  "
                     "elapsed=%0.1f  "
+                    "persist=%0.1f  "
                     "head=#%d %s  "
                     "age=%s"
                 ),
@@ -677,6 +696,7 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
                 stats.blocks_per_second,
                 stats.transactions_per_second,
                 stats.elapsed,
+                stats.time_in_persist,
                 stats.latest_head.block_number,
                 humanize_hash(stats.latest_head.hash),
                 humanize_seconds(head_age),
@@ -684,11 +704,13 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
 
     async def _persist_ready_blocks(self) -> None:
         """
-        Persist blocks as soon as all their prerequisites are done: body and receipt downloads.
-        Persisting must happen in order, so that the block's parent has already been persisted.
+        Prepare blocks as soon as all their prerequisites are done: body and receipt downloads.
+        Persisting must happen in order, so that the block's parent has already been persisted,
+        so prepared blocks are queued up for :meth:`_persist_prepared_blocks`.
 
-        Also, determine if fast sync with this peer should end, having reached (or surpassed)
-        its target hash. If so, shut down this service.
+        The next batch of blocks is prepared while the previous one is being written: the
+        transaction lookups and the uncles to write are built in the executor, so the
+        transactions are hashed and the writes are encoded off the event loop.
         """
         while self.is_operational:
             # This tracker waits for all prerequisites to be complete, and returns headers in
@@ -704,11 +726,27 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
                 # There is available capacity, let any waiting coroutines continue
                 self._db_buffer_capacity.set()
 
-            await self.wait(self._persist_blocks(completed_headers))
+            blocks = self._prepare_blocks(completed_headers)
+            prepared = await self.wait(self.db.coro_prepare_blocks(blocks))
+
+            # hang here if the database writes fall behind by more than the pipeline depth
+            await self.wait(self._prepared_blocks.put(prepared))
+
+    async def _persist_prepared_blocks(self) -> None:
+        """
+        Persist the prepared batches of blocks, in the order they were prepared.
+
+        Also, determine if fast sync with this peer should end, having reached (or surpassed)
+        its target hash. If so, shut down this service.
+        """
+        while self.is_operational:
+            prepared = await self.wait(self._prepared_blocks.get())
+
+            await self.wait(self._persist_blocks(prepared))
 
             target_hash = self._header_syncer.get_target_header_hash()
 
-            if target_hash in [header.hash for header in completed_headers]:
+            if target_hash in [block.hash for block in prepared.blocks]:
                 # exit the service when reaching the target hash
                 self._mark_complete()
                 break
@@ -717,12 +755,13 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
         self.is_complete = True
         self.cancel_nowait()
 
-    async def _persist_blocks(self, headers: Sequence[BlockHeaderAPI]) -> None:
+    def _prepare_blocks(self, headers: Sequence[BlockHeaderAPI]) -> Tuple[BlockAPI, ...]:
         """
-        Persist blocks for the given headers, directly to the database
+        Build the blocks for the given headers, from the downloaded bodies.
 
         :param headers: headers for which block bodies and receipts have been downloaded
         """
+        blocks = []
         for header in headers:
             vm_class = self.chain.get_vm_class(header)
             block_class = vm_class.get_block_class()
@@ -739,12 +778,26 @@ class FastChainBodySyncer(BaseBodyChainSyncer):
                 tx_class = block_class.get_transaction_class()
                 transactions = [tx_class.from_base_transaction(tx) for tx in body.transactions]
 
-                # record progress in the tracker
-                self.tracker.record_transactions(len(transactions))
+            blocks.append(block_class(header, transactions, uncles))
+
+        return tuple(blocks)
 
-            block = block_class(header, transactions, uncles)
-            await self.wait(self.db.coro_persist_block(block))
-            self.tracker.set_latest_head(header)
+    async def _persist_blocks(self, prepared: PreparedBlocks) -> None:
+        """
+        Persist the given blocks directly to the database, as a single atomic batch.
+
+        :param prepared: contiguous blocks, whose transactions and receipts are already
+            persisted
+        """
+        timer = Timer()
+        await self.wait(self.db.coro_persist_prepared_blocks(prepared))
+
+        # record progress in the tracker
+        self.tracker.record_persist(timer.elapsed)
+        self.tracker.record_transactions(
+            sum(len(block.transactions) for block in prepared.blocks)
+        )
+        self.tracker.set_latest_head(prepared.blocks[-1].header)
 
     async def _assign_receipt_download_to_peers(self) -> None:
         """
@@ -957,7 +1010,7 @@ class RegularChainSyncer(BaseService):
             db,
             peer_pool,
             self._header_syncer,
-            SimpleBlockImporter(chain),
+            PipelinedBlockImporter(chain),
             self.cancel_token,
         )
 
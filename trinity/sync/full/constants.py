@@ -13,6 +13,11 @@ HEADER_QUEUE_SIZE_TARGET = 6000
 # Only need a few seconds of buffer on the DB write side.
 BLOCK_QUEUE_SIZE_TARGET = 1000
 
+# How many batches of blocks may be prepared for persisting, while an earlier batch is
+# still being written to the database. Preparing a batch (building the blocks and their
+# transaction lookups) overlaps with the write of the previous one.
+BLOCK_PERSIST_PIPELINE_DEPTH = 2
+
 # How many blocks to import at a time
 # Only need a few seconds of buffer on the DB side
 # This is specifically for blocks where execution happens locally.
@@ -26,3 +31,10 @@ BLOCK_QUEUE_SIZE_TARGET = 1000
 BLOCK_IMPORT_QUEUE_SIZE = 31
 # This metric seems hard to pin down, we may have to expose it as a command line flag,
 #   until we have a better mechanism for backpressure related to slowness in I/O.
+
+# How many recent blocks make up the window of latencies that the block import pipeline
+# reports percentiles for, for each stage.
+BLOCK_IMPORT_STATS_WINDOW = 200
+
+# How many blocks to import between each log of the import pipeline latencies
+BLOCK_IMPORT_STATS_LOG_INTERVAL = 100
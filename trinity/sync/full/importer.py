@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from typing import (
+    Dict,
+    Iterable,
+    Tuple,
+    Type,
+)
+
+from eth.abc import (
+    BlockAPI,
+    BlockHeaderAPI,
+    SignedTransactionAPI,
+    VirtualMachineAPI,
+)
+from eth.constants import CREATE_CONTRACT_ADDRESS
+from eth.vm.interrupt import MissingBytecode
+from eth_typing import (
+    Address,
+    Hash32,
+)
+from trie.exceptions import MissingTrieNode
+
+from p2p.stats.percentile import Percentile
+
+from trinity.chains.base import AsyncChainAPI
+from trinity.sync.common.chain import BaseBlockImporter
+from trinity.sync.full.constants import (
+    BLOCK_IMPORT_STATS_LOG_INTERVAL,
+    BLOCK_IMPORT_STATS_WINDOW,
+)
+from trinity._utils.senders import sender_cache
+from trinity._utils.timer import Timer
+
+ImportBlockType = Tuple[BlockAPI, Tuple[BlockAPI, ...], Tuple[BlockAPI, ...]]
+
+
+class StageLatency:
+    """
+    Track the median and 99th percentile of the recent latencies of an import stage.
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.p50 = Percentile(percentile=0.5, window_size=BLOCK_IMPORT_STATS_WINDOW)
+        self.p99 = Percentile(percentile=0.99, window_size=BLOCK_IMPORT_STATS_WINDOW)
+
+    def update(self, seconds: float) -> None:
+        self.p50.update(seconds)
+        self.p99.update(seconds)
+
+    def __str__(self) -> str:
+        try:
+            return f"{self.name}=(p50 {self.p50.value:.3f}s, p99 {self.p99.value:.3f}s)"
+        except ValueError:
+            return f"{self.name}=(none)"
+
+
+class PipelinedBlockImporter(BaseBlockImporter):
+    """
+    Import blocks one at a time, while preparing the upcoming previewed blocks at the
+    same time: their transactions are validated and their senders are recovered in the
+    worker pool, unless the sender cache has them already. Then the accounts they touch
+    are read from the parent state in a thread, to warm the database before the block
+    is executed.
+
+    Only the preparation runs ahead, the state transition of each block stays serial.
+    """
+    logger = logging.getLogger('trinity.sync.full.importer.PipelinedBlockImporter')
+
+    def __init__(self, chain: AsyncChainAPI) -> None:
+        self._chain = chain
+
+        # block hash -> (block number, preparation of the block)
+        self._preparations: Dict[Hash32, Tuple[int, 'asyncio.Future[None]']] = {}
+
+        self._recover_latency = StageLatency('recover')
+        self._prefetch_latency = StageLatency('prefetch')
+        self._wait_latency = StageLatency('wait')
+        self._execute_latency = StageLatency('execute')
+        self._blocks_imported = 0
+
+    async def preview_transactions(
+            self,
+            header: BlockHeaderAPI,
+            transactions: Tuple[SignedTransactionAPI, ...],
+            parent_state_root: Hash32,
+            lagging: bool = True) -> None:
+
+        if not transactions or header.hash in self._preparations:
+            return
+
+        preparation = asyncio.ensure_future(
+            self._prepare_block(header, transactions, parent_state_root)
+        )
+        self._preparations[header.hash] = (header.block_number, preparation)
+
+    async def import_block(self, block: BlockAPI) -> ImportBlockType:
+        # drop the preparations that will never be needed, like for a block that was
+        # imported before it was previewed
+        for block_hash, (block_number, preparation) in tuple(self._preparations.items()):
+            if block_number < block.number:
+                self._discard_preparation(preparation)
+                del self._preparations[block_hash]
+
+        if block.hash in self._preparations:
+            _, preparation = self._preparations.pop(block.hash)
+            wait_timer = Timer()
+            try:
+                await preparation
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # the preparation is only an optimization, the import does all the work anyway
+                self.logger.exception("Failed to prepare block %s, importing it anyway", block)
+            self._wait_latency.update(wait_timer.elapsed)
+
+        execute_timer = Timer()
+        import_result = await self._chain.coro_import_block(block, perform_validation=True)
+        self._execute_latency.update(execute_timer.elapsed)
+
+        self._blocks_imported += 1
+        if self._blocks_imported % BLOCK_IMPORT_STATS_LOG_INTERVAL == 0:
+            self.logger.debug(
+                "Import pipeline latencies of the last %d blocks: %s %s %s %s, %s",
+                BLOCK_IMPORT_STATS_WINDOW,
+                self._recover_latency,
+                self._prefetch_latency,
+                self._wait_latency,
+                self._execute_latency,
+                sender_cache,
+            )
+
+        return import_result
+
+    @staticmethod
+    def _discard_preparation(preparation: 'asyncio.Future[None]') -> None:
+        # A preparation that finished already isn't cancelled, so retrieve its exception
+        #   to avoid the "Task exception was never retrieved" warning.
+        preparation.cancel()
+        preparation.add_done_callback(
+            lambda future: None if future.cancelled() else future.exception()
+        )
+
+    async def _prepare_block(
+            self,
+            header: BlockHeaderAPI,
+            transactions: Tuple[SignedTransactionAPI, ...],
+            parent_state_root: Hash32) -> None:
+
+        recover_timer = Timer()
+        senders = await sender_cache.recover_senders(transactions)
+        self._recover_latency.update(recover_timer.elapsed)
+        if None in senders:
+            # the import will fail on the same validation, and report it
+            self.logger.debug("Skipping preparation of block %s with invalid transactions", header)
+            return
+
+        recipients = tuple(
+            transaction.to for transaction in transactions
+            if transaction.to != CREATE_CONTRACT_ADDRESS
+        )
+        loop = asyncio.get_event_loop()
+        prefetch_timer = Timer()
+        await loop.run_in_executor(
+            None,
+            self._prefetch_accounts,
+            self._chain.get_vm_class(header),
+            parent_state_root,
+            senders,
+            recipients,
+        )
+        self._prefetch_latency.update(prefetch_timer.elapsed)
+
+    def _prefetch_accounts(
+            self,
+            vm_class: Type[VirtualMachineAPI],
+            parent_state_root: Hash32,
+            senders: Iterable[Address],
+            recipients: Iterable[Address]) -> None:
+        """
+        Read the accounts of the senders, and the accounts and code of the recipients,
+        so that the trie nodes are in the database caches when the block executes.
+        """
+        db = self._chain.chaindb.db
+        if parent_state_root in db:
+            state_root = parent_state_root
+        else:
+            # The parent isn't imported yet. Most of the trie nodes along the way to the
+            # accounts are the same in the latest imported state, so warm those instead.
+            state_root = self._chain.chaindb.get_canonical_head().state_root
+
+        account_db_class = vm_class.get_state_class().get_account_db_class()
+        account_db = account_db_class(db, state_root)
+        try:
+            for sender in senders:
+                account_db.get_nonce(sender)
+            for recipient in recipients:
+                account_db.get_code(recipient)
+        except (MissingTrieNode, MissingBytecode):
+            # the state is incomplete, like right after a fast sync: nothing more to warm up
+            pass
@@ -49,6 +49,7 @@ from eth.rlp.receipts import Receipt
 from p2p.abc import CommandAPI
 from p2p.exceptions import (
     BadLESResponse,
+    MalformedMessage,
     NoConnectedPeers,
     NoEligiblePeers,
 )
@@ -122,7 +123,19 @@ class LightPeerChain(PeerSubscriber, BaseService, BaseLightPeerChain):
         with self.subscribe(self.peer_pool):
             while self.is_operational:
                 peer, cmd = await self.wait(self.msg_queue.get())
-                request_id = getattr(cmd.payload, 'request_id', None)
+                try:
+                    request_id = getattr(cmd.payload, 'request_id', None)
+                except MalformedMessage as err:
+                    # The payloads are decoded when they are first read, so like
+                    #   Connection.run() does for the messages it decodes, disconnect
+                    #   the peer that sent it.
+                    self.logger.debug(
+                        "Disconnecting peer %s for sending MalformedMessage: %s",
+                        peer,
+                        err,
+                    )
+                    peer.disconnect_nowait(DisconnectReason.BAD_PROTOCOL)
+                    continue
                 # request_id can be None here because not all LES messages include one. For
                 # instance, the Announce msg doesn't.
                 if request_id is not None and request_id in self._pending_replies: